@@ -3,68 +3,229 @@
 Created on Wed Nov 13 09:28:50 2024
 
 @author: Shane
+
+Asset build tool for Learniverse. Run it from anywhere after adding or changing
+pictures:
+
+    python GFX/recursivePNG2JPG.py [--quality 85] [--keep-png] [--workers N]
+
+It does two jobs, spread over a process pool:
+
+1. Converts every PNG under GFX/ to a JPG of the same name and deletes the PNG
+   (kept with --keep-png).
+2. Writes a copy of every picture under assets/images/ and GFX/, pre-scaled to
+   each windowed resolution the game offers, to assets/scaled/<width>x<height>/.
+   These pictures are all drawn full-window, so the game loads the copy for its
+   window size instead of scaling the full-size art every time.
+
+Each source's content hash is kept in asset_manifest.json along with its scaled
+copies. A re-run only re-encodes pictures that changed, and the game reads the
+same manifest to find the scaled copies.
 """
 
-from PIL import Image
+import argparse
+import ast
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import glob
+import hashlib
+import json
 import os
 
-def convert_png_to_jpg(quality=85):
-    current_directory = os.getcwd()  # Get the current directory where the script is running
-    
-    # Go through all files in the current directory and subdirectories
-    for root, _, files in os.walk(current_directory):
-        for file_name in files:
-            if file_name.lower().endswith(".png"):
-                base_name = os.path.splitext(file_name)[0]  # Get the base name without extension
-                input_path = os.path.join(root, file_name)  # Full path to the PNG file
-                output_file_name = f"{base_name}.jpg"  # Initial JPG file name
-                output_path = os.path.join(root, output_file_name)  # Full path to the output JPG file
-                counter = 1  # Initialize the counter
-
-                # Load the PNG image
-                try:
-                    img = Image.open(input_path)
-                    img = img.convert("RGB")  # Convert to RGB (because JPG doesn't support transparency)
-                    
-                    # Temporarily save the new JPG to a unique name for comparison purposes
-                    temp_output_file = os.path.join(root, f"{base_name}_temp.jpg")
-                    img.save(temp_output_file, "JPEG", quality=quality)
-
-                    # Check if the target JPG already exists
-                    if os.path.exists(output_path):
-                        # Compare file sizes
-                        existing_jpg_size = os.path.getsize(output_path)
-                        new_jpg_size = os.path.getsize(temp_output_file)
-
-                        if new_jpg_size == existing_jpg_size:
-                            print(f"{output_file_name} already exists with identical size in {root}, skipping...")
-                            os.remove(temp_output_file)  # Remove temporary JPG
-                            continue  # Skip this file
-                        else:
-                            # If sizes differ, proceed to rename with a suffix
-                            while os.path.exists(output_path):
-                                output_file_name = f"{base_name}_{counter}.jpg"
-                                output_path = os.path.join(root, output_file_name)
-                                counter += 1
-                                # Avoid infinite loops
-                                if counter > 100:
-                                    print(f"Unable to rename {file_name} in {root}, skipping after 100 attempts.")
-                                    os.remove(temp_output_file)  # Clean up temp file
-                                    break
-
-                    # If we are not skipping, move the temp file to the correct name
-                    if counter <= 100:
-                        os.rename(temp_output_file, output_path)  # Rename the temp file
-                        print(f"Converted and saved: {file_name} to {output_path} with quality: {quality}")
-                        
-                        # Delete the original PNG file after successful conversion
-                        os.remove(input_path)
-                        print(f"Deleted original PNG file: {input_path}")
-                    else:
-                        os.remove(temp_output_file)  # Clean up if renaming failed
-
-                except Exception as e:
-                    print(f"Error converting {file_name} in {root}: {e}")
-
-# Call the function
-convert_png_to_jpg(quality=85)
+from PIL import Image
+
+GAME_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANIFEST_PATH = 'asset_manifest.json'
+MANIFEST_VERSION = 2
+SCALED_DIRECTORY = 'assets/scaled'
+CONVERT_DIRECTORIES = ('GFX',)
+SCALE_DIRECTORIES = ('assets/images', 'GFX')
+SKIPPED_DIRECTORIES = ('assets/images/sprites', SCALED_DIRECTORY)  # Sprites are scaled by the bonus games
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+def read_game_resolutions():
+    """
+    Read WINDOWED_RESOLUTIONS from the game's source, so the tool always builds
+    the sizes the options menu offers.
+
+    Returns:
+        list: The (width, height) resolutions.
+    """
+    game_modules = sorted(glob.glob(os.path.join(GAME_DIRECTORY, 'learniverse*.py')))
+    with open(game_modules[-1], 'r', encoding='utf-8') as file:
+        tree = ast.parse(file.read())
+
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            if node.targets[0].id == 'WINDOWED_RESOLUTIONS':
+                return [tuple(resolution) for resolution in ast.literal_eval(node.value)]
+    raise ValueError(f"WINDOWED_RESOLUTIONS not found in {game_modules[-1]}")
+
+
+def file_hash(path):
+    """Return the SHA-1 of a file's contents."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_sources(directories, extensions, skipped=()):
+    """
+    List the files under the folders with one of the extensions, as paths
+    relative to the game folder with forward slashes.
+    """
+    sources = []
+    for directory in directories:
+        for root, folders, files in os.walk(directory):
+            relative_root = os.path.relpath(root).replace(os.sep, '/')
+            folders[:] = sorted(folder for folder in folders if f"{relative_root}/{folder}" not in skipped)
+            sources.extend(f"{relative_root}/{file}" for file in sorted(files) if file.lower().endswith(extensions))
+    return sources
+
+
+def save_image(image, path, quality):
+    """Save an image, as a JPEG at the given quality if the path ends in .jpg."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if path.lower().endswith(('.jpg', '.jpeg')):
+        image.convert('RGB').save(path, 'JPEG', quality=quality)
+    else:
+        image.save(path)
+
+
+def convert_png_to_jpg(png_path, quality, keep_png):
+    """
+    Convert one PNG to a JPG of the same name.
+
+    Returns:
+        tuple: (png path, jpg path).
+    """
+    jpg_path = os.path.splitext(png_path)[0] + '.jpg'
+    with Image.open(png_path) as image:
+        save_image(image, jpg_path, quality)
+    if not keep_png:
+        os.remove(png_path)
+    return png_path, jpg_path
+
+
+def scaled_path(source_path, resolution):
+    """Return where the copy of a source pre-scaled for a resolution is written."""
+    return f"{SCALED_DIRECTORY}/{resolution[0]}x{resolution[1]}/{source_path}"
+
+
+def scale_image(source_path, source_hash, resolutions, quality):
+    """
+    Write a copy of one picture scaled to each resolution, stretched the same way
+    the game stretches it to fill the window. No copy is made for a resolution the
+    picture already has.
+
+    Returns:
+        tuple: (source path, its manifest entry).
+    """
+    variants = {}
+    with Image.open(source_path) as image:
+        image.load()
+        for resolution in resolutions:
+            if image.size == resolution:
+                continue
+            variant_path = scaled_path(source_path, resolution)
+            save_image(image.resize(resolution, Image.LANCZOS), variant_path, quality)
+            variants[f"{resolution[0]}x{resolution[1]}"] = variant_path
+        source_size = list(image.size)
+    return source_path, {"hash": source_hash, "size": source_size, "variants": variants}
+
+
+def load_manifest():
+    """Return the manifest from the last run, or an empty one."""
+    try:
+        with open(MANIFEST_PATH, 'r', encoding='utf-8') as file:
+            manifest = json.load(file)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "conversions": {}, "images": {}}
+
+
+def save_manifest(manifest):
+    """Write the manifest, replacing the old one only once the new one is complete."""
+    temporary_path = MANIFEST_PATH + '.tmp'
+    with open(temporary_path, 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=1, sort_keys=True)
+    os.replace(temporary_path, MANIFEST_PATH)
+
+
+def is_up_to_date(entry, source_hash, resolutions):
+    """Return True if a manifest entry was built from this content for these resolutions."""
+    if entry is None or entry["hash"] != source_hash:
+        return False
+    expected = {f"{width}x{height}" for width, height in resolutions if [width, height] != entry["size"]}
+    return set(entry["variants"]) == expected and all(os.path.exists(path) for path in entry["variants"].values())
+
+
+def build_assets(quality=85, keep_png=False, workers=None):
+    """
+    Convert new PNGs, pre-scale new or changed pictures and update the manifest.
+
+    Parameters:
+        quality (int): JPEG quality for converted and scaled pictures.
+        keep_png (bool): Whether to keep PNGs after converting them.
+        workers (int): Number of worker processes (defaults to the CPU count).
+    """
+    os.chdir(GAME_DIRECTORY)
+    resolutions = read_game_resolutions()
+    manifest = load_manifest()
+    manifest["resolutions"] = [list(resolution) for resolution in resolutions]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # A PNG kept from an earlier run is converted again only if it changed
+        conversions = []
+        for png_path in find_sources(CONVERT_DIRECTORIES, ('.png',)):
+            jpg_path = os.path.splitext(png_path)[0] + '.jpg'
+            previous = manifest["conversions"].get(png_path)
+            if os.path.exists(jpg_path) and (previous is None or previous["png_hash"] == file_hash(png_path)):
+                if previous is None:  # Never overwrite a different picture that has the same name
+                    print(f"{jpg_path} already exists, skipping {png_path}")
+                continue
+            conversions.append(executor.submit(convert_png_to_jpg, png_path, quality, keep_png))
+        for future in as_completed(conversions):
+            try:
+                png_path, jpg_path = future.result()
+                if keep_png:
+                    manifest["conversions"][png_path] = {"png_hash": file_hash(png_path), "jpg": jpg_path}
+                print(f"Converted {png_path} to {jpg_path}")
+            except Exception as e:
+                print(f"Error converting a PNG: {e}")
+
+        sources = find_sources(SCALE_DIRECTORIES, IMAGE_EXTENSIONS, SKIPPED_DIRECTORIES)
+        scalings = []
+        for source_path in sources:
+            source_hash = file_hash(source_path)
+            if not is_up_to_date(manifest["images"].get(source_path), source_hash, resolutions):
+                scalings.append(executor.submit(scale_image, source_path, source_hash, resolutions, quality))
+        for future in as_completed(scalings):
+            try:
+                source_path, entry = future.result()
+                manifest["images"][source_path] = entry
+            except Exception as e:
+                print(f"Error scaling a picture: {e}")
+
+    # Forget pictures that were deleted, along with their scaled copies
+    for source_path in set(manifest["images"]) - set(sources):
+        for variant_path in manifest["images"].pop(source_path)["variants"].values():
+            if os.path.exists(variant_path):
+                os.remove(variant_path)
+
+    save_manifest(manifest)
+    print(f"Converted {len(conversions)} PNGs and scaled {len(scalings)} of {len(sources)} pictures "
+          f"for {len(resolutions)} resolutions; manifest written to {MANIFEST_PATH}.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Convert PNGs to JPGs and pre-scale pictures for each window size.")
+    parser.add_argument('--quality', type=int, default=85, help="JPEG quality (default 85)")
+    parser.add_argument('--keep-png', action='store_true', help="keep PNGs after converting them")
+    parser.add_argument('--workers', type=int, default=None, help="number of worker processes (default: CPU count)")
+    arguments = parser.parse_args()
+    build_assets(arguments.quality, arguments.keep_png, arguments.workers)
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:40:00 2026
+
+@author: Alvadore Retro Technology
+"""
+
+import os
+import random
+import tempfile
+import unittest
+from learniverse_2025_02_25_08_56 import (AliasTable, AdaptiveMathGenerator, MATH_FACT_MAX_STALE_CELLS,
+                                          create_database_and_initialize_tables)
+
+SAMPLES = 200000
+
+
+def sample_frequencies(table, samples=SAMPLES):
+    """Draw from an alias table and return how often each index came up."""
+    counts = [0] * len(table.weights)
+    for _ in range(samples):
+        counts[table.sample()] += 1
+    return [count / samples for count in counts]
+
+
+class TestAliasTable(unittest.TestCase):
+    def setUp(self):
+        random.seed(1234)
+
+    def assertMatchesWeights(self, table):
+        total = sum(table.weights)
+        for frequency, weight in zip(sample_frequencies(table), table.weights):
+            self.assertAlmostEqual(frequency, weight / total, delta=0.01)
+
+    def test_initial_weights(self):
+        """Test that indexes are drawn in proportion to the weights the table was built with."""
+        self.assertMatchesWeights(AliasTable([1, 2, 3, 4]))
+
+    def test_updated_weights(self):
+        """Test that updated weights are honored before the table is rebuilt."""
+        table = AliasTable([1, 2, 3, 4])
+        table.update(0, 8)
+        table.update(2, 0.5)
+        self.assertEqual(len(table.stale), 2)  # Corrected by rejection, not rebuilt
+        self.assertMatchesWeights(table)
+
+    def test_zero_weight_is_never_drawn(self):
+        """Test that an index updated to weight 0 is never drawn."""
+        table = AliasTable([1, 1, 1])
+        table.update(1, 0)
+        self.assertEqual(sample_frequencies(table, 20000)[1], 0)
+
+    def test_rebuild_after_many_updates(self):
+        """Test that too many changed weights trigger a rebuild that keeps the new weights."""
+        table = AliasTable([1.0] * (MATH_FACT_MAX_STALE_CELLS + 2))
+        for index in range(MATH_FACT_MAX_STALE_CELLS + 1):
+            table.update(index, 1 + index % 3)
+        self.assertLess(len(table.stale), MATH_FACT_MAX_STALE_CELLS)
+        self.assertMatchesWeights(table)
+
+    def test_weight_of_unbuilt_index(self):
+        """Test that giving weight to an index built with weight 0 rebuilds the table."""
+        table = AliasTable([0, 1, 1])
+        table.update(0, 2)
+        self.assertEqual(table.stale, {})
+        self.assertMatchesWeights(table)
+
+
+class TestAdaptiveMathGenerator(unittest.TestCase):
+    def setUp(self):
+        random.seed(1234)
+        self.previous_directory = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+        create_database_and_initialize_tables()
+
+    def tearDown(self):
+        os.chdir(self.previous_directory)
+        self.directory.cleanup()
+
+    def test_subtraction_is_never_negative(self):
+        """Test that subtraction problems never have a negative answer."""
+        generator = AdaptiveMathGenerator(None, "sub", (1, 9), (1, 9))
+        for _ in range(2000):
+            num1, num2, answer = generator.next_problem()
+            self.assertGreaterEqual(answer, 0)
+            self.assertEqual(answer, num1 - num2)
+            generator.record(num1, num2, random.random() < 0.5, random.uniform(0.5, 10))
+
+    def test_missed_facts_are_drawn_more_often(self):
+        """Test that a fact answered wrongly and slowly is drawn more often than the others."""
+        generator = AdaptiveMathGenerator(None, "add", (1, 3), (1, 3))
+        generator.record(2, 3, False, 9)
+        counts = {}
+        for _ in range(9000):
+            num1, num2, _ = generator.next_problem()
+            counts[(num1, num2)] = counts.get((num1, num2), 0) + 1
+        self.assertEqual(max(counts, key=counts.get), (2, 3))
+
+    def test_save_and_load_round_trip(self):
+        """Test that a saved fact matrix is loaded back for the same student and fact set."""
+        generator = AdaptiveMathGenerator(1, "mul", (1, 9), (1, 9))
+        generator.record(7, 8, False, 6.5)
+        generator.record(7, 8, True, 2.0)
+        generator.record(3, 4, True, 1.25)
+        generator.save()
+
+        loaded = AdaptiveMathGenerator(1, "mul", (1, 9), (1, 9))
+        self.assertEqual(loaded.attempts, generator.attempts)
+        self.assertEqual(loaded.accuracy, generator.accuracy)
+        self.assertEqual(loaded.latency, generator.latency)
+        self.assertEqual(loaded.alias_table.weights, generator.alias_table.weights)
+
+        # Other students and fact sets keep their defaults
+        self.assertEqual(sum(AdaptiveMathGenerator(2, "mul", (1, 9), (1, 9)).attempts), 0)
+        self.assertEqual(sum(AdaptiveMathGenerator(1, "add", (1, 9), (1, 9)).attempts), 0)
+
+# Run the test
+if __name__ == "__main__":
+    unittest.main()
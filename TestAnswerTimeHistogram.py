@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:00:00 2026
+
+@author: Alvadore Retro Technology
+"""
+
+import json
+import random
+import unittest
+from learniverse_2025_02_25_08_56 import (ANSWER_TIME_BUCKET_COUNT, ANSWER_TIME_BUCKET_SECONDS, answer_time_percentile,
+                                          build_answer_time_histogram, decode_answer_time_histogram,
+                                          merge_answer_time_histograms)
+
+
+class TestAnswerTimeHistogram(unittest.TestCase):
+    def test_buckets(self):
+        """Test that answer times are counted into fixed-width buckets, clamped at both ends."""
+        histogram = build_answer_time_histogram([0.1, 0.2, 0.3, -1, 10_000])
+        self.assertEqual(histogram, {0: 3, 1: 1, ANSWER_TIME_BUCKET_COUNT - 1: 1})
+
+    def test_merge(self):
+        """Test that merging adds the counts of matching buckets."""
+        histogram = merge_answer_time_histograms({0: 2, 4: 1}, {4: 3, 7: 1})
+        self.assertEqual(histogram, {0: 2, 4: 4, 7: 1})
+
+    def test_decode_round_trip(self):
+        """Test that a histogram stored as JSON decodes back to integer buckets."""
+        histogram = build_answer_time_histogram([0.5, 1.7, 1.8, 4.2])
+        self.assertEqual(decode_answer_time_histogram(json.dumps(histogram)), histogram)
+        self.assertEqual(decode_answer_time_histogram(None), {})
+
+    def test_empty_percentile(self):
+        """Test that an empty histogram has a percentile of 0."""
+        self.assertEqual(answer_time_percentile({}, 90), 0)
+
+    def test_p90_matches_exact(self):
+        """Test that the estimated p90 is within one bucket of the exact p90 of the answer times."""
+        random.seed(1234)
+        answer_times = [random.lognormvariate(1, 0.6) for _ in range(5000)]
+        exact = sorted(answer_times)[int(len(answer_times) * 0.9) - 1]
+        estimate = answer_time_percentile(build_answer_time_histogram(answer_times), 90)
+        self.assertAlmostEqual(estimate, exact, delta=ANSWER_TIME_BUCKET_SECONDS)
+
+    def test_p90_of_merged_lessons(self):
+        """Test that the p90 of merged lessons equals the p90 of all their answers together."""
+        first = [1.0] * 9 + [6.0]
+        second = [2.0] * 5 + [8.0] * 5
+        merged = merge_answer_time_histograms(build_answer_time_histogram(first), build_answer_time_histogram(second))
+        self.assertEqual(answer_time_percentile(merged, 90),
+                         answer_time_percentile(build_answer_time_histogram(first + second), 90))
+        self.assertGreaterEqual(answer_time_percentile(merged, 90), 8.0)
+        self.assertLess(answer_time_percentile(merged, 90), 8.0 + ANSWER_TIME_BUCKET_SECONDS)
+
+# Run the test
+if __name__ == "__main__":
+    unittest.main()
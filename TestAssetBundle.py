@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:20:00 2026
+
+@author: Alvadore Retro Technology
+"""
+
+import io
+import os
+import tempfile
+import unittest
+from learniverse_2025_02_25_08_56 import AssetBundle, build_asset_bundle, normalize_asset_path
+
+
+class TestAssetBundle(unittest.TestCase):
+    def setUp(self):
+        self.previous_directory = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+
+        self.files = {
+            "assets/images/cats/cat01.jpg": os.urandom(5000),
+            "assets/images/cats/cat02.png": os.urandom(300),
+            "assets/sounds/meow.wav": os.urandom(1200),
+            "assets/music/theme.mp3": b"",
+            "GFX/title.bmp": os.urandom(70),
+        }
+        for path, contents in self.files.items():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as file:
+                file.write(contents)
+        with open("assets/images/cats/notes.txt", "w") as file:
+            file.write("Not an asset")
+
+        self.assertEqual(build_asset_bundle("test.bundle", ("assets", "GFX")), len(self.files))
+        self.bundle = AssetBundle("test.bundle")
+        self.assertTrue(self.bundle.open())
+
+    def tearDown(self):
+        self.bundle.close()
+        os.chdir(self.previous_directory)
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        """Test that every packed file reads back with the same bytes and type."""
+        self.assertEqual(set(self.bundle.entries), set(self.files))
+        for path, contents in self.files.items():
+            self.assertEqual(bytes(self.bundle.read(path)), contents)
+        self.assertEqual(self.bundle.entries["assets/sounds/meow.wav"][2], "sound")
+        self.assertEqual(self.bundle.entries["assets/music/theme.mp3"][2], "music")
+
+    def test_paths_are_normalized(self):
+        """Test that entries are found however their path is written."""
+        self.assertIn(os.path.join("assets", "images", "cats", "cat01.jpg"), self.bundle)
+        self.assertIn("./assets/images/cats/cat01.jpg", self.bundle)
+        self.assertNotIn("assets/images/cats/notes.txt", self.bundle)
+        self.assertEqual(normalize_asset_path("assets\\images\\cats/"), "assets/images/cats")
+
+    def test_list_directory(self):
+        """Test that only the entries directly inside a folder are listed."""
+        self.assertCountEqual(self.bundle.list_directory("assets/images/cats/"), ["cat01.jpg", "cat02.png"])
+        self.assertEqual(self.bundle.list_directory("assets/images"), [])
+        self.assertEqual(self.bundle.list_directory("assets/missing"), [])
+
+    def test_asset_file(self):
+        """Test that an opened entry reads and seeks like a file."""
+        contents = self.files["assets/images/cats/cat01.jpg"]
+        file = self.bundle.open_file("assets/images/cats/cat01.jpg")
+        self.assertEqual(file.read(10), contents[:10])
+        self.assertEqual(file.tell(), 10)
+        file.seek(-20, io.SEEK_END)
+        self.assertEqual(file.read(), contents[-20:])
+        self.assertEqual(file.read(5), b"")
+        file.seek(100)
+        file.seek(50, io.SEEK_CUR)
+        self.assertEqual(file.read(25), contents[150:175])
+        file.seek(0)
+        self.assertEqual(io.BufferedReader(file).read(), contents)
+
+    def test_missing_and_invalid_bundles(self):
+        """Test that a missing or corrupt bundle is not opened."""
+        self.assertFalse(AssetBundle("missing.bundle").open())
+        with open("corrupt.bundle", "wb") as file:
+            file.write(b"NOTABUNDLE" * 4)
+        corrupt = AssetBundle("corrupt.bundle")
+        self.assertFalse(corrupt.open())
+        self.assertEqual(corrupt.entries, {})
+
+# Run the test
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:40:00 2026
+
+@author: Alvadore Retro Technology
+"""
+
+import os
+import random
+import tempfile
+import unittest
+from learniverse_2025_02_25_08_56 import DirectoryIndex
+
+EXTENSIONS = ('.jpg', '.png')
+
+
+class TestDirectoryIndex(unittest.TestCase):
+    def setUp(self):
+        random.seed(1234)
+        self.directory = tempfile.TemporaryDirectory()
+        self.folder = self.directory.name
+        for name in ("cat01.jpg", "cat02.jpg", "cat03.png", "cat04.jpg", "readme.txt"):
+            self.add_file(name)
+        self.index = DirectoryIndex()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def add_file(self, name):
+        open(os.path.join(self.folder, name), "wb").close()
+        # Make sure the folder's modification time changes even on coarse clocks
+        modified_time = os.stat(self.folder).st_mtime_ns + 1_000_000_000
+        os.utime(self.folder, ns=(modified_time, modified_time))
+
+    def draw(self, count):
+        return [os.path.basename(self.index.pick(self.folder, EXTENSIONS)) for _ in range(count)]
+
+    def test_files_are_filtered(self):
+        """Test that only files with the given extensions are listed."""
+        self.assertEqual(sorted(self.index.files(self.folder, EXTENSIONS)),
+                         ["cat01.jpg", "cat02.jpg", "cat03.png", "cat04.jpg"])
+
+    def test_each_file_once_per_bag(self):
+        """Test that every file is picked once before any file is picked again."""
+        picks = self.draw(40)
+        for start in range(0, 40, 4):
+            self.assertCountEqual(picks[start:start + 4], ["cat01.jpg", "cat02.jpg", "cat03.png", "cat04.jpg"])
+
+    def test_no_immediate_repeat(self):
+        """Test that the same file is never picked twice in a row, even across bags."""
+        picks = self.draw(400)
+        for previous, current in zip(picks, picks[1:]):
+            self.assertNotEqual(previous, current)
+
+    def test_added_file_is_picked(self):
+        """Test that a file added to the folder refreshes the listing and joins the bag."""
+        self.draw(2)
+        self.add_file("cat05.jpg")
+        self.assertIn("cat05.jpg", self.index.files(self.folder, EXTENSIONS))
+        self.assertIn("cat05.jpg", self.draw(5))
+
+    def test_single_file(self):
+        """Test that a folder with one file keeps returning it."""
+        folder = os.path.join(self.folder, "single")
+        os.mkdir(folder)
+        open(os.path.join(folder, "only.png"), "wb").close()
+        self.assertEqual(self.index.pick(folder, EXTENSIONS), os.path.join(folder, "only.png"))
+        self.assertEqual(self.index.pick(folder, EXTENSIONS), os.path.join(folder, "only.png"))
+
+    def test_empty_folder(self):
+        """Test that a folder without matching files returns None."""
+        self.assertIsNone(self.index.pick(self.folder, ('.mp3',)))
+
+# Run the test
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:45:00 2026
+
+@author: Alvadore Retro Technology
+"""
+
+import unittest
+from learniverse_2025_02_25_08_56 import EntityPool
+
+
+class Particle:
+    created = 0
+
+    def __init__(self, x, y):
+        Particle.created += 1
+        self.reset(x, y)
+
+    def reset(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class TestEntityPool(unittest.TestCase):
+    def setUp(self):
+        Particle.created = 0
+        self.pool = EntityPool(Particle)
+
+    def test_acquire_creates_when_empty(self):
+        """Test that an empty pool builds a new instance from the arguments."""
+        particle = self.pool.acquire(1, 2)
+        self.assertEqual((particle.x, particle.y), (1, 2))
+        self.assertEqual(Particle.created, 1)
+
+    def test_released_instances_are_reused(self):
+        """Test that a released instance is reset and handed out again."""
+        particle = self.pool.acquire(1, 2)
+        self.pool.release(particle)
+        reused = self.pool.acquire(5, 6)
+        self.assertIs(reused, particle)
+        self.assertEqual((reused.x, reused.y), (5, 6))
+        self.assertEqual(Particle.created, 1)
+
+    def test_release_where(self):
+        """Test that release_where keeps the other items in order, in the same list."""
+        particles = [self.pool.acquire(x, 0) for x in range(6)]
+        live = particles
+        self.pool.release_where(particles, lambda particle: particle.x % 2 == 0)
+        self.assertIs(particles, live)
+        self.assertEqual([particle.x for particle in particles], [1, 3, 5])
+        self.assertEqual(sorted(particle.x for particle in self.pool.free), [0, 2, 4])
+
+    def test_release_all(self):
+        """Test that release_all empties the list and pools every item."""
+        particles = [self.pool.acquire(x, 0) for x in range(4)]
+        self.pool.release_all(particles)
+        self.assertEqual(particles, [])
+        self.assertEqual(len(self.pool.free), 4)
+        for x in range(4):
+            self.pool.acquire(x, 0)
+        self.assertEqual(Particle.created, 4)
+
+# Run the test
+if __name__ == "__main__":
+    unittest.main()
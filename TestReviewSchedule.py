@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:10:00 2026
+
+@author: Alvadore Retro Technology
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from learniverse_2025_02_25_08_56 import (DATETIME_FORMAT, REVIEW_DEFAULT_EASE, REVIEW_MINIMUM_EASE, answer_quality,
+                                          create_database_and_initialize_tables, get_database_cursor,
+                                          schedule_next_review, select_review_items)
+
+
+class TestScheduleNextReview(unittest.TestCase):
+    def test_answer_quality(self):
+        """Test that answers are graded by correctness and speed."""
+        self.assertEqual(answer_quality(False, 1), 1)
+        self.assertEqual(answer_quality(True, 1), 5)
+        self.assertEqual(answer_quality(True, 6), 4)
+
+    def test_interval_progression(self):
+        """Test that correct answers move the interval from 0 to 1 to 6 days, then multiply it by the ease."""
+        ease, interval_days, repetitions = schedule_next_review(REVIEW_DEFAULT_EASE, 0, 0, 4)
+        self.assertEqual((interval_days, repetitions), (1, 1))
+        ease, interval_days, repetitions = schedule_next_review(ease, interval_days, repetitions, 4)
+        self.assertEqual((interval_days, repetitions), (6, 2))
+        previous_interval = interval_days
+        ease, interval_days, repetitions = schedule_next_review(ease, interval_days, repetitions, 4)
+        self.assertEqual(repetitions, 3)
+        self.assertAlmostEqual(interval_days, round(previous_interval * ease, 2))
+
+    def test_ease_changes_with_quality(self):
+        """Test that a perfect answer raises the ease and a hesitant one keeps it."""
+        self.assertAlmostEqual(schedule_next_review(2.5, 6, 2, 5)[0], 2.6)
+        self.assertAlmostEqual(schedule_next_review(2.5, 6, 2, 4)[0], 2.5)
+
+    def test_lapse_resets(self):
+        """Test that a missed item goes back to interval 0 and repetition 0."""
+        ease, interval_days, repetitions = schedule_next_review(2.5, 15, 3, 1)
+        self.assertEqual((interval_days, repetitions), (0, 0))
+        self.assertLess(ease, 2.5)
+        self.assertEqual(schedule_next_review(ease, interval_days, repetitions, 5)[1:], (1, 1))
+
+    def test_ease_floor(self):
+        """Test that repeated lapses never push the ease below the minimum."""
+        ease = REVIEW_DEFAULT_EASE
+        for _ in range(10):
+            ease = schedule_next_review(ease, 0, 0, 0)[0]
+        self.assertEqual(ease, REVIEW_MINIMUM_EASE)
+
+
+class TestSelectReviewItems(unittest.TestCase):
+    def setUp(self):
+        self.previous_directory = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+        create_database_and_initialize_tables()
+
+        now = datetime.now()
+        schedule = {
+            "a": now - timedelta(days=1),      # Overdue
+            "b": now - timedelta(days=3),      # Most overdue
+            "c": now + timedelta(days=5),
+            "d": now + timedelta(hours=2),     # Due soonest
+        }
+        connection, cursor = get_database_cursor()
+        cursor.execute("INSERT INTO sessions (student_id, start_time) VALUES (?, ?)", (7, now.strftime(DATETIME_FORMAT)))
+        self.session_id = cursor.lastrowid
+        cursor.executemany('''
+            INSERT INTO review_schedule (student_id, deck, item, due) VALUES (?, ?, ?, ?)
+        ''', [(7, "Hiragana", item, due.strftime(DATETIME_FORMAT)) for item, due in schedule.items()])
+        cursor.execute('''
+            INSERT INTO review_schedule (student_id, deck, item, due) VALUES (?, ?, ?, ?)
+        ''', (7, "Katakana", "e", (now - timedelta(days=9)).strftime(DATETIME_FORMAT)))
+        connection.commit()
+        cursor.close()
+        connection.close()
+
+        self.items = ["a", "b", "c", "d", "e", "f"]  # e and f have never been seen in this deck
+
+    def tearDown(self):
+        os.chdir(self.previous_directory)
+        self.directory.cleanup()
+
+    def test_order(self):
+        """Test that overdue items come first, then new items from the end of the list, then the ones due soonest."""
+        self.assertEqual(select_review_items(self.session_id, "Hiragana", self.items, 6), ["b", "a", "f", "e", "d", "c"])
+
+    def test_count(self):
+        """Test that no more than count items are picked."""
+        self.assertEqual(select_review_items(self.session_id, "Hiragana", self.items, 3), ["b", "a", "f"])
+        self.assertEqual(select_review_items(self.session_id, "Hiragana", self.items, 0), [])
+
+    def test_due_only(self):
+        """Test that due_only picks only the overdue items."""
+        self.assertEqual(select_review_items(self.session_id, "Hiragana", self.items, 6, due_only=True), ["b", "a"])
+
+    def test_items_outside_the_list(self):
+        """Test that scheduled items not in the list are never picked."""
+        self.assertEqual(select_review_items(self.session_id, "Hiragana", ["c", "d"], 6), ["d", "c"])
+
+# Run the test
+if __name__ == "__main__":
+    unittest.main()
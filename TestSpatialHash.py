@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:30:00 2026
+
+@author: Alvadore Retro Technology
+"""
+
+import random
+import unittest
+import pygame
+from learniverse_2025_02_25_08_56 import SpatialHash
+
+
+class Entity:
+    def __init__(self, x, y, width, height):
+        self.rect = pygame.Rect(x, y, width, height)
+
+
+class TestSpatialHash(unittest.TestCase):
+    def test_matches_brute_force(self):
+        """Test that queries find exactly the entities a full scan would."""
+        random.seed(1234)
+        fish = [Entity(random.randint(-50, 900), random.randint(-50, 700), random.randint(1, 200), random.randint(1, 200))
+                for _ in range(200)]
+        grid = SpatialHash(64)
+        grid.rebuild({'fish': fish})
+        for _ in range(100):
+            rect = pygame.Rect(random.randint(-50, 900), random.randint(-50, 700), random.randint(1, 150), random.randint(1, 150))
+            expected = [entity for entity in fish if rect.colliderect(entity.rect)]
+            self.assertCountEqual(grid.query('fish', rect), expected)
+
+    def test_entity_spanning_cells_listed_once(self):
+        """Test that an entity overlapping several cells is returned once."""
+        grid = SpatialHash(10)
+        platform = Entity(0, 0, 100, 30)
+        grid.insert('platform', platform)
+        self.assertEqual(grid.query('platform', pygame.Rect(0, 0, 100, 30)), [platform])
+
+    def test_tags_are_separate(self):
+        """Test that a query only returns entities filed under its tag."""
+        grid = SpatialHash(32)
+        bomb = Entity(10, 10, 20, 20)
+        fish = Entity(10, 10, 20, 20)
+        grid.rebuild({'bomb': [bomb], 'fish': [fish]})
+        self.assertEqual(grid.query('bomb', pygame.Rect(0, 0, 40, 40)), [bomb])
+        self.assertEqual(grid.query('piranha', pygame.Rect(0, 0, 40, 40)), [])
+
+    def test_touching_edges_do_not_collide(self):
+        """Test that rects that only share an edge are not reported, as with Rect.colliderect."""
+        grid = SpatialHash(32)
+        grid.insert('fish', Entity(32, 0, 32, 32))
+        self.assertEqual(grid.query('fish', pygame.Rect(0, 0, 32, 32)), [])
+
+    def test_rebuild_clears_old_entities(self):
+        """Test that rebuilding the grid forgets entities from the last step."""
+        grid = SpatialHash(32)
+        old = Entity(0, 0, 10, 10)
+        new = Entity(100, 100, 10, 10)
+        grid.rebuild({'fish': [old]})
+        grid.rebuild({'fish': [new]})
+        self.assertEqual(grid.query('fish', pygame.Rect(0, 0, 200, 200)), [new])
+        grid.clear()
+        self.assertEqual(grid.query('fish', pygame.Rect(0, 0, 200, 200)), [])
+
+# Run the test
+if __name__ == "__main__":
+    unittest.main()
@@ -4,24 +4,38 @@
 Learniverse
 """
 
+from array import array
 import colorsys  
 import ctypes
 from datetime import datetime, timedelta
 import fractions
+import hashlib
+import io
 import json
 import math
+import mmap
 import noise
 import os
 import pygame
+import pygame.freetype
 import pyttsx3
 import random
+import shutil
 import sqlite3
+import struct
+import subprocess
 import sys
+import threading
 import time
 from typing import Optional, List, Tuple
 from unidecode import unidecode
 import webbrowser
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; effects that use it fall back to pure Python
+    np = None
+
 
 ###################################
 ### Constants and Configuration ###
@@ -30,15 +44,63 @@ import webbrowser
 # Our database name
 DB_NAME = 'learniverse.db'
 
+# Folder for generated files that are expensive to rebuild and safe to delete
+CACHE_DIRECTORY = 'cache'
+
+# Constants for the packed asset bundle (see build_asset_bundle)
+ASSET_BUNDLE_PATH = 'assets.bundle'
+ASSET_BUNDLE_DIRECTORIES = ('assets', 'GFX')
+ASSET_BUNDLE_MAGIC = b'LVASSETS'
+ASSET_BUNDLE_VERSION = 1
+ASSET_BUNDLE_HEADER = struct.Struct('<8sII')  # Magic, version, entry count
+ASSET_BUNDLE_ENTRY = struct.Struct('<QQBH')  # Offset, length, type, path length; the UTF-8 path follows
+ASSET_BUNDLE_TYPES = ('image', 'sound', 'music')
+ASSET_BUNDLE_EXTENSIONS = {
+    '.png': 'image', '.jpg': 'image', '.jpeg': 'image', '.bmp': 'image', '.ico': 'image',
+    '.wav': 'sound', '.mp3': 'music', '.ogg': 'music'
+}
+
+# Manifest of the pictures pre-scaled for each windowed resolution by GFX/recursivePNG2JPG.py
+ASSET_MANIFEST_PATH = 'asset_manifest.json'
+ASSET_MANIFEST_VERSION = 2  # Copies are scaled to exactly each window size
+
 # Format to get a human friendly date in the database
 DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+# Constants for the daily lesson statistics
+ANSWER_TIME_BUCKET_SECONDS = 0.25  # Width of one answer time histogram bucket
+ANSWER_TIME_BUCKET_COUNT = 240  # Buckets cover 0-60 seconds; slower answers share the last bucket
+
+# Constants for the spaced repetition scheduler (SM-2)
+REVIEW_DEFAULT_EASE = 2.5  # Starting ease factor for a new item
+REVIEW_MINIMUM_EASE = 1.3  # Ease factor never drops below this
+REVIEW_FAST_ANSWER_SECONDS = 3  # Correct answers faster than this count as effortless recall
+REVIEW_RELEARN_MINUTES = 10  # A missed item comes back after this many minutes
+JAPANESE_REVIEW_QUESTIONS = 3  # Due words from earlier levels added to a Japanese vocab quiz
+
+# Constants for Japanese fonts and the kana glyph atlas
+JAPANESE_FONT_TEST_TEXT = "あア日本語"  # A font is used for Japanese only if it has all of these glyphs
+JAPANESE_FONT_PREFERENCES = (  # Font file name prefixes tried first, in order
+    "msgothic", "yugoth", "meiryo", "hiragino", "notosanscjk", "notosansjp",
+    "sourcehansans", "ipag", "ipaexg", "takao", "vlgothic", "droidsansfallback", "wqy"
+)
+FONT_FILE_EXTENSIONS = ('.ttf', '.ttc', '.otf')
+KANA_ATLAS_CACHE_DIRECTORY = os.path.join(CACHE_DIRECTORY, 'kana')
+KANA_ATLAS_WIDTH = 2048  # Width of a packed kana atlas in pixels
+KANA_TEACH_FONT_SIZE = 300  # Size the teach screens show each kana at
+
+# Constants for the adaptive math problem generator
+MATH_FACT_MAX_CELLS = 10000  # Operand ranges with more pairs than this are drawn uniformly
+MATH_FACT_SMOOTHING = 0.3  # Weight of the newest answer in a fact's accuracy and latency averages
+MATH_FACT_MAX_STALE_CELLS = 32  # Changed facts tolerated before the alias table is rebuilt
+
 # Set the title of the window
 pygame.display.set_caption("Learniverse")
 
 # Constants for display and opacity
 DISPLAY_TIME = 2000  # Time for text at full opacity (in milliseconds)
 FADE_SPEED = 5  # Controls the fade-in and fade-out speed
+IDLE_WAIT_TIMEOUT = 500  # Longest time (in milliseconds) an idle screen sleeps between wake-ups
 
 # Color Definitions
 BLACK = (0, 0, 0)
@@ -155,6 +217,25 @@ BOLT_SPREAD = 50
 BOLT_LIFETIME = 0.2  # Lifetime of each lightning bolt in seconds
 lightning_bolts = []  # Store lightning bolts
 
+# Constants for reward animations (all times in milliseconds)
+REWARD_EFFECT_DURATION = 1000  # Length of the particle or lightning phase
+REWARD_HOLD_DURATION = 1000  # Time the result stays on screen after the effect
+REWARD_TEXT_FADE_DURATION = 250  # Time for the result text to ease in
+REWARD_ANIMATION_FPS = 60
+REWARD_PARTICLE_COUNT = 500
+REWARD_PARTICLE_STEP = 20  # Simulated time per particle update (the effect was tuned at 50 updates per second)
+LIGHTNING_STRIKES = 3  # Strikes per reward, each at a new random position
+LIGHTNING_BURSTS_PER_STRIKE = 3  # Flash bursts per strike
+LIGHTNING_FLASH_DURATION = 40  # Time each burst of bolts stays on screen
+LIGHTNING_BURST_INTERVAL = 60  # Time from one burst to the next within a strike
+LIGHTNING_STRIKE_INTERVAL = 330  # Time from one strike to the next
+LIGHTNING_BOLTS_PER_BURST = 10
+LIGHTNING_BOLT_SEGMENTS = 10
+LIGHTNING_START_COLOR = (173, 216, 230)  # Light blue
+LIGHTNING_END_COLOR = (255, 255, 255)  # White
+THUNDER_SOUND_PATH = 'assets/SFX/loud-thunder-192165.wav'
+BACKGROUND_CACHE_SIZE = 8  # Scaled backgrounds kept in memory for reuse
+
 # Constants for clouds SFX
 BASE_ALPHA = 220  # Higher base alpha for more visible clouds
 NOISE_SCALE = 0.005  # Scale to control cloud pattern size
@@ -162,6 +243,14 @@ CLOUD_THRESHOLD = 0.05  # Lower threshold to make clouds more dense
 ALPHA_MULTIPLIER = 2.5  # Control how quickly alpha ramps up for denser clouds
 CLOUD_SPEED = 0.5  # Speed of the cloud movement (pixels per frame)
 x_offset = 0  # Horizontal offset for cloud movement
+CLOUD_SEED_COUNT = 8  # Number of distinct cloud layers that get generated and cached
+CLOUD_CACHE_DIRECTORY = os.path.join(CACHE_DIRECTORY, 'clouds')
+
+# Constants for greeting trees SFX
+TREE_SEGMENT_BUDGET = 2000  # Most branch segments one tree may have, whatever its depth
+TREE_GROWTH_FRAMES = 40  # Frames a new tree takes to grow in on screen
+TREE_LEAF_RADIUS = 5
+GREETING_TREES = ((0.25, 10), (0.75, 11))  # (x position as a share of the width, max depth) of each tree
 
 # Constants for monthly streak SFX
 # Colors: Brown, Red, and Orange with intermediate shades
@@ -191,6 +280,8 @@ last_problem = None
 
 BASE_FONT_SIZE = 90  # Define a base font size 
 current_font_name_or_path = "timesnewroman"  # Set to the default font initially
+japanese_font_path = None  # Resolved font file covering Japanese, remembered in options.json
+japanese_font_searched = False  # Whether this run already searched the installed fonts
 music_volume = 0.5  # Start at 50% volume
 text_color = RED  # Set the initial text color to red
 shadow_color = RED  # Set the initial shadow color to RED
@@ -3032,26 +3123,471 @@ def log_message(log_entry, log_file="error_log.txt"):
     write_to_file(log_file, log_entry)
 
 
-### LOADING BACKGROUNDS ###
+### ASSET BUNDLE ###
+
+class AssetFile(io.RawIOBase):
+    """
+    A read-only, seekable file over a memoryview, so decoders can read a bundle
+    entry straight out of the memory-mapped bundle. Unlike io.BytesIO, the entry
+    is never copied as a whole: readinto copies only the bytes each read asks for,
+    which keeps streamed music from being duplicated in memory.
+
+    Attributes:
+    -----------
+    view : memoryview
+        The entry's bytes.
+    position : int
+        The offset of the next read.
+    """
+    def __init__(self, view):
+        super().__init__()
+        self.view = view
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        """Copy the next bytes into buffer and return how many were copied."""
+        target = memoryview(buffer).cast("B")
+        count = max(0, min(len(target), len(self.view) - self.position))
+        target[:count] = self.view[self.position:self.position + count]
+        self.position += count
+        return count
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        """Move to offset relative to the start, the current position or the end."""
+        start = {io.SEEK_SET: 0, io.SEEK_CUR: self.position, io.SEEK_END: len(self.view)}[whence]
+        self.position = max(0, start + offset)
+        return self.position
+
+    def tell(self):
+        return self.position
+
+
+class AssetBundle:
+    """
+    A class that reads the packed asset bundle written by build_asset_bundle. The
+    bundle is one file holding every image, sound and song, so the game opens a
+    single file (scanned once by antivirus software) instead of about 1,400 loose
+    ones, and never lists a folder on disk.
+
+    The file starts with a header (magic, version, entry count) and a table with the
+    offset, length, type and path of each entry, followed by the raw file contents.
+    The file is memory-mapped and entries are handed out as memoryview slices of it.
+
+    Attributes:
+    -----------
+    path : str
+        The bundle file.
+    data : mmap
+        The memory-mapped bundle, or None if it could not be opened.
+    entries : dict
+        Maps each normalized asset path (e.g. 'assets/images/cats/cat01.jpg') to
+        its (offset, length, type).
+
+    Methods:
+    --------
+    open():
+        Maps the bundle and reads its table. Returns False if it is missing or invalid.
+    read(path):
+        Returns an entry's bytes as a memoryview without copying them.
+    open_file(path):
+        Returns an entry as a file object that Pygame's loaders accept.
+    list_directory(folder):
+        Returns the names of the entries directly inside a folder, like os.listdir.
+    """
+    def __init__(self, path=ASSET_BUNDLE_PATH):
+        self.path = path
+        self.file = None
+        self.data = None
+        self.entries = {}
+
+    def open(self):
+        """
+        Map the bundle into memory and read its table of entries.
+
+        Returns:
+            bool: True if the bundle was opened, False if it is missing or invalid.
+        """
+        if not os.path.isfile(self.path):
+            return False
+        try:
+            self.file = open(self.path, "rb")
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, entry_count = ASSET_BUNDLE_HEADER.unpack_from(self.data, 0)
+            if magic != ASSET_BUNDLE_MAGIC or version != ASSET_BUNDLE_VERSION:
+                raise ValueError(f"not a version {ASSET_BUNDLE_VERSION} asset bundle")
+
+            position = ASSET_BUNDLE_HEADER.size
+            for _ in range(entry_count):
+                offset, length, asset_type, path_length = ASSET_BUNDLE_ENTRY.unpack_from(self.data, position)
+                position += ASSET_BUNDLE_ENTRY.size
+                path = self.data[position:position + path_length].decode("utf-8")
+                position += path_length
+                self.entries[path] = (offset, length, ASSET_BUNDLE_TYPES[asset_type])
+            return True
+        except (OSError, ValueError, IndexError, struct.error) as e:
+            log_message(create_log_message(f"Error opening asset bundle '{self.path}': {e}. Loading loose files instead."))
+            self.close()
+            return False
+
+    def close(self):
+        """Unmap the bundle and close its file."""
+        if self.data is not None:
+            self.data.close()
+        if self.file is not None:
+            self.file.close()
+        self.file = self.data = None
+        self.entries = {}
+
+    def __contains__(self, path):
+        return normalize_asset_path(path) in self.entries
+
+    def read(self, path):
+        """
+        Return the contents of an entry as a zero-copy slice of the mapped file.
+
+        Parameters:
+            path (str): The asset path, as it would be opened from disk.
+
+        Returns:
+            memoryview: The entry's bytes.
+        """
+        offset, length, _ = self.entries[normalize_asset_path(path)]
+        return memoryview(self.data)[offset:offset + length]
+
+    def open_file(self, path):
+        """
+        Return an entry as a file object for pygame.image.load, pygame.mixer.Sound
+        and pygame.mixer.music.load. Those decoders need the encoded file (WAV
+        header, JPEG markers), not the raw samples Sound(buffer=...) expects. The
+        entry is not copied up front; each read copies only the bytes asked for.
+
+        Parameters:
+            path (str): The asset path, as it would be opened from disk.
+
+        Returns:
+            AssetFile: A read-only file over the entry's bytes.
+        """
+        return AssetFile(self.read(path))
+
+    def list_directory(self, folder):
+        """
+        Return the names of the entries directly inside a folder.
+
+        Parameters:
+            folder (str): The folder, as it would be listed on disk.
+
+        Returns:
+            list: File names, or an empty list if the bundle has no such folder.
+        """
+        prefix = normalize_asset_path(folder) + "/"
+        return [
+            path[len(prefix):] for path in self.entries
+            if path.startswith(prefix) and "/" not in path[len(prefix):]
+        ]
+
+
+def normalize_asset_path(path):
+    """
+    Convert a relative asset path to the form used as a key in the bundle, so
+    'assets\\images\\cats/' and './assets/images/cats' name the same folder.
 
-def get_image_files(folder_path):
+    Parameters:
+        path (str): A path relative to the game folder.
+
+    Returns:
+        str: The path with forward slashes and no leading './' or trailing slash.
+    """
+    return os.path.normpath(path).replace(os.sep, "/").replace("\\", "/")
+
+
+def build_asset_bundle(bundle_path=ASSET_BUNDLE_PATH, directories=ASSET_BUNDLE_DIRECTORIES):
+    """
+    Pack every image, sound and song under the asset folders into one bundle file.
+    Run this after adding or changing assets; files missing from the bundle are
+    still loaded from disk. The bundle is written next to the game and swapped in
+    only once it is complete.
+
+    Parameters:
+        bundle_path (str): Where to write the bundle.
+        directories (tuple): The folders to pack, relative to the game folder.
+
+    Returns:
+        int: The number of files packed.
+    """
+    files = []
+    for directory in directories:
+        for root, _, names in os.walk(directory):
+            for name in sorted(names):
+                asset_type = ASSET_BUNDLE_EXTENSIONS.get(os.path.splitext(name)[1].lower())
+                if asset_type is not None:
+                    path = os.path.join(root, name)
+                    files.append((normalize_asset_path(path), path, asset_type, os.path.getsize(path)))
+
+    encoded_paths = [path.encode("utf-8") for path, _, _, _ in files]
+    offset = ASSET_BUNDLE_HEADER.size + sum(ASSET_BUNDLE_ENTRY.size + len(path) for path in encoded_paths)
+
+    temporary_path = bundle_path + ".tmp"
+    with open(temporary_path, "wb") as bundle:
+        bundle.write(ASSET_BUNDLE_HEADER.pack(ASSET_BUNDLE_MAGIC, ASSET_BUNDLE_VERSION, len(files)))
+        for encoded_path, (_, _, asset_type, size) in zip(encoded_paths, files):
+            bundle.write(ASSET_BUNDLE_ENTRY.pack(offset, size, ASSET_BUNDLE_TYPES.index(asset_type), len(encoded_path)))
+            bundle.write(encoded_path)
+            offset += size
+        for _, path, _, _ in files:
+            with open(path, "rb") as source:
+                shutil.copyfileobj(source, bundle)
+    os.replace(temporary_path, bundle_path)
+
+    log_message(create_log_message(f"Asset bundle '{bundle_path}' built with {len(files)} files."))
+    return len(files)
+
+
+# The bundle shipped next to the game, if there is one; assets are loaded from it before the disk
+asset_bundle = AssetBundle()
+asset_bundle.open()
+
+
+def asset_exists(path):
+    """Return True if an asset can be loaded from the bundle or from disk."""
+    return path in asset_bundle or os.path.isfile(path)
+
+
+def list_asset_directory(folder):
+    """
+    List a folder's files from the bundle together with the files on disk, so
+    pictures and songs added after the bundle was built are found as well.
+
+    Parameters:
+        folder (str): The folder to list.
+
+    Returns:
+        list: The sorted file names in the folder.
+
+    Raises:
+        OSError: If the folder is not in the bundle and cannot be listed on disk.
+    """
+    names = set(asset_bundle.list_directory(folder))
+    if not names or os.path.isdir(folder):
+        names.update(os.listdir(folder))
+    return sorted(names)
+
+
+def load_image_asset(path):
+    """
+    Load an image from the bundle, or from disk when the bundle does not have it.
+
+    Parameters:
+        path (str): The image path, relative to the game folder.
+
+    Returns:
+        pygame.Surface: The unconverted image.
+
+    Raises:
+        FileNotFoundError: If the image is in neither the bundle nor on disk.
+        pygame.error: If Pygame fails to decode the image.
+    """
+    if path in asset_bundle:
+        return pygame.image.load(asset_bundle.open_file(path), os.path.basename(path))
+    return pygame.image.load(path)
+
+
+def load_sound_asset(path):
+    """
+    Load a sound effect from the bundle, or from disk when the bundle does not have it.
+
+    Parameters:
+        path (str): The WAV path, relative to the game folder.
+
+    Returns:
+        pygame.mixer.Sound: The decoded sound.
+
+    Raises:
+        FileNotFoundError: If the sound is in neither the bundle nor on disk.
+        pygame.error: If Pygame fails to decode the sound.
     """
-    Get a list of image files in the specified folder.
+    if path in asset_bundle:
+        return pygame.mixer.Sound(file=asset_bundle.open_file(path))
+    return pygame.mixer.Sound(path)
+
+
+def load_asset_manifest(manifest_path=ASSET_MANIFEST_PATH):
+    """
+    Read the manifest of pre-scaled pictures written by GFX/recursivePNG2JPG.py.
 
     Parameters:
-        folder_path (str): The path to the folder containing images.
+        manifest_path (str): Path to the manifest.
 
     Returns:
-        list: A list of image file names with common image extensions.
+        dict: Maps each source picture path to its size and its pre-scaled copies,
+        or an empty dict if the build tool has not been run.
     """
-    image_extensions = ('.png', '.jpg', '.jpeg', '.bmp')
+    if not os.path.isfile(manifest_path):
+        return {}
     try:
-        return [
-            f for f in os.listdir(folder_path)
-            if f.lower().endswith(image_extensions)
-        ]
-    except OSError as e:
-        return log_file_error(folder_path, e)
+        with open(manifest_path, "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+        if manifest.get("version") != ASSET_MANIFEST_VERSION:
+            log_message(create_log_message(f"Asset manifest '{manifest_path}' is out of date. Scaling pictures at runtime."))
+            return {}
+        return manifest.get("images", {})
+    except (OSError, ValueError, AttributeError) as e:
+        log_message(create_log_message(f"Error reading asset manifest '{manifest_path}': {e}. Scaling pictures at runtime."))
+        return {}
+
+
+# Pre-scaled copies of the backgrounds and vocabulary pictures, keyed by source path
+asset_manifest = load_asset_manifest()
+
+
+def load_scaled_image(image_path, size):
+    """
+    Load an opaque picture scaled to a size. The smallest pre-scaled copy at least
+    that big is decoded instead of the full-size art, so a background for a 640x640
+    window comes straight from its 640x640 copy. The picture is only smoothscaled
+    at runtime when neither a copy nor the original has exactly the requested size.
+
+    Parameters:
+        image_path (str): Path to the full-size picture.
+        size (tuple): The (width, height) to return.
+
+    Returns:
+        pygame.Surface: The converted, scaled picture.
+
+    Raises:
+        FileNotFoundError: If the picture is in neither the asset bundle nor on disk.
+        pygame.error: If Pygame fails to decode the picture.
+    """
+    size = (int(size[0]), int(size[1]))
+    load_path = image_path
+
+    entry = asset_manifest.get(normalize_asset_path(image_path))
+    if entry is not None and tuple(entry["size"]) != size:
+        # Copies are keyed by the window size they were scaled to, e.g. '640x640'
+        best_size = None
+        for resolution, variant_path in entry["variants"].items():
+            variant_size = tuple(int(value) for value in resolution.split("x"))
+            if variant_size[0] >= size[0] and variant_size[1] >= size[1] and (best_size is None or variant_size < best_size):
+                if asset_exists(variant_path):
+                    best_size, load_path = variant_size, variant_path
+
+    image = load_image_asset(load_path).convert()
+    if image.get_size() != size:
+        image = pygame.transform.smoothscale(image, size)
+    return image
+
+
+### DIRECTORY INDEX ###
+
+class DirectoryIndex:
+    """
+    A class that remembers the filtered file list of each asset folder, so random
+    backgrounds and songs are picked without listing the folder every time.
+
+    A folder's list is rebuilt only when the folder's modification time changes
+    (a file was added, removed or renamed). Folders that only exist in the asset
+    bundle never change while the game runs and are listed once.
+
+    Picks can come from a shuffle bag: every file is handed out once, in random
+    order, before any repeats, and a new bag never starts with the file that
+    ended the previous one. Children then never see the same cat twice in a row.
+
+    Attributes:
+    -----------
+    listings : dict
+        Maps (folder, extensions) to (folder modification time, file names).
+    bags : dict
+        Maps (folder, extensions) to the file list a bag was filled from, the
+        names still in the bag and the last name picked.
+
+    Methods:
+    --------
+    files(folder, extensions):
+        Returns the names of the files in a folder with one of the extensions.
+    pick(folder, extensions, shuffle_bag=True):
+        Returns the path of a random file in a folder, or None if it has none.
+    """
+    def __init__(self):
+        self.listings = {}
+        self.bags = {}
+
+    def files(self, folder, extensions):
+        """
+        Return the names of the files in a folder with one of the extensions.
+
+        Parameters:
+            folder (str): The folder to list.
+            extensions (tuple): Lower-case file extensions to keep, e.g. ('.mp3',).
+
+        Returns:
+            list: The file names. The list is shared, so callers must not change it.
+
+        Raises:
+            OSError: If the folder is in neither the asset bundle nor on disk.
+        """
+        key = (normalize_asset_path(folder), extensions)
+        try:
+            modified_time = os.stat(folder).st_mtime_ns
+        except OSError:
+            modified_time = None  # Only in the asset bundle
+
+        listing = self.listings.get(key)
+        if listing is None or listing[0] != modified_time:
+            names = [name for name in list_asset_directory(folder) if name.lower().endswith(extensions)]
+            listing = self.listings[key] = (modified_time, names)
+        return listing[1]
+
+    def pick(self, folder, extensions, shuffle_bag=True):
+        """
+        Return the path of a random file in a folder.
+
+        Parameters:
+            folder (str): The folder to pick from.
+            extensions (tuple): Lower-case file extensions to pick from.
+            shuffle_bag (bool): Whether to draw from a shuffle bag instead of picking
+                independently each time.
+
+        Returns:
+            str: The path of the picked file, or None if the folder has no such files.
+
+        Raises:
+            OSError: If the folder is in neither the asset bundle nor on disk.
+        """
+        names = self.files(folder, extensions)
+        if not names:
+            return None
+        if not shuffle_bag:
+            return os.path.join(folder, random.choice(names))
+
+        key = (normalize_asset_path(folder), extensions)
+        bag = self.bags.get(key)
+        if bag is None or bag["names"] is not names:  # New folder, or its listing was rebuilt
+            bag = self.bags[key] = {"names": names, "remaining": [], "last": bag["last"] if bag else None}
+
+        if not bag["remaining"]:
+            remaining = list(names)
+            random.shuffle(remaining)
+            # Names are drawn from the end, so move the previous pick away from it
+            if len(remaining) > 1 and remaining[-1] == bag["last"]:
+                remaining[0], remaining[-1] = remaining[-1], remaining[0]
+            bag["remaining"] = remaining
+
+        bag["last"] = bag["remaining"].pop()
+        return os.path.join(folder, bag["last"])
+
+
+# Shared index of the background, sprite and music folders
+directory_index = DirectoryIndex()
+
+
+### LOADING BACKGROUNDS ###
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
 
 
 def log_file_error(folder_path, exception):
@@ -3072,21 +3608,6 @@ def log_file_error(folder_path, exception):
     return []
 
 
-def pick_random_item(items):
-    """
-    Pick a random item from a list.
-
-    Parameters:
-        items (list): The list of items to select from.
-
-    Returns:
-        str: The randomly selected item, or None if the list is empty.
-    """
-    if not items:
-        return None
-    return random.choice(items)
-
-
 def log_empty_folder_error(folder_path):
     """
     Log an error when no images are found in a folder.
@@ -3100,7 +3621,8 @@ def log_empty_folder_error(folder_path):
 
 def select_random_background(folder_path):
     """
-    Select a random background image from the specified folder.
+    Select a random background image from the specified folder. Images come from
+    a shuffle bag, so the same one is never shown twice in a row.
 
     Parameters:
         folder_path (str): The path to the folder containing background images.
@@ -3109,15 +3631,17 @@ def select_random_background(folder_path):
         str: The file path of the randomly selected image, or None if no images
         are found or an error occurs.
     """
-    image_files = get_image_files(folder_path)
-
-    selected_image = pick_random_item(image_files)
+    try:
+        selected_image = directory_index.pick(folder_path, IMAGE_EXTENSIONS)
+    except OSError as e:
+        log_file_error(folder_path, e)
+        return None
 
     if not selected_image:
         log_empty_folder_error(folder_path)
         return None
 
-    return os.path.join(folder_path, selected_image)
+    return selected_image
 
 
 ### WINDOW MANAGEMENT ###
@@ -3424,7 +3948,7 @@ def load_image(icon_path):
         FileNotFoundError: If the file is not found.
         pygame.error: If Pygame fails to load the image.
     """
-    return pygame.image.load(icon_path)
+    return load_image_asset(icon_path)
 
 
 def set_window_icon(icon):
@@ -3673,6 +4197,11 @@ def verify_and_initialize_database():
         else:
             log_message(create_log_message("'students' table found. Database is ready."))
 
+        ensure_daily_stats_exist(cursor, connection)
+        create_answer_event_tables(cursor)
+        create_review_schedule_table(cursor)
+        create_math_fact_matrices_table(cursor)
+        connection.commit()
         ensure_lessons_exist(cursor, connection)
     finally:
         cursor.close()
@@ -3706,6 +4235,24 @@ def ensure_lessons_exist(cursor, connection):
     insert_lessons(cursor, connection)
         
 
+def ensure_daily_stats_exist(cursor, connection):
+    """
+    Ensure the 'student_lesson_daily_stats' table exists. Databases created before
+    it was added get the table built from their session history.
+
+    Parameters:
+        cursor (sqlite3.Cursor): The database cursor.
+        connection (sqlite3.Connection): The database connection.
+    """
+    if verify_table_exists(cursor, "student_lesson_daily_stats"):
+        return
+
+    log_message(create_log_message("'student_lesson_daily_stats' table not found. Building it from session history..."))
+    create_student_lesson_daily_stats_table(cursor)
+    rebuild_daily_lesson_stats(cursor)
+    connection.commit()
+
+
 def _initialize_tables(cursor, connection):
     """
     Initialize the required database tables and insert lessons.
@@ -3721,6 +4268,10 @@ def _initialize_tables(cursor, connection):
         create_sessions_table(cursor)
         create_session_lessons_table(cursor)
         create_student_lesson_progress_table(cursor)
+        create_student_lesson_daily_stats_table(cursor)
+        create_answer_event_tables(cursor)
+        create_review_schedule_table(cursor)
+        create_math_fact_matrices_table(cursor)
 
         # Insert lessons into the database
         insert_lessons(cursor, connection)
@@ -3806,6 +4357,101 @@ def create_student_lesson_progress_table(cursor):
     ''')
 
 
+def create_student_lesson_daily_stats_table(cursor):
+    """Create the 'student_lesson_daily_stats' table, one row per student, lesson and day."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS student_lesson_daily_stats (
+            student_id INTEGER NOT NULL,
+            lesson_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            attempts INTEGER DEFAULT 0,
+            questions_asked INTEGER DEFAULT 0,
+            questions_correct INTEGER DEFAULT 0,
+            total_answer_time REAL DEFAULT 0,
+            mean_answer_time REAL DEFAULT 0,
+            p90_answer_time REAL DEFAULT 0,
+            best_streak INTEGER DEFAULT 0,
+            answer_time_histogram TEXT DEFAULT '{}',
+            PRIMARY KEY (student_id, lesson_id, day),
+            FOREIGN KEY (student_id) REFERENCES students(id),
+            FOREIGN KEY (lesson_id) REFERENCES lessons(lesson_id)
+        ) WITHOUT ROWID
+    ''')
+
+
+def create_answer_event_tables(cursor):
+    """
+    Create the 'answer_items' and 'answer_events' tables.
+
+    Every event row is stored as small integers: prompts and given answers are
+    interned in 'answer_items', and the answer time and result are packed into
+    one 'outcome' value (milliseconds << 1 | correct). Events are written in
+    per-lesson batches, so each lesson's answers sit together in rowid order.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS answer_items (
+            item_id INTEGER PRIMARY KEY,
+            text TEXT NOT NULL UNIQUE
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS answer_events (
+            event_id INTEGER PRIMARY KEY,
+            session_id INTEGER NOT NULL,
+            lesson_id INTEGER NOT NULL,
+            prompt_id INTEGER NOT NULL,
+            answer_id INTEGER NOT NULL,
+            outcome INTEGER NOT NULL,
+            FOREIGN KEY (session_id) REFERENCES sessions(session_id),
+            FOREIGN KEY (lesson_id) REFERENCES lessons(lesson_id),
+            FOREIGN KEY (prompt_id) REFERENCES answer_items(item_id),
+            FOREIGN KEY (answer_id) REFERENCES answer_items(item_id)
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS answer_events_session ON answer_events (session_id)")
+
+
+def create_review_schedule_table(cursor):
+    """
+    Create the 'review_schedule' table, holding the spaced repetition state of every
+    item a student has been quizzed on. Items are grouped into decks by lesson title.
+    The index on due date makes picking a student's next due items a range scan.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS review_schedule (
+            student_id INTEGER NOT NULL,
+            deck TEXT NOT NULL,
+            item TEXT NOT NULL,
+            ease REAL DEFAULT 2.5,
+            interval_days REAL DEFAULT 0,
+            repetitions INTEGER DEFAULT 0,
+            lapses INTEGER DEFAULT 0,
+            due TIMESTAMP NOT NULL,
+            PRIMARY KEY (student_id, deck, item),
+            FOREIGN KEY (student_id) REFERENCES students(id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS review_schedule_due ON review_schedule (student_id, deck, due)")
+
+
+def create_math_fact_matrices_table(cursor):
+    """
+    Create the 'math_fact_matrices' table. Each row holds one student's statistics for
+    one set of math facts (e.g. 'add:1-9x1-9') as packed arrays with one cell per operand pair.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS math_fact_matrices (
+            student_id INTEGER NOT NULL,
+            fact_set TEXT NOT NULL,
+            attempts BLOB NOT NULL,
+            accuracy BLOB NOT NULL,
+            latency BLOB NOT NULL,
+            PRIMARY KEY (student_id, fact_set),
+            FOREIGN KEY (student_id) REFERENCES students(id)
+        ) WITHOUT ROWID
+    ''')
+
+
 def handle_table_initialization_error(error, connection):
     """
     Handle errors during table initialization.
@@ -4057,9 +4703,12 @@ def calculate_session_metrics(start_time: float, end_time: float, total_question
 
 
 def add_session_lesson(session_id: int, lesson_id: int, start_time: float, end_time: float, 
-                       total_questions: int, questions_correct: int) -> Optional[int]:
+                       total_questions: int, questions_correct: int,
+                       answer_log: Optional['AnswerLog'] = None) -> Optional[int]:
     """
-    Add a new record to the session_lessons table with detailed lesson data.
+    Add a new record to the session_lessons table with detailed lesson data,
+    fold it into the student's daily lesson statistics and write the lesson's
+    answer events.
 
     Parameters:
         session_id (int): The ID of the session.
@@ -4068,6 +4717,7 @@ def add_session_lesson(session_id: int, lesson_id: int, start_time: float, end_t
         end_time (float): Unix timestamp representing the end time.
         total_questions (int): The total number of questions asked in the lesson.
         questions_correct (int): The total number of correct answers.
+        answer_log (AnswerLog): The answers given during the lesson (optional).
 
     Returns:
         Optional[int]: The ID of the new session lesson record, or None if an error occurs.
@@ -4078,7 +4728,7 @@ def add_session_lesson(session_id: int, lesson_id: int, start_time: float, end_t
         session_lesson_data = prepare_session_lesson_data(
             session_id, lesson_id, start_time, end_time, total_questions, questions_correct
         )
-        session_lesson_id = insert_session_lesson(session_lesson_data)
+        session_lesson_id = insert_session_lesson(session_lesson_data, answer_log)
         log_successful_insertion(session_lesson_id)
         return session_lesson_id
     except sqlite3.Error as e:
@@ -4112,12 +4762,14 @@ def prepare_session_lesson_data(session_id: int, lesson_id: int, start_time: flo
             total_questions, questions_correct, avg_time_per_question, percent_correct)
 
 
-def insert_session_lesson(data: Tuple) -> int:
+def insert_session_lesson(data: Tuple, answer_log: Optional['AnswerLog'] = None) -> int:
     """
-    Insert a session lesson record into the database.
+    Insert a session lesson record into the database, updating the daily lesson
+    statistics and writing the answer events in the same transaction.
 
     Parameters:
         data (Tuple): The data for the session lesson record.
+        answer_log (AnswerLog): The answers given during the lesson (optional).
 
     Returns:
         int: The ID of the newly inserted session lesson record.
@@ -4129,8 +4781,17 @@ def insert_session_lesson(data: Tuple) -> int:
                                          questions_asked, questions_correct, avg_time_per_question, percent_correct)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', data)
+        session_lesson_id = cursor.lastrowid
+        if answer_log:
+            update_daily_lesson_stats(cursor, data, answer_log.times(), answer_log.results())
+            insert_answer_events(cursor, data[0], data[1], answer_log)
+        else:
+            update_daily_lesson_stats(cursor, data)
         connection.commit()
-        return cursor.lastrowid
+        return session_lesson_id
+    except sqlite3.Error:
+        answer_item_ids.clear()  # Item IDs interned in the rolled back transaction are gone
+        raise
     finally:
         cursor.close()
         connection.close()
@@ -4158,31 +4819,618 @@ def handle_session_lesson_error(error: sqlite3.Error):
     log_message(log_entry)
 
 
-def get_student_id_by_name(student_name: str) -> Optional[int]:
+### DAILY LESSON STATISTICS ###
+
+def get_session_student_id(cursor, session_id: int) -> Optional[int]:
+    """Return the ID of the student a session belongs to, or None if there is no such session."""
+    cursor.execute("SELECT student_id FROM sessions WHERE session_id = ?", (session_id,))
+    result = cursor.fetchone()
+    return result[0] if result else None
+
+
+def build_answer_time_histogram(answer_times: List[float]) -> dict:
     """
-    Retrieve the student ID based on the student's name.
+    Count answer times into fixed-width buckets.
 
     Parameters:
-        student_name (str): The name of the student to search for.
+        answer_times (List[float]): Seconds taken for each answer.
 
     Returns:
-        Optional[int]: The ID of the student if found, otherwise None.
+        dict: Answer counts keyed by bucket index.
     """
-    try:
-        with sqlite3.connect('learniverse.db') as connection:
-            cursor = connection.cursor()
-            cursor.execute("SELECT id FROM students WHERE name = ?", (student_name,))
-            result = cursor.fetchone()
+    histogram = {}
+    for answer_time in answer_times:
+        bucket = min(int(max(answer_time, 0) / ANSWER_TIME_BUCKET_SECONDS), ANSWER_TIME_BUCKET_COUNT - 1)
+        histogram[bucket] = histogram.get(bucket, 0) + 1
+    return histogram
 
-            if result is None:
-                log_message(create_log_message(f"Error: Student '{student_name}' not found."))
-                return None
 
-            return result[0]
+def merge_answer_time_histograms(histogram: dict, other: dict) -> dict:
+    """Add the bucket counts of one answer time histogram into another and return it."""
+    for bucket, count in other.items():
+        histogram[bucket] = histogram.get(bucket, 0) + count
+    return histogram
 
-    except sqlite3.Error as e:
-        log_message(create_log_message(f"Error retrieving student ID for '{student_name}': {e}"))
-        return None
+
+def decode_answer_time_histogram(histogram_json: str) -> dict:
+    """Decode a stored answer time histogram, whose JSON keys are strings, back to integer buckets."""
+    return {int(bucket): count for bucket, count in json.loads(histogram_json or '{}').items()}
+
+
+def answer_time_percentile(histogram: dict, percentile: float) -> float:
+    """
+    Estimate an answer time percentile from a histogram, interpolating within the bucket.
+
+    Parameters:
+        histogram (dict): Answer counts keyed by bucket index.
+        percentile (float): The percentile to estimate, between 0 and 100.
+
+    Returns:
+        float: The estimated answer time in seconds, or 0 for an empty histogram.
+    """
+    total = sum(histogram.values())
+    if total == 0:
+        return 0
+
+    target = total * percentile / 100
+    seen = 0
+    for bucket in sorted(histogram):
+        count = histogram[bucket]
+        if seen + count >= target:
+            fraction = (target - seen) / count
+            return round((bucket + fraction) * ANSWER_TIME_BUCKET_SECONDS, 2)
+        seen += count
+    return round((max(histogram) + 1) * ANSWER_TIME_BUCKET_SECONDS, 2)
+
+
+def longest_correct_streak(answer_results: List[bool]) -> int:
+    """Return the longest run of consecutive correct answers."""
+    best = current = 0
+    for correct in answer_results:
+        current = current + 1 if correct else 0
+        best = max(best, current)
+    return best
+
+
+def estimate_best_streak(questions_asked: int, questions_correct: int) -> int:
+    """
+    Return the shortest best streak a lesson score guarantees when the order of
+    answers was not recorded: the correct answers are split by the wrong ones
+    into at most (wrong + 1) runs.
+    """
+    questions_wrong = max(questions_asked - questions_correct, 0)
+    return math.ceil(questions_correct / (questions_wrong + 1)) if questions_correct > 0 else 0
+
+
+def update_daily_lesson_stats(cursor, data: Tuple, answer_times: Optional[List[float]] = None,
+                              answer_results: Optional[List[bool]] = None):
+    """
+    Fold one session lesson record into its (student, lesson, day) row of the
+    'student_lesson_daily_stats' table, creating the row on the first lesson of the day.
+
+    When per-answer times are not given, every answer is counted at the lesson's
+    average time. When per-answer results are not given, the best streak is the
+    shortest one the score guarantees.
+
+    Parameters:
+        cursor (sqlite3.Cursor): The database cursor, inside the caller's transaction.
+        data (Tuple): The session lesson record, as built by prepare_session_lesson_data.
+        answer_times (List[float]): Seconds taken for each answer (optional).
+        answer_results (List[bool]): Whether each answer was correct, in order (optional).
+    """
+    session_id, lesson_id, start_time_str, _, total_time, questions_asked, questions_correct, avg_time_per_question, _ = data
+
+    student_id = get_session_student_id(cursor, session_id)
+    if student_id is None:
+        log_message(create_log_message(f"No session {session_id} found; daily lesson statistics not updated."))
+        return
+    day = start_time_str[:10]
+
+    if answer_times:
+        lesson_histogram = build_answer_time_histogram(answer_times)
+        lesson_answer_time = sum(answer_times)
+    else:
+        lesson_histogram = build_answer_time_histogram([avg_time_per_question] * questions_asked)
+        lesson_answer_time = avg_time_per_question * questions_asked
+
+    if answer_results:
+        lesson_streak = longest_correct_streak(answer_results)
+    else:
+        lesson_streak = estimate_best_streak(questions_asked, questions_correct)
+
+    cursor.execute('''
+        SELECT attempts, questions_asked, questions_correct, total_answer_time, best_streak, answer_time_histogram
+        FROM student_lesson_daily_stats
+        WHERE student_id = ? AND lesson_id = ? AND day = ?
+    ''', (student_id, lesson_id, day))
+    row = cursor.fetchone()
+    if row is None:
+        row = (0, 0, 0, 0, 0, '{}')
+
+    attempts = row[0] + 1
+    asked = row[1] + questions_asked
+    correct = row[2] + questions_correct
+    answer_time = row[3] + lesson_answer_time
+    best_streak = max(row[4], lesson_streak)
+    histogram = merge_answer_time_histograms(decode_answer_time_histogram(row[5]), lesson_histogram)
+
+    cursor.execute('''
+        INSERT OR REPLACE INTO student_lesson_daily_stats
+            (student_id, lesson_id, day, attempts, questions_asked, questions_correct, total_answer_time,
+             mean_answer_time, p90_answer_time, best_streak, answer_time_histogram)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (student_id, lesson_id, day, attempts, asked, correct, answer_time,
+          round(answer_time / asked, 2) if asked > 0 else 0,
+          answer_time_percentile(histogram, 90), best_streak,
+          json.dumps(histogram, separators=(',', ':'))))
+
+
+def rebuild_daily_lesson_stats(cursor):
+    """
+    Rebuild the 'student_lesson_daily_stats' table from every recorded session lesson.
+
+    Parameters:
+        cursor (sqlite3.Cursor): The database cursor, inside the caller's transaction.
+    """
+    cursor.execute("DELETE FROM student_lesson_daily_stats")
+    cursor.execute('''
+        SELECT session_id, lesson_id, start_time, end_time, total_time,
+               questions_asked, questions_correct, avg_time_per_question, percent_correct
+        FROM session_lessons
+        ORDER BY session_lesson_id
+    ''')
+    for data in cursor.fetchall():
+        update_daily_lesson_stats(cursor, data)
+
+
+def summarize_daily_stats_rows(rows: List[tuple]) -> dict:
+    """
+    Combine daily statistics rows for one lesson into a single summary.
+
+    Parameters:
+        rows (List[tuple]): Rows of (day, attempts, questions_asked, questions_correct,
+                            total_answer_time, best_streak, answer_time_histogram).
+
+    Returns:
+        dict: The combined attempts, questions, percent correct, mean and p90 answer
+              time, best streak and the last day the lesson was played.
+    """
+    histogram = {}
+    for row in rows:
+        merge_answer_time_histograms(histogram, decode_answer_time_histogram(row[6]))
+
+    questions_asked = sum(row[2] for row in rows)
+    questions_correct = sum(row[3] for row in rows)
+    total_answer_time = sum(row[4] for row in rows)
+
+    return {
+        "attempts": sum(row[1] for row in rows),
+        "questions_asked": questions_asked,
+        "questions_correct": questions_correct,
+        "percent_correct": round(questions_correct / questions_asked * 100, 1) if questions_asked > 0 else 0,
+        "mean_answer_time": round(total_answer_time / questions_asked, 2) if questions_asked > 0 else 0,
+        "p90_answer_time": answer_time_percentile(histogram, 90),
+        "best_streak": max(row[5] for row in rows),
+        "last_day": max(row[0] for row in rows),
+    }
+
+
+def get_student_lesson_report(student_name: str, start_day: Optional[str] = None,
+                              end_day: Optional[str] = None) -> List[dict]:
+    """
+    Report how a student is doing in every lesson they have played, read from the
+    daily lesson statistics instead of the full session history.
+
+    Parameters:
+        student_name (str): The name of the student.
+        start_day (str): First day to include, as 'YYYY-MM-DD' (optional).
+        end_day (str): Last day to include, as 'YYYY-MM-DD' (optional).
+
+    Returns:
+        List[dict]: One summary per lesson, with its 'lesson_id' and 'title', ordered by title.
+    """
+    connection, cursor = get_database_cursor()
+    try:
+        cursor.execute('''
+            SELECT stats.lesson_id, lessons.title, stats.day, stats.attempts, stats.questions_asked,
+                   stats.questions_correct, stats.total_answer_time, stats.best_streak, stats.answer_time_histogram
+            FROM student_lesson_daily_stats stats
+            JOIN students ON students.id = stats.student_id
+            JOIN lessons ON lessons.lesson_id = stats.lesson_id
+            WHERE students.name = ? AND stats.day >= ? AND stats.day <= ?
+            ORDER BY lessons.title, stats.day
+        ''', (student_name, start_day or '0000-00-00', end_day or '9999-99-99'))
+        rows = cursor.fetchall()
+    except sqlite3.Error as e:
+        log_message(create_log_message(f"Error building lesson report for '{student_name}': {e}"))
+        return []
+    finally:
+        cursor.close()
+        connection.close()
+
+    lessons = {}
+    for row in rows:
+        lessons.setdefault((row[1], row[0]), []).append(row[2:])
+
+    report = []
+    for (title, lesson_id), lesson_rows in lessons.items():
+        summary = summarize_daily_stats_rows(lesson_rows)
+        summary.update(lesson_id=lesson_id, title=title)
+        report.append(summary)
+    return report
+
+
+def get_student_lesson_history(student_name: str, lesson_id: int, days: int = 30) -> List[dict]:
+    """
+    Return a student's day-by-day statistics for one lesson, oldest first.
+
+    Parameters:
+        student_name (str): The name of the student.
+        lesson_id (int): The ID of the lesson.
+        days (int): How many days back from today to include.
+
+    Returns:
+        List[dict]: One entry per day the lesson was played.
+    """
+    first_day = (datetime.now() - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+
+    connection, cursor = get_database_cursor()
+    try:
+        cursor.execute('''
+            SELECT stats.day, stats.attempts, stats.questions_asked, stats.questions_correct,
+                   stats.mean_answer_time, stats.p90_answer_time, stats.best_streak
+            FROM student_lesson_daily_stats stats
+            JOIN students ON students.id = stats.student_id
+            WHERE students.name = ? AND stats.lesson_id = ? AND stats.day >= ?
+            ORDER BY stats.day
+        ''', (student_name, lesson_id, first_day))
+        rows = cursor.fetchall()
+    except sqlite3.Error as e:
+        log_message(create_log_message(f"Error reading lesson history for '{student_name}': {e}"))
+        return []
+    finally:
+        cursor.close()
+        connection.close()
+
+    columns = ("day", "attempts", "questions_asked", "questions_correct",
+               "mean_answer_time", "p90_answer_time", "best_streak")
+    return [dict(zip(columns, row)) for row in rows]
+
+
+### ANSWER EVENTS ###
+
+class AnswerLog:
+    """
+    A class that collects every answer given during one lesson in memory, so the
+    quiz loop never waits on the database. add_session_lesson writes the whole
+    batch when the lesson is recorded.
+
+    Attributes:
+    -----------
+    events : list
+        (prompt, given answer, correct, milliseconds) for each answer, in order.
+
+    Methods:
+    --------
+    record(prompt, given_answer, correct, seconds):
+        Adds one answer to the log.
+    times():
+        Returns the seconds taken for each answer.
+    results():
+        Returns whether each answer was correct.
+    """
+    def __init__(self):
+        self.events = []
+
+    def __len__(self):
+        return len(self.events)
+
+    def record(self, prompt, given_answer, correct, seconds):
+        """
+        Add one answer to the log.
+
+        Parameters:
+            prompt (str): The problem as shown, e.g. '7 + 5' or 'あ'.
+            given_answer (str): The answer the student gave.
+            correct (bool): Whether the answer was correct.
+            seconds (float): How long the student took to answer.
+        """
+        self.events.append((str(prompt), str(given_answer), bool(correct), int(round(seconds * 1000))))
+
+    def times(self):
+        """Return the seconds taken for each answer."""
+        return [milliseconds / 1000 for _, _, _, milliseconds in self.events]
+
+    def results(self):
+        """Return whether each answer was correct."""
+        return [correct for _, _, correct, _ in self.events]
+
+
+# Interned answer_items text to item_id, filled as items are written or read
+answer_item_ids = {}
+
+
+def get_answer_item_ids(cursor, texts) -> dict:
+    """
+    Return the item IDs for prompt and answer texts, interning any new ones.
+
+    Parameters:
+        cursor (sqlite3.Cursor): The database cursor, inside the caller's transaction.
+        texts (iterable): The texts to look up.
+
+    Returns:
+        dict: The item ID for each text.
+    """
+    missing = [text for text in set(texts) if text not in answer_item_ids]
+    if missing:
+        cursor.executemany("INSERT OR IGNORE INTO answer_items (text) VALUES (?)", [(text,) for text in missing])
+        cursor.execute(
+            f"SELECT item_id, text FROM answer_items WHERE text IN ({', '.join('?' * len(missing))})", missing
+        )
+        for item_id, text in cursor.fetchall():
+            answer_item_ids[text] = item_id
+    return {text: answer_item_ids[text] for text in texts}
+
+
+def pack_answer_outcome(correct: bool, milliseconds: int) -> int:
+    """Pack an answer time and result into one integer (milliseconds << 1 | correct)."""
+    return (max(milliseconds, 0) << 1) | int(correct)
+
+
+def unpack_answer_outcome(outcome: int) -> Tuple[bool, int]:
+    """Unpack an outcome integer into (correct, milliseconds)."""
+    return bool(outcome & 1), outcome >> 1
+
+
+def insert_answer_events(cursor, session_id: int, lesson_id: int, answer_log: AnswerLog):
+    """
+    Write every answer in a lesson's log as one batch.
+
+    Parameters:
+        cursor (sqlite3.Cursor): The database cursor, inside the caller's transaction.
+        session_id (int): The ID of the session.
+        lesson_id (int): The ID of the lesson.
+        answer_log (AnswerLog): The answers given during the lesson.
+    """
+    item_ids = get_answer_item_ids(
+        cursor, [prompt for prompt, _, _, _ in answer_log.events] + [given for _, given, _, _ in answer_log.events]
+    )
+    cursor.executemany('''
+        INSERT INTO answer_events (session_id, lesson_id, prompt_id, answer_id, outcome)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [
+        (session_id, lesson_id, item_ids[prompt], item_ids[given], pack_answer_outcome(correct, milliseconds))
+        for prompt, given, correct, milliseconds in answer_log.events
+    ])
+
+
+def get_answer_events(session_id: int, lesson_id: Optional[int] = None) -> List[dict]:
+    """
+    Read back the answers given in a session, optionally for one lesson only.
+
+    Parameters:
+        session_id (int): The ID of the session.
+        lesson_id (int): The ID of the lesson (optional).
+
+    Returns:
+        List[dict]: One entry per answer with 'lesson_id', 'prompt', 'given_answer',
+                    'correct' and 'milliseconds', in the order they were given.
+    """
+    connection, cursor = get_database_cursor()
+    try:
+        cursor.execute('''
+            SELECT events.lesson_id, prompts.text, answers.text, events.outcome
+            FROM answer_events events
+            JOIN answer_items prompts ON prompts.item_id = events.prompt_id
+            JOIN answer_items answers ON answers.item_id = events.answer_id
+            WHERE events.session_id = ? AND (? IS NULL OR events.lesson_id = ?)
+            ORDER BY events.event_id
+        ''', (session_id, lesson_id, lesson_id))
+        rows = cursor.fetchall()
+    except sqlite3.Error as e:
+        log_message(create_log_message(f"Error reading answer events for session_id {session_id}: {e}"))
+        return []
+    finally:
+        cursor.close()
+        connection.close()
+
+    events = []
+    for event_lesson_id, prompt, given_answer, outcome in rows:
+        correct, milliseconds = unpack_answer_outcome(outcome)
+        events.append({
+            "lesson_id": event_lesson_id,
+            "prompt": prompt,
+            "given_answer": given_answer,
+            "correct": correct,
+            "milliseconds": milliseconds,
+        })
+    return events
+
+
+### SPACED REPETITION ###
+
+def answer_quality(correct: bool, seconds: float) -> int:
+    """
+    Grade an answer on the SM-2 scale of 0-5.
+
+    Parameters:
+        correct (bool): Whether the answer was correct.
+        seconds (float): How long the student took to answer.
+
+    Returns:
+        int: 5 for a fast correct answer, 4 for a slow one and 1 for a wrong one.
+    """
+    if not correct:
+        return 1
+    return 5 if seconds < REVIEW_FAST_ANSWER_SECONDS else 4
+
+
+def schedule_next_review(ease: float, interval_days: float, repetitions: int, quality: int) -> Tuple[float, float, int]:
+    """
+    Apply one SM-2 step to an item's review state.
+
+    Parameters:
+        ease (float): The item's ease factor.
+        interval_days (float): Days between the last two reviews.
+        repetitions (int): Correct reviews in a row.
+        quality (int): The grade of this answer, 0-5.
+
+    Returns:
+        Tuple[float, float, int]: The new (ease, interval_days, repetitions). An
+                                  interval of 0 means the item is relearned the same day.
+    """
+    ease = max(REVIEW_MINIMUM_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+
+    if quality < 3:
+        return ease, 0, 0
+    if repetitions == 0:
+        return ease, 1, 1
+    if repetitions == 1:
+        return ease, 6, 2
+    return ease, round(interval_days * ease, 2), repetitions + 1
+
+
+def update_review_schedule(session_id: int, deck: str, answer_log: AnswerLog):
+    """
+    Update the review schedule of every item answered in a lesson, in one transaction.
+
+    Parameters:
+        session_id (int): The ID of the session, used to find the student.
+        deck (str): The deck the items belong to, e.g. 'Hiragana'.
+        answer_log (AnswerLog): The answers given during the lesson; each prompt is an item.
+    """
+    if not answer_log:
+        return
+
+    connection, cursor = get_database_cursor()
+    try:
+        student_id = get_session_student_id(cursor, session_id)
+        if student_id is None:
+            log_message(create_log_message(f"No session {session_id} found; review schedule not updated."))
+            return
+
+        items = {prompt for prompt, _, _, _ in answer_log.events}
+        cursor.execute(f'''
+            SELECT item, ease, interval_days, repetitions, lapses
+            FROM review_schedule
+            WHERE student_id = ? AND deck = ? AND item IN ({', '.join('?' * len(items))})
+        ''', (student_id, deck, *items))
+        states = {row[0]: row[1:] for row in cursor.fetchall()}
+
+        now = datetime.now()
+        for prompt, _, correct, milliseconds in answer_log.events:
+            ease, interval_days, repetitions, lapses = states.get(prompt, (REVIEW_DEFAULT_EASE, 0, 0, 0))
+            ease, interval_days, repetitions = schedule_next_review(
+                ease, interval_days, repetitions, answer_quality(correct, milliseconds / 1000)
+            )
+            states[prompt] = (ease, interval_days, repetitions, lapses + (0 if correct else 1))
+
+        rows = []
+        for item, (ease, interval_days, repetitions, lapses) in states.items():
+            delay = timedelta(days=interval_days) if interval_days else timedelta(minutes=REVIEW_RELEARN_MINUTES)
+            rows.append((student_id, deck, item, ease, interval_days, repetitions, lapses,
+                         (now + delay).strftime(DATETIME_FORMAT)))
+
+        cursor.executemany('''
+            INSERT OR REPLACE INTO review_schedule
+                (student_id, deck, item, ease, interval_days, repetitions, lapses, due)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        connection.commit()
+    except sqlite3.Error as e:
+        log_message(create_log_message(f"Error updating review schedule for deck '{deck}': {e}"))
+        connection.rollback()
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def select_review_items(session_id: int, deck: str, items: List[str], count: int, due_only: bool = False) -> List[str]:
+    """
+    Pick the items for the next quiz from the student's review schedule.
+
+    Overdue items come first, most overdue first. Items the student has never seen
+    come next, taking the last items of the list first, since those are the ones
+    most recently unlocked. Any remaining places go to the items due soonest.
+
+    Parameters:
+        session_id (int): The ID of the session, used to find the student.
+        deck (str): The deck the items belong to, e.g. 'Hiragana'.
+        items (List[str]): The items the quiz may ask about.
+        count (int): How many items to pick.
+        due_only (bool): Only pick items that are due for review.
+
+    Returns:
+        List[str]: Up to count distinct items, in the order they should be asked.
+    """
+    items = list(dict.fromkeys(items))
+    if not items or count <= 0:
+        return []
+
+    connection, cursor = get_database_cursor()
+    try:
+        student_id = get_session_student_id(cursor, session_id)
+        placeholders = ', '.join('?' * len(items))
+
+        # Range scan of the due date index for the items that are due
+        cursor.execute(f'''
+            SELECT item FROM review_schedule
+            WHERE student_id = ? AND deck = ? AND due <= ? AND item IN ({placeholders})
+            ORDER BY due
+            LIMIT ?
+        ''', (student_id, deck, datetime.now().strftime(DATETIME_FORMAT), *items, count))
+        selected = [row[0] for row in cursor.fetchall()]
+
+        if not due_only and len(selected) < count:
+            cursor.execute(f'''
+                SELECT item FROM review_schedule
+                WHERE student_id = ? AND deck = ? AND item IN ({placeholders})
+                ORDER BY due
+            ''', (student_id, deck, *items))
+            scheduled = [row[0] for row in cursor.fetchall()]
+
+            seen = set(scheduled)
+            new_items = [item for item in reversed(items) if item not in seen]
+            for item in new_items + scheduled:
+                if len(selected) == count:
+                    break
+                if item not in selected:
+                    selected.append(item)
+    except sqlite3.Error as e:
+        log_message(create_log_message(f"Error reading review schedule for deck '{deck}': {e}"))
+        selected = [] if due_only else random.sample(items, min(count, len(items)))
+    finally:
+        cursor.close()
+        connection.close()
+
+    return selected
+
+
+def get_student_id_by_name(student_name: str) -> Optional[int]:
+    """
+    Retrieve the student ID based on the student's name.
+
+    Parameters:
+        student_name (str): The name of the student to search for.
+
+    Returns:
+        Optional[int]: The ID of the student if found, otherwise None.
+    """
+    try:
+        with sqlite3.connect('learniverse.db') as connection:
+            cursor = connection.cursor()
+            cursor.execute("SELECT id FROM students WHERE name = ?", (student_name,))
+            result = cursor.fetchone()
+
+            if result is None:
+                log_message(create_log_message(f"Error: Student '{student_name}' not found."))
+                return None
+
+            return result[0]
+
+    except sqlite3.Error as e:
+        log_message(create_log_message(f"Error retrieving student ID for '{student_name}': {e}"))
+        return None
 
 
 def insert_new_session(student_id: int) -> Optional[int]:
@@ -4596,88 +5844,66 @@ def fetch_lesson_id(lesson_title):
         return None
 
 
-def perfect_score_lesson_skip(student_name, lesson_name):
+# Lessons each student scored 100% on yesterday, keyed by (student name, today's date)
+perfect_score_lessons_cache = {}
+
+
+def load_perfect_score_lessons(student_name):
     """
-    Check if a student achieved a perfect score on a specified lesson the previous day.
-    Returns True if they did, False otherwise.
+    Fetch, in one query, the titles of every lesson a student scored 100% on
+    yesterday, and cache them for the rest of the day.
+
+    Parameters:
+        student_name (str): The name of the student.
+
+    Returns:
+        set: The lesson titles with a perfect score yesterday.
     """
-    # Connect to the database
+    yesterday_start = (datetime.now() - timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    yesterday_end = yesterday_start.replace(hour=23, minute=59, second=59)
+
     connection, cursor = get_database_cursor()
-    
     try:
-        # Get student_id for the specified student name
-        cursor.execute("SELECT id FROM students WHERE name = ?", (student_name,))
-        student_result = cursor.fetchone()
-        if not student_result:
-            log_entry = create_log_message(f"Student '{student_name}' not found in the database.")
-            log_message(log_entry)
-            return False
-        student_id = student_result[0]
-        log_entry = create_log_message(f"Student ID for '{student_name}': {student_id}")
-        log_message(log_entry)
-
-        # Get lesson_id for the specified lesson name
-        cursor.execute("SELECT lesson_id FROM lessons WHERE title = ?", (lesson_name,))
-        lesson_result = cursor.fetchone()
-        if not lesson_result:
-            log_entry = create_log_message(f"Lesson '{lesson_name}' not found in the database.")
-            log_message(log_entry)
-            return False
-        lesson_id = lesson_result[0]
-        log_entry = create_log_message(f"Lesson ID for '{lesson_name}': {lesson_id}")
-        log_message(log_entry)
-
-        # Define date range for yesterday
-        yesterday_start = (datetime.now() - timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
-        yesterday_end = yesterday_start.replace(hour=23, minute=59, second=59)
-        log_entry = create_log_message(f"Date range for yesterday: {yesterday_start} to {yesterday_end}")
-        log_message(log_entry)
-
-        # Find session_id(s) for the student within the sessions table
-        cursor.execute('''
-            SELECT session_id
-            FROM sessions
-            WHERE student_id = ?
-              AND start_time BETWEEN ? AND ?
-        ''', (student_id, yesterday_start, yesterday_end))
-        
-        session_ids = [row[0] for row in cursor.fetchall()]
-        if not session_ids:
-            log_entry = create_log_message(f"No sessions found for student ID {student_id} on {yesterday_start.date()}")
-            log_message(log_entry)
-            return False
-        log_entry = create_log_message(f"Session IDs for '{student_name}' on {yesterday_start.date()}: {session_ids}")
+        cursor.execute('''
+            SELECT DISTINCT lessons.title
+            FROM session_lessons
+            JOIN sessions ON sessions.session_id = session_lessons.session_id
+            JOIN students ON students.id = sessions.student_id
+            JOIN lessons ON lessons.lesson_id = session_lessons.lesson_id
+            WHERE students.name = ?
+              AND sessions.start_time BETWEEN ? AND ?
+              AND session_lessons.percent_correct = 100
+        ''', (student_name, yesterday_start, yesterday_end))
+        perfect_lessons = {row[0] for row in cursor.fetchall()}
+    except sqlite3.Error as e:
+        log_entry = create_log_message(f"Error checking perfect scores: {e}")
         log_message(log_entry)
+        return set()
+    finally:
+        cursor.close()
+        connection.close()
 
-        # Check session_lessons for perfect scores for this lesson within the sessions found
-        cursor.execute('''
-            SELECT percent_correct, end_time
-            FROM session_lessons
-            WHERE lesson_id = ?
-              AND session_id IN ({seq})
-              AND percent_correct = 100
-        '''.format(seq=','.join(['?'] * len(session_ids))), (lesson_id, *session_ids))
-        
-        perfect_score_yesterday = cursor.fetchone()
+    perfect_score_lessons_cache[(student_name, datetime.now().date())] = perfect_lessons
+    log_entry = create_log_message(
+        f"Perfect scores for '{student_name}' on {yesterday_start.date()}: "
+        f"{', '.join(sorted(perfect_lessons)) if perfect_lessons else 'None'}"
+    )
+    log_message(log_entry)
+    return perfect_lessons
 
-        # Log the retrieved data 
-        if perfect_score_yesterday:
-            log_entry = create_log_message(f"Perfect score found for student ID {student_id} on lesson ID {lesson_id}: {perfect_score_yesterday}")
-            log_message(log_entry)
-        else:
-            log_entry = create_log_message(f"No perfect score found for student ID {student_id} on lesson ID {lesson_id} on {yesterday_start.date()}.")
-            log_message(log_entry)
 
-        # Return True if a perfect score was achieved yesterday, otherwise False
-        return bool(perfect_score_yesterday)
+def perfect_score_lesson_skip(student_name, lesson_name):
+    """
+    Check if a student achieved a perfect score on a specified lesson the previous day.
+    Returns True if they did, False otherwise.
 
-    except sqlite3.Error as e:
-        log_entry = create_log_message(f"Error checking perfect score: {e}")
-        log_message(log_entry)
-        return False
-    finally:
-        cursor.close()
-        connection.close()
+    Uses the set loaded by load_perfect_score_lessons at the start of the session,
+    loading it first if this is a new student or a new day.
+    """
+    perfect_lessons = perfect_score_lessons_cache.get((student_name, datetime.now().date()))
+    if perfect_lessons is None:
+        perfect_lessons = load_perfect_score_lessons(student_name)
+    return lesson_name in perfect_lessons
         
 
 # TODO Finish implementing incomplete session logic and stuff
@@ -4813,18 +6039,132 @@ def load_english_font(font_name_or_path, font_size):
     return pygame.font.SysFont(font_name_or_path, font_size)
 
 
+def get_font_directories():
+    """
+    Return the folders fonts are installed in on this platform, most specific first.
+
+    Returns:
+        list: The existing font folders.
+    """
+    home = os.path.expanduser("~")
+    if is_windows_platform():
+        directories = [
+            os.path.join(os.environ.get("WINDIR", "C:/Windows"), "Fonts"),
+            os.path.join(os.environ.get("LOCALAPPDATA", ""), "Microsoft", "Windows", "Fonts"),
+        ]
+    elif sys.platform == "darwin":
+        directories = [
+            os.path.join(home, "Library", "Fonts"), "/Library/Fonts",
+            "/System/Library/Fonts", "/System/Library/Fonts/Supplemental",
+        ]
+    else:
+        directories = [
+            os.path.join(home, ".local", "share", "fonts"), os.path.join(home, ".fonts"),
+            "/usr/local/share/fonts", "/usr/share/fonts",
+        ]
+    return [directory for directory in directories if os.path.isdir(directory)]
+
+
+def find_japanese_font_candidates():
+    """
+    List the font files that may cover Japanese, best guesses first: fonts fontconfig
+    reports for Japanese when it is installed, then every font in the platform font
+    folders, each ordered by JAPANESE_FONT_PREFERENCES.
+
+    Returns:
+        list: Font file paths to try, without duplicates.
+    """
+    candidates = []
+
+    if shutil.which("fc-list"):
+        try:
+            result = subprocess.run(["fc-list", ":lang=ja", "file"], capture_output=True, text=True, timeout=10)
+            candidates.extend(line.split(":")[0].strip() for line in result.stdout.splitlines() if line.strip())
+        except (OSError, subprocess.SubprocessError) as e:
+            log_message(create_log_message(f"Error running fc-list: {e}"))
+
+    for directory in get_font_directories():
+        for root, _, files in os.walk(directory):
+            candidates.extend(os.path.join(root, file) for file in sorted(files) if file.lower().endswith(FONT_FILE_EXTENSIONS))
+
+    def preference(path):
+        name = os.path.basename(path).lower().replace("-", "").replace("_", "")
+        return next((rank for rank, prefix in enumerate(JAPANESE_FONT_PREFERENCES) if name.startswith(prefix)), len(JAPANESE_FONT_PREFERENCES))
+
+    # sorted is stable, so fontconfig's matches stay ahead of equally preferred folder matches
+    return sorted(dict.fromkeys(candidates), key=preference)
+
+
+def font_covers_text(font_path, text):
+    """
+    Check whether a font file has a glyph for every character of a text.
+
+    Parameters:
+        font_path (str): Path to the font file.
+        text (str): The characters to look for.
+
+    Returns:
+        bool: True if none of the characters would fall back to a missing glyph box.
+    """
+    try:
+        # pygame.freetype reports missing glyphs as None, unlike pygame.font
+        return None not in pygame.freetype.Font(font_path, 12).get_metrics(text)
+    except (OSError, pygame.error):
+        return False
+
+
+def resolve_japanese_font_path():
+    """
+    Return the path of a font covering kana and kanji. The path remembered in
+    options.json is used while it still exists; otherwise the candidates are
+    searched once per run and the first covering JAPANESE_FONT_TEST_TEXT is saved.
+
+    Returns:
+        str: The font file path, or None if no installed font covers Japanese.
+    """
+    global japanese_font_path, japanese_font_searched
+
+    if japanese_font_path and os.path.isfile(japanese_font_path):
+        return japanese_font_path
+    if japanese_font_searched:
+        return None
+    japanese_font_searched = True
+
+    if not pygame.freetype.get_init():
+        pygame.freetype.init()
+
+    for font_path in find_japanese_font_candidates():
+        if font_covers_text(font_path, JAPANESE_FONT_TEST_TEXT):
+            japanese_font_path = font_path
+            log_message(create_log_message(f"Japanese font resolved to '{font_path}'."))
+            save_options()
+            return font_path
+
+    japanese_font_path = None
+    log_message(create_log_message("No installed font covers Japanese; kana and kanji will not display correctly."))
+    return None
+
+
+japanese_fonts = {}  # Japanese fonts opened this run, shared by every screen, keyed by size
+
+
 def load_japanese_font(font_size):
     """
-    Load the Japanese font with a specific path to MS Gothic.
+    Return the shared Japanese font of a size, opening the resolved font file the
+    first time that size is asked for. Falls back to Pygame's default font if no
+    installed font covers Japanese.
 
     Parameters:
         font_size (int): The size of the font.
 
     Returns:
-        pygame.font.Font: The initialized Japanese font object.
+        pygame.font.Font: The Japanese font object.
     """
-    japanese_font_path = "C:/Windows/Fonts/msgothic.ttc"
-    return pygame.font.Font(japanese_font_path, font_size)
+    font_path = resolve_japanese_font_path()
+    key = (font_path, font_size)
+    if key not in japanese_fonts:
+        japanese_fonts[key] = pygame.font.Font(font_path, font_size)
+    return japanese_fonts[key]
 
 
 def init_fonts():
@@ -4943,7 +6283,10 @@ def increase_volume(step=0.1):
 
 def load_mp3(mp3):
     try:
-        pygame.mixer.music.load(mp3)
+        if mp3 in asset_bundle:
+            pygame.mixer.music.load(asset_bundle.open_file(mp3), os.path.basename(mp3))
+        else:
+            pygame.mixer.music.load(mp3)
         return True  # Indicate success
     except pygame.error as e:
         log_entry = create_log_message(f"Failed to load {mp3}: {e}")
@@ -4956,19 +6299,16 @@ def load_mp3(mp3):
     
 
 def get_random_mp3(directory):
-    """Get a random MP3 file from the specified directory."""
+    """Get a random MP3 file from the specified directory, never the same song twice in a row."""
     try:
-        # List all MP3 files in the directory
-        mp3_files = [f for f in os.listdir(directory) if f.endswith('.mp3')]
+        random_mp3 = directory_index.pick(directory, ('.mp3',))
         
-        if not mp3_files:
+        if not random_mp3:
             log_entry = create_log_message("No MP3 files found in the directory.")
             log_message(log_entry)
             return None
         
-        # Randomly select an MP3 file
-        random_mp3 = random.choice(mp3_files)
-        return os.path.join(directory, random_mp3)
+        return random_mp3
     
     except Exception as e:
         log_entry = create_log_message(f"Error loading MP3 files from directory: {e}")
@@ -5005,153 +6345,556 @@ def draw_branch(screen, start_pos, end_pos, thickness, color):
     pygame.draw.line(screen, color, start_pos, end_pos, thickness)
 
 
-def grow_tree(screen, start_x, start_y, max_depth, max_branches):
-    # Randomized recursive tree
-    branches = [(start_x, start_y, -90)]  # Starting trunk (x, y, angle - 90 degrees pointing up)
-    branch_thickness = 10  # Start thickness for the trunk
-    
-    for depth in range(max_depth):
-        new_branches = []
-        
-        for branch in branches:
-            x, y, angle = branch
-            branch_length = random.randint(10, 40)  # Random length for variety
-            
-            # Calculate new branch endpoint
-            end_x = x + math.cos(math.radians(angle)) * branch_length
-            end_y = y + math.sin(math.radians(angle)) * branch_length
-            
-            # Draw the branch
-            draw_branch(screen, (x, y), (end_x, end_y), branch_thickness, TRUNK_COLOR)
-            
-            # Randomly decide how many branches to grow from this segment
-            num_new_branches = random.randint(1, max_branches)
-            
-            for _ in range(num_new_branches):
-                new_angle = angle + random.randint(-40, 40)  # Random angle variation
-                new_branches.append((end_x, end_y, new_angle))  # Append new branches
+class ProceduralTree:
+    """
+    A class for a randomized branching tree with a fixed cost.
+
+    The tree grows breadth first like the original recursive tree, but never gets
+    more than segment_budget segments: when a level would go over the budget, a
+    random sample of its branches is kept. The geometry is stored in flat arrays
+    and drawn onto the tree's own surface, either all at once or a few segments
+    per frame so the tree grows in as an animation.
+
+    Attributes:
+    -----------
+    segments : array
+        x0, y0, x1, y1 of every segment in screen coordinates, trunk first.
+    thickness : array
+        The line thickness of every segment.
+    leaves : array
+        x, y of every leaf at the branch tips.
+    surface : Surface
+        Transparent surface just large enough for the tree.
+    topleft : tuple
+        Where the surface goes on the screen.
+    drawn : int
+        How many segments have been drawn onto the surface so far.
+
+    Methods:
+    --------
+    grow(count):
+        Draws the next count segments, and the leaves once every segment is drawn.
+    finish():
+        Draws everything that is left.
+    is_complete():
+        Returns True once the whole tree is drawn.
+    """
+    def __init__(self, start_x, start_y, max_depth, max_branches, seed, segment_budget=TREE_SEGMENT_BUDGET):
+        rng = random.Random(seed)
+        self.segments = array('f')
+        self.thickness = array('B')
+        self.leaves = array('f')
+
+        branches = [(start_x, start_y, -90)]  # Starting trunk (x, y, angle - 90 degrees pointing up)
+        branch_thickness = 10  # Start thickness for the trunk
+        tips = []
+
+        for depth in range(max_depth):
+            remaining = segment_budget - len(self.thickness)
+            if remaining <= 0:
+                break
+            if len(branches) > remaining:
+                branches = rng.sample(branches, remaining)
+
+            new_branches = []
+            tips = []
+            for x, y, angle in branches:
+                branch_length = rng.randint(10, 40)  # Random length for variety
+                end_x = x + math.cos(math.radians(angle)) * branch_length
+                end_y = y + math.sin(math.radians(angle)) * branch_length
+
+                self.segments.extend((x, y, end_x, end_y))
+                self.thickness.append(branch_thickness)
+                tips.append((end_x, end_y))
+
+                # Randomly decide how many branches to grow from this segment
+                for _ in range(rng.randint(1, max_branches)):
+                    new_branches.append((end_x, end_y, angle + rng.randint(-40, 40)))  # Random angle variation
+
+            branches = new_branches
+            branch_thickness = max(1, branch_thickness - 1)  # Decrease thickness with each level
+
+        # Leaves at the tips of the last level
+        for end_x, end_y in tips:
+            self.leaves.extend((end_x, end_y))
+
+        self.drawn = 0
+        if not self.thickness:
+            # No depth or no budget: an empty tree with nothing to draw
+            self.topleft = (int(start_x), int(start_y))
+            self.surface = pygame.Surface((1, 1), pygame.SRCALPHA)
+            return
+
+        # Size the surface to the tree's bounds
+        padding = 10 + TREE_LEAF_RADIUS
+        xs = self.segments[0::4] + self.segments[2::4]
+        ys = self.segments[1::4] + self.segments[3::4]
+        left, top = int(min(xs)) - padding, int(min(ys)) - padding
+        self.topleft = (left, top)
+        self.surface = pygame.Surface((int(max(xs)) + padding - left, int(max(ys)) + padding - top), pygame.SRCALPHA)
+
+    def segment_count(self):
+        """Return the number of segments in the tree."""
+        return len(self.thickness)
+
+    def is_complete(self):
+        """Return True once every segment and leaf has been drawn."""
+        return self.drawn == self.segment_count()
+
+    def grow(self, count):
+        """
+        Draw the next segments onto the tree's surface.
+
+        Parameters:
+            count (int): How many more segments to draw.
+
+        Returns:
+            bool: True once the whole tree has been drawn.
+        """
+        if self.is_complete():
+            return True
+
+        left, top = self.topleft
+        segments, thickness = self.segments, self.thickness
+        last = min(self.drawn + count, self.segment_count())
+        for index in range(self.drawn, last):
+            offset = index * 4
+            draw_branch(
+                self.surface,
+                (segments[offset] - left, segments[offset + 1] - top),
+                (segments[offset + 2] - left, segments[offset + 3] - top),
+                thickness[index],
+                TRUNK_COLOR
+            )
+        self.drawn = last
+
+        if self.is_complete():
+            for offset in range(0, len(self.leaves), 2):
+                pygame.draw.circle(
+                    self.surface, LEAF_COLOR,
+                    (int(self.leaves[offset] - left), int(self.leaves[offset + 1] - top)), TREE_LEAF_RADIUS
+                )
+        return self.is_complete()
+
+    def finish(self):
+        """Draw every segment and leaf that has not been drawn yet."""
+        self.grow(self.segment_count())
 
-            # At the end of depth, we add leaves
-            if depth == max_depth - 1:
-                pygame.draw.circle(screen, LEAF_COLOR, (int(end_x), int(end_y)), 5)  # Leaves at the tips
 
-        # Update for next depth
-        branches = new_branches
-        branch_thickness = max(1, branch_thickness - 1)  # Decrease thickness with each level
+# Today's trees already generated, keyed by (seed, max_depth, max_branches, position, resolution)
+tree_cache = {}
+tree_cache_date = None  # The day tree_cache holds trees for; older trees are dropped
 
 
-def draw_lightning(screen, start_pos, end_pos, background_image, font, text_color, correct_message="CORRECT!"):
+def get_procedural_tree(start_x, start_y, max_depth, max_branches, seed):
     """
-    Draws lightning bolts quickly flashing on the screen, clearing each frame of lightning
-    while keeping the background image and 'CORRECT!' text intact.
+    Return the tree for a seed, size, position and resolution, generating it the
+    first time it is asked for today. A tree from the cache keeps its surface, so
+    it does not have to grow again.
+
+    Parameters:
+        start_x (float): X position of the base of the trunk.
+        start_y (float): Y position of the base of the trunk.
+        max_depth (int): Most branching levels.
+        max_branches (int): Most branches growing from each segment.
+        seed (int): Seed for the tree's shape.
+
+    Returns:
+        ProceduralTree: The tree.
     """
+    global tree_cache_date
 
-    # Prepare colors for the lightning
-    start_color = (173, 216, 230)  # Light blue
-    end_color = (255, 255, 255)    # White
+    today = datetime.now().date()
+    if today != tree_cache_date:
+        tree_cache.clear()
+        tree_cache_date = today
 
-    BOLT_SEGMENTS = 10  # Number of segments for each bolt
-    FLASH_COUNT = 10    # Number of bolts per flash burst
-    BOLT_FLASH_DURATION = 40  # Duration to display each flash (milliseconds)
+    key = (seed, max_depth, max_branches, (start_x, start_y), (WIDTH, HEIGHT))
+    tree = tree_cache.get(key)
+    if tree is None:
+        tree = ProceduralTree(start_x, start_y, max_depth, max_branches, seed)
+        tree_cache[key] = tree
+    return tree
 
-    # Load and scale the background image to fit the screen
-    bg_image = pygame.image.load(background_image)
-    bg_image = pygame.transform.scale(bg_image, (screen.get_width(), screen.get_height()))
 
-    # Load the thunder sound effect
-    thunder_sound = pygame.mixer.Sound('assets/SFX/loud-thunder-192165.wav')
+### LIGHTNING ###
 
-    for _ in range(3):  # Number of flash bursts
-        # Step 1: Redraw the background to clear previous lightning bolts
-        screen.blit(bg_image, (0, 0))
+thunder_sound = None  # Decoded once on first use
+lightning_overlay = None  # Shared transparent surface the bolts are drawn onto
 
-        # Step 2: Draw the "CORRECT!" message using the draw_text function
-        draw_text(
-            text=correct_message,
-            font=font,
-            color=text_color,
-            x=0,  # X position is set to 0 for centering later
-            y=screen.get_height() * 0.2,  # Y position places the text above the image
-            center=True,
-            enable_shadow=True,  # Optionally enable shadow
-        )
 
-        # Step 3: Play the thunder sound effect (automatically assigns channel)
-        thunder_sound.play()
-
-        # Step 4: Draw multiple lightning bolts in this frame
-        for _ in range(FLASH_COUNT):
-            current_pos = start_pos
-            for i in range(BOLT_SEGMENTS):
-                fraction = i / BOLT_SEGMENTS
-                color = (
-                    int(start_color[0] + (end_color[0] - start_color[0]) * fraction),
-                    int(start_color[1] + (end_color[1] - start_color[1]) * fraction),
-                    int(start_color[2] + (end_color[2] - start_color[2]) * fraction)
-                )
+def get_thunder_sound():
+    """
+    Return the thunder sound effect, decoding the WAV file only the first time.
 
-                # Randomly vary the next segment position for a jagged effect
-                next_x = current_pos[0] + random.randint(-BOLT_SPREAD, BOLT_SPREAD)
-                next_y = current_pos[1] + (end_pos[1] - start_pos[1]) // BOLT_SEGMENTS
-                next_pos = (next_x, next_y)
+    Returns:
+        pygame.mixer.Sound: The thunder sound, or None if it could not be loaded.
+    """
+    global thunder_sound
+    if thunder_sound is None:
+        try:
+            thunder_sound = load_sound_asset(THUNDER_SOUND_PATH)
+        except (pygame.error, FileNotFoundError) as e:
+            log_message(create_log_message(f"Error loading thunder sound: {e}"))
+    return thunder_sound
 
-                # Draw the segment of the lightning bolt
-                pygame.draw.line(screen, color, current_pos, next_pos, 2)
-                current_pos = next_pos
 
-            # Draw the final segment of the bolt
-            pygame.draw.line(screen, end_color, current_pos, end_pos, 2)
+def play_thunder():
+    """Play the cached thunder sound on the thunder channel."""
+    sound = get_thunder_sound()
+    if sound:
+        THUNDER_CHANNEL.play(sound)
 
-        # Step 5: Display the lightning on top of the background and "CORRECT!" message
-        pygame.display.flip()
 
-        # Step 6: Hold the lightning flash for a brief moment
-        pygame.time.delay(BOLT_FLASH_DURATION)
+def get_lightning_overlay():
+    """
+    Return the shared lightning overlay, creating it again only if the
+    resolution has changed.
 
-        # Step 7: Clear the screen by redrawing the background and "CORRECT!" message (erasing previous bolts)
-        screen.blit(bg_image, (0, 0))
-        draw_text(
-            text=correct_message,
-            font=font,
-            color=text_color,
-            x=0,  # X position is set to 0 for centering later
-            y=screen.get_height() * 0.2,  # Y position places the text above the image
-            center=True,
-            enable_shadow=True,  # Optionally enable shadow
-        )
+    Returns:
+        pygame.Surface: A transparent surface the size of the screen.
+    """
+    global lightning_overlay
+    if lightning_overlay is None or lightning_overlay.get_size() != (WIDTH, HEIGHT):
+        lightning_overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+    return lightning_overlay
 
-        # Step 8: Refresh the screen to apply the cleared frame
-        pygame.display.flip()
 
-        # Short delay before the next flash burst
-        pygame.time.delay(20)
+def generate_bolt_polylines(start_pos, end_pos, bolt_count=LIGHTNING_BOLTS_PER_BURST, segments=LIGHTNING_BOLT_SEGMENTS, spread=BOLT_SPREAD):
+    """
+    Generate the jagged polylines for a burst of lightning bolts. Each bolt steps
+    evenly downwards from start_pos while wandering randomly sideways, then joins
+    end_pos. Uses NumPy when it is available.
 
-    # Step 9: Redraw the background and "CORRECT!" message after the lightning effect
-    screen.blit(bg_image, (0, 0))
-    draw_text(
-        text=correct_message,
-        font=font,
-        color=text_color,
-        x=0,  # X position is set to 0 for centering later
-        y=screen.get_height() * 0.2,  # Y position places the text above the image
-        center=True,
-        enable_shadow=True,  # Optionally enable shadow
-    )
-    pygame.display.flip()  # Final refresh with background and text intact
+    Parameters:
+        start_pos (tuple): The (x, y) point the bolts start from.
+        end_pos (tuple): The (x, y) point the bolts end at.
+        bolt_count (int): The number of bolts in the burst.
+        segments (int): The number of jagged segments per bolt.
+        spread (int): The largest sideways step of a segment in pixels.
+
+    Returns:
+        list: One list of segments + 2 (x, y) points per bolt.
+    """
+    step_y = (end_pos[1] - start_pos[1]) // segments
+
+    if np is not None:
+        points = np.empty((bolt_count, segments + 2, 2), dtype=int)
+        points[:, 0] = start_pos
+        points[:, 1:-1, 0] = start_pos[0] + np.cumsum(np.random.randint(-spread, spread + 1, size=(bolt_count, segments)), axis=1)
+        points[:, 1:-1, 1] = start_pos[1] + step_y * np.arange(1, segments + 1)
+        points[:, -1] = end_pos
+        return points.tolist()
+
+    bolts = []
+    for _ in range(bolt_count):
+        x, y = start_pos
+        bolt = [start_pos]
+        for _ in range(segments):
+            x += random.randint(-spread, spread)
+            y += step_y
+            bolt.append((x, y))
+        bolt.append(end_pos)
+        bolts.append(bolt)
+    return bolts
+
+
+def get_bolt_segment_colors(segments=LIGHTNING_BOLT_SEGMENTS):
+    """
+    Return the color of each bolt segment, fading from the start color to the end
+    color, with the final joining segment in the end color.
+
+    Parameters:
+        segments (int): The number of jagged segments per bolt.
+
+    Returns:
+        list: segments + 1 RGB tuples.
+    """
+    colors = []
+    for i in range(segments):
+        fraction = i / segments
+        colors.append(tuple(
+            int(start + (end - start) * fraction)
+            for start, end in zip(LIGHTNING_START_COLOR, LIGHTNING_END_COLOR)
+        ))
+    colors.append(LIGHTNING_END_COLOR)
+    return colors
+
+
+class LightningEffect:
+    """
+    A set of lightning strikes whose bolts are generated up front and drawn onto
+    the shared overlay, so showing a flash only costs one blit.
+
+    Attributes:
+    -----------
+    strikes : list
+        The (start_pos, end_pos) of each strike.
+    bursts : list
+        For each strike, the bolt polylines of each of its bursts.
+    colors : list
+        The color of each bolt segment.
+    overlay : Surface
+        The shared transparent surface the current burst is drawn onto.
+    drawn_burst : tuple
+        The (strike, burst) currently on the overlay, or None.
+    dirty_rect : Rect
+        The area of the overlay the current burst covers.
+
+    Methods:
+    --------
+    draw(surface, strike_index, burst_index):
+        Draws one burst of a strike onto the surface.
+    play_thunder():
+        Plays the thunder sound for a strike.
+    """
+    def __init__(self, strikes, bursts_per_strike=LIGHTNING_BURSTS_PER_STRIKE, bolt_count=LIGHTNING_BOLTS_PER_BURST, segments=LIGHTNING_BOLT_SEGMENTS):
+        """
+        Initialize the LightningEffect object.
+
+        Parameters:
+            strikes (list): The (start_pos, end_pos) of each strike.
+            bursts_per_strike (int): The number of flash bursts per strike.
+            bolt_count (int): The number of bolts in each burst.
+            segments (int): The number of jagged segments per bolt.
+        """
+        self.strikes = strikes
+        self.bursts = [
+            [generate_bolt_polylines(start_pos, end_pos, bolt_count, segments) for _ in range(bursts_per_strike)]
+            for start_pos, end_pos in strikes
+        ]
+        self.colors = get_bolt_segment_colors(segments)
+        self.overlay = get_lightning_overlay()
+        self.drawn_burst = None
+        self.dirty_rect = None
+
+        # Decode the thunder now rather than in the middle of the first flash
+        get_thunder_sound()
+
+    def _render_burst(self, strike_index, burst_index):
+        """Draw a burst onto the overlay, clearing only the area the last burst covered."""
+        if self.dirty_rect:
+            self.overlay.fill((0, 0, 0, 0), self.dirty_rect)
+
+        self.dirty_rect = None
+        for bolt in self.bursts[strike_index][burst_index]:
+            for color, segment_start, segment_end in zip(self.colors, bolt, bolt[1:]):
+                segment_rect = pygame.draw.line(self.overlay, color, segment_start, segment_end, 2)
+                self.dirty_rect = segment_rect if self.dirty_rect is None else self.dirty_rect.union(segment_rect)
+        self.drawn_burst = (strike_index, burst_index)
+
+    def draw(self, surface, strike_index, burst_index):
+        """
+        Draw one burst of a strike onto the surface.
+
+        Parameters:
+            surface (pygame.Surface): The surface to draw on.
+            strike_index (int): The strike the burst belongs to.
+            burst_index (int): The burst within the strike.
+        """
+        if self.drawn_burst != (strike_index, burst_index):
+            self._render_burst(strike_index, burst_index)
+        if self.dirty_rect:
+            surface.blit(self.overlay, self.dirty_rect.topleft, self.dirty_rect)
+
+    def play_thunder(self):
+        """Play the thunder sound for a strike."""
+        play_thunder()
+
+### REWARD ANIMATIONS ###
+
+def ease_out_cubic(t):
+    """
+    Ease-out curve that starts fast and settles gently.
+
+    Parameters:
+        t (float): Linear progress from 0 to 1.
+
+    Returns:
+        float: The eased progress from 0 to 1.
+    """
+    t = max(0.0, min(1.0, t))
+    return 1 - (1 - t) ** 3
+
+
+class RewardAnimation:
+    """
+    A timeline for the result screen shown after an answer: a particle shower or
+    lightning strikes over the background, the result text easing in, then a hold.
+
+    Everything is positioned by the elapsed time rather than by frame count, so
+    the effect takes the same time on every machine. run_reward_animation drives
+    it while still handling events.
+
+    Attributes:
+    -----------
+    background : Surface
+        The pre-scaled background, or None to use the theme color.
+    use_lightning : bool
+        Whether to show lightning strikes (needs a background) instead of particles.
+    duration : int
+        Total length of the timeline in milliseconds.
+    text_layer : Surface
+        The result text, rendered once onto a transparent layer.
+    particles : list
+        The particles of the shower, taken from the shared particle pool.
+    lightning : LightningEffect
+        The pre-generated lightning strikes, or None.
+
+    Methods:
+    --------
+    update(elapsed_ms):
+        Advances the effects to the given point on the timeline.
+    draw(surface, elapsed_ms):
+        Draws the frame for the given point on the timeline.
+    is_settled(elapsed_ms):
+        Returns True once nothing on screen is moving any more.
+    release():
+        Returns the particles to the shared pool.
+    """
+    def __init__(self, result_text, background=None, use_lightning=False):
+        self.background = background
+        self.use_lightning = use_lightning and background is not None
+        self.duration = REWARD_EFFECT_DURATION + REWARD_HOLD_DURATION
+
+        # The lightning message sits above the strikes; otherwise it is centered
+        text_y = HEIGHT * 0.2 if self.use_lightning else HEIGHT // 2
+        self.text_layer = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        draw_text(result_text, font, text_color, WIDTH // 2, text_y, self.text_layer,
+                  center=True, enable_shadow=True, max_width=WIDTH)
+
+        self.particles = []
+        self.particle_steps = 0
+        if background is not None and not self.use_lightning:
+            for _ in range(REWARD_PARTICLE_COUNT):
+                color = random.choice([NAVY_BLUE, WHITE, ROYAL_BLUE, LIGHT_BLUE])
+                self.particles.append(particle_pool.acquire(random.randint(0, WIDTH), random.randint(0, HEIGHT), color))
+
+        self.lightning = None
+        self.strikes_started = 0
+        if self.use_lightning:
+            self.lightning = LightningEffect(
+                [((random.randint(0, WIDTH), 0), (random.randint(0, WIDTH), HEIGHT)) for _ in range(LIGHTNING_STRIKES)]
+            )
+
+    def _active_burst(self, elapsed_ms):
+        """Return the (strike, burst) flashing at elapsed_ms, or None between flashes."""
+        strike_index, strike_time = divmod(int(elapsed_ms), LIGHTNING_STRIKE_INTERVAL)
+        burst_index, burst_time = divmod(strike_time, LIGHTNING_BURST_INTERVAL)
+        if strike_index < LIGHTNING_STRIKES and burst_index < LIGHTNING_BURSTS_PER_STRIKE and burst_time < LIGHTNING_FLASH_DURATION:
+            return strike_index, burst_index
+        return None
+
+    def update(self, elapsed_ms):
+        """
+        Advance the effects to the given point on the timeline.
+
+        Parameters:
+            elapsed_ms (int): Milliseconds since the animation started.
+        """
+        # Catch the particles up to the timeline, however long the last frame took
+        steps_due = int(elapsed_ms // REWARD_PARTICLE_STEP)
+        while self.particles and self.particle_steps < steps_due:
+            for particle in self.particles:
+                particle.update()
+            particle_pool.release_where(self.particles, Particle.is_expired)
+            self.particle_steps += 1
+
+        # Thunder rolls once as each strike begins
+        if self.lightning:
+            strikes_started = min(int(elapsed_ms) // LIGHTNING_STRIKE_INTERVAL + 1, LIGHTNING_STRIKES)
+            if strikes_started > self.strikes_started:
+                self.lightning.play_thunder()
+                self.strikes_started = strikes_started
+
+    def draw(self, surface, elapsed_ms):
+        """
+        Draw the frame for the given point on the timeline.
+
+        Parameters:
+            surface (pygame.Surface): The surface to draw on.
+            elapsed_ms (int): Milliseconds since the animation started.
+        """
+        draw_scene_background(surface, self.background)
+
+        for particle in self.particles:
+            particle.draw(surface)
+
+        if self.lightning:
+            burst = self._active_burst(elapsed_ms)
+            if burst:
+                self.lightning.draw(surface, *burst)
+
+        self.text_layer.set_alpha(int(255 * ease_out_cubic(elapsed_ms / REWARD_TEXT_FADE_DURATION)))
+        surface.blit(self.text_layer, (0, 0))
+
+    def is_settled(self, elapsed_ms):
+        """Return True once the effects are over and the text has fully faded in."""
+        return elapsed_ms >= max(REWARD_EFFECT_DURATION, REWARD_TEXT_FADE_DURATION) and not self.particles
+
+    def release(self):
+        """Return any remaining particles to the shared pool."""
+        particle_pool.release_all(self.particles)
+
+
+def run_reward_animation(animation):
+    """
+    Play a reward animation, handling events every frame. A left click skips the
+    rest of it. Once the effects settle, the loop sleeps until the hold ends or the
+    player clicks instead of redrawing an unchanging frame.
+
+    Parameters:
+        animation (RewardAnimation): The timeline to play.
+    """
+    # Clear the event queue to avoid any unwanted inputs
+    pygame.event.clear()
+
+    frame_clock = pygame.time.Clock()
+    start_time = pygame.time.get_ticks()
+
+    try:
+        while True:
+            elapsed_ms = pygame.time.get_ticks() - start_time
+            if elapsed_ms >= animation.duration:
+                break
+
+            animation.update(elapsed_ms)
+            animation.draw(screen, elapsed_ms)
+            pygame.display.flip()
+
+            if animation.is_settled(elapsed_ms):
+                events = wait_for_input(timeout=animation.duration - elapsed_ms)
+            else:
+                events = pygame.event.get()
+                frame_clock.tick(REWARD_ANIMATION_FPS)
+
+            for event in events:
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
+                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                    return
+    finally:
+        animation.release()
+
+        # Clear the event queue again after displaying the result
+        pygame.event.clear()
 
 
-def generate_perlin_cloud(x_offset):
-    # Function to generate a Perlin noise cloud mask with horizontal offset
+def generate_perlin_cloud(x_offset, width, height, seed=None):
+    # Function to generate a width x height Perlin noise cloud mask with horizontal offset
     # Create a surface for the cloud with alpha
-    cloud_surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+    cloud_surface = pygame.Surface((width, height), pygame.SRCALPHA)
 
-    # Generate a random seed offset for both x and y directions to create a different cloud pattern
-    random_x_offset = random.uniform(0, 10000)  # Randomize X offset
-    random_y_offset = random.uniform(0, 10000)  # Randomize Y offset
+    # Generate a random seed offset for both x and y directions to create a different cloud pattern.
+    # The same seed always gives the same pattern.
+    rng = random.Random(seed)
+    random_x_offset = rng.uniform(0, 10000)  # Randomize X offset
+    random_y_offset = rng.uniform(0, 10000)  # Randomize Y offset
 
     # Generate Perlin noise for the entire screen
-    for x in range(WIDTH):
-        for y in range(HEIGHT):
+    for x in range(width):
+        for y in range(height):
             # Apply random offsets to both X and Y to randomize the cloud pattern
             noise_value = noise.pnoise2(
                 (x + x_offset + random_x_offset) * NOISE_SCALE, 
@@ -5167,6 +6910,61 @@ def generate_perlin_cloud(x_offset):
     
     return cloud_surface
 
+
+cloud_cache = {}  # Cloud layers already loaded this run, keyed by (seed, width, height)
+
+
+def load_perlin_cloud(seed=None):
+    """
+    Return a static Perlin cloud layer for the current resolution. Generating one
+    takes seconds, so each (seed, resolution) layer is generated once, saved as a
+    PNG in the cache folder and loaded from there afterwards.
+
+    Parameters:
+        seed (int): Which cloud layer to use. A random one of CLOUD_SEED_COUNT
+                    layers is picked if not given.
+
+    Returns:
+        pygame.Surface: The cloud layer with per-pixel alpha.
+    """
+    if seed is None:
+        seed = random.randrange(CLOUD_SEED_COUNT)
+
+    key = (seed, WIDTH, HEIGHT)
+    if key not in cloud_cache:
+        cloud_cache[key] = read_perlin_cloud(seed, WIDTH, HEIGHT).convert_alpha()
+    return cloud_cache[key]
+
+
+def read_perlin_cloud(seed, width, height):
+    """
+    Read a cloud layer from the cache folder, or generate and save it if it is not
+    there yet. The surface is not converted and the size is passed in rather than
+    read from the current resolution, so this is safe to call from a worker thread.
+
+    Parameters:
+        seed (int): Which cloud layer to read.
+        width (int): The width of the layer.
+        height (int): The height of the layer.
+
+    Returns:
+        pygame.Surface: The cloud layer with per-pixel alpha.
+    """
+    cache_path = os.path.join(CLOUD_CACHE_DIRECTORY, f"cloud_{seed}_{width}x{height}.png")
+    if os.path.exists(cache_path):
+        try:
+            return pygame.image.load(cache_path)
+        except pygame.error as e:
+            log_message(create_log_message(f"Error loading cached cloud layer '{cache_path}': {e}"))
+
+    cloud_surface = generate_perlin_cloud(0, width, height, seed)
+    try:
+        os.makedirs(CLOUD_CACHE_DIRECTORY, exist_ok=True)
+        pygame.image.save(cloud_surface, cache_path)
+    except (pygame.error, OSError) as e:
+        log_message(create_log_message(f"Error saving cloud layer to '{cache_path}': {e}"))
+    return cloud_surface
+
     
 ### WIREFRAME CUBE ###
 cube_vertices = [
@@ -5200,62 +6998,206 @@ def project_3d_to_2d(point, center_x, center_y, fov=512, viewer_distance=10):
     return (int(x), int(y))
 
 
-# Functions to rotate 3D points around the axes
-def rotate_x(point, angle):
-    """Rotate a point around the X-axis."""
-    y = point[1] * math.cos(angle) - point[2] * math.sin(angle)
-    z = point[1] * math.sin(angle) + point[2] * math.cos(angle)
-    return [point[0], y, z]
-
-
-def rotate_y(point, angle):
-    """Rotate a point around the Y-axis."""
-    x = point[2] * math.sin(angle) + point[0] * math.cos(angle)
-    z = point[2] * math.cos(angle) - point[0] * math.sin(angle)
-    return [x, point[1], z]
+def rotation_matrix(angle_x, angle_y, angle_z):
+    """
+    Build the combined 3x3 rotation matrix that rotates around the X axis, then
+    the Y axis, then the Z axis. The trig runs once per frame rather than once
+    per vertex.
 
+    Returns:
+        The matrix as a NumPy array, or as nested lists without NumPy.
+    """
+    cos_x, sin_x = math.cos(angle_x), math.sin(angle_x)
+    cos_y, sin_y = math.cos(angle_y), math.sin(angle_y)
+    cos_z, sin_z = math.cos(angle_z), math.sin(angle_z)
+
+    # Rz * Ry * Rx multiplied out
+    matrix = [
+        [cos_z * cos_y, cos_z * sin_y * sin_x - sin_z * cos_x, cos_z * sin_y * cos_x + sin_z * sin_x],
+        [sin_z * cos_y, sin_z * sin_y * sin_x + cos_z * cos_x, sin_z * sin_y * cos_x - cos_z * sin_x],
+        [-sin_y, cos_y * sin_x, cos_y * cos_x]
+    ]
+    return np.array(matrix) if np is not None else matrix
 
-def rotate_z(point, angle):
-    """Rotate a point around the Z-axis."""
-    x = point[0] * math.cos(angle) - point[1] * math.sin(angle)
-    y = point[0] * math.sin(angle) + point[1] * math.cos(angle)
-    return [x, y, point[2]]
 
+class WireframeMesh:
+    """
+    A 3D shape drawn as lines between its vertices.
 
-def draw_wireframe_cube(screen, center_x, center_y):
-    global angle_x, angle_y, angle_z  # Use the global rotation variables
+    With NumPy available, all vertices are rotated in one matrix multiplication
+    and projected in one vectorized step.
 
-    # Rotate the cube's vertices
-    rotated_vertices = []
-    for vertex in cube_vertices:
-        rotated = rotate_x(vertex, angle_x)
-        rotated = rotate_y(rotated, angle_y)
-        rotated = rotate_z(rotated, angle_z)
-        rotated_vertices.append(rotated)
+    Attributes:
+    -----------
+    vertices : array
+        The (x, y, z) model-space position of every vertex.
+    edges : list
+        (start, end) vertex index pairs to draw lines between.
 
-    # Project the 3D points to 2D
-    projected_vertices = [
-        project_3d_to_2d(vertex, center_x, center_y) for vertex in rotated_vertices
+    Methods:
+    --------
+    project(matrix, center_x, center_y, fov=512, viewer_distance=10):
+        Rotates the vertices and projects them to screen coordinates.
+    draw(surface, matrix, center_x, center_y, color, width=2):
+        Draws the rotated mesh centered on a screen position.
+    """
+    def __init__(self, vertices, edges):
+        self.vertices = np.array(vertices, dtype=float) if np is not None else [list(map(float, vertex)) for vertex in vertices]
+        self.edges = list(edges)
+
+    def project(self, matrix, center_x, center_y, fov=512, viewer_distance=10):
+        """
+        Rotate the vertices with a rotation matrix and project them to the screen.
+
+        Parameters:
+            matrix: The rotation matrix from rotation_matrix().
+            center_x (int): The screen x-coordinate of the model origin.
+            center_y (int): The screen y-coordinate of the model origin.
+            fov (int): The field of view scale.
+            viewer_distance (int): The distance from the viewer to the model origin.
+
+        Returns:
+            list: The (x, y) screen position of every vertex.
+        """
+        if np is None:
+            rotated = [[sum(row[i] * vertex[i] for i in range(3)) for row in matrix] for vertex in self.vertices]
+            return [project_3d_to_2d(vertex, center_x, center_y, fov, viewer_distance) for vertex in rotated]
+
+        rotated = self.vertices @ matrix.T
+        factor = fov / (viewer_distance + rotated[:, 2])
+        projected = np.empty((len(rotated), 2))
+        projected[:, 0] = rotated[:, 0] * factor + center_x
+        projected[:, 1] = -rotated[:, 1] * factor + center_y  # Invert y-axis to match Pygame's coordinate system
+        return projected.astype(int).tolist()
+
+    def draw(self, surface, matrix, center_x, center_y, color, width=2):
+        """
+        Draw the rotated mesh centered on a screen position.
+
+        Parameters:
+            surface (pygame.Surface): The surface to draw on.
+            matrix: The rotation matrix from rotation_matrix().
+            center_x (int): The screen x-coordinate of the model origin.
+            center_y (int): The screen y-coordinate of the model origin.
+            color (tuple): The RGB color of the edges.
+            width (int): The line width of the edges.
+        """
+        points = self.project(matrix, center_x, center_y)
+        for start, end in self.edges:
+            pygame.draw.line(surface, color, points[start], points[end], width)
+
+
+def create_cube_mesh(center=(0, 0, 0), size=2):
+    """
+    Create a cube mesh.
+
+    Parameters:
+        center (tuple): The (x, y, z) center of the cube.
+        size (float): The length of each side.
+
+    Returns:
+        WireframeMesh: The cube.
+    """
+    half = size / 2
+    vertices = [[center[i] + corner[i] * half for i in range(3)] for corner in cube_vertices]
+    return WireframeMesh(vertices, cube_edges)
+
+
+def create_dodecahedron_mesh(radius=1.5):
+    """
+    Create a regular dodecahedron mesh centered on the origin.
+
+    Parameters:
+        radius (float): The distance from the center to each vertex.
+
+    Returns:
+        WireframeMesh: The dodecahedron.
+    """
+    phi = (1 + math.sqrt(5)) / 2
+    vertices = [[x, y, z] for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)]
+    for a in (-1 / phi, 1 / phi):
+        for b in (-phi, phi):
+            vertices += [[0, a, b], [a, b, 0], [b, 0, a]]
+
+    # Every edge has length 2 / phi on the unit-cube construction above
+    edge_length = 2 / phi
+    edges = [
+        (i, j)
+        for i in range(len(vertices))
+        for j in range(i + 1, len(vertices))
+        if abs(math.dist(vertices[i], vertices[j]) - edge_length) < 1e-6
     ]
 
-    # Convert HSV to RGB for dynamic color cycling
-    r, g, b = colorsys.hsv_to_rgb(hue, 1.0, 1.0)
-    edge_color = (int(r * 255), int(g * 255), int(b * 255))
+    scale = radius / math.sqrt(3)
+    return WireframeMesh([[coordinate * scale for coordinate in vertex] for vertex in vertices], edges)
 
-    # Draw the edges of the cube with the dynamic RGB color
-    for edge in cube_edges:
-        pygame.draw.line(screen, edge_color, projected_vertices[edge[0]], projected_vertices[edge[1]], 2)
 
-    # Update the angles for continuous rotation
-    angle_x += 0.01
-    angle_y += 0.02
-    angle_z += 0.015
+def combine_meshes(meshes):
+    """
+    Merge several meshes into one so they are rotated and drawn together,
+    e.g. a stack of cubes.
+
+    Parameters:
+        meshes (list): The WireframeMesh objects to merge.
+
+    Returns:
+        WireframeMesh: A mesh holding every vertex and edge.
+    """
+    vertices, edges = [], []
+    for mesh in meshes:
+        offset = len(vertices)
+        vertices += [list(vertex) for vertex in mesh.vertices]
+        edges += [(start + offset, end + offset) for start, end in mesh.edges]
+    return WireframeMesh(vertices, edges)
+
+
+streak_cube_mesh = create_cube_mesh()
+
+STREAK_DAYS_PER_CUBE = 7  # Each full week of a streak adds a cube to the stack
+STREAK_MAX_STACKED_CUBES = 4  # From this many weeks on, the dodecahedron is shown instead
+
+
+def create_streak_mesh(streak_days):
+    """
+    Return the wireframe shown for a streak: the cube during the first week, a
+    stack with one more cube for each full week, and a dodecahedron once the
+    streak reaches STREAK_MAX_STACKED_CUBES weeks.
+
+    Parameters:
+        streak_days (int): How many days in a row the student has studied.
 
+    Returns:
+        WireframeMesh: The mesh to draw.
+    """
+    weeks = streak_days // STREAK_DAYS_PER_CUBE
+    if weeks == 0:
+        return streak_cube_mesh
+    if weeks >= STREAK_MAX_STACKED_CUBES:
+        return create_dodecahedron_mesh()
+
+    cube_count = weeks + 1
+    size = 1.2
+    spacing = size * 1.25
+    return combine_meshes([
+        create_cube_mesh(center=(0, (index - (cube_count - 1) / 2) * spacing, 0), size=size)
+        for index in range(cube_count)
+    ])
+
+
+def draw_wireframe_cube(screen, center_x, center_y, mesh=None):
+    global angle_x, angle_y, angle_z, hue  # Use the global rotation and color variables
+
+    # One rotation matrix for every vertex this frame
+    matrix = rotation_matrix(angle_x, angle_y, angle_z)
+
+    # Convert HSV to RGB for dynamic color cycling
+    r, g, b = colorsys.hsv_to_rgb(hue, 1.0, 1.0)
+    edge_color = (int(r * 255), int(g * 255), int(b * 255))
 
-def update_cube():
-    global angle_x, angle_y, angle_z, hue  # Declare as global since they are being modified
+    # Draw the edges of the mesh (the cube unless another is given) with the dynamic RGB color
+    (mesh or streak_cube_mesh).draw(screen, matrix, center_x, center_y, edge_color)
 
-    # Update the rotation angles for continuous animation
+    # Update the angles for continuous rotation and cycle the color
     angle_x += 0.01
     angle_y += 0.02
     angle_z += 0.015
@@ -5263,18 +7205,93 @@ def update_cube():
     if hue > 1.0:
         hue -= 1.0
 
+
 ### SEASONAL SFX ###
-# Colors: White to light blue
+
+particle_stamp_cache = {}  # Pre-rendered particle shapes keyed by (kind, size, color)
+
+
+def render_particle_stamp(kind, size, color):
+    """
+    Draw one seasonal particle shape onto a small transparent surface.
+
+    Parameters:
+        kind (str): 'snowflake', 'sakura' or 'leaf'.
+        size: The particle size; (width, height) for leaves.
+        color (tuple): The RGB color of the particle.
+
+    Returns:
+        tuple: The surface and the (x, y) offset of the particle's anchor point
+               within it.
+    """
+    if kind == 'snowflake':
+        # Six lines radiating from the center, 60 degrees apart
+        stamp = pygame.Surface((size * 2 + 3, size * 2 + 3), pygame.SRCALPHA)
+        center = (size + 1, size + 1)
+        for i in range(6):
+            angle = i * math.pi / 3
+            end_pos = (center[0] + math.cos(angle) * size, center[1] + math.sin(angle) * size)
+            pygame.draw.line(stamp, color, center, end_pos, 1)
+        return stamp, center
+
+    if kind == 'sakura':
+        # Five petals around the center
+        petal_distance = size * 0.4  # Distance of petals from center (closer to center)
+        petal_width = size * 0.7
+        petal_height = size * 0.4
+        anchor = (math.ceil(petal_distance) + 1, math.ceil(petal_distance) + 1)
+        stamp = pygame.Surface(
+            (math.ceil(2 * petal_distance + petal_width) + 2, math.ceil(2 * petal_distance + petal_height) + 2),
+            pygame.SRCALPHA
+        )
+        for i in range(5):
+            angle = i * (2 * math.pi / 5)
+            petal_x = anchor[0] + math.cos(angle) * petal_distance
+            petal_y = anchor[1] + math.sin(angle) * petal_distance
+            pygame.draw.ellipse(stamp, color, (petal_x, petal_y, petal_width, petal_height))
+        return stamp, anchor
+
+    # Leaves are a plain oval anchored at its top-left corner
+    stamp = pygame.Surface(size, pygame.SRCALPHA)
+    pygame.draw.ellipse(stamp, color, (0, 0, *size))
+    return stamp, (0, 0)
+
+
+def get_particle_stamp(kind, size, color):
+    """
+    Return the pre-rendered stamp for a particle, rendering it the first time
+    this (kind, size, color) combination is seen.
+
+    Parameters:
+        kind (str): 'snowflake', 'sakura' or 'leaf'.
+        size: The particle size; (width, height) for leaves.
+        color (tuple): The RGB color of the particle.
+
+    Returns:
+        tuple: The surface and the (x, y) offset of the particle's anchor point
+               within it.
+    """
+    key = (kind, size, color)
+    stamp = particle_stamp_cache.get(key)
+    if stamp is None:
+        stamp = render_particle_stamp(kind, size, color)
+        particle_stamp_cache[key] = stamp
+    return stamp
+
+
+# Colors: White to light blue, in steps of 8 to keep the number of stamps small
 def random_snow_color():
     return (
-        random.randint(200, 255),  # Red: High for white/light blue
-        random.randint(200, 255),  # Green: High for white/light blue
-        random.randint(255, 255)   # Blue: Max for light blue
+        random.randrange(200, 256, 8),  # Red: High for white/light blue
+        random.randrange(200, 256, 8),  # Green: High for white/light blue
+        255                             # Blue: Max for light blue
     )
 
 
 # Snowflake Particle class
 class SnowflakeParticle:
+    SWAY_PERIOD = 500  # Milliseconds per radian of the shared sway wave
+
     def __init__(self):
         self.x = random.randint(0, WIDTH - 1)
         self.y = random.randint(-200, -10)  # Start above the screen
@@ -5290,7 +7307,7 @@ class SnowflakeParticle:
             # Vertical falling
             self.y += self.speed
             # Horizontal swaying
-            sway_offset = math.sin(pygame.time.get_ticks() / 500) * self.sway
+            sway_offset = math.sin(pygame.time.get_ticks() / self.SWAY_PERIOD) * self.sway
             self.x += sway_offset * self.sway_direction
 
             # Keep within screen bounds
@@ -5301,12 +7318,13 @@ class SnowflakeParticle:
                 self.y = HEIGHT - 1  # Snap to the ground
                 self.settled = True  # Mark as settled
 
+    def stamp_key(self):
+        return 'snowflake', self.size, self.color
+
     def draw(self, surface):
-        for i in range(6):  # Six lines radiating from center
-            angle = i * math.pi / 3  # 60 degrees between each line
-            end_x = self.x + math.cos(angle) * self.size
-            end_y = self.y + math.sin(angle) * self.size
-            pygame.draw.line(surface, self.color, (self.x, self.y), (end_x, end_y), 1)
+        # Six lines radiating from center, pre-rendered once per size and color
+        stamp, (anchor_x, anchor_y) = get_particle_stamp(*self.stamp_key())
+        surface.blit(stamp, (self.x - anchor_x, self.y - anchor_y))
 
 
 # Random color generator for sakura petals
@@ -5316,6 +7334,8 @@ def random_sakura_color():
 
 # Sakura Blossom Particle class
 class SakuraBlossom:
+    SWAY_PERIOD = 1000  # Milliseconds per radian of the shared sway wave
+
     def __init__(self):
         self.x = random.randint(0, WIDTH - 1)
         self.y = random.randint(-200, -10)  # Start above the screen
@@ -5331,7 +7351,7 @@ class SakuraBlossom:
             # Vertical falling
             self.y += self.speed
             # Horizontal swaying
-            sway_offset = math.sin(pygame.time.get_ticks() / 1000) * self.sway
+            sway_offset = math.sin(pygame.time.get_ticks() / self.SWAY_PERIOD) * self.sway
             self.x += sway_offset * self.sway_direction
 
             # Keep within screen bounds
@@ -5342,17 +7362,13 @@ class SakuraBlossom:
                 self.y = HEIGHT - 1  # Snap to the ground
                 self.settled = True  # Mark as settled
 
-    def draw(self, surface):
-        center_x, center_y = self.x, self.y
-        petal_distance = self.size * 0.4  # Distance of petals from center (closer to center)
-        petal_width = self.size * 0.7
-        petal_height = self.size * 0.4
+    def stamp_key(self):
+        return 'sakura', self.size, self.color
 
-        for i in range(5):  # Draw five petals
-            angle = i * (2 * math.pi / 5)  # Divide circle into 5 angles
-            petal_x = center_x + math.cos(angle) * petal_distance
-            petal_y = center_y + math.sin(angle) * petal_distance
-            pygame.draw.ellipse(surface, self.color, (petal_x, petal_y, petal_width, petal_height))
+    def draw(self, surface):
+        # Five petals around the center, pre-rendered once per size and color
+        stamp, (anchor_x, anchor_y) = get_particle_stamp(*self.stamp_key())
+        surface.blit(stamp, (self.x - anchor_x, self.y - anchor_y))
 
 
 # Random color generator for leaves
@@ -5362,6 +7378,8 @@ def random_leaf_color():
 
 # Leaf Particle class
 class LeafParticle:
+    SWAY_PERIOD = 500  # Milliseconds per radian of the shared sway wave
+
     def __init__(self):
         self.x = random.randint(0, WIDTH - 1)
         self.y = random.randint(-200, -10)  # Start above the screen
@@ -5378,7 +7396,7 @@ class LeafParticle:
             # Vertical falling
             self.y += self.speed
             # Horizontal swaying
-            sway_offset = math.sin(pygame.time.get_ticks() / 500) * self.sway
+            sway_offset = math.sin(pygame.time.get_ticks() / self.SWAY_PERIOD) * self.sway
             self.x += sway_offset * self.sway_direction
 
             # Keep within screen bounds
@@ -5389,8 +7407,174 @@ class LeafParticle:
                 self.y = HEIGHT - 1  # Snap to the ground
                 self.settled = True  # Mark as settled
 
+    def stamp_key(self):
+        return 'leaf', (self.width, self.height), self.color
+
+    def draw(self, surface):
+        stamp, _ = get_particle_stamp(*self.stamp_key())
+        surface.blit(stamp, (self.x, self.y))
+
+
+GROUND_STRIP_HEIGHT = 48  # Height of the strip at the bottom of the screen that settled particles bake into
+
+
+class SeasonalParticleField:
+    """
+    All the falling particles of one seasonal type, simulated together.
+
+    With NumPy available, positions and speeds live in arrays and the sway,
+    fall and settle steps run as whole-array operations. Without it, the
+    particle objects are updated one by one. Either way, particles that reach
+    the ground are drawn once into a ground strip surface and dropped, so the
+    pile-up costs a single blit per frame however large it grows.
+
+    Attributes:
+    -----------
+    particle_class : type
+        SnowflakeParticle, LeafParticle or SakuraBlossom.
+    count : int
+        The number of particles still falling.
+    ground : Surface
+        The strip along the bottom of the screen holding the settled particles.
+    ground_top : int
+        The screen y-coordinate of the top of the ground strip.
+
+    Methods:
+    --------
+    spawn(count=1):
+        Adds new particles above the top of the screen.
+    update():
+        Moves every falling particle and bakes the ones that have settled.
+    draw(surface):
+        Draws the ground strip and the falling particles.
+    """
+    def __init__(self, particle_class, capacity=256):
+        self.particle_class = particle_class
+        self.count = 0
+        self.ground_top = HEIGHT - GROUND_STRIP_HEIGHT
+        self.ground = pygame.Surface((WIDTH, GROUND_STRIP_HEIGHT), pygame.SRCALPHA)
+
+        # Each distinct stamp gets an id so particles can refer to it from an array
+        self.stamp_ids = {}
+        self.stamp_surfaces = []
+        self.stamp_anchors = []
+
+        if np is not None:
+            self.x = np.zeros(capacity)
+            self.y = np.zeros(capacity)
+            self.speed = np.zeros(capacity)
+            self.sway = np.zeros(capacity)  # Sway amount with its direction folded in
+            self.stamp = np.zeros(capacity, dtype=np.int32)
+            self.anchor_x = np.zeros(0)
+            self.anchor_y = np.zeros(0)
+        else:
+            self.particles = []
+
+    def _stamp_id(self, particle):
+        """Return the id of a particle's stamp, registering the stamp the first time."""
+        key = particle.stamp_key()
+        stamp_id = self.stamp_ids.get(key)
+        if stamp_id is None:
+            stamp, anchor = get_particle_stamp(*key)
+            stamp_id = len(self.stamp_surfaces)
+            self.stamp_ids[key] = stamp_id
+            self.stamp_surfaces.append(stamp)
+            self.stamp_anchors.append(anchor)
+            if np is not None:
+                self.anchor_x = np.append(self.anchor_x, anchor[0])
+                self.anchor_y = np.append(self.anchor_y, anchor[1])
+        return stamp_id
+
+    def _bake(self, stamp_id, x, y):
+        """Draw a settled particle into the ground strip."""
+        anchor_x, anchor_y = self.stamp_anchors[stamp_id]
+        self.ground.blit(self.stamp_surfaces[stamp_id], (x - anchor_x, y - anchor_y - self.ground_top))
+
+    def spawn(self, count=1):
+        """
+        Add new particles above the top of the screen, randomized by the particle class.
+
+        Parameters:
+            count (int): The number of particles to add.
+        """
+        for _ in range(count):
+            particle = self.particle_class()
+            if np is None:
+                self.particles.append(particle)
+                continue
+
+            if self.count == len(self.x):
+                # Out of room; double the capacity of every array
+                for name in ('x', 'y', 'speed', 'sway', 'stamp'):
+                    column = getattr(self, name)
+                    setattr(self, name, np.concatenate([column, np.zeros_like(column)]))
+
+            index = self.count
+            self.x[index] = particle.x
+            self.y[index] = particle.y
+            self.speed[index] = particle.speed
+            self.sway[index] = particle.sway * particle.sway_direction
+            self.stamp[index] = self._stamp_id(particle)
+            self.count += 1
+
+    def update(self):
+        """Move every falling particle and bake the ones that have settled into the ground."""
+        if np is None:
+            for particle in self.particles:
+                particle.update()
+                if particle.settled:
+                    self._bake(self._stamp_id(particle), particle.x, particle.y)
+            self.particles = [particle for particle in self.particles if not particle.settled]
+            self.count = len(self.particles)
+            return
+
+        count = self.count
+        if count == 0:
+            return
+
+        # Every particle sways on the same wave, scaled by its own amount and direction
+        sway_offset = math.sin(pygame.time.get_ticks() / self.particle_class.SWAY_PERIOD)
+        x, y = self.x[:count], self.y[:count]
+        y += self.speed[:count]
+        x += sway_offset * self.sway[:count]
+        np.clip(x, 0, WIDTH - 1, out=x)
+
+        settled = y >= HEIGHT - 1
+        if settled.any():
+            for index in np.flatnonzero(settled):
+                self._bake(self.stamp[index], x[index], HEIGHT - 1)
+
+            # Keep only the particles still falling, packed at the front of the arrays
+            falling = ~settled
+            remaining = int(falling.sum())
+            for column in (self.x, self.y, self.speed, self.sway, self.stamp):
+                column[:remaining] = column[:count][falling]
+            self.count = remaining
+
     def draw(self, surface):
-        pygame.draw.ellipse(surface, self.color, (self.x, self.y, self.width, self.height))
+        """
+        Draw the ground strip and then the falling particles.
+
+        Parameters:
+            surface (pygame.Surface): The surface to draw on.
+        """
+        surface.blit(self.ground, (0, self.ground_top))
+
+        if np is None:
+            for particle in self.particles:
+                particle.draw(surface)
+            return
+
+        count = self.count
+        if count == 0:
+            return
+        stamps = self.stamp[:count]
+        draw_x = (self.x[:count] - self.anchor_x[stamps]).tolist()
+        draw_y = (self.y[:count] - self.anchor_y[stamps]).tolist()
+        surface.blits(
+            [(self.stamp_surfaces[stamp], (px, py)) for stamp, px, py in zip(stamps.tolist(), draw_x, draw_y)],
+            doreturn=False
+        )
         
         
 ################################
@@ -5422,6 +7606,89 @@ def apply_theme(theme_name):
         apply_theme("light")
 
 
+# Event types that wake an idle screen: input, timers (USEREVENT and up) and
+# window exposure so the screen can be redrawn after being covered.
+WAKE_EVENT_TYPES = {
+    pygame.QUIT,
+    pygame.KEYDOWN,
+    pygame.MOUSEBUTTONDOWN,
+    pygame.MOUSEBUTTONUP,
+    pygame.JOYBUTTONDOWN,
+    pygame.VIDEOEXPOSE,
+    pygame.WINDOWEXPOSED,
+}
+
+
+def is_wake_event(event, wake_on_motion=False):
+    """
+    Check whether an event should wake a screen that is waiting for input.
+
+    Parameters:
+        event (pygame.event.Event): The event to check.
+        wake_on_motion (bool): Whether mouse motion counts as input (for hover effects).
+
+    Returns:
+        bool: True if the event is input, a timer event or a redraw request.
+    """
+    if event.type in WAKE_EVENT_TYPES or event.type >= pygame.USEREVENT:
+        return True
+    return wake_on_motion and event.type == pygame.MOUSEMOTION
+
+
+def wait_for_input(fps=None, timeout=IDLE_WAIT_TIMEOUT, wake_on_motion=False):
+    """
+    Sleep until input, a timer event or the next animation tick arrives.
+
+    Unlike polling pygame.event.get() in a tight loop, this blocks inside
+    pygame.event.wait, so a screen waiting on the student uses next to no CPU.
+    Animated screens pass the frame rate they need and are woken once per frame.
+
+    Parameters:
+        fps (int): Frame rate requested by an animation (optional). Overrides timeout.
+        timeout (int): Longest time to sleep in milliseconds when no fps is given.
+        wake_on_motion (bool): Whether mouse motion should also wake the screen.
+
+    Returns:
+        list: The events that caused the wake-up. Empty when woken by a tick or timeout.
+    """
+    if fps:
+        timeout = max(1, int(1000 / fps))
+
+    deadline = pygame.time.get_ticks() + timeout
+    while True:
+        remaining = deadline - pygame.time.get_ticks()
+        if remaining <= 0:
+            return []
+
+        event = pygame.event.wait(remaining)
+        if event.type == pygame.NOEVENT:
+            return []  # Timed out, so this is an animation tick
+
+        if is_wake_event(event, wake_on_motion):
+            # Drain whatever else is queued so callers see every pending input
+            return [event] + [
+                queued for queued in pygame.event.get()
+                if is_wake_event(queued, wake_on_motion)
+            ]
+
+
+def wait_for_continue_click(continue_rect):
+    """
+    Block until the student left-clicks inside the 'Continue...' button.
+
+    Parameters:
+        continue_rect (pygame.Rect): The rect of the drawn 'Continue...' button.
+    """
+    while True:
+        for event in wait_for_input():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                if check_continue_click(event.pos, continue_rect):
+                    return
+
+
 def check_continue_click(mouse_pos, continue_rect):
     """Check if the 'Continue...' button was clicked."""
     if continue_rect.collidepoint(mouse_pos):
@@ -5434,20 +7701,8 @@ def draw_background(image_path):
     resolution."""
     try:
         if image_path:
-            # Load the selected background image
-            background_image = pygame.image.load(image_path).convert()
-
-            # Define the base resolution (the original size of your art)
-            base_width, base_height = 1080, 1080
-
-            # Calculate the scaling factor based on the current screen resolution
-            scale_factor_x = WIDTH / base_width
-            scale_factor_y = HEIGHT / base_height
-
-            # Scale the image to fit the current resolution
-            scaled_background = pygame.transform.scale(
-                background_image, (int(base_width * scale_factor_x), int(base_height * scale_factor_y))
-            )
+            # Load the selected background image, pre-scaled for the current resolution
+            scaled_background = load_scaled_image(image_path, (WIDTH, HEIGHT))
 
             # Blit the scaled background image onto the screen
             screen.blit(scaled_background, (0, 0))  # Draw it starting at the top-left corner
@@ -5464,6 +7719,59 @@ def draw_background(image_path):
         screen.fill(screen_color)
 
 
+background_cache = {}  # Scaled backgrounds keyed by (path, width, height), oldest first
+
+
+def load_background_surface(image_path):
+    """
+    Load a background image once, scaled to the current resolution, so it can be
+    blitted every frame without going back to disk.
+
+    Parameters:
+        image_path (str): Path to the background image, or None.
+
+    Returns:
+        pygame.Surface: The scaled background, or None if it could not be loaded.
+    """
+    if not image_path:
+        return None
+
+    try:
+        return load_scaled_image(image_path, (WIDTH, HEIGHT))
+    except (pygame.error, FileNotFoundError) as e:
+        log_entry = create_log_message(f"Error loading background image: {e}")
+        log_message(log_entry)
+        return None
+
+
+def get_cached_background(image_path):
+    """
+    Return a scaled background from a small in-memory cache, loading it with
+    load_background_surface only the first time it is used at this resolution.
+
+    Parameters:
+        image_path (str): Path to the background image, or None.
+
+    Returns:
+        pygame.Surface: The scaled background, or None if it could not be loaded.
+    """
+    if not image_path:
+        return None
+
+    key = (image_path, WIDTH, HEIGHT)
+    if key in background_cache:
+        # Move the entry to the end so the least recently used one is evicted first
+        background_cache[key] = background_cache.pop(key)
+        return background_cache[key]
+
+    background = load_background_surface(image_path)
+    if background is not None:
+        background_cache[key] = background
+        if len(background_cache) > BACKGROUND_CACHE_SIZE:
+            del background_cache[next(iter(background_cache))]
+    return background
+
+
 def draw_continue_button():
     global current_font_name_or_path  # Ensure we're using the global variable for font
 
@@ -5493,18 +7801,8 @@ def draw_and_wait_continue_button():
     """Draws the 'Continue...' button and waits for the student to click."""
     continue_rect = draw_continue_button()
     pygame.display.flip()
-    
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = pygame.mouse.get_pos()
-                if check_continue_click(mouse_pos, continue_rect):
-                    waiting = False
-    return
+
+    wait_for_continue_click(continue_rect)
 
 
 def draw_skip_button(hovered_over=False):
@@ -5534,19 +7832,21 @@ def draw_skip_button(hovered_over=False):
 
 
 def display_text_and_wait(text):
-    """Clears the screen, displays the given text, and waits for a left mouse click."""
+    """Displays the given text over the current screen and waits for a left mouse click."""
+    # The text is static, so draw it once and only redraw if the window is exposed
+    draw_text(text, font, text_color, WIDTH // 2, HEIGHT // 20, center=True, max_width=WIDTH * 0.95, enable_shadow=True)  # Display the text
+    pygame.display.flip()
+
     running = True
     while running:
-        for event in pygame.event.get():
+        for event in wait_for_input():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:  # Only left-click
                 running = False
-
-        # screen.fill(screen_color)  # Clear the screen with the current theme's background color
-        draw_text(text, font, text_color, WIDTH // 2, HEIGHT // 20, center=True, max_width=WIDTH * 0.95, enable_shadow=True)  # Display the text
-        pygame.display.flip()
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                pygame.display.flip()
 
     pygame.time.delay(200)  # Optional: Delay to prevent accidental double clicks
 
@@ -5773,8 +8073,8 @@ def speak_japanese(text):
 
     try:
         # Check if the WAV file exists and play it
-        if os.path.isfile(wav_file_path):
-            sound = pygame.mixer.Sound(wav_file_path)
+        if asset_exists(wav_file_path):
+            sound = load_sound_asset(wav_file_path)
             sound.play()  # Play without specifying a channel, allowing automatic assignment
             # log_entry = create_log_message(f"Played audio file: {wav_file_path}")
             # log_message(log_entry)
@@ -5812,1082 +8112,1161 @@ def bonus_game_selector():
     selected_game()
 
 
-def bonus_game_fat_tuna():
-    """
-    Runs the "Fat Tuna" bonus game.
+### SPRITE ATLAS ###
 
-    This function initializes the game environment, including background images,
-    platforms, the player's cat character, piranhas, and the fat tuna target.
-    The objective is to reach the fat tuna without colliding with any piranhas.
-    The player can control the cat's movements to jump across platforms and avoid 
-    obstacles.
-
-    If the cat collides with the fat tuna, the game ends with a win message.
-    If a piranha collides with the cat, the game ends with a game over message.
-
-    Game Elements:
-        - Scaling factors are used to adjust the size of sprites and movement speeds 
-          based on the current resolution.
-        - Platforms spawn and move downwards periodically.
-        - The fat tuna moves horizontally and reverses direction when reaching 
-          screen edges.
-        - Piranhas spawn periodically and fall, presenting an obstacle to the player.
-
-    Gameplay Phases:
-        1. Control Display: Shows the control instructions and a bouncing "Bonus Stage!" 
-           message until the player clicks "Continue...".
-        2. Gameplay: Player controls the cat character to jump between platforms, avoid 
-           piranhas, and reach the fat tuna. 
-        3. End Phase: Displays a win or game over message based on the outcome.
+SPRITES_DIRECTORY = 'assets/images/sprites'
+SPRITE_EXTENSIONS = ('.png', '.jpg')
+ATLAS_WIDTH = 1024  # Width of the packed atlas texture in pixels
+ATLAS_PADDING = 1  # Transparent gap between packed sprites so scaling never bleeds
 
-    Returns:
-        None
-    """
-    # Check if the assets/images directory exists
-    if not os.path.exists('assets/images'):
-        log_entry = create_log_message("Assets folder 'assets/images' is missing. Returning to the main menu.")
-        log_message(log_entry)
-        return "main_menu"
-    
-    # Calculate scaling factors based on the current resolution
-    scale_factor_x = WIDTH / REFERENCE_RESOLUTION[0]
-    scale_factor_y = HEIGHT / REFERENCE_RESOLUTION[1]
-    scale_factor = min(scale_factor_x, scale_factor_y)
 
-    FALL_SPEED = 13 * scale_factor  # Base speed for falling platforms, scaled
-    RESPAWN_RATE = 10  # Probability out of 100 for a new platform to spawn each frame
-    PLATFORM_SPAWN_INTERVAL = 300  # Minimum time (milliseconds) between platform spawns
-    PIRANHA_SPAWN_INTERVAL = 2000  # Time interval (milliseconds) between spawning additional piranhas
-    
-    running = True
-    win = False
-    game_over = False
-    start_time = time.time()
-    last_spawn_time = 0
-    last_piranha_spawn_time = 0
-
-    # Load images
-    platform_img = pygame.image.load('assets/images/sprites/platform.jpg')
-    bonus_mode_background = select_random_background("assets/images/bonus_mode")
-    gameplay_background = select_random_background("assets/images/bonus_bkgs")
-
-    # Load and scale the fat tuna image
-    fat_tuna_img = pygame.image.load('assets/images/sprites/fat_tuna.png')
-    fat_tuna_img = pygame.transform.scale(
-        fat_tuna_img, 
-        (int(fat_tuna_img.get_width() * scale_factor), int(fat_tuna_img.get_height() * scale_factor))
-    )
-    fat_tuna_rect = fat_tuna_img.get_rect(center=(WIDTH // 2, int(fat_tuna_img.get_height() * scale_factor) // 2))
-    fat_tuna_speed = 5 * scale_factor  # Adjust speed based on scale
-    fat_tuna_direction = -1  # Direction of movement, 1 is right, -1 is left
-
-    # Load and scale the piranha image
-    piranha_img = pygame.image.load('assets/images/sprites/piranha.png')
-    piranha_img = pygame.transform.scale(
-        piranha_img, 
-        (int(piranha_img.get_width() * scale_factor), int(piranha_img.get_height() * scale_factor))
-    )
-    piranhas = [Piranha(piranha_img, 0, HEIGHT, 5 * scale_factor)]
+class SpriteAtlas:
+    """
+    A class that packs every sprite under a folder into one texture and hands out
+    converted, scaled and flipped variants from a cache.
 
-    # Initialize platforms with the image
-    platforms = [
-        Platform(platform_img, int(100 * scale_factor), int(600 * scale_factor), int(200 * scale_factor), int(50 * scale_factor)),
-        Platform(platform_img, int(400 * scale_factor), int(400 * scale_factor), int(200 * scale_factor), int(50 * scale_factor)),
-        Platform(platform_img, int(700 * scale_factor), int(200 * scale_factor), int(200 * scale_factor), int(50 * scale_factor))
-    ]
-    
-    # Scale the text positions and movements
-    text_x, text_y = WIDTH // 2 - int(175 * scale_factor), HEIGHT // 2
-    text_dx, text_dy = random.choice([-10, 10]), random.choice([-10, 10])
-    text_dx *= scale_factor
-    text_dy *= scale_factor
+    The atlas is built the first time a sprite is requested (a display mode must
+    be set so the texture can be converted). After that, bonus games never touch
+    the disk or rescale a sprite they have used before.
 
-    # Initialize the cat
-    # player_img = pygame.image.load('assets/images/sprites/cat06.png')
-    # Get the current month
-    current_month = datetime.now().month
-    
-    # Conditional image loading
-    player_img = pygame.image.load(
-        'assets/images/sprites/cat06.png' if current_month == 12 
-        else 'assets/images/sprites/cat01.png'
-    )
-    player_img = pygame.transform.scale(player_img, (int(player_img.get_width() * scale_factor), int(player_img.get_height() * scale_factor)))
-    cat = Cat(player_img, WIDTH // 2, HEIGHT - player_img.get_rect().height, 25 * scale_factor, scale_factor)
+    Attributes:
+    -----------
+    directory : str
+        The folder the sprites are packed from.
+    texture : Surface
+        The packed atlas texture, converted to the display's pixel format.
+    rects : dict
+        Maps each sprite name (path relative to the folder, without extension,
+        e.g. 'cat01' or 'fish/fish02') to its Rect within the texture.
+    variants : dict
+        Cache of scaled and flipped surfaces keyed by (name, size, flipped).
 
-    # Create a clock object to control the frame rate
-    clock = pygame.time.Clock()
+    Methods:
+    --------
+    build():
+        Loads and packs all sprites into the atlas texture.
+    names(folder=""):
+        Returns the sorted sprite names inside a sub-folder.
+    get(name, scale=1.0, flipped=False):
+        Returns a sprite scaled by a factor of its original size.
+    get_sized(name, size, flipped=False):
+        Returns a sprite scaled to an exact size.
+    """
+    def __init__(self, directory=SPRITES_DIRECTORY):
+        self.directory = directory
+        self.texture = None
+        self.rects = {}
+        self.variants = {}
+
+    def _find_sprite_files(self):
+        """Return (name, path) pairs for every sprite image under the folder."""
+        prefix = normalize_asset_path(self.directory) + "/"
+        bundled_paths = sorted(
+            path for path in asset_bundle.entries
+            if path.startswith(prefix) and path.lower().endswith(SPRITE_EXTENSIONS)
+        )
+        if bundled_paths:
+            return [(os.path.splitext(path[len(prefix):])[0], path) for path in bundled_paths]
+
+        sprite_files = []
+        for root, _, files in os.walk(self.directory):
+            for file in sorted(files):
+                if file.lower().endswith(SPRITE_EXTENSIONS):
+                    path = os.path.join(root, file)
+                    name = os.path.splitext(os.path.relpath(path, self.directory))[0].replace(os.sep, '/')
+                    sprite_files.append((name, path))
+        return sprite_files
+
+    def build(self):
+        """
+        Load every sprite once and pack it into a single texture with shelf packing
+        (tallest sprites first, filling rows left to right).
+        """
+        images = {}
+        for name, path in self._find_sprite_files():
+            try:
+                images[name] = load_image_asset(path)
+            except (pygame.error, FileNotFoundError) as e:
+                log_message(create_log_message(f"Failed to load sprite '{path}': {e}"))
+
+        atlas_width = max([ATLAS_WIDTH] + [image.get_width() + ATLAS_PADDING for image in images.values()])
+        x = y = shelf_height = 0
+        for name in sorted(images, key=lambda n: images[n].get_height(), reverse=True):
+            width, height = images[name].get_size()
+            if x + width > atlas_width:
+                x, y = 0, y + shelf_height + ATLAS_PADDING
+                shelf_height = 0
+            self.rects[name] = pygame.Rect(x, y, width, height)
+            x += width + ATLAS_PADDING
+            shelf_height = max(shelf_height, height)
+
+        self.texture = pygame.Surface((atlas_width, max(1, y + shelf_height)), pygame.SRCALPHA)
+        for name, rect in self.rects.items():
+            self.texture.blit(images[name], rect.topleft)
+        self.texture = self.texture.convert_alpha()
+
+        log_message(create_log_message(f"Sprite atlas built with {len(self.rects)} sprites ({self.texture.get_width()}x{self.texture.get_height()})."))
+
+    def _ensure_built(self):
+        if self.texture is None:
+            self.build()
+
+    def names(self, folder=""):
+        """
+        Return the sprite names inside a sub-folder, replacing a directory listing.
 
-    # Load and play bonus game music
-    bonus_music_directory = 'assets/music/bonus'
-    random_mp3 = get_random_mp3(bonus_music_directory)
-    
-    if random_mp3:
-        music_loaded = load_mp3(random_mp3)
-        if music_loaded:
-            play_mp3()
+        Parameters:
+            folder (str): Sub-folder of the sprites directory, e.g. 'fish'.
 
-    # Bonus Mode Display Phase (show controls and animated text)
-    running = True
-    controls_displayed = False
-    start_time = time.time()
+        Returns:
+            list: The sorted sprite names in that folder.
+        """
+        self._ensure_built()
+        prefix = f"{folder}/" if folder else ""
+        return sorted(name for name in self.rects if name.startswith(prefix) and "/" not in name[len(prefix):])
 
-    while not controls_displayed:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+    def get_size(self, name):
+        """Return the original (width, height) of a sprite."""
+        self._ensure_built()
+        return self.rects[name].size
 
-        # Draw the bonus mode background (or fallback to navy blue)
-        if bonus_mode_background:
-            draw_background(bonus_mode_background)
-        else:
-            screen.fill(screen_color)
+    def get_sized(self, name, size, flipped=False):
+        """
+        Return a sprite scaled to an exact size, creating and caching it on first use.
 
-        # Render the controls
-        draw_text("Controls:", font, text_color, 0, HEIGHT * 0.2, center=True, enable_shadow=True)
-        draw_text("W/Space/Up = Jump", font, text_color, 0, HEIGHT * 0.4, center=True, enable_shadow=True)
-        draw_text("A/Left = Move Left", font, text_color, 0, HEIGHT * 0.6, center=True, enable_shadow=True)
-        draw_text("D/Right = Move Right", font, text_color, 0, HEIGHT * 0.8, center=True, enable_shadow=True)
+        Parameters:
+            name (str): The sprite name, e.g. 'cat01'.
+            size (tuple): The (width, height) to scale to.
+            flipped (bool): Whether to mirror the sprite horizontally.
 
-        # Render the bouncing "Bonus Stage!" text
-        text_surface = font.render("Bonus Stage!", True, text_color)
-        text_width, text_height = text_surface.get_size()
-
-        # Update text position
-        text_x += text_dx
-        text_y += text_dy
-
-        # Check for collisions with the screen edges
-        if text_x <= 0 or text_x >= WIDTH - text_width:
-            text_dx = -text_dx
-        if text_y <= 0 or text_y >= HEIGHT - text_height:
-            text_dy = -text_dy
-
-        # Draw the bouncing text at the new position
-        screen.blit(text_surface, (text_x, text_y))
+        Returns:
+            pygame.Surface: The converted sprite surface.
+        """
+        self._ensure_built()
+        size = (max(1, int(size[0])), max(1, int(size[1])))
+        key = (name, size, flipped)
+        variant = self.variants.get(key)
+        if variant is None:
+            if flipped:
+                variant = pygame.transform.flip(self.get_sized(name, size), True, False)
+            else:
+                variant = pygame.transform.scale(self.texture.subsurface(self.rects[name]), size)
+            self.variants[key] = variant
+        return variant
 
-        # Draw the "Continue..." button below the controls
-        continue_rect = draw_continue_button()
-        pygame.display.flip()
+    def get(self, name, scale=1.0, flipped=False):
+        """
+        Return a sprite scaled by a factor of its original size.
 
-        # Check for "Continue..." button click without stopping the animation
-        for event in pygame.event.get():
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = pygame.mouse.get_pos()
-                if check_continue_click(mouse_pos, continue_rect):
-                    controls_displayed = True  # Exit the loop and continue to gameplay
+        Parameters:
+            name (str): The sprite name, e.g. 'fish/fish02'.
+            scale (float): The scale factor to apply to the original size.
+            flipped (bool): Whether to mirror the sprite horizontally.
 
-        clock.tick(60)  # Keep the animation going at 60 FPS
+        Returns:
+            pygame.Surface: The converted sprite surface.
+        """
+        width, height = self.get_size(name)
+        return self.get_sized(name, (width * scale, height * scale), flipped)
 
-    # Gameplay Phase
-    try:
-        start_time = time.time()
-        while running:
-            elapsed_time = int(time.time() - start_time)
-            current_time = pygame.time.get_ticks()
 
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                    pygame.mixer.music.stop()
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE or event.key == pygame.K_w or event.key == pygame.K_UP or event.key == pygame.K_KP8:
-                        cat.jump()
+# Shared atlas for the bonus game sprites, built on first use
+sprite_atlas = SpriteAtlas()
 
-            cat.update(platforms)
 
-            # Check for win condition
-            if cat.rect.colliderect(fat_tuna_rect):
-                win = True
-                running = False
+### BONUS GAME RUNTIME ###
 
-            # Check for game over condition
-            for piranha in piranhas:
-                if cat.rect.colliderect(piranha.rect):
-                    game_over = True
-                    running = False
-
-            # Update piranhas positions
-            for piranha in piranhas:
-                piranha.update()
-
-            # Update platform positions and remove them if they scroll off the bottom of the screen
-            for platform in platforms[:]:
-                platform.update(FALL_SPEED)
-                if platform.rect.y > HEIGHT:
-                    platforms.remove(platform)
-
-            # Spawn new platforms at the top of the screen
-            if current_time - last_spawn_time > PLATFORM_SPAWN_INTERVAL and random.randint(1, 100) <= RESPAWN_RATE:
-                new_platform = Platform(
-                    platform_img, 
-                    random.randint(0, int(WIDTH - 200 * scale_factor)), 
-                    -int(50 * scale_factor), 
-                    int(200 * scale_factor), 
-                    int(50 * scale_factor)
-                )
-                platforms.append(new_platform)
-                last_spawn_time = current_time
-
-            # Spawn new piranhas at the bottom of the screen
-            if current_time - last_piranha_spawn_time > PIRANHA_SPAWN_INTERVAL:
-                new_piranha = Piranha(piranha_img, 0, HEIGHT, 5 * scale_factor)
-                piranhas.append(new_piranha)
-                last_piranha_spawn_time = current_time
-
-            # Move the fat tuna
-            fat_tuna_rect.x += fat_tuna_speed * fat_tuna_direction
-            if fat_tuna_rect.left <= 0 or fat_tuna_rect.right >= WIDTH:
-                fat_tuna_direction *= -1  # Reverse direction when hitting the edge
-
-            # Draw the gameplay background (or fallback to navy blue)
-            if gameplay_background:
-                draw_background(gameplay_background)
-            else:
-                screen.fill(screen_color)
+BONUS_GAME_TICK_RATE = 24  # Fixed simulation steps per second the bonus games were tuned at
+BONUS_GAME_RENDER_FPS = 60  # Render frame rate cap; frames between steps are interpolated
+MAX_FRAME_TIME = 0.25  # Longest frame time (seconds) fed into the simulation after a stall
+MAX_UPDATES_PER_FRAME = 5  # Frame budget: most simulation steps run before a frame is drawn
+COLLISION_CELL_SIZE = 128  # Spatial hash cell size in pixels at the reference resolution
 
-            # Draw the platforms first
-            for platform in platforms:
-                platform.draw(screen)
 
-            # Draw the piranhas
-            for piranha in piranhas:
-                piranha.draw(screen)
+class BonusScene:
+    """
+    Base class for the scene logic of a bonus game.
 
-            # Draw the fat tuna
-            screen.blit(fat_tuna_img, fat_tuna_rect.topleft)
+    A scene only describes what happens in one fixed simulation step and how the
+    current state is drawn; run_bonus_scene owns the loop, the clock and the display.
+    Movement speeds in update() are per step, so game speed is the same on every
+    machine no matter how fast it can render.
 
-            # Draw the cat on top of everything else
-            cat.draw(screen)
+    Attributes:
+    -----------
+    tick_rate : int
+        The number of fixed update steps per second.
+    finished : bool
+        Set to True by the scene when the game is over.
+    elapsed_ms : float
+        Simulated time in milliseconds, advanced by the runtime after every step.
 
-            # Draw the timer on top of all elements
-            draw_text(f"{elapsed_time}", font, text_color, WIDTH // 4, HEIGHT // 60)
+    Methods:
+    --------
+    handle_event(event):
+        Reacts to a single Pygame input event.
+    update(dt):
+        Advances the game by one fixed step of dt seconds.
+    draw(surface, alpha):
+        Draws the scene, interpolating alpha (0-1) of the way into the next step.
+    end_message():
+        Returns the message for the end screen, or None to skip it.
+    """
+    tick_rate = BONUS_GAME_TICK_RATE
 
-            pygame.display.flip()
-            clock.tick(24)  # Control the frame rate
+    def __init__(self):
+        self.finished = False
+        self.elapsed_ms = 0
 
-    finally:
-        # Ensure music stops and resources are freed if an exception occurs
-        stop_mp3()
+    def elapsed_seconds(self):
+        """Return the whole number of simulated seconds since the game started."""
+        return int(self.elapsed_ms / 1000)
 
-    # Game Over or Win Phase
-    if win:
-        screen.fill(screen_color)
-        draw_text(f"You caught the Fat Tuna in {elapsed_time} seconds!", 
-                  font, 
-                  text_color, 
-                  WIDTH // 2, 
-                  HEIGHT // 3, 
-                  center=True, 
-                  enable_shadow=True,
-                  max_width=WIDTH)
-    elif game_over:
-        screen.fill(screen_color)
-        draw_text("Game Over! You were eaten by the piranha.", 
-                  font, 
-                  text_color, 
-                  WIDTH // 2, 
-                  HEIGHT // 3, 
-                  center=True, 
-                  enable_shadow=True,
-                  max_width=WIDTH)
+    def handle_event(self, event):
+        """Reacts to a single Pygame input event."""
+        pass
 
-    # Draw the "Continue..." button after game completion message
-    continue_rect = draw_continue_button()
+    def update(self, dt):
+        """Advances the game by one fixed step of dt seconds."""
+        pass
 
-    pygame.display.flip()
+    def draw(self, surface, alpha):
+        """Draws the scene, interpolating alpha (0-1) of the way into the next step."""
+        pass
 
-    # Wait for the player to click "Continue..." after the game ends
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()  
-            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = pygame.mouse.get_pos()
-                if check_continue_click(mouse_pos, continue_rect):
-                    waiting = False  # Continue after the "Continue..." button is clicked
+    def end_message(self):
+        """Returns the message for the end screen, or None to skip it."""
+        return "Game Over!"
 
 
-def bonus_game_no_fish():
+def interpolate_position(previous, current, alpha):
     """
-    Runs the "No Fish" bonus game.
+    Linearly interpolate between two positions.
 
-    This game requires the player to control a cat character, avoiding obstacles and 
-    surviving as long as possible by jumping across falling platforms and dodging 
-    hazards like bombs and piranhas. The objective is to accumulate survival time 
-    or a high score while avoiding collisions that would end the game.
-
-    Game Elements:
-        - Scaling factors adjust sprite sizes and movement speeds based on the 
-          current screen resolution.
-        - Platforms spawn periodically and scroll downwards.
-        - Bombs and piranhas spawn at intervals and pose hazards for the player.
-
-    Gameplay Phases:
-        1. Control Display Phase: Shows control instructions and an animated 
-           "Bonus Stage!" message until the player clicks "Continue...".
-        2. Gameplay Phase: The player controls the cat, jumping between platforms 
-           and avoiding bombs and piranhas. The game ends if the cat collides with 
-           a bomb or piranha.
-        3. Game Over Phase: Displays a game-over message indicating the cause of 
-           death, either "hit by a bomb" or "eaten by a piranha."
+    Parameters:
+        previous (tuple): The (x, y) position at the previous simulation step.
+        current (tuple): The (x, y) position at the current simulation step.
+        alpha (float): How far (0-1) the render time is between the two steps.
 
     Returns:
-        None
+        tuple: The interpolated (x, y) position.
     """
-    # Check if the assets/images directory exists
-    if not os.path.exists('assets/images'):
-        log_entry = create_log_message("Assets folder 'assets/images' is missing. Returning to the main menu.")
-        log_message(log_entry)
-        return "main_menu"
-    
-    # Calculate scaling factors based on the current resolution
-    scale_factor_x = WIDTH / REFERENCE_RESOLUTION[0]
-    scale_factor_y = HEIGHT / REFERENCE_RESOLUTION[1]
-    scale_factor = min(scale_factor_x, scale_factor_y)
-
-    FALL_SPEED = 13 * scale_factor  # Base speed for falling platforms, scaled
-    RESPAWN_RATE = 10  # Probability out of 100 for a new platform to spawn each frame
-    PLATFORM_SPAWN_INTERVAL = 300  # Minimum time (milliseconds) between platform spawns
-    PIRANHA_SPAWN_INTERVAL = 2000  # Time interval (milliseconds) between spawning additional piranhas
-    BOMB_SPAWN_INTERVAL = 1500  # Time interval (milliseconds) between bomb spawns
-    BOMB_FALL_SPEED = 25 * scale_factor  # Speed for the falling bombs
-    
-    running = True
-    game_over = False
-    death_cause = None  # Variable to store the cause of death
-    start_time = time.time()
-    last_spawn_time = 0
-    last_piranha_spawn_time = 0
-    last_bomb_spawn_time = 0  # Track last bomb spawn time
-
-    # Load images
-    platform_img = pygame.image.load('assets/images/sprites/platform.jpg')
-    bonus_mode_background = select_random_background("assets/images/bonus_mode")
-    gameplay_background = select_random_background("assets/images/bonus_bkgs")
-
-    # Load and scale the piranha image
-    piranha_img = pygame.image.load('assets/images/sprites/piranha.png')
-    piranha_img = pygame.transform.scale(
-        piranha_img, 
-        (int(piranha_img.get_width() * scale_factor), int(piranha_img.get_height() * scale_factor))
+    return (
+        previous[0] + (current[0] - previous[0]) * alpha,
+        previous[1] + (current[1] - previous[1]) * alpha
     )
-    piranhas = [Piranha(piranha_img, 0, HEIGHT, 5 * scale_factor)]
 
-    # Initialize platforms with the image
-    platforms = [
-        Platform(platform_img, int(100 * scale_factor), int(600 * scale_factor), int(200 * scale_factor), int(50 * scale_factor)),
-        Platform(platform_img, int(400 * scale_factor), int(400 * scale_factor), int(200 * scale_factor), int(50 * scale_factor)),
-        Platform(platform_img, int(700 * scale_factor), int(200 * scale_factor), int(200 * scale_factor), int(50 * scale_factor))
-    ]
-    
-    # Load and scale the bomb image
-    bomb_img = pygame.image.load('assets/images/sprites/bomb.png')
-    bomb_img = pygame.transform.scale(bomb_img, (int(bomb_img.get_width() * scale_factor), int(bomb_img.get_height() * scale_factor)))
-    bombs = []  # List to hold bombs
 
-    # Scale the text positions and movements
-    text_x, text_y = WIDTH // 2 - int(175 * scale_factor), HEIGHT // 2
-    text_dx, text_dy = random.choice([-10, 10]), random.choice([-10, 10])
-    text_dx *= scale_factor
-    text_dy *= scale_factor
+class SpatialHash:
+    """
+    A uniform grid that buckets bonus game entities by the cells their rects
+    overlap, so a collision query only tests entities near the queried rect
+    instead of every entity in the game.
 
-    # Initialize the cat
-    player_img = pygame.image.load('assets/images/sprites/cat01.png')
-    player_img = pygame.transform.scale(player_img, (int(player_img.get_width() * scale_factor), int(player_img.get_height() * scale_factor)))
-    cat = Cat(player_img, WIDTH // 2, HEIGHT - player_img.get_rect().height, 25 * scale_factor, scale_factor)
+    Entities are filed under a tag (e.g. 'bomb' or 'fish') and must have a
+    `rect` attribute. Scenes rebuild the grid once per simulation step.
 
-    # Create a clock object to control the frame rate
-    clock = pygame.time.Clock()
+    Attributes:
+    -----------
+    cell_size : int
+        The width and height of a grid cell in pixels.
+    cells : dict
+        Maps (tag, column, row) to the list of entities overlapping that cell.
 
-    # Load and play bonus game music
-    bonus_music_directory = 'assets/music/bonus'
-    random_mp3 = get_random_mp3(bonus_music_directory)
-    
-    if random_mp3:
-        music_loaded = load_mp3(random_mp3)
-        if music_loaded:
-            play_mp3()
+    Methods:
+    --------
+    clear():
+        Removes every entity from the grid.
+    insert(tag, entity):
+        Files an entity under a tag in every cell its rect overlaps.
+    rebuild(groups):
+        Clears the grid and inserts every entity from a {tag: entities} mapping.
+    query(tag, rect):
+        Returns the entities with a tag whose rects collide with rect.
+    """
+    def __init__(self, cell_size=COLLISION_CELL_SIZE):
+        self.cell_size = max(1, int(cell_size))
+        self.cells = {}
 
-    # Bonus Mode Display Phase (show controls and animated text)
-    controls_displayed = False
-    start_time = time.time()
+    def _cell_range(self, rect):
+        """Return the column and row ranges of the cells a rect overlaps."""
+        columns = range(rect.left // self.cell_size, (rect.right - 1) // self.cell_size + 1)
+        rows = range(rect.top // self.cell_size, (rect.bottom - 1) // self.cell_size + 1)
+        return columns, rows
 
-    while not controls_displayed:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+    def clear(self):
+        """Remove every entity from the grid."""
+        self.cells.clear()
 
-        # Draw the bonus mode background (or fallback to navy blue)
-        if bonus_mode_background:
-            draw_background(bonus_mode_background)
-        else:
-            screen.fill(screen_color)
+    def insert(self, tag, entity):
+        """
+        File an entity under a tag in every cell its rect overlaps.
 
-        # Render the controls
-        draw_text("Controls:", font, text_color, 0, HEIGHT * 0.2, center=True, enable_shadow=True)
-        draw_text("W/Space/Up = Jump", font, text_color, 0, HEIGHT * 0.4, center=True, enable_shadow=True)
-        draw_text("A/Left = Move Left", font, text_color, 0, HEIGHT * 0.6, center=True, enable_shadow=True)
-        draw_text("D/Right = Move Right", font, text_color, 0, HEIGHT * 0.8, center=True, enable_shadow=True)
+        Parameters:
+            tag (str): The group the entity belongs to.
+            entity: Any object with a `rect` attribute.
+        """
+        columns, rows = self._cell_range(entity.rect)
+        for column in columns:
+            for row in rows:
+                self.cells.setdefault((tag, column, row), []).append(entity)
 
-        # Render the bouncing "Bonus Stage!" text
-        text_surface = font.render("Bonus Stage!", True, text_color)
-        text_width, text_height = text_surface.get_size()
+    def rebuild(self, groups):
+        """
+        Clear the grid and insert every entity from a mapping of tag to entities.
 
-        # Update text position
-        text_x += text_dx
-        text_y += text_dy
+        Parameters:
+            groups (dict): Maps each tag to an iterable of entities.
+        """
+        self.clear()
+        for tag, entities in groups.items():
+            for entity in entities:
+                self.insert(tag, entity)
 
-        # Check for collisions with the screen edges
-        if text_x <= 0 or text_x >= WIDTH - text_width:
-            text_dx = -text_dx
-        if text_y <= 0 or text_y >= HEIGHT - text_height:
-            text_dy = -text_dy
+    def query(self, tag, rect):
+        """
+        Return the entities filed under a tag whose rects collide with rect.
 
-        # Draw the bouncing text at the new position
-        screen.blit(text_surface, (text_x, text_y))
+        Parameters:
+            tag (str): The group to search.
+            rect (pygame.Rect): The rect to test, usually the cat's.
 
-        # Draw the "Continue..." button below the controls
-        continue_rect = draw_continue_button()
-        pygame.display.flip()
+        Returns:
+            list: The colliding entities, each listed once.
+        """
+        hits = []
+        columns, rows = self._cell_range(rect)
+        for column in columns:
+            for row in rows:
+                for entity in self.cells.get((tag, column, row), ()):
+                    if entity not in hits and rect.colliderect(entity.rect):
+                        hits.append(entity)
+        return hits
 
-        # Check for "Continue..." button click without stopping the animation
-        for event in pygame.event.get():
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = pygame.mouse.get_pos()
-                if check_continue_click(mouse_pos, continue_rect):
-                    controls_displayed = True  # Exit the loop and continue to gameplay
 
-        clock.tick(60)  # Keep the animation going at 60 FPS
+class EntityPool:
+    """
+    A free list of reusable entity objects, so bonus games recycle their fish,
+    bombs, piranhas, platforms and particles instead of allocating new ones at
+    every spawn.
 
-    # Gameplay Phase
-    try:
-        start_time = time.time()
-        while running:
-            elapsed_time = int(time.time() - start_time)
-            current_time = pygame.time.get_ticks()
+    Pooled classes take their constructor arguments in a reset() method that
+    reinitializes an instance in place.
 
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                    pygame.mixer.music.stop()
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE or event.key == pygame.K_w or event.key == pygame.K_UP or event.key == pygame.K_KP8:
-                        cat.jump()
-
-            cat.update(platforms)
-
-            # Check for game over condition (bomb or piranha collision)
-            for bomb in bombs:
-                if cat.rect.colliderect(bomb.rect):
-                    death_cause = "bomb"
-                    game_over = True
-                    running = False
-
-            for piranha in piranhas:
-                if cat.rect.colliderect(piranha.rect):
-                    death_cause = "piranha"
-                    game_over = True
-                    running = False
-
-            # Update piranhas positions
-            for piranha in piranhas:
-                piranha.update()
-
-            # Update platform positions and remove them if they scroll off the bottom of the screen
-            for platform in platforms[:]:
-                platform.update(FALL_SPEED)
-                if platform.rect.y > HEIGHT:
-                    platforms.remove(platform)
-
-            # Spawn new platforms at the top of the screen
-            if current_time - last_spawn_time > PLATFORM_SPAWN_INTERVAL and random.randint(1, 100) <= RESPAWN_RATE:
-                new_platform = Platform(
-                    platform_img, 
-                    random.randint(0, int(WIDTH - 200 * scale_factor)), 
-                    -int(50 * scale_factor), 
-                    int(200 * scale_factor), 
-                    int(50 * scale_factor)
-                )
-                platforms.append(new_platform)
-                last_spawn_time = current_time
-
-            # Spawn new piranhas at the bottom of the screen
-            if current_time - last_piranha_spawn_time > PIRANHA_SPAWN_INTERVAL:
-                new_piranha = Piranha(piranha_img, 0, HEIGHT, 5 * scale_factor)
-                piranhas.append(new_piranha)
-                last_piranha_spawn_time = current_time
-
-            # Spawn new bombs at the top of the screen
-            if current_time - last_bomb_spawn_time > BOMB_SPAWN_INTERVAL:
-                new_bomb = Bomb(bomb_img, random.randint(0, WIDTH - bomb_img.get_width()), 0, BOMB_FALL_SPEED)
-                bombs.append(new_bomb)
-                last_bomb_spawn_time = current_time
-
-            # Update bombs positions
-            for bomb in bombs:
-                bomb.update()
-
-            # Draw the gameplay background (or fallback to navy blue)
-            if gameplay_background:
-                draw_background(gameplay_background)
+    Attributes:
+    -----------
+    factory : type
+        The pooled class, called to create an instance when the pool is empty.
+    free : list
+        Released instances waiting to be reused.
+
+    Methods:
+    --------
+    acquire(*args):
+        Returns a reset instance, reusing a released one when available.
+    release(item):
+        Returns an instance to the pool.
+    release_where(items, condition):
+        Releases the items for which condition(item) is true, removing them from
+        the list in place.
+    release_all(items):
+        Releases every item in a list and empties it.
+    """
+    def __init__(self, factory):
+        self.factory = factory
+        self.free = []
+
+    def acquire(self, *args):
+        """Return an instance reset with args, reusing a released one when available."""
+        if self.free:
+            item = self.free.pop()
+            item.reset(*args)
+            return item
+        return self.factory(*args)
+
+    def release(self, item):
+        """Return an instance to the pool."""
+        self.free.append(item)
+
+    def release_where(self, items, condition):
+        """
+        Release the items for which condition(item) is true and compact the list
+        in place, without allocating a new list.
+
+        Parameters:
+            items (list): The live entities, modified in place.
+            condition (callable): Returns True for items that should be released.
+        """
+        kept = 0
+        for item in items:
+            if condition(item):
+                self.free.append(item)
             else:
-                screen.fill(screen_color)
+                items[kept] = item
+                kept += 1
+        del items[kept:]
 
-            # Draw the platforms first
-            for platform in platforms:
-                platform.draw(screen)
+    def release_all(self, items):
+        """Release every item in a list and empty it."""
+        self.free.extend(items)
+        items.clear()
 
-            # Draw the piranhas
-            for piranha in piranhas:
-                piranha.draw(screen)
 
-            # Draw the bombs
-            for bomb in bombs:
-                bomb.draw(screen)
+def is_below_screen(entity):
+    """Return True if an entity has fallen past the bottom of the screen."""
+    return entity.rect.top > HEIGHT
 
-            # Draw the cat on top of everything else
-            cat.draw(screen)
 
-            # Draw the timer on top of all elements
-            draw_text(f"{elapsed_time}", font, text_color, WIDTH // 4, HEIGHT // 60)
+def draw_scene_background(surface, background):
+    """
+    Draw a pre-loaded scene background, or the theme color if there is none.
 
-            pygame.display.flip()
-            clock.tick(24)  # Control the frame rate
+    Parameters:
+        surface (pygame.Surface): The surface to draw on.
+        background (pygame.Surface): The background surface, or None.
+    """
+    if background:
+        surface.blit(background, (0, 0))
+    else:
+        surface.fill(screen_color)
 
-    finally:
-        # Ensure music stops and resources are freed if an exception occurs
-        stop_mp3()
 
-    # Game Over Phase
-    if game_over:
-        screen.fill(screen_color)
-        if death_cause == "bomb":
-            death_message = "Game Over! You were hit by a bomb."
-        elif death_cause == "piranha":
-            death_message = "Game Over! You were eaten by a piranha."
-        else:
-            death_message = "Game Over!"
+def run_bonus_scene(scene):
+    """
+    Run a bonus game scene with a fixed-timestep update and an interpolated render.
 
-        draw_text(death_message, font, text_color, WIDTH // 2, HEIGHT // 3, center=True, enable_shadow=True, max_width=WIDTH)
+    Simulation steps run at scene.tick_rate regardless of the render rate. At most
+    MAX_UPDATES_PER_FRAME steps run per frame; time beyond that budget is dropped
+    so a slow machine plays slower instead of freezing.
 
-    # Draw the "Continue..." button after game completion message
-    continue_rect = draw_continue_button()
+    Parameters:
+        scene (BonusScene): The scene to run until it sets scene.finished.
+    """
+    frame_clock = pygame.time.Clock()
+    step = 1.0 / scene.tick_rate
+    accumulator = 0.0
+    previous_time = time.perf_counter()
 
-    pygame.display.flip()
+    while not scene.finished:
+        current_time = time.perf_counter()
+        accumulator += min(current_time - previous_time, MAX_FRAME_TIME)
+        previous_time = current_time
 
-    # Wait for the player to click "Continue..." after the game ends
-    waiting = True
-    while waiting:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
-                sys.exit()  
-            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = pygame.mouse.get_pos()
-                if check_continue_click(mouse_pos, continue_rect):
-                    waiting = False  # Continue after the "Continue..." button is clicked
+                sys.exit()
+            scene.handle_event(event)
 
+        updates = 0
+        while accumulator >= step and not scene.finished:
+            if updates == MAX_UPDATES_PER_FRAME:
+                accumulator = 0.0  # Over budget, drop the backlog
+                break
+            scene.update(step)
+            scene.elapsed_ms += step * 1000
+            accumulator -= step
+            updates += 1
 
-def bonus_game_falling_fish():
+        scene.draw(screen, min(accumulator / step, 1.0))
+        pygame.display.flip()
+        frame_clock.tick(BONUS_GAME_RENDER_FPS)
+
+
+def bonus_assets_available():
     """
-    Runs the "Falling Fish" bonus game with an additional special item (cat food) 
-    that falls like fish for bonus points.
+    Check that the bonus game images are present, logging if they are not.
+
+    Returns:
+        bool: True if the 'assets/images' folder exists, False otherwise.
     """
-    # Check if the assets/images directory exists
     if not os.path.exists('assets/images'):
         log_entry = create_log_message("Assets folder 'assets/images' is missing. Returning to the main menu.")
         log_message(log_entry)
-        return "main_menu"
-    
-    try:
-        # Scaling factors based on resolution
-        scale_factor_x = WIDTH / REFERENCE_RESOLUTION[0]
-        scale_factor_y = HEIGHT / REFERENCE_RESOLUTION[1]
-        scale_factor = min(scale_factor_x, scale_factor_y)
-        log_message(f"Scaling factors calculated: scale_factor_x={scale_factor_x}, scale_factor_y={scale_factor_y}, scale_factor={scale_factor}")
-
-        # Game settings for items
-        BOMB_SPAWN_INTERVAL = 600  # Time interval (milliseconds) between bomb spawns
-        FISH_SPAWN_INTERVAL = 1000  # Time interval (milliseconds) between fish spawns
-        CAT_FOOD_SPAWN_INTERVAL = 3000  # Time interval (milliseconds) between special item spawns
-        BOMB_FALL_SPEED = 35 * scale_factor  # Speed for the falling bombs
-        FISH_FALL_SPEED = 24 * scale_factor  # Speed for the falling fish
-        CAT_FOOD_FALL_SPEED = 20 * scale_factor  # Speed for the falling cat food (special item)
-        
-        # Initialize variables
-        running = True
-        game_over = False
-        death_cause = None
-        score = 0
-        # start_time = time.time()
-        last_bomb_spawn_time = 0
-        last_fish_spawn_time = 0
-        last_cat_food_spawn_time = 0  # Special item spawn timer
-        log_message("Game variables initialized")
-
-        # Load images
-        bonus_mode_background = select_random_background("assets/images/bonus_mode")
-        gameplay_background = select_random_background("assets/images/bonus_bkgs")
-        bomb_img = pygame.image.load('assets/images/sprites/bomb.png')
-        bomb_img = pygame.transform.scale(bomb_img, (int(bomb_img.get_width() * scale_factor), int(bomb_img.get_height() * scale_factor)))
-        bombs = []
-
-        fish_dir = 'assets/images/sprites/fish'
-        fish_images = [os.path.join(fish_dir, file) for file in os.listdir(fish_dir) if file.lower().endswith(('.jpg', '.png'))]
-        fishes = []
-        log_message(f"Fish images loaded from {fish_dir}: {len(fish_images)} images found")
-
-        cat_food_img = pygame.image.load('assets/images/sprites/power_ups/cat_food.png')
-        cat_food_img = pygame.transform.scale(cat_food_img, (int(cat_food_img.get_width() * scale_factor), int(cat_food_img.get_height() * scale_factor)))
-        cat_food_items = []
-
-        # Load and initialize the cat character
-        player_img = pygame.image.load('assets/images/sprites/cat08.png')
-        player_img = pygame.transform.scale(player_img, (int(player_img.get_width() * scale_factor * 2), int(player_img.get_height() * scale_factor * 2)))
-        cat = Cat(player_img, WIDTH // 2, HEIGHT - player_img.get_rect().height, 25 * scale_factor, scale_factor)
-        log_message("Cat character initialized")
-
-        clock = pygame.time.Clock()
-
-        # Load and play bonus game music
-        bonus_music_directory = 'assets/music/bonus'
-        random_mp3 = get_random_mp3(bonus_music_directory)
-        if random_mp3:
-            music_loaded = load_mp3(random_mp3)
-            if music_loaded:
-                play_mp3()
-                log_message(f"Playing bonus music: {random_mp3}")
-            else:
-                log_message("Failed to load bonus music")
-        
-        # Bonus Mode Display Phase
-        controls_displayed = False
-        text_x, text_y = WIDTH // 2 - int(175 * scale_factor), HEIGHT // 2
-        text_dx, text_dy = random.choice([-10, 10]), random.choice([-10, 10])
-        text_dx *= scale_factor
-        text_dy *= scale_factor
-        log_message("Bonus Mode Display Phase started")
-
-        while not controls_displayed:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-
-            if bonus_mode_background:
-                draw_background(bonus_mode_background)
-            else:
-                screen.fill(screen_color)
-
-            draw_text("Controls:", font, text_color, 0, HEIGHT * 0.2, center=True, enable_shadow=True)
-            draw_text("W/Space/Up = Jump", font, text_color, 0, HEIGHT * 0.4, center=True, enable_shadow=True)
-            draw_text("A/Left = Move Left", font, text_color, 0, HEIGHT * 0.6, center=True, enable_shadow=True)
-            draw_text("D/Right = Move Right", font, text_color, 0, HEIGHT * 0.8, center=True, enable_shadow=True)
-
-            text_surface = font.render("Bonus Stage!", True, text_color)
-            text_width, text_height = text_surface.get_size()
-
-            text_x += text_dx
-            text_y += text_dy
+        return False
+    return True
 
-            if text_x <= 0 or text_x >= WIDTH - text_width:
-                text_dx = -text_dx
-            if text_y <= 0 or text_y >= HEIGHT - text_height:
-                text_dy = -text_dy
 
-            screen.blit(text_surface, (text_x, text_y))
-            continue_rect = draw_continue_button()
-            pygame.display.flip()
+def start_bonus_music():
+    """
+    Load and play a random track from the bonus music folder.
 
-            for event in pygame.event.get():
-                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    if check_continue_click(pygame.mouse.get_pos(), continue_rect):
-                        controls_displayed = True
-                        log_message("Controls display completed, starting gameplay phase")
+    Returns:
+        str: The path of the track that is playing, or None if none could be played.
+    """
+    random_mp3 = get_random_mp3('assets/music/bonus')
+    if random_mp3 and load_mp3(random_mp3):
+        play_mp3()
+        return random_mp3
+    return None
 
-            clock.tick(60)
 
-        # Gameplay Phase
-        try:
-            while running:
-                current_time = pygame.time.get_ticks()
+def show_bonus_controls(control_lines, background_path=None):
+    """
+    Show the control instructions with a bouncing "Bonus Stage!" title until
+    the player clicks "Continue...".
 
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        running = False
-                        pygame.quit()
-                        sys.exit()
-                    elif event.type == pygame.KEYDOWN:
-                        if event.key in [pygame.K_SPACE, pygame.K_w, pygame.K_UP, pygame.K_KP8]:
-                            cat.jump()
-                            log_message("Cat jumped")
-
-                cat.update()
-
-                # Bomb collision check
-                for bomb in bombs:
-                    if cat.rect.colliderect(bomb.rect):
-                        death_cause = "bomb"
-                        game_over = True
-                        running = False
-                        log_message("Game Over: Cat collided with bomb")
-
-                # Fish collision check
-                for fish in fishes[:]:
-                    if cat.rect.colliderect(fish.rect):
-                        score += 1
-                        fishes.remove(fish)
-                        log_message(f"Score increased to {score} by collecting fish")
-
-                # Cat food (special item) collision check
-                for item in cat_food_items[:]:
-                    if cat.rect.colliderect(item.rect):
-                        score += 5
-                        cat_food_items.remove(item)
-                        log_message(f"Score increased to {score} by collecting cat food (special item)")
-
-                # Bomb spawning
-                if current_time - last_bomb_spawn_time > BOMB_SPAWN_INTERVAL:
-                    new_bomb = Bomb(bomb_img, random.randint(0, WIDTH - bomb_img.get_width()), 0, BOMB_FALL_SPEED)
-                    bombs.append(new_bomb)
-                    last_bomb_spawn_time = current_time
-                    log_message("New bomb spawned")
-
-                # Fish spawning
-                if current_time - last_fish_spawn_time > FISH_SPAWN_INTERVAL and fish_images:
-                    fish_img = pygame.image.load(random.choice(fish_images))
-                    fish_img = pygame.transform.scale(fish_img, (int(fish_img.get_width() * scale_factor), int(fish_img.get_height() * scale_factor)))
-                    fishes.append(Fish(fish_img, random.randint(0, WIDTH - fish_img.get_width()), 0, FISH_FALL_SPEED))
-                    last_fish_spawn_time = current_time
-                    log_message("New fish spawned")
-
-                # Cat food (special item) spawning
-                if current_time - last_cat_food_spawn_time > CAT_FOOD_SPAWN_INTERVAL:
-                    new_cat_food = Fish(cat_food_img, random.randint(0, WIDTH - cat_food_img.get_width()), 0, CAT_FOOD_FALL_SPEED)
-                    cat_food_items.append(new_cat_food)
-                    last_cat_food_spawn_time = current_time
-                    log_message("New cat food (special item) spawned")
-
-                # Update positions
-                for bomb in bombs:
-                    bomb.update()
-                for fish in fishes:
-                    fish.update()
-                for item in cat_food_items:
-                    item.update()
-
-                if gameplay_background:
-                    draw_background(gameplay_background)
-                else:
-                    screen.fill(screen_color)
+    Parameters:
+        control_lines (list): Instruction lines shown under the "Controls:" heading.
+        background_path (str): Path to the background image (optional).
+    """
+    scale_factor = calculate_scale_factor((WIDTH, HEIGHT), REFERENCE_RESOLUTION)
+    background = load_background_surface(background_path)
+    title_surface = font.render("Bonus Stage!", True, text_color)
+    text_width, text_height = title_surface.get_size()
 
-                for bomb in bombs:
-                    bomb.draw(screen)
-                for fish in fishes:
-                    fish.draw(screen)
-                for item in cat_food_items:
-                    item.draw(screen)
+    text_x, text_y = WIDTH // 2 - int(175 * scale_factor), HEIGHT // 2
+    text_dx = random.choice([-10, 10]) * scale_factor
+    text_dy = random.choice([-10, 10]) * scale_factor
 
-                cat.draw(screen)
-                draw_text(f"Score: {score}", font, text_color, WIDTH // 4, HEIGHT // 60, enable_shadow=True)
+    while True:
+        draw_scene_background(screen, background)
 
-                pygame.display.flip()
-                clock.tick(24)
+        # Render the controls
+        draw_text("Controls:", font, text_color, 0, HEIGHT * 0.2, center=True, enable_shadow=True)
+        for index, line in enumerate(control_lines):
+            draw_text(line, font, text_color, 0, HEIGHT * (0.4 + 0.2 * index), center=True, enable_shadow=True)
 
-        finally:
-            stop_mp3()
-            log_message("Music stopped, exiting game")
+        # Bounce the title off the screen edges
+        text_x += text_dx
+        text_y += text_dy
+        if text_x <= 0 or text_x >= WIDTH - text_width:
+            text_dx = -text_dx
+        if text_y <= 0 or text_y >= HEIGHT - text_height:
+            text_dy = -text_dy
+        screen.blit(title_surface, (text_x, text_y))
 
-    except Exception as e:
-        log_message(f"Error in bonus_game_falling_fish: {str(e)}")
-        pygame.quit()
-        sys.exit()
-    
-    if game_over:
-        screen.fill(screen_color)
-        death_message = "Game Over! You were hit by a bomb." if death_cause == "bomb" else "Game Over!"
-        draw_text(death_message, font, text_color, WIDTH // 2, HEIGHT // 3, center=True, enable_shadow=True, max_width=WIDTH)
-        log_message(death_message)
         continue_rect = draw_continue_button()
-
         pygame.display.flip()
 
-        waiting = True
-        while waiting:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()  
-                elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    if check_continue_click(pygame.mouse.get_pos(), continue_rect):
-                        waiting = False
-                        log_message("Player continued after game over")
+        # Sleep until the next animation frame, waking early for clicks
+        for event in wait_for_input(fps=60):
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                if check_continue_click(event.pos, continue_rect):
+                    return
 
 
-def bonus_game_cat_pong():
+def show_bonus_game_result(message):
     """
-    Runs the "Cat Pong" bonus game.
-
-    This function launches a game where the player controls a cat character on 
-    one side of the screen to bat a bomb back and forth with a computer-controlled 
-    cat on the opposite side. The goal is to prevent the bomb from hitting the 
-    player’s side while trying to make it past the computer-controlled cat.
-
-    Game Elements:
-        - Player Cat: Controlled by the player, moving up and down on the left side.
-        - Computer Cat: Controlled by the AI, moving up and down on the right side 
-          to intercept the bomb.
-        - Bomb: Moves between the cats, with speed and direction changing upon contact 
-          with the cats or screen edges.
-
-    Gameplay Phases:
-        1. Control Display Phase: Shows control instructions and an animated 
-           "Bonus Stage!" message until the player clicks "Continue...".
-        2. Gameplay Phase: The player controls the cat to prevent the bomb from 
-           crossing the left boundary while the AI cat defends the right boundary.
-        3. Game Over Phase: Displays a "Victory!" message if the bomb crosses 
-           the AI’s side, or a "Game Over!" message if it crosses the player’s side.
+    Show the end of game message and wait for the player to click "Continue...".
 
-    Returns:
-        None
+    Parameters:
+        message (str): The win or game over message to display.
     """
-    # Check if the assets/images directory exists
-    if not os.path.exists('assets/images'):
-        log_entry = create_log_message("Assets folder 'assets/images' is missing. Returning to the main menu.")
-        log_message(log_entry)
-        return "main_menu"
+    screen.fill(screen_color)
+    draw_text(message, font, text_color, WIDTH // 2, HEIGHT // 3, center=True, enable_shadow=True, max_width=WIDTH)
+    continue_rect = draw_continue_button()
+    pygame.display.flip()
 
-    # Calculate scaling factors based on the current resolution
-    scale_factor_x = WIDTH / REFERENCE_RESOLUTION[0]
-    scale_factor_y = HEIGHT / REFERENCE_RESOLUTION[1]
-    scale_factor = min(scale_factor_x, scale_factor_y)
+    wait_for_continue_click(continue_rect)
 
-    BOMB_SPEED_X = 8 * scale_factor  # Initial horizontal speed of the bomb
-    BOMB_SPEED_Y = 7 * scale_factor  # Initial vertical speed of the bomb
-    # PLAYER_SPEED = 6 * scale_factor  # Slightly slower than the bomb’s initial speed
-    AI_SPEED = 6.1 * scale_factor  # AI speed matches player speed
-    PLAYER_SPEED = AI_SPEED * 1.2
-    
-    running = True
-    game_over = False
-    win = False  # Track if the player won or lost
-    # start_time = time.time()
 
-    # Load images
-    background = select_random_background("assets/images/bonus_bkgs")
+def run_bonus_game(scene, control_lines=None, intro_background=None, play_music=True):
+    """
+    Run the shared bonus game phases around a scene: music, controls, gameplay
+    and the end screen.
 
-    # Load and double-scale the bomb image
-    bomb_img = pygame.image.load('assets/images/sprites/bomb.png')
-    bomb_img = pygame.transform.scale(bomb_img, (int(bomb_img.get_width() * 1.5 * scale_factor), int(bomb_img.get_height() * 1.5 * scale_factor)))
-    bomb_rect = bomb_img.get_rect(center=(WIDTH // 2, HEIGHT // 2))
-    bomb_dx, bomb_dy = BOMB_SPEED_X, BOMB_SPEED_Y
+    Parameters:
+        scene (BonusScene): The gameplay scene to run.
+        control_lines (list): Control instructions to show first (optional).
+        intro_background (str): Background image path for the controls screen (optional).
+        play_music (bool): Whether to start a random bonus track.
+    """
+    if play_music:
+        start_bonus_music()
 
-    # Load and double-scale player cat
-    player_cat_img = pygame.image.load('assets/images/sprites/cat01.png')
-    player_cat_img = pygame.transform.scale(player_cat_img, (int(player_cat_img.get_width() * 2 * scale_factor), int(player_cat_img.get_height() * 2 * scale_factor)))
-    player_cat_rect = player_cat_img.get_rect(midleft=(int(50 * scale_factor), HEIGHT // 2))
+    if control_lines:
+        show_bonus_controls(control_lines, intro_background)
 
-    # Load and double-scale AI cat
-    ai_cat_img = pygame.image.load('assets/images/sprites/cat08.png')  # A second cat sprite
-    ai_cat_img = pygame.transform.scale(ai_cat_img, (int(ai_cat_img.get_width() * 2 * scale_factor), int(ai_cat_img.get_height() * 2 * scale_factor)))
-    ai_cat_img = pygame.transform.flip(ai_cat_img, True, False)  # Flip AI cat horizontally
-    ai_cat_rect = ai_cat_img.get_rect(midright=(WIDTH - int(50 * scale_factor), HEIGHT // 2))
+    try:
+        run_bonus_scene(scene)
+    finally:
+        # Ensure music stops and resources are freed if an exception occurs
+        stop_mp3()
 
+    message = scene.end_message()
+    if message:
+        show_bonus_game_result(message)
 
-    # Create a clock object to control the frame rate
-    clock = pygame.time.Clock()
 
-    # Load and play bonus game music
-    bonus_music_directory = 'assets/music/bonus'
-    random_mp3 = get_random_mp3(bonus_music_directory)
-    
-    if random_mp3:
-        music_loaded = load_mp3(random_mp3)
-        if music_loaded:
-            play_mp3()
+class FatTunaScene(BonusScene):
+    """
+    Scene logic for the "Fat Tuna" bonus game.
 
-    # Control Display Phase
-    controls_displayed = False
-    
-    # Initialize bouncing text variables
-    text_x, text_y = WIDTH // 2 - int(175 * scale_factor), HEIGHT // 2
-    text_dx, text_dy = random.choice([-10, 10]), random.choice([-10, 10])
-    text_dx *= scale_factor
-    text_dy *= scale_factor
+    The cat jumps across falling platforms to reach the fat tuna swimming along
+    the top of the screen, while piranhas keep spawning along the bottom.
+    """
+    RESPAWN_RATE = 10  # Probability out of 100 for a new platform to spawn each step
+    PLATFORM_SPAWN_INTERVAL = 300  # Minimum time (milliseconds) between platform spawns
+    PIRANHA_SPAWN_INTERVAL = 2000  # Time interval (milliseconds) between spawning additional piranhas
+
+    def __init__(self, scale_factor):
+        super().__init__()
+        self.scale_factor = scale_factor
+        self.fall_speed = 13 * scale_factor  # Base speed for falling platforms, scaled
+        self.win = False
+        self.game_over = False
+        self.last_spawn_time = 0
+        self.last_piranha_spawn_time = 0
+
+        self.background = load_background_surface(select_random_background("assets/images/bonus_bkgs"))
+        self.collisions = SpatialHash(COLLISION_CELL_SIZE * scale_factor)
+        self.platform_img = sprite_atlas.get_sized('platform', (int(200 * scale_factor), int(50 * scale_factor)))
+
+        # Scaled fat tuna image from the sprite atlas
+        self.fat_tuna_img = sprite_atlas.get('fat_tuna', scale_factor)
+        self.fat_tuna_rect = self.fat_tuna_img.get_rect(center=(WIDTH // 2, int(self.fat_tuna_img.get_height() * scale_factor) // 2))
+        self.prev_fat_tuna_pos = self.fat_tuna_rect.topleft
+        self.fat_tuna_speed = 5 * scale_factor  # Adjust speed based on scale
+        self.fat_tuna_direction = -1  # Direction of movement, 1 is right, -1 is left
+
+        # Scaled piranha image from the sprite atlas
+        self.piranha_img = sprite_atlas.get('piranha', scale_factor)
+        self.piranha_pool = EntityPool(Piranha)
+        self.piranhas = [self.piranha_pool.acquire(self.piranha_img, 0, HEIGHT, 5 * scale_factor)]
+
+        # Initialize platforms with the image
+        self.platform_pool = EntityPool(Platform)
+        self.platforms = [
+            self.platform_pool.acquire(self.platform_img, int(100 * scale_factor), int(600 * scale_factor), int(200 * scale_factor), int(50 * scale_factor)),
+            self.platform_pool.acquire(self.platform_img, int(400 * scale_factor), int(400 * scale_factor), int(200 * scale_factor), int(50 * scale_factor)),
+            self.platform_pool.acquire(self.platform_img, int(700 * scale_factor), int(200 * scale_factor), int(200 * scale_factor), int(50 * scale_factor))
+        ]
+
+        # The cat wears its holiday outfit in December
+        cat_sprite = 'cat06' if datetime.now().month == 12 else 'cat01'
+        player_img = sprite_atlas.get(cat_sprite, scale_factor)
+        self.cat = Cat(player_img, WIDTH // 2, HEIGHT - player_img.get_rect().height, 25 * scale_factor, scale_factor,
+                       flipped_image=sprite_atlas.get(cat_sprite, scale_factor, flipped=True))
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key in (pygame.K_SPACE, pygame.K_w, pygame.K_UP, pygame.K_KP8):
+            self.cat.jump()
+
+    def update(self, dt):
+        self.cat.update(self.platforms)
+
+        # Check for win condition
+        if self.cat.rect.colliderect(self.fat_tuna_rect):
+            self.win = True
+            self.finished = True
+
+        # Check for game over condition
+        self.collisions.rebuild({"piranha": self.piranhas})
+        if self.collisions.query("piranha", self.cat.rect):
+            self.game_over = True
+            self.finished = True
+
+        for piranha in self.piranhas:
+            piranha.update()
+
+        # Update platform positions and remove them if they scroll off the bottom of the screen
+        for platform in self.platforms:
+            platform.update(self.fall_speed)
+        self.platform_pool.release_where(self.platforms, is_below_screen)
+
+        # Spawn new platforms at the top of the screen
+        if self.elapsed_ms - self.last_spawn_time > self.PLATFORM_SPAWN_INTERVAL and random.randint(1, 100) <= self.RESPAWN_RATE:
+            self.platforms.append(self.platform_pool.acquire(
+                self.platform_img,
+                random.randint(0, int(WIDTH - 200 * self.scale_factor)),
+                -int(50 * self.scale_factor),
+                int(200 * self.scale_factor),
+                int(50 * self.scale_factor)
+            ))
+            self.last_spawn_time = self.elapsed_ms
+
+        # Spawn new piranhas at the bottom of the screen
+        if self.elapsed_ms - self.last_piranha_spawn_time > self.PIRANHA_SPAWN_INTERVAL:
+            self.piranhas.append(self.piranha_pool.acquire(self.piranha_img, 0, HEIGHT, 5 * self.scale_factor))
+            self.last_piranha_spawn_time = self.elapsed_ms
+
+        # Move the fat tuna, reversing direction at the screen edges
+        self.prev_fat_tuna_pos = self.fat_tuna_rect.topleft
+        self.fat_tuna_rect.x += self.fat_tuna_speed * self.fat_tuna_direction
+        if self.fat_tuna_rect.left <= 0 or self.fat_tuna_rect.right >= WIDTH:
+            self.fat_tuna_direction *= -1
+
+    def draw(self, surface, alpha):
+        draw_scene_background(surface, self.background)
+
+        for platform in self.platforms:
+            platform.draw(surface, alpha)
+        for piranha in self.piranhas:
+            piranha.draw(surface, alpha)
+        surface.blit(self.fat_tuna_img, interpolate_position(self.prev_fat_tuna_pos, self.fat_tuna_rect.topleft, alpha))
+
+        # Draw the cat on top of everything else, then the timer
+        self.cat.draw(surface, alpha)
+        draw_text(f"{self.elapsed_seconds()}", font, text_color, WIDTH // 4, HEIGHT // 60, surface)
+
+    def end_message(self):
+        if self.win:
+            return f"You caught the Fat Tuna in {self.elapsed_seconds()} seconds!"
+        if self.game_over:
+            return "Game Over! You were eaten by the piranha."
+        return None
+
+
+def bonus_game_fat_tuna():
+    """
+    Runs the "Fat Tuna" bonus game.
+
+    The objective is to reach the fat tuna without colliding with any piranhas.
+    The player controls the cat to jump across falling platforms and avoid
+    obstacles. The gameplay itself lives in FatTunaScene.
+
+    Returns:
+        None
+    """
+    if not bonus_assets_available():
+        return "main_menu"
+
+    scale_factor = calculate_scale_factor((WIDTH, HEIGHT), REFERENCE_RESOLUTION)
+
+    run_bonus_game(
+        FatTunaScene(scale_factor),
+        control_lines=["W/Space/Up = Jump", "A/Left = Move Left", "D/Right = Move Right"],
+        intro_background=select_random_background("assets/images/bonus_mode")
+    )
+
+
+class NoFishScene(BonusScene):
+    """
+    Scene logic for the "No Fish" bonus game.
+
+    The cat survives as long as possible on falling platforms while bombs drop
+    from the top of the screen and piranhas patrol the bottom.
+    """
+    RESPAWN_RATE = 10  # Probability out of 100 for a new platform to spawn each step
+    PLATFORM_SPAWN_INTERVAL = 300  # Minimum time (milliseconds) between platform spawns
+    PIRANHA_SPAWN_INTERVAL = 2000  # Time interval (milliseconds) between spawning additional piranhas
+    BOMB_SPAWN_INTERVAL = 1500  # Time interval (milliseconds) between bomb spawns
+
+    def __init__(self, scale_factor):
+        super().__init__()
+        self.scale_factor = scale_factor
+        self.fall_speed = 13 * scale_factor  # Base speed for falling platforms, scaled
+        self.bomb_fall_speed = 25 * scale_factor  # Speed for the falling bombs
+        self.death_cause = None  # The cause of death shown on the end screen
+        self.last_spawn_time = 0
+        self.last_piranha_spawn_time = 0
+        self.last_bomb_spawn_time = 0
+
+        self.background = load_background_surface(select_random_background("assets/images/bonus_bkgs"))
+        self.collisions = SpatialHash(COLLISION_CELL_SIZE * scale_factor)
+        self.platform_img = sprite_atlas.get_sized('platform', (int(200 * scale_factor), int(50 * scale_factor)))
+
+        # Scaled piranha image from the sprite atlas
+        self.piranha_img = sprite_atlas.get('piranha', scale_factor)
+        self.piranha_pool = EntityPool(Piranha)
+        self.piranhas = [self.piranha_pool.acquire(self.piranha_img, 0, HEIGHT, 5 * scale_factor)]
+
+        # Initialize platforms with the image
+        self.platform_pool = EntityPool(Platform)
+        self.platforms = [
+            self.platform_pool.acquire(self.platform_img, int(100 * scale_factor), int(600 * scale_factor), int(200 * scale_factor), int(50 * scale_factor)),
+            self.platform_pool.acquire(self.platform_img, int(400 * scale_factor), int(400 * scale_factor), int(200 * scale_factor), int(50 * scale_factor)),
+            self.platform_pool.acquire(self.platform_img, int(700 * scale_factor), int(200 * scale_factor), int(200 * scale_factor), int(50 * scale_factor))
+        ]
+
+        # Scaled bomb image from the sprite atlas
+        self.bomb_img = sprite_atlas.get('bomb', scale_factor)
+        self.bomb_pool = EntityPool(Bomb)
+        self.bombs = []
+
+        # Initialize the cat
+        player_img = sprite_atlas.get('cat01', scale_factor)
+        self.cat = Cat(player_img, WIDTH // 2, HEIGHT - player_img.get_rect().height, 25 * scale_factor, scale_factor,
+                       flipped_image=sprite_atlas.get('cat01', scale_factor, flipped=True))
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key in (pygame.K_SPACE, pygame.K_w, pygame.K_UP, pygame.K_KP8):
+            self.cat.jump()
+
+    def update(self, dt):
+        self.cat.update(self.platforms)
+
+        # Check for game over condition (bomb or piranha collision)
+        self.collisions.rebuild({"bomb": self.bombs, "piranha": self.piranhas})
+        if self.collisions.query("bomb", self.cat.rect):
+            self.death_cause = "bomb"
+            self.finished = True
+
+        if self.collisions.query("piranha", self.cat.rect):
+            self.death_cause = "piranha"
+            self.finished = True
+
+        for piranha in self.piranhas:
+            piranha.update()
+
+        # Update platform positions and remove them if they scroll off the bottom of the screen
+        for platform in self.platforms:
+            platform.update(self.fall_speed)
+        self.platform_pool.release_where(self.platforms, is_below_screen)
+
+        # Spawn new platforms at the top of the screen
+        if self.elapsed_ms - self.last_spawn_time > self.PLATFORM_SPAWN_INTERVAL and random.randint(1, 100) <= self.RESPAWN_RATE:
+            self.platforms.append(self.platform_pool.acquire(
+                self.platform_img,
+                random.randint(0, int(WIDTH - 200 * self.scale_factor)),
+                -int(50 * self.scale_factor),
+                int(200 * self.scale_factor),
+                int(50 * self.scale_factor)
+            ))
+            self.last_spawn_time = self.elapsed_ms
+
+        # Spawn new piranhas at the bottom of the screen
+        if self.elapsed_ms - self.last_piranha_spawn_time > self.PIRANHA_SPAWN_INTERVAL:
+            self.piranhas.append(self.piranha_pool.acquire(self.piranha_img, 0, HEIGHT, 5 * self.scale_factor))
+            self.last_piranha_spawn_time = self.elapsed_ms
+
+        # Spawn new bombs at the top of the screen
+        if self.elapsed_ms - self.last_bomb_spawn_time > self.BOMB_SPAWN_INTERVAL:
+            self.bombs.append(self.bomb_pool.acquire(self.bomb_img, random.randint(0, WIDTH - self.bomb_img.get_width()), 0, self.bomb_fall_speed))
+            self.last_bomb_spawn_time = self.elapsed_ms
+
+        for bomb in self.bombs:
+            bomb.update()
+        self.bomb_pool.release_where(self.bombs, is_below_screen)
+
+    def draw(self, surface, alpha):
+        draw_scene_background(surface, self.background)
+
+        for platform in self.platforms:
+            platform.draw(surface, alpha)
+        for piranha in self.piranhas:
+            piranha.draw(surface, alpha)
+        for bomb in self.bombs:
+            bomb.draw(surface, alpha)
+
+        # Draw the cat on top of everything else, then the timer
+        self.cat.draw(surface, alpha)
+        draw_text(f"{self.elapsed_seconds()}", font, text_color, WIDTH // 4, HEIGHT // 60, surface)
+
+    def end_message(self):
+        if self.death_cause == "bomb":
+            return "Game Over! You were hit by a bomb."
+        if self.death_cause == "piranha":
+            return "Game Over! You were eaten by a piranha."
+        return "Game Over!"
+
+
+def bonus_game_no_fish():
+    """
+    Runs the "No Fish" bonus game.
+
+    The player survives as long as possible by jumping across falling platforms
+    and dodging bombs and piranhas. The gameplay itself lives in NoFishScene.
+
+    Returns:
+        None
+    """
+    if not bonus_assets_available():
+        return "main_menu"
+
+    scale_factor = calculate_scale_factor((WIDTH, HEIGHT), REFERENCE_RESOLUTION)
+
+    run_bonus_game(
+        NoFishScene(scale_factor),
+        control_lines=["W/Space/Up = Jump", "A/Left = Move Left", "D/Right = Move Right"],
+        intro_background=select_random_background("assets/images/bonus_mode")
+    )
+
+
+class FallingFishScene(BonusScene):
+    """
+    Scene logic for the "Falling Fish" bonus game.
+
+    The cat catches falling fish (1 point) and cat food (5 points) and the game
+    ends when it is hit by a bomb.
+    """
+    BOMB_SPAWN_INTERVAL = 600  # Time interval (milliseconds) between bomb spawns
+    FISH_SPAWN_INTERVAL = 1000  # Time interval (milliseconds) between fish spawns
+    CAT_FOOD_SPAWN_INTERVAL = 3000  # Time interval (milliseconds) between special item spawns
+
+    def __init__(self, scale_factor):
+        super().__init__()
+        self.scale_factor = scale_factor
+        self.bomb_fall_speed = 35 * scale_factor  # Speed for the falling bombs
+        self.fish_fall_speed = 24 * scale_factor  # Speed for the falling fish
+        self.cat_food_fall_speed = 20 * scale_factor  # Speed for the falling cat food (special item)
+        self.game_over = False
+        self.death_cause = None
+        self.score = 0
+        self.last_bomb_spawn_time = 0
+        self.last_fish_spawn_time = 0
+        self.last_cat_food_spawn_time = 0
+
+        self.background = load_background_surface(select_random_background("assets/images/bonus_bkgs"))
+        self.collisions = SpatialHash(COLLISION_CELL_SIZE * scale_factor)
+
+        self.bomb_img = sprite_atlas.get('bomb', scale_factor)
+        self.bomb_pool = EntityPool(Bomb)
+        self.bombs = []
+
+        # Falling fish and cat food share one pool since both are Fish objects
+        self.fish_pool = EntityPool(Fish)
+
+        # Scale every fish sprite once up front instead of loading one per spawn
+        self.fish_images = [sprite_atlas.get(name, scale_factor) for name in sprite_atlas.names('fish')]
+        self.fishes = []
+        log_message(f"Fish images loaded from the sprite atlas: {len(self.fish_images)} images found")
+
+        self.cat_food_img = sprite_atlas.get('power_ups/cat_food', scale_factor)
+        self.cat_food_items = []
+
+        # Initialize the cat character at double size
+        player_img = sprite_atlas.get('cat08', scale_factor * 2)
+        self.cat = Cat(player_img, WIDTH // 2, HEIGHT - player_img.get_rect().height, 25 * scale_factor, scale_factor,
+                       flipped_image=sprite_atlas.get('cat08', scale_factor * 2, flipped=True))
+        log_message("Cat character initialized")
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key in (pygame.K_SPACE, pygame.K_w, pygame.K_UP, pygame.K_KP8):
+            self.cat.jump()
+            log_message("Cat jumped")
+
+    def update(self, dt):
+        self.cat.update()
+
+        self.collisions.rebuild({"bomb": self.bombs, "fish": self.fishes, "cat_food": self.cat_food_items})
+
+        # Bomb collision check
+        if self.collisions.query("bomb", self.cat.rect):
+            self.death_cause = "bomb"
+            self.game_over = True
+            self.finished = True
+            log_message("Game Over: Cat collided with bomb")
+
+        # Fish collision check
+        caught_fish = self.collisions.query("fish", self.cat.rect)
+        for fish in caught_fish:
+            self.score += 1
+            log_message(f"Score increased to {self.score} by collecting fish")
+        if caught_fish:
+            self.fish_pool.release_where(self.fishes, caught_fish.__contains__)
+
+        # Cat food (special item) collision check
+        caught_items = self.collisions.query("cat_food", self.cat.rect)
+        for item in caught_items:
+            self.score += 5
+            log_message(f"Score increased to {self.score} by collecting cat food (special item)")
+        if caught_items:
+            self.fish_pool.release_where(self.cat_food_items, caught_items.__contains__)
+
+        # Bomb spawning
+        if self.elapsed_ms - self.last_bomb_spawn_time > self.BOMB_SPAWN_INTERVAL:
+            self.bombs.append(self.bomb_pool.acquire(self.bomb_img, random.randint(0, WIDTH - self.bomb_img.get_width()), 0, self.bomb_fall_speed))
+            self.last_bomb_spawn_time = self.elapsed_ms
+            log_message("New bomb spawned")
+
+        # Fish spawning
+        if self.elapsed_ms - self.last_fish_spawn_time > self.FISH_SPAWN_INTERVAL and self.fish_images:
+            fish_img = random.choice(self.fish_images)
+            self.fishes.append(self.fish_pool.acquire(fish_img, random.randint(0, WIDTH - fish_img.get_width()), 0, self.fish_fall_speed))
+            self.last_fish_spawn_time = self.elapsed_ms
+            log_message("New fish spawned")
+
+        # Cat food (special item) spawning
+        if self.elapsed_ms - self.last_cat_food_spawn_time > self.CAT_FOOD_SPAWN_INTERVAL:
+            self.cat_food_items.append(self.fish_pool.acquire(self.cat_food_img, random.randint(0, WIDTH - self.cat_food_img.get_width()), 0, self.cat_food_fall_speed))
+            self.last_cat_food_spawn_time = self.elapsed_ms
+            log_message("New cat food (special item) spawned")
+
+        for bomb in self.bombs:
+            bomb.update()
+        for fish in self.fishes:
+            fish.update()
+        for item in self.cat_food_items:
+            item.update()
+
+        # Drop everything that has fallen off the bottom of the screen
+        self.bomb_pool.release_where(self.bombs, is_below_screen)
+        self.fish_pool.release_where(self.fishes, is_below_screen)
+        self.fish_pool.release_where(self.cat_food_items, is_below_screen)
+
+    def draw(self, surface, alpha):
+        draw_scene_background(surface, self.background)
+
+        for bomb in self.bombs:
+            bomb.draw(surface, alpha)
+        for fish in self.fishes:
+            fish.draw(surface, alpha)
+        for item in self.cat_food_items:
+            item.draw(surface, alpha)
+
+        self.cat.draw(surface, alpha)
+        draw_text(f"Score: {self.score}", font, text_color, WIDTH // 4, HEIGHT // 60, surface, enable_shadow=True)
+
+    def end_message(self):
+        if not self.game_over:
+            return None
+        return "Game Over! You were hit by a bomb." if self.death_cause == "bomb" else "Game Over!"
 
-    while not controls_displayed:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-    
-        # Draw the background
-        if background:
-            draw_background(background)
-        else:
-            screen.fill(screen_color)
-    
-        # Render the controls
-        draw_text("Controls:", font, text_color, 0, HEIGHT * 0.2, center=True, enable_shadow=True)
-        draw_text("W = Move Up", font, text_color, 0, HEIGHT * 0.4, center=True, enable_shadow=True)
-        draw_text("S = Move Down", font, text_color, 0, HEIGHT * 0.6, center=True, enable_shadow=True)
-    
-        # Update bouncing text position
-        text_x += text_dx
-        text_y += text_dy
-    
-        # Check for collisions with screen edges
-        text_surface = font.render("Bonus Stage!", True, text_color)
-        text_width, text_height = text_surface.get_size()
-        
-        if text_x <= 0 or text_x >= WIDTH - text_width:
-            text_dx = -text_dx
-        if text_y <= 0 or text_y >= HEIGHT - text_height:
-            text_dy = -text_dy
-    
-        # Draw the bouncing "Bonus Stage!" text
-        screen.blit(text_surface, (text_x, text_y))
-    
-        # Draw the "Continue..." button
-        continue_rect = draw_continue_button()
-        pygame.display.flip()
-    
-        # Check for "Continue..." button click
-        for event in pygame.event.get():
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = pygame.mouse.get_pos()
-                if check_continue_click(mouse_pos, continue_rect):
-                    controls_displayed = True
-    
-        clock.tick(60)
 
+def bonus_game_falling_fish():
+    """
+    Runs the "Falling Fish" bonus game with an additional special item (cat food)
+    that falls like fish for bonus points. The gameplay itself lives in
+    FallingFishScene.
+    """
+    if not bonus_assets_available():
+        return "main_menu"
 
     try:
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-    
-            # Move the player cat based on input
-            keys = pygame.key.get_pressed()
-            
-            # Keyboard controls (W/S + Arrow Keys)
-            if (keys[pygame.K_w] or keys[pygame.K_UP]) and player_cat_rect.top > 0:
-                player_cat_rect.y -= PLAYER_SPEED
-            if (keys[pygame.K_s] or keys[pygame.K_DOWN]) and player_cat_rect.bottom < HEIGHT:
-                player_cat_rect.y += PLAYER_SPEED
-                
-            # Joystick controls (only if a joystick is connected)
-            if joystick:
-                # Left Stick Up/Down (Axis 1)
-                axis_1_value = joystick.get_axis(1)  # Read vertical movement
-            
-                # Apply dead zone to prevent drift
-                if abs(axis_1_value) > 0.2:
-                    if axis_1_value < 0 and player_cat_rect.top > 0:  # Stick Up
-                        player_cat_rect.y -= PLAYER_SPEED
-                    elif axis_1_value > 0 and player_cat_rect.bottom < HEIGHT:  # Stick Down
-                        player_cat_rect.y += PLAYER_SPEED
-            
-                # D-Pad Up/Down (Buttons 11 & 12)
-                if joystick.get_numbuttons() > 12:  # Ensure it has enough buttons
-                    if joystick.get_button(11) and player_cat_rect.top > 0:  # D-pad Up
-                        player_cat_rect.y -= PLAYER_SPEED
-                    if joystick.get_button(12) and player_cat_rect.bottom < HEIGHT:  # D-pad Down
-                        player_cat_rect.y += PLAYER_SPEED
-    
-            # AI cat movement logic
-            if bomb_rect.centery < ai_cat_rect.centery and ai_cat_rect.top > 0:
-                ai_cat_rect.y -= AI_SPEED
-            elif bomb_rect.centery > ai_cat_rect.centery and ai_cat_rect.bottom < HEIGHT:
-                ai_cat_rect.y += AI_SPEED
-    
-            # Update bomb position
-            bomb_rect.x += bomb_dx
-            bomb_rect.y += bomb_dy
-    
-            # Check for collisions with top/bottom screen boundaries
-            if bomb_rect.top <= 0 or bomb_rect.bottom >= HEIGHT:
-                bomb_dy = -bomb_dy
-    
-            # Check for collisions with player cat
-            if bomb_rect.colliderect(player_cat_rect) and bomb_dx < 0:
-                # Modify bounce angle based on contact point
-                offset = (bomb_rect.centery - player_cat_rect.centery) / player_cat_rect.height
-                bomb_dx = -bomb_dx  # Reverse direction horizontally
-                bomb_dy += offset * 5  # Adjust vertical speed based on collision point
-    
-            # Check for collisions with AI cat
-            if bomb_rect.colliderect(ai_cat_rect) and bomb_dx > 0:
-                # Modify bounce angle based on contact point
-                offset = (bomb_rect.centery - ai_cat_rect.centery) / ai_cat_rect.height
-                bomb_dx = -bomb_dx  # Reverse direction horizontally
-                bomb_dy += offset * 5  # Adjust vertical speed based on collision point
-                
-            # Check for win/loss state
-            if bomb_rect.left <= 0:  # Player loses if bomb crosses the left edge
-                game_over = True
-                win = False
-                running = False
-            elif bomb_rect.right >= WIDTH:  # Player wins if bomb crosses the right edge
-                game_over = True
-                win = True
-                running = False
-    
-            # Draw gameplay background
-            if background:
-                draw_background(background)
-            else:
-                screen.fill(screen_color)
-    
-            # Draw the cats and the bomb
-            screen.blit(player_cat_img, player_cat_rect.topleft)
-            screen.blit(ai_cat_img, ai_cat_rect.topleft)
-            screen.blit(bomb_img, bomb_rect.topleft)
-    
-            pygame.display.flip()
-            clock.tick(60)
-    
-    finally:
-        stop_mp3()
+        scale_factor = calculate_scale_factor((WIDTH, HEIGHT), REFERENCE_RESOLUTION)
+        log_message(f"Scaling factor calculated: scale_factor={scale_factor}")
+
+        scene = FallingFishScene(scale_factor)
+        run_bonus_game(
+            scene,
+            control_lines=["W/Space/Up = Jump", "A/Left = Move Left", "D/Right = Move Right"],
+            intro_background=select_random_background("assets/images/bonus_mode")
+        )
+        log_message("Music stopped, exiting game")
 
+    except Exception as e:
+        log_message(f"Error in bonus_game_falling_fish: {str(e)}")
+        pygame.quit()
+        sys.exit()
 
-    # Game Over Phase
-    if game_over:
-        screen.fill(screen_color)
-        if win:
-            message = "Victory!"
-        else:
-            message = "Game Over! The bomb passed your side."
+    if scene.game_over:
+        log_message("Player continued after game over")
 
-        draw_text(message, font, text_color, WIDTH // 2, HEIGHT // 3, 
-                  center=True, 
-                  max_width=WIDTH,
-                  enable_shadow=True)
-        continue_rect = draw_continue_button()
-        pygame.display.flip()
 
-        # Wait for the player to click "Continue..."
-        waiting = True
-        while waiting:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()  
-                elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    mouse_pos = pygame.mouse.get_pos()
-                    if check_continue_click(mouse_pos, continue_rect):
-                        waiting = False  # Continue after the "Continue..." button is clicked
+class CatPongScene(BonusScene):
+    """
+    Scene logic for the "Cat Pong" bonus game.
+
+    The player's cat on the left bats a bomb back and forth with a
+    computer-controlled cat on the right. The player wins if the bomb gets past
+    the computer's cat and loses if it gets past their own.
+    """
+    tick_rate = 60  # Cat Pong was tuned to move every 60 FPS frame
+
+    def __init__(self, scale_factor, background_path):
+        super().__init__()
+        self.bomb_dx = 8 * scale_factor  # Initial horizontal speed of the bomb
+        self.bomb_dy = 7 * scale_factor  # Initial vertical speed of the bomb
+        self.ai_speed = 6.1 * scale_factor
+        self.player_speed = self.ai_speed * 1.2
+        self.win = False
+
+        self.background = load_background_surface(background_path)
+
+        # Bomb at 1.5x
+        self.bomb_img = sprite_atlas.get('bomb', 1.5 * scale_factor)
+        self.bomb_rect = self.bomb_img.get_rect(center=(WIDTH // 2, HEIGHT // 2))
+
+        # Double-scaled player cat
+        self.player_cat_img = sprite_atlas.get('cat01', 2 * scale_factor)
+        self.player_cat_rect = self.player_cat_img.get_rect(midleft=(int(50 * scale_factor), HEIGHT // 2))
+
+        # Double-scaled AI cat, flipped to face the player
+        self.ai_cat_img = sprite_atlas.get('cat08', 2 * scale_factor, flipped=True)
+        self.ai_cat_rect = self.ai_cat_img.get_rect(midright=(WIDTH - int(50 * scale_factor), HEIGHT // 2))
+
+        self.previous_positions = self.current_positions()
+
+    def current_positions(self):
+        """Return the top-left positions of the player cat, AI cat and bomb."""
+        return (self.player_cat_rect.topleft, self.ai_cat_rect.topleft, self.bomb_rect.topleft)
+
+    def move_player(self):
+        """Move the player's cat from the keyboard and, if connected, the joystick."""
+        keys = pygame.key.get_pressed()
+
+        # Keyboard controls (W/S + Arrow Keys)
+        if (keys[pygame.K_w] or keys[pygame.K_UP]) and self.player_cat_rect.top > 0:
+            self.player_cat_rect.y -= self.player_speed
+        if (keys[pygame.K_s] or keys[pygame.K_DOWN]) and self.player_cat_rect.bottom < HEIGHT:
+            self.player_cat_rect.y += self.player_speed
+
+        if joystick:
+            # Left Stick Up/Down (Axis 1) with a dead zone to prevent drift
+            axis_1_value = joystick.get_axis(1)
+            if abs(axis_1_value) > 0.2:
+                if axis_1_value < 0 and self.player_cat_rect.top > 0:
+                    self.player_cat_rect.y -= self.player_speed
+                elif axis_1_value > 0 and self.player_cat_rect.bottom < HEIGHT:
+                    self.player_cat_rect.y += self.player_speed
+
+            # D-Pad Up/Down (Buttons 11 & 12)
+            if joystick.get_numbuttons() > 12:
+                if joystick.get_button(11) and self.player_cat_rect.top > 0:
+                    self.player_cat_rect.y -= self.player_speed
+                if joystick.get_button(12) and self.player_cat_rect.bottom < HEIGHT:
+                    self.player_cat_rect.y += self.player_speed
+
+    def update(self, dt):
+        self.previous_positions = self.current_positions()
+        self.move_player()
+
+        # AI cat follows the bomb
+        if self.bomb_rect.centery < self.ai_cat_rect.centery and self.ai_cat_rect.top > 0:
+            self.ai_cat_rect.y -= self.ai_speed
+        elif self.bomb_rect.centery > self.ai_cat_rect.centery and self.ai_cat_rect.bottom < HEIGHT:
+            self.ai_cat_rect.y += self.ai_speed
+
+        self.bomb_rect.x += self.bomb_dx
+        self.bomb_rect.y += self.bomb_dy
+
+        # Bounce off the top and bottom of the screen
+        if self.bomb_rect.top <= 0 or self.bomb_rect.bottom >= HEIGHT:
+            self.bomb_dy = -self.bomb_dy
+
+        # Bounce off either cat, angling the bomb by where it hit
+        for cat_rect, moving_towards in ((self.player_cat_rect, self.bomb_dx < 0), (self.ai_cat_rect, self.bomb_dx > 0)):
+            if self.bomb_rect.colliderect(cat_rect) and moving_towards:
+                offset = (self.bomb_rect.centery - cat_rect.centery) / cat_rect.height
+                self.bomb_dx = -self.bomb_dx
+                self.bomb_dy += offset * 5
+
+        # Check for win/loss state
+        if self.bomb_rect.left <= 0:
+            self.win = False
+            self.finished = True
+        elif self.bomb_rect.right >= WIDTH:
+            self.win = True
+            self.finished = True
+
+    def draw(self, surface, alpha):
+        draw_scene_background(surface, self.background)
+
+        images = (self.player_cat_img, self.ai_cat_img, self.bomb_img)
+        for image, previous, current in zip(images, self.previous_positions, self.current_positions()):
+            surface.blit(image, interpolate_position(previous, current, alpha))
+
+    def end_message(self):
+        return "Victory!" if self.win else "Game Over! The bomb passed your side."
+
+
+def bonus_game_cat_pong():
+    """
+    Runs the "Cat Pong" bonus game.
+
+    The player controls a cat on the left to bat a bomb back and forth with a
+    computer-controlled cat on the right. The gameplay itself lives in
+    CatPongScene.
+
+    Returns:
+        None
+    """
+    if not bonus_assets_available():
+        return "main_menu"
+
+    scale_factor = calculate_scale_factor((WIDTH, HEIGHT), REFERENCE_RESOLUTION)
+    background = select_random_background("assets/images/bonus_bkgs")
+
+    run_bonus_game(
+        CatPongScene(scale_factor, background),
+        control_lines=["W = Move Up", "S = Move Down"],
+        intro_background=background
+    )
 
 
 # TODO implement this, make it fun, this was William's idea        
@@ -7240,266 +9619,161 @@ def bonus_game_cat_pong():
 #                 mouse_pos = pygame.mouse.get_pos()
 #                 if check_continue_click(mouse_pos, continue_rect):
 #                     waiting = False
-def bonus_game_tuna_tower():
-    # Check if the assets/images directory exists
-    if not os.path.exists('assets/images'):
-        log_entry = create_log_message("Assets folder 'assets/images' is missing. Returning to the main menu.")
-        log_message(log_entry)
-        return "main_menu"
-    
-    # Calculate scaling factors based on the current resolution
-    scale_factor_x = WIDTH / REFERENCE_RESOLUTION[0]
-    scale_factor_y = HEIGHT / REFERENCE_RESOLUTION[1]
-    scale_factor = min(scale_factor_x, scale_factor_y)
-
-    GROUND_LEVEL = HEIGHT * 0.8  # Set the ground level
 
-    # Load tower tile image and scale it
-    tower_tile_img = pygame.image.load('assets/images/sprites/towertile01.png')
-    tower_tile_img = pygame.transform.scale(tower_tile_img, (int(64 * scale_factor), int(64 * scale_factor)))
-    
-    # Load platform image and scale it
-    platform_img = pygame.image.load('assets/images/sprites/platform.jpg')
-    platform_img = pygame.transform.scale(platform_img, (int(200 * scale_factor), int(50 * scale_factor)))
-    
-    # Load cat image and scale to double its original size
-    cat_img = pygame.image.load('assets/images/sprites/cat05.png')
-    cat_img = pygame.transform.scale(cat_img, (int(cat_img.get_width() * 2 * scale_factor), int(cat_img.get_height() * 2 * scale_factor)))
-    
-    # Cat position and movement variables
-    cat_x = WIDTH // 2 - cat_img.get_width() // 2
-    cat_y = HEIGHT * 0.8 - cat_img.get_height()  # Fixed cat vertical position, slightly above ground level
-    cat_speed = 25 * scale_factor  # Speed for horizontal movement
-    cat_facing_right = True       # Track direction to manage flipping
-    scroll_offset = 0            # Background/platform scrolling offset
-    cat_velocity_y = 0           # Vertical movement placeholder for controlling scroll speed
-
-    # Gravity and jumping variables
-    gravity = 1 * scale_factor
-    jump_strength = -20 * scale_factor
-    on_platform = False
-
-    # Platform positions and properties
-    platforms = [
-        {"x": WIDTH // 2 - platform_img.get_width() // 2, "y": int(GROUND_LEVEL)},
-        {"x": WIDTH // 2 + 150, "y": int(GROUND_LEVEL) - 150},  # New platform above and to the right
-    ]
 
-    # Gameplay Phase: Implement controls, jumping effect with easing, and scrolling background
-    running = True
-    try:
-        while running:
-            # current_time = time.time()
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                    pygame.quit()
-                    sys.exit()
+class TunaTowerScene(BonusScene):
+    """
+    Scene logic for the "Tuna Tower" bonus game (work in progress).
 
-            keys = pygame.key.get_pressed()
-
-            # Handle left movement with "A" key
-            if keys[pygame.K_a]:
-                cat_x -= cat_speed
-                if cat_facing_right:
-                    cat_img = pygame.transform.flip(cat_img, True, False)  # Flip to face left
-                    cat_facing_right = False
-
-            # Handle right movement with "D" key
-            if keys[pygame.K_d]:
-                cat_x += cat_speed
-                if not cat_facing_right:
-                    cat_img = pygame.transform.flip(cat_img, True, False)  # Flip to face right
-                    cat_facing_right = True
-
-            # Initiate jump when "W" is pressed and cat is on the platform
-            if keys[pygame.K_w] and on_platform:
-                cat_velocity_y = jump_strength
-                on_platform = False
-
-            # Apply gravity if the cat is falling
-            if not on_platform:
-                cat_velocity_y += gravity
-                scroll_offset -= cat_velocity_y
-
-            # Update cat's rect for collision detection
-            cat_rect = pygame.Rect(cat_x, cat_y, cat_img.get_width(), cat_img.get_height())
-
-            # Platform collision detection phase
-            platform_to_land_on = None
-            for platform in platforms:
-                platform_x = platform["x"]
-                platform_y_on_screen = platform["y"] + scroll_offset
-                platform_rect = pygame.Rect(platform_x, platform_y_on_screen, platform_img.get_width(), platform_img.get_height())
-
-                # Check if the cat is falling and collides with a platform
-                if cat_velocity_y > 0 and cat_rect.colliderect(platform_rect):
-                    if cat_rect.bottom > platform_rect.top and cat_rect.bottom - cat_velocity_y <= platform_rect.top:
-                        if platform_to_land_on is None or platform_y_on_screen < platform_to_land_on["y"]:
-                            platform_to_land_on = {"x": platform_x, "y": platform_y_on_screen}
-
-            # Landing phase (apply landing response)
-            if platform_to_land_on:
-                # Align the cat's bottom to the top of the platform smoothly
-                scroll_offset = platform_to_land_on["y"] - (cat_y + cat_img.get_height())
-                cat_velocity_y = 0
-                on_platform = True
-            else:
-                on_platform = False
+    The cat stays at a fixed height while the tower and its platforms scroll
+    around it as it jumps and falls.
+    """
+    def __init__(self, scale_factor):
+        super().__init__()
+        ground_level = HEIGHT * 0.8  # Set the ground level
+
+        # Scaled tower tile and platform images from the sprite atlas
+        self.tower_tile_img = sprite_atlas.get_sized('towertile01', (int(64 * scale_factor), int(64 * scale_factor)))
+        self.platform_img = sprite_atlas.get_sized('platform', (int(200 * scale_factor), int(50 * scale_factor)))
+
+        # Cat at double its original size, with a pre-flipped copy for facing left
+        self.cat_img_right = sprite_atlas.get('cat05', 2 * scale_factor)
+        self.cat_img_left = sprite_atlas.get('cat05', 2 * scale_factor, flipped=True)
+        self.cat_img = self.cat_img_right
+
+        # Cat position and movement variables
+        self.cat_x = WIDTH // 2 - self.cat_img.get_width() // 2
+        self.cat_y = HEIGHT * 0.8 - self.cat_img.get_height()  # Fixed cat vertical position, slightly above ground level
+        self.cat_speed = 25 * scale_factor  # Speed for horizontal movement
+        self.cat_facing_right = True  # Track direction to manage flipping
+        self.scroll_offset = 0  # Background/platform scrolling offset
+        self.cat_velocity_y = 0  # Vertical movement placeholder for controlling scroll speed
+        self.prev_cat_x = self.cat_x
+        self.prev_scroll_offset = self.scroll_offset
+
+        # Gravity and jumping variables
+        self.gravity = 1 * scale_factor
+        self.jump_strength = -20 * scale_factor
+        self.on_platform = False
+
+        # Platform rects in tower coordinates; they never move, only the view scrolls
+        self.platforms = [
+            self.platform_img.get_rect(topleft=(WIDTH // 2 - self.platform_img.get_width() // 2, int(ground_level))),
+            self.platform_img.get_rect(topleft=(WIDTH // 2 + 150, int(ground_level) - 150)),  # New platform above and to the right
+        ]
 
-            # Ensure the cat doesn't move off-screen horizontally
-            if cat_x < 0:
-                cat_x = 0
-            elif cat_x > WIDTH - cat_img.get_width():
-                cat_x = WIDTH - cat_img.get_width()
+    def update(self, dt):
+        self.prev_cat_x = self.cat_x
+        self.prev_scroll_offset = self.scroll_offset
 
-            # Fill the screen by tiling the tower tile image with a scrolling effect
-            screen.fill(screen_color)  # Clear the screen before drawing
-            for x in range(0, WIDTH, tower_tile_img.get_width()):
-                for y in range(-tower_tile_img.get_height(), HEIGHT, tower_tile_img.get_height()):
-                    screen.blit(tower_tile_img, (x, y + scroll_offset % tower_tile_img.get_height()))
+        keys = pygame.key.get_pressed()
 
-            # Draw all platforms
-            for platform in platforms:
-                platform_x = platform["x"]
-                platform_y_on_screen = platform["y"] + scroll_offset
-                screen.blit(platform_img, (platform_x, platform_y_on_screen))
+        # Handle left movement with "A" key
+        if keys[pygame.K_a]:
+            self.cat_x -= self.cat_speed
+            if self.cat_facing_right:
+                self.cat_img = self.cat_img_left  # Face left
+                self.cat_facing_right = False
+
+        # Handle right movement with "D" key
+        if keys[pygame.K_d]:
+            self.cat_x += self.cat_speed
+            if not self.cat_facing_right:
+                self.cat_img = self.cat_img_right  # Face right
+                self.cat_facing_right = True
+
+        # Initiate jump when "W" is pressed and cat is on the platform
+        if keys[pygame.K_w] and self.on_platform:
+            self.cat_velocity_y = self.jump_strength
+            self.on_platform = False
+
+        # Apply gravity if the cat is falling
+        if not self.on_platform:
+            self.cat_velocity_y += self.gravity
+            self.scroll_offset -= self.cat_velocity_y
+
+        # Move the cat into tower coordinates instead of moving every platform onto the screen
+        cat_rect = pygame.Rect(self.cat_x, self.cat_y - self.scroll_offset, self.cat_img.get_width(), self.cat_img.get_height())
+
+        # Find the highest platform the falling cat is landing on
+        platform_to_land_on = None
+        if self.cat_velocity_y > 0:
+            for index in cat_rect.collidelistall(self.platforms):
+                platform_rect = self.platforms[index]
+                if cat_rect.bottom > platform_rect.top and cat_rect.bottom - self.cat_velocity_y <= platform_rect.top:
+                    if platform_to_land_on is None or platform_rect.top < platform_to_land_on.top:
+                        platform_to_land_on = platform_rect
+
+        # Landing phase (apply landing response)
+        if platform_to_land_on:
+            # Align the cat's bottom to the top of the platform
+            self.scroll_offset = platform_to_land_on.top + self.scroll_offset - (self.cat_y + self.cat_img.get_height())
+            self.cat_velocity_y = 0
+            self.on_platform = True
+        else:
+            self.on_platform = False
 
-            # Draw the cat at the updated position
-            screen.blit(cat_img, (cat_x, cat_y))
+        # Ensure the cat doesn't move off-screen horizontally
+        self.cat_x = max(0, min(WIDTH - self.cat_img.get_width(), self.cat_x))
 
-            pygame.display.flip()
-            clock.tick(24)
+    def draw(self, surface, alpha):
+        scroll_offset = self.prev_scroll_offset + (self.scroll_offset - self.prev_scroll_offset) * alpha
+        cat_x = self.prev_cat_x + (self.cat_x - self.prev_cat_x) * alpha
 
-    finally:
-        stop_mp3()  # Ensure any music stops when exiting
+        # Fill the screen by tiling the tower tile image with a scrolling effect
+        surface.fill(screen_color)
+        tile_width, tile_height = self.tower_tile_img.get_size()
+        for x in range(0, WIDTH, tile_width):
+            for y in range(-tile_height, HEIGHT, tile_height):
+                surface.blit(self.tower_tile_img, (x, y + scroll_offset % tile_height))
 
-    # End Phase placeholder - can be used for displaying end-of-game messages
-    screen.fill(screen_color)
-    draw_text("Game Over!", font, text_color, WIDTH // 2, HEIGHT // 3, center=True, enable_shadow=True)
-    continue_rect = draw_continue_button()
-    pygame.display.flip()
+        for platform in self.platforms:
+            surface.blit(self.platform_img, (platform.x, platform.y + scroll_offset))
 
-    # Wait for "Continue..." click after game ends
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = pygame.mouse.get_pos()
-                if check_continue_click(mouse_pos, continue_rect):
-                    waiting = False
+        surface.blit(self.cat_img, (cat_x, self.cat_y))
 
 
-# TODO For later use
-def bonus_game_generic():
-    # Check if the assets/images directory exists
-    if not os.path.exists('assets/images'):
-        log_entry = create_log_message("Assets folder 'assets/images' is missing. Returning to the main menu.")
-        log_message(log_entry)
+def bonus_game_tuna_tower():
+    if not bonus_assets_available():
         return "main_menu"
-    
-    # Calculate scaling factors based on the current resolution
-    scale_factor_x = WIDTH / REFERENCE_RESOLUTION[0]
-    scale_factor_y = HEIGHT / REFERENCE_RESOLUTION[1]
-    scale_factor = min(scale_factor_x, scale_factor_y)
 
-    # GROUND_LEVEL = HEIGHT * 0.8  # Set the ground level
+    scale_factor = calculate_scale_factor((WIDTH, HEIGHT), REFERENCE_RESOLUTION)
 
-    # Control display phase setup
-    running = True
-    controls_displayed = False
-    # start_time = time.time()
+    run_bonus_game(TunaTowerScene(scale_factor), play_music=False)
 
-    # Load any background and platform images if needed (placeholder for future customization)
-    bonus_mode_background = select_random_background("assets/images/bonus_mode")
 
-    # Display control instructions
-    while not controls_displayed:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+class GenericScene(BonusScene):
+    """
+    Placeholder scene for future bonus games. Enter ends it without an end screen.
+    """
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+            self.finished = True
 
-        # Draw the background (or fallback to navy blue)
-        if bonus_mode_background:
-            draw_background(bonus_mode_background)
-        else:
-            screen.fill(screen_color)
+    def draw(self, surface, alpha):
+        # Minimal gameplay phase setup - this can be replaced with future gameplay logic
+        surface.fill(screen_color)
 
-        # Render the controls text
-        draw_text("Controls:", font, text_color, 0, HEIGHT * 0.2, center=True, enable_shadow=True)
-        draw_text("W = Jump", font, text_color, 0, HEIGHT * 0.4, center=True, enable_shadow=True)
-        draw_text("A = Move Left", font, text_color, 0, HEIGHT * 0.6, center=True, enable_shadow=True)
-        draw_text("D = Move Right", font, text_color, 0, HEIGHT * 0.8, center=True, enable_shadow=True)
-
-        # Render the bouncing "Bonus Stage!" text
-        text_x, text_y = WIDTH // 2 - int(175 * scale_factor), HEIGHT // 2
-        text_dx, text_dy = random.choice([-10, 10]), random.choice([-10, 10])
-        text_dx *= scale_factor
-        text_dy *= scale_factor
-        text_surface = font.render("Bonus Stage!", True, text_color)
-        screen.blit(text_surface, (text_x, text_y))
+    def end_message(self):
+        return None
 
-        # Draw the "Continue..." button
-        continue_rect = draw_continue_button()
-        pygame.display.flip()
 
-        # Check for "Continue..." button click
-        for event in pygame.event.get():
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = pygame.mouse.get_pos()
-                if check_continue_click(mouse_pos, continue_rect):
-                    controls_displayed = True  # Exit the loop and move to gameplay
+# TODO For later use
+def bonus_game_generic():
+    if not bonus_assets_available():
+        return "main_menu"
 
-        clock.tick(60)
+    run_bonus_game(
+        GenericScene(),
+        control_lines=["W = Jump", "A = Move Left", "D = Move Right"],
+        intro_background=select_random_background("assets/images/bonus_mode"),
+        play_music=False
+    )
 
-    # Placeholder for Gameplay Phase - can be customized as needed
-    try:
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if event.key in [pygame.K_RETURN, pygame.K_KP_ENTER]:
-                        running = False
-                        return
 
-            # Minimal gameplay phase setup - this can be replaced with future gameplay logic
-            screen.fill(screen_color)  # Just a solid color background for now
-            pygame.display.flip()
-            clock.tick(24)
-
-    finally:
-        stop_mp3()  # Ensure any music stops when exiting
-
-    # End Phase placeholder - can be used for displaying end-of-game messages
-    screen.fill(screen_color)
-    draw_text("Game Over!", font, text_color, WIDTH // 2, HEIGHT // 3, center=True, enable_shadow=True)
-    continue_rect = draw_continue_button()
-    pygame.display.flip()
-
-    # Wait for "Continue..." click after game ends
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = pygame.mouse.get_pos()
-                if check_continue_click(mouse_pos, continue_rect):
-                    waiting = False
-
-
-######################
-## English section ###
-######################
+######################
+## English section ###
+######################
 
 def random_quote_display():
     """
@@ -7913,76 +10187,13 @@ def display_result(result_text, image_folder=None, use_lightning=False):
     Display the result text and an optional image from the given folder.
     If an image is provided and 'use_lightning' is True, show lightning instead of particles.
     If 'use_lightning' is False, show a particle effect.
+    The animation is time-based and the player can click to skip it.
     """
-    # global shadow_color
-    
-    # Clear the event queue to avoid any unwanted inputs
-    pygame.event.clear()
-
-    # Initialize particle list
-    particles = []
-
-    # Get the image path and set the background
+    background = None
     if image_folder:
-        image_path = select_random_background(image_folder)
-        draw_background(image_path)
-
-        if not use_lightning:
-            # Generate particles for the effect (only if use_lightning is False)
-            for _ in range(500):  # Number of particles to generate
-                x = random.randint(0, WIDTH)
-                y = random.randint(0, HEIGHT)
-                color = random.choice([NAVY_BLUE, (255, 255, 255), ROYAL_BLUE, LIGHT_BLUE])
-                particles.append(Particle(x, y, color))
-
-    else:
-        # If no image folder is provided, fill the screen with the current screen color
-        screen.fill(screen_color)
-    
-    # Display loop for particle effect or lightning effect
-    if use_lightning:
-        # Show lightning effect if the fast answer condition is met
-        for _ in range(3):  # Increased number of lightning bolts for dramatic effect
-            draw_lightning(screen, (random.randint(0, WIDTH), 0), (random.randint(0, WIDTH), HEIGHT), 
-                           image_path, font, text_color, correct_message=result_text)
-            pygame.display.flip()
-            pygame.time.delay(150)  # Slight delay between lightning bolts
-    else:
-        # Show particle effect for slower answers
-        for _ in range(50):  # Run the particle effect for 50 frames
-            if image_folder:
-                # Transparent fill to allow particles to fade
-                screen.fill((0, 0, 0, 0))
-                draw_background(image_path)
-
-                # Update and draw each particle
-                for particle in particles[:]:
-                    particle.update()
-                    if particle.lifetime <= 0:
-                        particles.remove(particle)
-                    else:
-                        particle.draw(screen)
-            else:
-                # For incorrect answers, just fill the screen with the current screen color
-                screen.fill(screen_color)
+        background = get_cached_background(select_random_background(image_folder))
 
-            # Draw the result text on top of the particles or background
-            draw_text(result_text, 
-                      font, 
-                      text_color, 
-                      WIDTH // 2, 
-                      HEIGHT // 2, 
-                      center=True, 
-                      enable_shadow=True,
-                      max_width=WIDTH)
-            pygame.display.flip()
-    
-    # Final display and pause before exiting the function
-    pygame.display.flip()
-    time.sleep(1)  # Pause for 1 second
-
-    # Clear the event queue again after displaying the result
-    pygame.event.clear()
+    run_reward_animation(RewardAnimation(result_text, background, use_lightning))
 
 
 def generate_rainbow_number_problem():
@@ -8194,6 +10405,7 @@ def rainbow_numbers(session_id):
     problem_count = 0
     total_questions = 5
     completion_times = []  # List to store time taken for each question
+    answer_log = AnswerLog()
 
     clock = pygame.time.Clock()
 
@@ -8223,6 +10435,7 @@ def rainbow_numbers(session_id):
                         end_time = time.time()
                         time_taken = round(end_time - start_time, 1)  # Calculate time for the question
                         completion_times.append(time_taken)
+                        answer_log.record(f"{num1} + ? = 10", user_input, int(user_input) == num2, time_taken)
 
                         if int(user_input) == num2:
                             correct_answers += 1
@@ -8264,7 +10477,8 @@ def rainbow_numbers(session_id):
             lesson_start_time,
             lesson_end_time,
             total_questions,
-            correct_answers
+            correct_answers,
+            answer_log=answer_log
         )
     except Exception as e:
         log_entry = create_log_message(f"Error recording session lesson: {e}")
@@ -8364,2926 +10578,1205 @@ def rainbow_numbers(session_id):
         clock.tick(60)
 
 
-def generate_math_problem(min_val, max_val, operation="add"):
-    """Generates two random numbers within the given range and returns the 
-    problem and the answer."""
-    num1 = random.randint(min_val, max_val)
-    num2 = random.randint(min_val, max_val)
-    
-    if operation == "sub" and num1 < num2:
-        # Ensure num1 is always larger to avoid negative answers
-        num1, num2 = num2, num1  
-    
+def calculate_math_answer(num1, num2, operation="add"):
+    """Returns the answer to num1 (operation) num2 for "add", "sub" or "mul"."""
     if operation == "add":
-        answer = num1 + num2
+        return num1 + num2
     elif operation == "sub":
-        answer = num1 - num2
+        return num1 - num2
     elif operation == "mul":
-        answer = num1 * num2
+        return num1 * num2
     else:
         raise ValueError("Unsupported operation. Use 'add', 'sub', or 'mul'.")
-    
-    return num1, num2, answer
-
 
-def display_math_problem(num1, num2, user_input, first_input, operation="add"):
-    screen.fill(screen_color)
 
-    # Control for minimum answer line width
-    min_line_width = 150  # Adjust this value as needed
+### ADAPTIVE MATH PROBLEMS ###
 
-    # Dynamically calculate positions based on screen size
-    right_x = WIDTH * 0.55  # Right edge for alignment
-    num1_y = HEIGHT * 0.4
-    num2_y = HEIGHT * 0.5
-    line_y = HEIGHT * 0.60
-    sum_y = HEIGHT * 0.65
+class AliasTable:
+    """
+    A class for drawing indexes in proportion to their weights in constant time
+    (Vose's alias method).
 
-    # Draw the first number (right-aligned)
-    num1_text = str(num1)
-    num1_width = font.size(num1_text)[0]
-    draw_text(num1_text, 
-              font,
-              text_color, 
-              right_x - num1_width, 
-              num1_y, 
-              center=False, 
-              enable_shadow=True)
+    Weights can change between draws: changed indexes are corrected by rejection
+    sampling against the weights the table was built from, and the table is only
+    rebuilt once too many weights have changed.
 
-    # Determine the operation sign and adjust position
-    if operation == "add":
-        operator_sign = "+"
-    elif operation == "sub":
-        operator_sign = "-"
-    elif operation == "mul":
-        operator_sign = "×"
-    else:
-        raise ValueError("Unsupported operation. Use 'add', 'sub', or 'mul'.")
+    Attributes:
+    -----------
+    weights : list
+        The current weight of each index.
+    probability : list
+        The chance of keeping each column instead of taking its alias.
+    alias : list
+        The index each column falls back to.
 
-    # Operator sign, aligned to num1's position with a slight offset
-    operator_sign_x = right_x - num1_width - WIDTH * 0.1
-    draw_text(operator_sign, 
-              font, 
-              text_color, 
-              operator_sign_x, 
-              num2_y, 
-              center=False, 
-              enable_shadow=True)
+    Methods:
+    --------
+    sample():
+        Returns a random index, drawn in proportion to its current weight.
+    update(index, weight):
+        Changes the weight of one index.
+    rebuild():
+        Rebuilds the table from the current weights.
+    """
+    def __init__(self, weights):
+        self.weights = list(weights)
+        self.rebuild()
+
+    def rebuild(self):
+        """Rebuild the alias table from the current weights."""
+        count = len(self.weights)
+        total = sum(self.weights)
+        self.built_weights = list(self.weights)
+        self.probability = [1.0] * count
+        self.alias = list(range(count))
+        self.stale = {}  # index -> current weight / built weight, for weights changed since the rebuild
+        self.bound = 1.0  # Largest of those ratios, used to keep the rejection step exact
+
+        scaled = [weight * count / total for weight in self.weights] if total > 0 else [1.0] * count
+        small = [index for index, value in enumerate(scaled) if value < 1.0]
+        large = [index for index, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+
+    def update(self, index, weight):
+        """
+        Change the weight of one index.
 
-    # Draw the second number (right-aligned)
-    num2_text = str(num2)
-    num2_width = font.size(num2_text)[0]
-    draw_text(num2_text, 
-              font, 
-              text_color, 
-              right_x - num2_width, 
-              num2_y, 
-              center=False, 
-              enable_shadow=True)
+        Parameters:
+            index (int): The index to change.
+            weight (float): Its new weight.
+        """
+        self.weights[index] = weight
+        built_weight = self.built_weights[index]
+        if built_weight <= 0 or len(self.stale) >= MATH_FACT_MAX_STALE_CELLS:
+            self.rebuild()
+            return
+        self.stale[index] = weight / built_weight
+        self.bound = max(1.0, max(self.stale.values()))
+
+    def sample(self):
+        """Return a random index, drawn in proportion to its current weight."""
+        while True:
+            column = random.randrange(len(self.probability))
+            index = column if random.random() < self.probability[column] else self.alias[column]
+            if random.random() * self.bound < self.stale.get(index, 1.0):
+                return index
+
+
+class AdaptiveMathGenerator:
+    """
+    A class that picks math problems for a student in proportion to how much each
+    fact needs practice, using a fact matrix with one cell per operand pair.
 
-    # Calculate line width based on max width of elements
-    max_width = max(num1_width, num2_width, font.size(str(num1 + num2))[0])
-    # Ensures line width is at least min_line_width
-    line_width = max(max_width * 1.5, min_line_width)  
+    Each cell keeps the number of attempts and running averages of accuracy and
+    answer time. Facts the student gets wrong or answers slowly are drawn more
+    often; facts that have never been asked start in the middle.
 
-    # Draw shadow for the answer line
-    shadow_offset = 2
-    pygame.draw.line(screen, 
-                     shadow_color, 
-                     (right_x * 1.05 - line_width + shadow_offset, 
-                      line_y + shadow_offset), 
-                     (right_x * 1.05 + shadow_offset, 
-                      line_y + shadow_offset), 
-                     3)
+    Attributes:
+    -----------
+    student_id : int
+        The student the statistics belong to, or None to keep them in memory only.
+    operation : str
+        "add", "sub" or "mul".
+    first_range, second_range : tuple
+        The (min, max) values of each operand.
+    attempts : array
+        Answers recorded per cell.
+    accuracy : array
+        Running average of correct answers per cell (0-1).
+    latency : array
+        Running average of answer time in seconds per cell.
 
-    # Draw the actual answer line (sum line)
-    pygame.draw.line(screen, 
-                     text_color, 
-                     (right_x * 1.05 - line_width, line_y), 
-                     (right_x * 1.05, line_y), 
-                     3)
+    Methods:
+    --------
+    next_problem():
+        Returns the next (num1, num2, answer).
+    record(num1, num2, correct, seconds):
+        Updates the fact's statistics and its draw weight.
+    save():
+        Persists the fact matrix for the student.
+    """
+    def __init__(self, student_id, operation, first_range, second_range):
+        self.student_id = student_id
+        self.operation = operation
+        self.first_range = first_range
+        self.second_range = second_range
+        self.columns = second_range[1] - second_range[0] + 1
+        cell_count = (first_range[1] - first_range[0] + 1) * self.columns
+        self.fact_set = f"{operation}:{first_range[0]}-{first_range[1]}x{second_range[0]}-{second_range[1]}"
+
+        self.attempts = array('H', [0]) * cell_count
+        self.accuracy = array('f', [0.5]) * cell_count
+        self.latency = array('f', [REVIEW_FAST_ANSWER_SECONDS]) * cell_count
+        self.load()
+
+        self.alias_table = AliasTable([self.cell_weight(cell) for cell in range(cell_count)])
+        self.last_cell = None
+
+    def cell_operands(self, cell):
+        """Return the (num1, num2) of a cell."""
+        return self.first_range[0] + cell // self.columns, self.second_range[0] + cell % self.columns
+
+    def operands_cell(self, num1, num2):
+        """Return the cell of (num1, num2), or None if they are outside the matrix."""
+        row, column = num1 - self.first_range[0], num2 - self.second_range[0]
+        if 0 <= row <= self.first_range[1] - self.first_range[0] and 0 <= column < self.columns:
+            return row * self.columns + column
+        return None
 
-    # Draw the sum placeholder or the user input (right-aligned)
-    input_text = "?" if first_input else str(user_input)
-    input_width = font.size(input_text)[0]
-    draw_text(input_text, 
-              font, 
-              text_color, 
-              right_x - input_width, 
-              sum_y, 
-              center=False, 
-              enable_shadow=True)
+    def cell_weight(self, cell):
+        """
+        Return the draw weight of a cell: a base of 1, up to 4 more for mistakes and
+        up to 3 more for slow answers. Subtraction only uses cells where num1 >= num2.
+        """
+        num1, num2 = self.cell_operands(cell)
+        if self.operation == "sub" and num1 < num2:
+            return 0.0
+        return 1.0 + 4.0 * (1.0 - self.accuracy[cell]) + min(self.latency[cell] / REVIEW_FAST_ANSWER_SECONDS, 3.0)
 
-    # Refresh the display
-    pygame.display.flip()
+    def next_problem(self):
+        """
+        Draw the next problem, never repeating the previous one when there is a choice.
 
+        Returns:
+            tuple: (num1, num2, answer).
+        """
+        cell = self.alias_table.sample()
+        for _ in range(3):
+            if cell != self.last_cell:
+                break
+            cell = self.alias_table.sample()
+        self.last_cell = cell
 
-def single_digit_addition(session_id):
-    """Presents a single-digit addition quiz with random numbers and updates the session results."""
-    global current_student  # Access the global current student
+        num1, num2 = self.cell_operands(cell)
+        return num1, num2, calculate_math_answer(num1, num2, self.operation)
 
-    # Initialize the clock for frame rate control
-    clock = pygame.time.Clock()
+    def record(self, num1, num2, correct, seconds):
+        """
+        Update a fact's accuracy and latency and refresh its draw weight.
 
-    # Retrieve the lesson_id for Single Digit Addition
-    connection, cursor = get_database_cursor()
-    cursor.execute("SELECT lesson_id FROM lessons WHERE title = ?", ('Single Digit Addition',))
-    result = cursor.fetchone()
+        Parameters:
+            num1 (int): The first operand of the problem.
+            num2 (int): The second operand of the problem.
+            correct (bool): Whether the answer was correct.
+            seconds (float): How long the student took to answer.
+        """
+        cell = self.operands_cell(num1, num2)
+        if cell is None:
+            return
 
-    if result:
-        addition_lesson_id = result[0]
-    else:
-        log_entry = create_log_message("Single Digit Addition lesson not found in the database.")
-        log_message(log_entry)
-        cursor.close()
-        connection.close()
-        return 0, 0, None  # Return default values if lesson ID not found
+        if self.attempts[cell] == 0:
+            self.accuracy[cell] = float(correct)
+            self.latency[cell] = seconds
+        else:
+            self.accuracy[cell] += MATH_FACT_SMOOTHING * (float(correct) - self.accuracy[cell])
+            self.latency[cell] += MATH_FACT_SMOOTHING * (seconds - self.latency[cell])
+        self.attempts[cell] = min(self.attempts[cell] + 1, 65535)
+        self.alias_table.update(cell, self.cell_weight(cell))
 
-    cursor.close()
-    connection.close()
+    def load(self):
+        """Load the student's saved fact matrix, keeping the defaults if there is none."""
+        if self.student_id is None:
+            return
 
-    # Check if the student got a perfect score on this lesson yesterday
-    perfect_score_yesterday = perfect_score_lesson_skip(current_student, 'Single Digit Addition')
+        connection, cursor = get_database_cursor()
+        try:
+            cursor.execute(
+                "SELECT attempts, accuracy, latency FROM math_fact_matrices WHERE student_id = ? AND fact_set = ?",
+                (self.student_id, self.fact_set)
+            )
+            row = cursor.fetchone()
+        except sqlite3.Error as e:
+            log_message(create_log_message(f"Error loading math facts '{self.fact_set}': {e}"))
+            row = None
+        finally:
+            cursor.close()
+            connection.close()
 
-    # Log the result of the perfect score check
-    today = datetime.now().date()
-    yesterday = today - timedelta(days=1)
-    log_entry = create_log_message(
-        f"Student: {current_student}, Lesson: 'Single Digit Addition', "
-        f"Date: {yesterday}, 100%: {'Yes' if perfect_score_yesterday else 'No'}"
-    )
-    log_message(log_entry)
+        if row is None:
+            return
+        for saved, blob in zip((self.attempts, self.accuracy, self.latency), row):
+            values = array(saved.typecode)
+            values.frombytes(blob)
+            if len(values) == len(saved):
+                saved[:] = values
 
-    # Particle effect settings
-    particles = []
-    particle_count = 3
-    particle_lifetime = 30
+    def save(self):
+        """Save the fact matrix for the student."""
+        if self.student_id is None:
+            return
 
-    # Track hover states and frame rendering
-    hovered_continue = False  # Ensures particles only generate after a valid hover
-    interaction_ready = False  # Wait for the first frame to render properly
+        connection, cursor = get_database_cursor()
+        try:
+            cursor.execute('''
+                INSERT OR REPLACE INTO math_fact_matrices (student_id, fact_set, attempts, accuracy, latency)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (self.student_id, self.fact_set,
+                  self.attempts.tobytes(), self.accuracy.tobytes(), self.latency.tobytes()))
+            connection.commit()
+        except sqlite3.Error as e:
+            log_message(create_log_message(f"Error saving math facts '{self.fact_set}': {e}"))
+        finally:
+            cursor.close()
+            connection.close()
 
-    # Display the introductory message
-    waiting = True
-    skip_clicked = False
 
-    # Frame counter to delay hover effects
-    frames_since_display = 0
+class UniformMathGenerator:
+    """
+    Problem source with the same interface as AdaptiveMathGenerator for operand
+    ranges too large for a fact matrix; problems are drawn uniformly.
+    """
+    def __init__(self, operation, first_range, second_range):
+        self.operation = operation
+        self.first_range = first_range
+        self.second_range = second_range
 
-    while waiting:
-        # Clear the screen for a new frame
-        screen.fill(screen_color)
+    def next_problem(self):
+        num1 = random.randint(*self.first_range)
+        num2 = random.randint(*self.second_range)
+        if self.operation == "sub" and num1 < num2:
+            num1, num2 = num2, num1
+        return num1, num2, calculate_math_answer(num1, num2, self.operation)
 
-        # Draw the introductory text
-        draw_text(
-            "Let's work on Single-Digit Addition!",
-            font,
-            text_color,
-            x=0,
-            y=HEIGHT * 0.4,
-            max_width=WIDTH * 0.95,
-            center=True,
-            enable_shadow=True
-        )
+    def record(self, num1, num2, correct, seconds):
+        pass
 
-        # Draw the "Continue..." button
-        continue_rect = draw_continue_button()
+    def save(self):
+        pass
 
-        # Draw the "Skip..." button if applicable
-        skip_rect = None
-        if perfect_score_yesterday:
-            skip_rect = draw_skip_button()
 
-        # Get the current mouse position
-        mouse_pos = pygame.mouse.get_pos()
+# Problem sources already loaded this run, keyed by (student_id, operation, first_range, second_range)
+math_generators = {}
 
-        # Enable hover logic only after a few frames
-        if frames_since_display > 10:
-            interaction_ready = True
 
-        if interaction_ready:
-            # Determine hover color for "Continue..." button
-            continue_color = shadow_color if continue_rect.collidepoint(mouse_pos) else text_color
+def get_math_problem_source(session_id, min_val, max_val, operation="add", second_range=None):
+    """
+    Return the problem source for a math quiz: an adaptive generator for the session's
+    student, or a uniform one when the operand ranges are too large for a fact matrix.
 
-            # Redraw the "Continue..." button with hover effect
-            draw_text(
-                "Continue...",
-                pygame.font.SysFont(current_font_name_or_path, int(get_dynamic_font_size() * 0.8)),
-                continue_color,
-                x=WIDTH * 0.55,
-                y=HEIGHT * 0.9,
-                enable_shadow=True,
-                shadow_color=shadow_color
-            )
+    Parameters:
+        session_id (int): The ID of the session, used to find the student.
+        min_val (int): The minimum value of the first operand.
+        max_val (int): The maximum value of the first operand.
+        operation (str): "add", "sub" or "mul".
+        second_range (tuple): The (min, max) of the second operand, if different from the first.
 
-            # Determine hover color for "Skip..." button
-            if skip_rect:
-                # skip_color = shadow_color if skip_rect.collidepoint(mouse_pos) else text_color
-                if skip_rect.collidepoint(mouse_pos):
-                    draw_skip_button(hovered_over=True)
-                else:
-                    draw_skip_button(hovered_over=False)
+    Returns:
+        AdaptiveMathGenerator or UniformMathGenerator: The problem source.
+    """
+    first_range = (min_val, max_val)
+    second_range = second_range or first_range
+    cell_count = (first_range[1] - first_range[0] + 1) * (second_range[1] - second_range[0] + 1)
+    if cell_count > MATH_FACT_MAX_CELLS:
+        return UniformMathGenerator(operation, first_range, second_range)
 
-            # Generate particles if hovering over "Continue..." or "Skip..." buttons
-            if continue_rect.collidepoint(mouse_pos):
-                hovered_continue = True  # Track hover state
-                for _ in range(particle_count):  # Limit particle generation per frame
-                    particle_color = random.choice([shadow_color, text_color, screen_color])
-                    particle = Particle(mouse_pos[0], mouse_pos[1], particle_color)
-                    particle.lifetime = particle_lifetime
-                    angle = random.uniform(0, 2 * math.pi)
-                    speed = random.uniform(1, 3)
-                    particle.dx = math.cos(angle) * speed
-                    particle.dy = math.sin(angle) * speed
-                    particles.append(particle)
+    connection, cursor = get_database_cursor()
+    try:
+        student_id = get_session_student_id(cursor, session_id)
+    except sqlite3.Error as e:
+        log_message(create_log_message(f"Error finding the student for session {session_id}: {e}"))
+        student_id = None
+    finally:
+        cursor.close()
+        connection.close()
 
-            if skip_rect and skip_rect.collidepoint(mouse_pos):
-                for _ in range(particle_count):  # Limit particle generation per frame
-                    particle_color = random.choice([shadow_color, text_color, screen_color])
-                    particle = Particle(mouse_pos[0], mouse_pos[1], particle_color)
-                    particle.lifetime = particle_lifetime
-                    angle = random.uniform(0, 2 * math.pi)
-                    speed = random.uniform(1, 3)
-                    particle.dx = math.cos(angle) * speed
-                    particle.dy = math.sin(angle) * speed
-                    particles.append(particle)
+    key = (student_id, operation, first_range, second_range)
+    if key not in math_generators:
+        math_generators[key] = AdaptiveMathGenerator(student_id, operation, first_range, second_range)
+    return math_generators[key]
 
-        # Update and draw particles
-        for particle in particles[:]:
-            particle.update()
-            particle.draw(screen)
-            if particle.lifetime <= 0:
-                particles.remove(particle)
 
-        pygame.display.flip()  # Update the display
+def format_math_prompt(num1, num2, operation="add"):
+    """
+    Return a math problem as text for the answer log, e.g. '7 + 5'.
 
-        # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                # Check if "Continue..." button is clicked
-                if continue_rect.collidepoint(event.pos):
-                    waiting = False
-                # Check if "Skip..." button is clicked
-                elif skip_rect and skip_rect.collidepoint(event.pos):
-                    log_entry = create_log_message("skip clicked")
-                    log_message(log_entry)
-                    skip_clicked = True
-                    waiting = False
+    Parameters:
+        num1 (int): The first number.
+        num2 (int): The second number.
+        operation (str): "add", "sub" or "mul", as for display_math_problem.
 
-        # Increment frame counter
-        frames_since_display += 1
+    Returns:
+        str: The problem with the same operator sign that is displayed.
+    """
+    operator_sign = {"add": "+", "sub": "-", "mul": "×"}[operation]
+    return f"{num1} {operator_sign} {num2}"
 
-        # Cap the frame rate
-        clock.tick(60)
 
-    # If skip was clicked, record session with NULL values for scores and return early
-    if skip_clicked:
-        try:
-            connection, cursor = get_database_cursor()
+### MATH PROBLEM WIDGETS ###
 
-            # Format the current time to match the desired format without microseconds
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+class ProblemWidget:
+    """
+    Base class for the on-screen math problems. The static parts of a problem
+    (operands, operator and rule) are laid out and rendered once into a layer
+    cropped to their bounds when the problem changes, and the answer labels are
+    only re-rendered when the student's input changes. Drawing a frame is then a
+    fill and a few small blits; the caller presents the frame with a single
+    pygame.display.flip().
 
-            # Insert the session lesson with NULL values for performance metrics
-            cursor.execute('''
-                INSERT INTO session_lessons (
-                    session_id, lesson_id, start_time, end_time,
-                    total_time, questions_asked, questions_correct, avg_time_per_question, percent_correct
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                session_id, addition_lesson_id, current_time, current_time,
-                None, None, None, None, None  # NULL values for performance metrics
-            ))
+    Attributes:
+    -----------
+    layout_key : tuple
+        The problem, screen size and theme the static layer was built for.
+    static_layer : Surface
+        The pre-rendered static parts of the problem, cropped to their bounds.
+    static_position : tuple
+        Where static_layer is drawn on the screen.
+    input_anchors : list
+        (x, y, rect attribute, shadowed) for each answer label, set by layout().
+    input_texts : tuple
+        The answer texts the labels were rendered for.
+    input_labels : list
+        The rendered (surface, position) of each answer label.
 
-            connection.commit()
-            log_entry = create_log_message("Session recorded as skipped with NULL values.")
-            log_message(log_entry)
-
-        except sqlite3.Error as e:
-            log_entry = create_log_message(f"Error recording skipped session: {e}")
-            log_message(log_entry)
-            connection.rollback()
-
-        finally:
-            cursor.close()
-            connection.close()
-
-        return 0, 0, None  # Return default values if the lesson was skipped
-
-    # Start the lesson timer
-    lesson_start_time = time.time()
-
-    correct_answers = 0
-    problem_count = 0
-    total_questions = 5
-    completion_times = []
-
-    while problem_count < total_questions:
-        num1, num2, answer = generate_math_problem(1, 9)
-        user_input = ""
-        first_input = True
-        question_complete = False
-
-        # Start the timer for the question
-        start_time = time.time()
-
-        while not question_complete:
-            screen.fill(screen_color)
-            display_math_problem(num1, num2, user_input, first_input)
-            pygame.display.flip()
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if (event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER) and user_input.isdigit():
-                        end_time = time.time()
-                        time_taken = round(end_time - start_time, 1)
-                        completion_times.append(time_taken)
-
-                        if int(user_input) == answer:
-                            correct_answers += 1
-
-                            if time_taken < 3:
-                                display_result("CORRECT!", "assets/images/fast_cats", use_lightning=True)
-                            else:
-                                display_result("CORRECT!", "assets/images/cats", use_lightning=False)
-                        else:
-                            display_result(f"Sorry, the answer is {answer}")
-
-                        pygame.event.clear()
-                        problem_count += 1
-                        question_complete = True
-                    elif event.key == pygame.K_BACKSPACE:
-                        user_input = user_input[:-1]
-                    elif event.unicode.isdigit() and len(user_input) < 2:
-                        user_input += event.unicode
-                        first_input = False
-
-            clock.tick(60)
-
-    # End of lesson timer
-    lesson_end_time = time.time()
-
-    if completion_times:
-        average_time = round(sum(completion_times) / len(completion_times), 1)
-    else:
-        average_time = 0
-
-    try:
-        add_session_lesson(
-            session_id,
-            addition_lesson_id,
-            lesson_start_time,
-            lesson_end_time,
-            total_questions,
-            correct_answers
-        )
-    except Exception as e:
-        log_entry = create_log_message(f"Error recording session lesson: {e}")
-        log_message(log_entry)
-        return total_questions, correct_answers, average_time
-
-    # Display the final score
-    screen.fill(screen_color)
-    final_message = f"Final Score: {correct_answers}/{total_questions}"
-    draw_text(final_message, font, text_color, WIDTH // 2, HEIGHT * 0.25, center=True, enable_shadow=True)
-
-    if completion_times:
-        average_time_message = f"Average Time: {average_time} seconds"
-        draw_text(average_time_message, font, text_color, WIDTH // 2, HEIGHT * 0.6, center=True, enable_shadow=True, max_width=WIDTH)
-
-    if correct_answers == total_questions:
-        draw_text("Perfect score!", font, text_color, WIDTH // 2, HEIGHT * 0.35, center=True, enable_shadow=True)
-        if average_time < 3.0:
-            draw_text("MASTERY!", font, text_color, WIDTH // 2, HEIGHT * 0.80, center=True, enable_shadow=True)
-
-    # Handle the final "Continue..." button
-    frames_since_display = 0  # Reset frame counter
-    hovered_continue = False
-    while True:
-        # Clear the screen for a new frame
-        screen.fill(screen_color)
-
-        # Redraw final score and messages
-        draw_text(final_message, font, text_color, WIDTH // 2, HEIGHT * 0.25, center=True, enable_shadow=True)
-        if completion_times:
-            draw_text(average_time_message, font, text_color, WIDTH // 2, HEIGHT * 0.6, center=True, enable_shadow=True, max_width=WIDTH)
-        if correct_answers == total_questions:
-            draw_text("Perfect score!", font, text_color, WIDTH // 2, HEIGHT * 0.35, center=True, enable_shadow=True)
-            if average_time < 3.0:
-                draw_text("MASTERY!", font, text_color, WIDTH // 2, HEIGHT * 0.80, center=True, enable_shadow=True)
-
-        # Draw the "Continue..." button
-        continue_rect = draw_continue_button()
-
-        # Get the current mouse position
-        mouse_pos = pygame.mouse.get_pos()
-
-        # Determine hover color for "Continue..." button
-        continue_color = shadow_color if continue_rect.collidepoint(mouse_pos) else text_color
-
-        # Redraw the "Continue..." button with hover effect
-        draw_text(
-            "Continue...",
-            pygame.font.SysFont(current_font_name_or_path, int(get_dynamic_font_size() * 0.8)),
-            continue_color,
-            x=WIDTH * 0.55,
-            y=HEIGHT * 0.9,
-            enable_shadow=True,
-            shadow_color=shadow_color
-        )
-
-        # Generate particles if hovering over the "Continue..." button
-        if frames_since_display > 10:  # Prevent particles during the first 10 frames
-            if continue_rect.collidepoint(mouse_pos):
-                if not hovered_continue:  # Only allow particles after the first hover detection
-                    hovered_continue = True
-                for _ in range(particle_count):  # Limit particle generation per frame
-                    particle_color = random.choice([shadow_color, text_color, screen_color])
-                    particle = Particle(mouse_pos[0], mouse_pos[1], particle_color)
-                    particle.lifetime = particle_lifetime
-                    angle = random.uniform(0, 2 * math.pi)
-                    speed = random.uniform(1, 3)
-                    particle.dx = math.cos(angle) * speed
-                    particle.dy = math.sin(angle) * speed
-                    particles.append(particle)
-
-        # Update and draw particles
-        for particle in particles[:]:
-            particle.update()
-            particle.draw(screen)
-            if particle.lifetime <= 0:
-                particles.remove(particle)
-
-        pygame.display.flip()  # Update the display
-
-        # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                if continue_rect.collidepoint(event.pos):
-                    if correct_answers == total_questions:
-                        bonus_game_selector()
-                    return total_questions, correct_answers, average_time
-
-        # Increment frame counter
-        frames_since_display += 1
-
-        # Cap the frame rate
-        clock.tick(60)
-
-
-def double_digit_addition(session_id):
-    """Presents a double-digit addition quiz with random numbers and updates the session results."""
-    global current_student  # Access the global current student
-
-    log_message(create_log_message("Double digit addition begins."))
-
-    # Initialize the clock for frame rate control
-    clock = pygame.time.Clock()
-
-    # Retrieve the lesson_id for Double Digit Addition
-    connection, cursor = get_database_cursor()
-    cursor.execute("SELECT lesson_id FROM lessons WHERE title = ?", ('Double Digit Addition',))
-    result = cursor.fetchone()
-
-    if result:
-        addition_lesson_id = result[0]
-    else:
-        log_entry = create_log_message("Double Digit Addition lesson not found in the database.")
-        log_message(log_entry)
-        cursor.close()
-        connection.close()
-        return 0, 0, None  # Return default values if lesson ID not found
-
-    cursor.close()
-    connection.close()
-
-    # Check if the student got a perfect score on this lesson yesterday
-    perfect_score_yesterday = perfect_score_lesson_skip(current_student, 'Double Digit Addition')
-
-    # Log the result of the perfect score check
-    today = datetime.now().date()
-    yesterday = today - timedelta(days=1)
-    log_entry = create_log_message(
-        f"Student: {current_student}, Lesson: 'Double Digit Addition', "
-        f"Date: {yesterday}, 100%: {'Yes' if perfect_score_yesterday else 'No'}"
-    )
-    log_message(log_entry)
-
-    # Particle effect settings
-    particles = []
-    particle_count = 3
-    particle_lifetime = 30
-
-    # Display the introductory message
-    waiting = True
-    skip_clicked = False
-
-    while waiting:
-        # Clear the screen for a new frame
-        screen.fill(screen_color)
-
-        # Draw the introductory text
-        draw_text(
-            "Let's work on Double-Digit Addition!",
-            font,
-            text_color,
-            x=0,
-            y=HEIGHT * 0.4,
-            max_width=WIDTH * 0.95,
-            center=True,
-            enable_shadow=True
-        )
-
-        # Draw the "Continue..." button
-        continue_rect = draw_continue_button()
-
-        # Draw the "Skip..." button if applicable
-        skip_rect = None
-        if perfect_score_yesterday:
-            skip_rect = draw_skip_button()
-
-        # Get the current mouse position
-        mouse_pos = pygame.mouse.get_pos()
-
-        # Determine hover color for "Continue..." button
-        continue_color = shadow_color if continue_rect.collidepoint(mouse_pos) else text_color
-
-        # Redraw the "Continue..." button with hover effect
-        draw_text(
-            "Continue...",
-            pygame.font.SysFont(current_font_name_or_path, int(get_dynamic_font_size() * 0.8)),
-            continue_color,
-            x=WIDTH * 0.55,
-            y=HEIGHT * 0.9,
-            enable_shadow=True,
-            shadow_color=shadow_color
-        )
-
-        # Determine hover color for "Skip..." button
-        if skip_rect:
-            # skip_color = shadow_color if skip_rect.collidepoint(mouse_pos) else text_color
-            if skip_rect.collidepoint(mouse_pos):
-                draw_skip_button(hovered_over=True)
-            else:
-                draw_skip_button(hovered_over=False)
-
-        # Generate particles if hovering over "Continue..." or "Skip..."
-        if continue_rect.collidepoint(mouse_pos) or (skip_rect and skip_rect.collidepoint(mouse_pos)):
-            for _ in range(particle_count):  # Limit particle generation per frame
-                particle_color = random.choice([shadow_color, text_color, screen_color])
-                particle = Particle(mouse_pos[0], mouse_pos[1], particle_color)
-                particle.lifetime = particle_lifetime
-                angle = random.uniform(0, 2 * math.pi)
-                speed = random.uniform(1, 3)
-                particle.dx = math.cos(angle) * speed
-                particle.dy = math.sin(angle) * speed
-                particles.append(particle)
-
-        # Update and draw particles
-        for particle in particles[:]:
-            particle.update()
-            particle.draw(screen)
-            if particle.lifetime <= 0:
-                particles.remove(particle)
-
-        pygame.display.flip()  # Update the display
-
-        # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                # Check if "Continue..." button is clicked
-                if continue_rect.collidepoint(event.pos):
-                    waiting = False
-                # Check if "Skip..." button is clicked
-                elif skip_rect and skip_rect.collidepoint(event.pos):
-                    log_entry = create_log_message("skip clicked")
-                    log_message(log_entry)
-                    skip_clicked = True
-                    waiting = False
-
-        # Cap the frame rate
-        clock.tick(60)
-
-    # If skip was clicked, record session with NULL values for scores and return early
-    if skip_clicked:
-        try:
-            connection, cursor = get_database_cursor()
-
-            # Format the current time to match the desired format without microseconds
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-            # Insert the session lesson with NULL values for performance metrics
-            cursor.execute('''
-                INSERT INTO session_lessons (
-                    session_id, lesson_id, start_time, end_time,
-                    total_time, questions_asked, questions_correct, avg_time_per_question, percent_correct
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                session_id, addition_lesson_id, current_time, current_time,
-                None, None, None, None, None  # NULL values for performance metrics
-            ))
-
-            connection.commit()
-            log_entry = create_log_message("Session recorded as skipped with NULL values.")
-            log_message(log_entry)
-
-        except sqlite3.Error as e:
-            log_entry = create_log_message(f"Error recording skipped session: {e}")
-            log_message(log_entry)
-            connection.rollback()
-
-        finally:
-            cursor.close()
-            connection.close()
-
-        return 0, 0, None  # Return default values if the lesson was skipped
-
-    # Start the lesson timer
-    lesson_start_time = time.time()
-
-    correct_answers = 0
-    problem_count = 0
-    total_questions = 5
-    completion_times = []
-
-    while problem_count < total_questions:
-        num1, num2, answer = generate_math_problem(10, 99)
-        user_input = ""
-        first_input = True
-        question_complete = False
-
-        # Start the timer for the question
-        start_time = time.time()
-
-        while not question_complete:
-            screen.fill(screen_color)
-            display_math_problem(num1, num2, user_input, first_input)
-            pygame.display.flip()
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if (event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER) and user_input.isdigit():
-                        end_time = time.time()
-                        time_taken = round(end_time - start_time, 1)
-                        completion_times.append(time_taken)
-
-                        if int(user_input) == answer:
-                            correct_answers += 1
-
-                            if time_taken < 3:
-                                display_result("CORRECT!", "assets/images/fast_cats", use_lightning=True)
-                            else:
-                                display_result("CORRECT!", "assets/images/cats", use_lightning=False)
-                        else:
-                            display_result(f"Sorry, the answer is {answer}")
-
-                        pygame.event.clear()
-                        problem_count += 1
-                        question_complete = True
-                    elif event.key == pygame.K_BACKSPACE:
-                        user_input = user_input[:-1]
-                    elif event.unicode.isdigit() and len(user_input) < 3:  # Limit input to three digits
-                        user_input += event.unicode
-                        first_input = False
-
-            clock.tick(60)
-
-    # End of lesson timer
-    lesson_end_time = time.time()
-
-    if completion_times:
-        average_time = round(sum(completion_times) / len(completion_times), 1)
-    else:
-        average_time = 0
-
-    try:
-        add_session_lesson(
-            session_id,
-            addition_lesson_id,
-            lesson_start_time,
-            lesson_end_time,
-            total_questions,
-            correct_answers
-        )
-    except Exception as e:
-        log_entry = create_log_message(f"Error recording session lesson: {e}")
-        log_message(log_entry)
-        return total_questions, correct_answers, average_time
-
-    # Display the final score
-    screen.fill(screen_color)
-    final_message = f"Final Score: {correct_answers}/{total_questions}"
-    draw_text(final_message, font, text_color, WIDTH // 2, HEIGHT * 0.25, center=True, enable_shadow=True)
-
-    if completion_times:
-        average_time_message = f"Average Time: {average_time} seconds"
-        draw_text(average_time_message, font, text_color, WIDTH // 2, HEIGHT * 0.6, center=True, enable_shadow=True, max_width=WIDTH)
-
-    if correct_answers == total_questions:
-        draw_text("Perfect score!", font, text_color, WIDTH // 2, HEIGHT * 0.35, center=True, enable_shadow=True)
-        if average_time < 3.0:
-            draw_text("MASTERY!", font, text_color, WIDTH // 2, HEIGHT * 0.80, center=True, enable_shadow=True)
-
-    # Add hover effects and particles for "Continue..."
-    while True:
-        screen.fill(screen_color)
-
-        # Redraw final messages
-        draw_text(final_message, font, text_color, WIDTH // 2, HEIGHT * 0.25, center=True, enable_shadow=True)
-        if completion_times:
-            draw_text(average_time_message, font, text_color, WIDTH // 2, HEIGHT * 0.6, center=True, enable_shadow=True)
-        if correct_answers == total_questions:
-            draw_text("Perfect score!", font, text_color, WIDTH // 2, HEIGHT * 0.35, center=True, enable_shadow=True)
-            if average_time < 3.0:
-                draw_text("MASTERY!", font, text_color, WIDTH // 2, HEIGHT * 0.80, center=True, enable_shadow=True)
-
-        # Draw the "Continue..." button
-        continue_rect = draw_continue_button()
-
-        # Hover effects for the "Continue..." button
-        mouse_pos = pygame.mouse.get_pos()
-        continue_color = shadow_color if continue_rect.collidepoint(mouse_pos) else text_color
-        draw_text(
-            "Continue...",
-            pygame.font.SysFont(current_font_name_or_path, int(get_dynamic_font_size() * 0.8)),
-            continue_color,
-            x=WIDTH * 0.55,
-            y=HEIGHT * 0.9,
-            enable_shadow=True,
-            shadow_color=shadow_color
-        )
-
-        # Generate particles on hover
-        if continue_rect.collidepoint(mouse_pos):
-            for _ in range(particle_count):
-                particle_color = random.choice([shadow_color, text_color, screen_color])
-                particle = Particle(mouse_pos[0], mouse_pos[1], particle_color)
-                particle.lifetime = particle_lifetime
-                angle = random.uniform(0, 2 * math.pi)
-                speed = random.uniform(1, 3)
-                particle.dx = math.cos(angle) * speed
-                particle.dy = math.sin(angle) * speed
-                particles.append(particle)
-
-        # Update and draw particles
-        for particle in particles[:]:
-            particle.update()
-            particle.draw(screen)
-            if particle.lifetime <= 0:
-                particles.remove(particle)
-
-        pygame.display.flip()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                if continue_rect.collidepoint(event.pos):
-                    if correct_answers == total_questions:
-                        bonus_game_selector()
-                    return total_questions, correct_answers, average_time
-
-        clock.tick(60)
-
-
-def triple_digit_addition(session_id):
-    """Presents a triple-digit addition quiz with random numbers and updates the session results."""
-    global current_student  # Access the global current student
-
-    # Retrieve the lesson_id for Triple Digit Addition
-    connection, cursor = get_database_cursor()
-    cursor.execute("SELECT lesson_id FROM lessons WHERE title = ?", ('Triple Digit Addition',))
-    result = cursor.fetchone()
-    
-    if result:
-        addition_lesson_id = result[0]
-    else:
-        log_entry = create_log_message("Triple Digit Addition lesson not found in the database.")
-        log_message(log_entry)
-        cursor.close()
-        connection.close()
-        return 0, 0, 0  # No questions asked, no correct answers, no time taken
-
-    cursor.close()
-    connection.close()
-
-    # Display the introductory message
-    screen.fill(screen_color)
-    draw_text(
-        "Let's work on Triple-Digit Addition!",
-        font,
-        text_color,
-        x=0,
-        y=HEIGHT * 0.4,
-        max_width=WIDTH * 0.95,
-        center=True,
-        enable_shadow=True,
-    )
-
-    draw_and_wait_continue_button()
-
-    # Start the lesson timer
-    lesson_start_time = time.time()
-
-    correct_answers = 0
-    problem_count = 0
-    total_questions = 5
-    completion_times = []
-
-    clock = pygame.time.Clock()
-
-    while problem_count < total_questions:
-        num1, num2, answer = generate_math_problem(100, 999)
-        user_input = ""
-        first_input = True
-        question_complete = False
-
-        # Start the timer for the question
-        start_time = time.time()
-
-        while not question_complete:
-            screen.fill(screen_color)
-
-            # Draw the math problem
-            display_math_problem(num1, num2, user_input, first_input)
-
-            pygame.display.flip()
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if (event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER) and user_input.isdigit():
-                        end_time = time.time()
-                        time_taken = round(end_time - start_time, 1)
-                        completion_times.append(time_taken)
-
-                        if int(user_input) == answer:
-                            correct_answers += 1
-
-                            if time_taken < 3:
-                                display_result("CORRECT!", "assets/images/fast_cats", use_lightning=True)
-                            else:
-                                display_result("CORRECT!", "assets/images/cats", use_lightning=False)
-                        else:
-                            display_result(f"Sorry, the answer is {answer}")
-
-                        pygame.event.clear()
-                        problem_count += 1
-                        question_complete = True
-                    elif event.key == pygame.K_BACKSPACE:
-                        user_input = user_input[:-1]
-                    elif event.unicode.isdigit() and len(user_input) < 4:  # Limit input to four digits
-                        user_input += event.unicode
-                        first_input = False
-
-            clock.tick(60)
-
-    # End of lesson timer
-    lesson_end_time = time.time()
-
-    if completion_times:
-        average_time = round(sum(completion_times) / len(completion_times), 1)
-    else:
-        average_time = 0
-
-    try:
-        add_session_lesson(
-            session_id,
-            addition_lesson_id,
-            lesson_start_time,
-            lesson_end_time,
-            total_questions,
-            correct_answers
-        )
-    except Exception as e:
-        log_entry = create_log_message(f"Error recording session lesson: {e}")
-        log_message(log_entry)
-        return total_questions, correct_answers, average_time
-
-    screen.fill(screen_color)
-
-    final_message = f"Final Score: {correct_answers}/{total_questions}"
-    draw_text(final_message, font, text_color, WIDTH // 2, HEIGHT * 0.25, center=True, enable_shadow=True)
-
-    if completion_times:
-        average_time_message = f"Average Time: {average_time} seconds"
-        draw_text(average_time_message, font, text_color, WIDTH // 2, HEIGHT * 0.6, center=True, enable_shadow=True, max_width=WIDTH)
-
-    if correct_answers == total_questions:
-        draw_text("Perfect score!", font, text_color, WIDTH // 2, HEIGHT * 0.35, center=True, enable_shadow=True)
-        
-        if average_time < 3.0:
-            draw_text("MASTERY!", font, text_color, WIDTH // 2, HEIGHT * 0.80, center=True, enable_shadow=True)
-
-    draw_and_wait_continue_button()
-    
-    if correct_answers == total_questions:
-        bonus_game_selector()
-
-    return total_questions, correct_answers, average_time
-
-
-def quad_digit_addition(session_id):
-    """Presents a four-digit addition quiz with random numbers and updates the session results."""
-    global current_student  # Access the global current student
-
-    # Retrieve the lesson_id for Quad Digit Addition
-    connection, cursor = get_database_cursor()
-    cursor.execute("SELECT lesson_id FROM lessons WHERE title = ?", ('Quad Digit Addition',))
-    result = cursor.fetchone()
-    
-    if result:
-        addition_lesson_id = result[0]
-    else:
-        log_entry = create_log_message("Quad Digit Addition lesson not found in the database.")
-        log_message(log_entry)
-        cursor.close()
-        connection.close()
-        return 0, 0, 0  # No questions asked, no correct answers, no time taken
-
-    cursor.close()
-    connection.close()
-
-    # Display the introductory message
-    screen.fill(screen_color)
-    draw_text(
-        "Let's work on Four-Digit Addition!",
-        font,
-        text_color,
-        x=0,
-        y=HEIGHT * 0.4,
-        max_width=WIDTH * 0.95,
-        center=True,
-        enable_shadow=True,
-    )
-
-    draw_and_wait_continue_button()
-
-    # Start the lesson timer
-    lesson_start_time = time.time()
-
-    correct_answers = 0
-    problem_count = 0
-    total_questions = 5
-    completion_times = []
-
-    clock = pygame.time.Clock()
-
-    while problem_count < total_questions:
-        num1, num2, answer = generate_math_problem(1000, 9999)
-        user_input = ""
-        first_input = True
-        question_complete = False
-
-        # Start the timer for the question
-        start_time = time.time()
-
-        while not question_complete:
-            screen.fill(screen_color)
-
-            # Draw the math problem
-            display_math_problem(num1, num2, user_input, first_input)
-
-            pygame.display.flip()
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if (event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER) and user_input.isdigit():
-                        end_time = time.time()
-                        time_taken = round(end_time - start_time, 1)
-                        completion_times.append(time_taken)
-
-                        if int(user_input) == answer:
-                            correct_answers += 1
-
-                            if time_taken < 3:
-                                display_result("CORRECT!", "assets/images/fast_cats", use_lightning=True)
-                            else:
-                                display_result("CORRECT!", "assets/images/cats", use_lightning=False)
-                        else:
-                            display_result(f"Sorry, the answer is {answer}")
-
-                        pygame.event.clear()
-                        problem_count += 1
-                        question_complete = True
-                    elif event.key == pygame.K_BACKSPACE:
-                        user_input = user_input[:-1]
-                    elif event.unicode.isdigit() and len(user_input) < 5:  # Limit input to five digits
-                        user_input += event.unicode
-                        first_input = False
-
-            clock.tick(60)
-
-    # End of lesson timer
-    lesson_end_time = time.time()
-
-    if completion_times:
-        average_time = round(sum(completion_times) / len(completion_times), 1)
-    else:
-        average_time = 0
-
-    try:
-        add_session_lesson(
-            session_id,
-            addition_lesson_id,
-            lesson_start_time,
-            lesson_end_time,
-            total_questions,
-            correct_answers
-        )
-    except Exception as e:
-        log_entry = create_log_message(f"Error recording session lesson: {e}")
-        log_message(log_entry)
-        return total_questions, correct_answers, average_time
-
-    screen.fill(screen_color)
-
-    final_message = f"Final Score: {correct_answers}/{total_questions}"
-    draw_text(final_message, font, text_color, WIDTH // 2, HEIGHT * 0.25, center=True, enable_shadow=True)
-
-    if completion_times:
-        average_time_message = f"Average Time: {average_time} seconds"
-        draw_text(average_time_message, font, text_color, WIDTH // 2, HEIGHT * 0.6, center=True, enable_shadow=True, max_width=WIDTH)
-
-    if correct_answers == total_questions:
-        draw_text("Perfect score!", font, text_color, WIDTH // 2, HEIGHT * 0.35, center=True, enable_shadow=True)
-        
-        if average_time < 3.0:
-            draw_text("MASTERY!", font, text_color, WIDTH // 2, HEIGHT * 0.80, center=True, enable_shadow=True)
-
-    draw_and_wait_continue_button()
-    
-    if correct_answers == total_questions:
-        bonus_game_selector()
-
-    return total_questions, correct_answers, average_time
-
-
-def single_digit_subtraction(session_id):
-    """Presents a single-digit subtraction quiz with random numbers and updates the session results."""
-    global current_student  # Access the global current student
-
-    # Retrieve the lesson_id for Single Digit Subtraction
-    connection, cursor = get_database_cursor()
-    cursor.execute("SELECT lesson_id FROM lessons WHERE title = ?", ('Single Digit Subtraction',))
-    result = cursor.fetchone()
-    
-    if result:
-        subtraction_lesson_id = result[0]
-    else:
-        log_entry = create_log_message("Single Digit Subtraction lesson not found in the database.")
-        log_message(log_entry)
-        cursor.close()
-        connection.close()
-        return 0, 0, None  # Return default values if lesson ID not found
-
-    cursor.close()
-    connection.close()
-
-    # Check if the student got a perfect score on this lesson yesterday
-    perfect_score_yesterday = perfect_score_lesson_skip(current_student, 'Single Digit Subtraction')
-    
-    # Log the result of the perfect score check
-    today = datetime.now().date()
-    yesterday = today - timedelta(days=1)
-    log_entry = create_log_message(
-        f"Student: {current_student}, Lesson: 'Single Digit Subtraction', "
-        f"Date: {yesterday}, 100%: {'Yes' if perfect_score_yesterday else 'No'}"
-    )
-    log_message(log_entry)
-
-    # Display the introductory message
-    screen.fill(screen_color)
-    draw_text(
-        "Let's work on Single-Digit Subtraction!",
-        font,
-        text_color,
-        x=0,
-        y=HEIGHT * 0.4,
-        max_width=WIDTH * 0.95,
-        center=True,
-        enable_shadow=True
-    )
-
-    # Draw the "Continue..." and, if applicable, "Skip..." buttons
-    continue_rect = draw_continue_button()
-    skip_rect = None
-    if perfect_score_yesterday:
-        skip_rect = draw_skip_button()
-    pygame.display.flip()
-
-    # Event loop to wait for the "Continue..." or "Skip..." button click
-    waiting = True
-    skip_clicked = False
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = pygame.mouse.get_pos()
-                if continue_rect.collidepoint(mouse_pos):
-                    waiting = False
-                elif skip_rect and skip_rect.collidepoint(mouse_pos):
-                    log_entry = create_log_message("skip clicked")
-                    log_message(log_entry)
-                    skip_clicked = True
-                    waiting = False
-
-    # If skip was clicked, record session with NULL values for scores and return early
-    if skip_clicked:
-        try:
-            connection, cursor = get_database_cursor()
-            
-            # Format the current time to match the desired format without microseconds
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            # Insert the session lesson with NULL values for performance metrics
-            cursor.execute('''
-                INSERT INTO session_lessons (
-                    session_id, lesson_id, start_time, end_time,
-                    total_time, questions_asked, questions_correct, avg_time_per_question, percent_correct
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                session_id, subtraction_lesson_id, current_time, current_time,
-                None, None, None, None, None  # NULL values for performance metrics
-            ))
-            
-            connection.commit()
-            log_entry = create_log_message("Session recorded as skipped with NULL values.")
-            log_message(log_entry)
-
-        except sqlite3.Error as e:
-            log_entry = create_log_message(f"Error recording skipped session: {e}")
-            log_message(log_entry)
-            connection.rollback()
-        
-        finally:
-            cursor.close()
-            connection.close()
-        
-        return 0, 0, None  # Return default values if the lesson was skipped
-
-    # Start the lesson timer
-    lesson_start_time = time.time()
-
-    correct_answers = 0
-    problem_count = 0
-    total_questions = 5
-    completion_times = []
-
-    clock = pygame.time.Clock()
-
-    while problem_count < total_questions:
-        num1, num2, answer = generate_math_problem(1, 9, operation="sub")
-        user_input = ""
-        first_input = True
-        question_complete = False
-
-        # Start the timer for the question
-        start_time = time.time()
-
-        while not question_complete:
-            screen.fill(screen_color)
-            display_math_problem(num1, num2, user_input, first_input, operation="sub")
-            pygame.display.flip()
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if (event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER) and user_input.isdigit():
-                        end_time = time.time()
-                        time_taken = round(end_time - start_time, 1)
-                        completion_times.append(time_taken)
-
-                        if int(user_input) == answer:
-                            correct_answers += 1
-
-                            if time_taken < 3:
-                                display_result("CORRECT!", "assets/images/fast_cats", use_lightning=True)
-                            else:
-                                display_result("CORRECT!", "assets/images/cats", use_lightning=False)
-                        else:
-                            display_result(f"Sorry, the answer is {answer}")
-
-                        pygame.event.clear()
-                        problem_count += 1
-                        question_complete = True
-                    elif event.key == pygame.K_BACKSPACE:
-                        user_input = user_input[:-1]
-                    elif event.unicode.isdigit() and len(user_input) < 1:  # Limit input to one digit
-                        user_input += event.unicode
-                        first_input = False
-
-            clock.tick(60)
-
-    # End of lesson timer
-    lesson_end_time = time.time()
-
-    if completion_times:
-        average_time = round(sum(completion_times) / len(completion_times), 1)
-    else:
-        average_time = 0
-
-    try:
-        add_session_lesson(
-            session_id,
-            subtraction_lesson_id,
-            lesson_start_time,
-            lesson_end_time,
-            total_questions,
-            correct_answers
-        )
-    except Exception as e:
-        log_entry = create_log_message(f"Error recording session lesson: {e}")
-        log_message(log_entry)
-        return total_questions, correct_answers, average_time
-
-    screen.fill(screen_color)
-
-    final_message = f"Final Score: {correct_answers}/{total_questions}"
-    draw_text(final_message, font, text_color, WIDTH // 2, HEIGHT * 0.25, center=True, enable_shadow=True)
-
-    if completion_times:
-        average_time_message = f"Average Time: {average_time} seconds"
-        draw_text(average_time_message, font, text_color, WIDTH // 2, HEIGHT * 0.6, center=True, enable_shadow=True, max_width=WIDTH)
-
-    if correct_answers == total_questions:
-        draw_text("Perfect score!", font, text_color, WIDTH // 2, HEIGHT * 0.35, center=True, enable_shadow=True)
-        
-        if average_time < 3.0:
-            draw_text("MASTERY!", font, text_color, WIDTH // 2, HEIGHT * 0.80, center=True, enable_shadow=True)
-
-    draw_and_wait_continue_button()
-    
-    if correct_answers == total_questions:
-        bonus_game_selector()
-
-    return total_questions, correct_answers, average_time
-
-
-def double_digit_subtraction(session_id):
-    """Presents a double-digit subtraction quiz with random numbers and updates the session results."""
-    global current_student  # Access the global current student
-    
-    log_message(create_log_message("Double digit subtraction begins."))
-
-    # Retrieve the lesson_id for Double Digit Subtraction
-    connection, cursor = get_database_cursor()
-    cursor.execute("SELECT lesson_id FROM lessons WHERE title = ?", ('Double Digit Subtraction',))
-    result = cursor.fetchone()
-    
-    if result:
-        subtraction_lesson_id = result[0]
-    else:
-        log_entry = create_log_message("Double Digit Subtraction lesson not found in the database.")
-        log_message(log_entry)
-        cursor.close()
-        connection.close()
-        return 0, 0, None  # Return default values if lesson ID not found
-
-    cursor.close()
-    connection.close()
-
-    # Check if the student got a perfect score on this lesson yesterday
-    perfect_score_yesterday = perfect_score_lesson_skip(current_student, 'Double Digit Subtraction')
-    
-    # Log the result of the perfect score check
-    today = datetime.now().date()
-    yesterday = today - timedelta(days=1)
-    log_entry = create_log_message(
-        f"Student: {current_student}, Lesson: 'Double Digit Subtraction', "
-        f"Date: {yesterday}, 100%: {'Yes' if perfect_score_yesterday else 'No'}"
-    )
-    log_message(log_entry)
-
-    # Display the introductory message
-    screen.fill(screen_color)
-    draw_text(
-        "Let's work on Double-Digit Subtraction!",
-        font,
-        text_color,
-        x=0,
-        y=HEIGHT * 0.4,
-        max_width=WIDTH * 0.95,
-        center=True,
-        enable_shadow=True
-    )
-
-    # Draw the "Continue..." and, if applicable, "Skip..." buttons
-    continue_rect = draw_continue_button()
-    skip_rect = None
-    if perfect_score_yesterday:
-        skip_rect = draw_skip_button()
-    pygame.display.flip()
-
-    # Event loop to wait for the "Continue..." or "Skip..." button click
-    waiting = True
-    skip_clicked = False
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = pygame.mouse.get_pos()
-                if continue_rect.collidepoint(mouse_pos):
-                    waiting = False
-                elif skip_rect and skip_rect.collidepoint(mouse_pos):
-                    log_entry = create_log_message("skip clicked")
-                    log_message(log_entry)
-                    skip_clicked = True
-                    waiting = False
-
-    # If skip was clicked, record session with NULL values for scores and return early
-    if skip_clicked:
-        try:
-            connection, cursor = get_database_cursor()
-            
-            # Format the current time to match the desired format without microseconds
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            # Insert the session lesson with NULL values for performance metrics
-            cursor.execute('''
-                INSERT INTO session_lessons (
-                    session_id, lesson_id, start_time, end_time,
-                    total_time, questions_asked, questions_correct, avg_time_per_question, percent_correct
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                session_id, subtraction_lesson_id, current_time, current_time,
-                None, None, None, None, None  # NULL values for performance metrics
-            ))
-            
-            connection.commit()
-            log_entry = create_log_message("Session recorded as skipped with NULL values.")
-            log_message(log_entry)
-
-        except sqlite3.Error as e:
-            log_entry = create_log_message(f"Error recording skipped session: {e}")
-            log_message(log_entry)
-            connection.rollback()
-        
-        finally:
-            cursor.close()
-            connection.close()
-        
-        return 0, 0, None  # Return default values if the lesson was skipped
-
-    # Start the lesson timer
-    lesson_start_time = time.time()
-
-    correct_answers = 0
-    problem_count = 0
-    total_questions = 5
-    completion_times = []
-
-    clock = pygame.time.Clock()
-
-    while problem_count < total_questions:
-        num1, num2, answer = generate_math_problem(10, 99, operation="sub")
-        user_input = ""
-        first_input = True
-        question_complete = False
-
-        # Start the timer for the question
-        start_time = time.time()
-
-        while not question_complete:
-            screen.fill(screen_color)
-            display_math_problem(num1, num2, user_input, first_input, operation="sub")
-            pygame.display.flip()
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if (event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER) and user_input.isdigit():
-                        end_time = time.time()
-                        time_taken = round(end_time - start_time, 1)
-                        completion_times.append(time_taken)
-
-                        if int(user_input) == answer:
-                            correct_answers += 1
-
-                            if time_taken < 3:
-                                display_result("CORRECT!", "assets/images/fast_cats", use_lightning=True)
-                            else:
-                                display_result("CORRECT!", "assets/images/cats", use_lightning=False)
-                        else:
-                            display_result(f"Sorry, the answer is {answer}")
-
-                        pygame.event.clear()
-                        problem_count += 1
-                        question_complete = True
-                    elif event.key == pygame.K_BACKSPACE:
-                        user_input = user_input[:-1]
-                    elif event.unicode.isdigit() and len(user_input) < 2:  # Limit input to two digits
-                        user_input += event.unicode
-                        first_input = False
-
-            clock.tick(60)
-
-    # End of lesson timer
-    lesson_end_time = time.time()
-
-    if completion_times:
-        average_time = round(sum(completion_times) / len(completion_times), 1)
-    else:
-        average_time = 0
-
-    try:
-        add_session_lesson(
-            session_id,
-            subtraction_lesson_id,
-            lesson_start_time,
-            lesson_end_time,
-            total_questions,
-            correct_answers
-        )
-    except Exception as e:
-        log_entry = create_log_message(f"Error recording session lesson: {e}")
-        log_message(log_entry)
-        return total_questions, correct_answers, average_time
-
-    screen.fill(screen_color)
-
-    final_message = f"Final Score: {correct_answers}/{total_questions}"
-    draw_text(final_message, font, text_color, WIDTH // 2, HEIGHT * 0.25, center=True, enable_shadow=True)
-
-    if completion_times:
-        average_time_message = f"Average Time: {average_time} seconds"
-        draw_text(average_time_message, font, text_color, WIDTH // 2, HEIGHT * 0.6, center=True, enable_shadow=True, max_width=WIDTH)
-
-    if correct_answers == total_questions:
-        draw_text("Perfect score!", font, text_color, WIDTH // 2, HEIGHT * 0.35, center=True, enable_shadow=True)
-        
-        if average_time < 3.0:
-            draw_text("MASTERY!", font, text_color, WIDTH // 2, HEIGHT * 0.80, center=True, enable_shadow=True)
-
-    draw_and_wait_continue_button()
-    
-    if correct_answers == total_questions:
-        bonus_game_selector()
-
-    return total_questions, correct_answers, average_time
-
-
-def triple_digit_subtraction(session_id):
-    """Presents a triple-digit subtraction quiz with random numbers and updates the session results."""
-    global current_student  # Access the global current student
-
-    # Retrieve the lesson_id for Triple Digit Subtraction
-    connection, cursor = get_database_cursor()
-    cursor.execute("SELECT lesson_id FROM lessons WHERE title = ?", ('Triple Digit Subtraction',))
-    result = cursor.fetchone()
-    
-    if result:
-        subtraction_lesson_id = result[0]
-    else:
-        log_entry = create_log_message("Triple Digit Subtraction lesson not found in the database.")
-        log_message(log_entry)
-        cursor.close()
-        connection.close()
-        return 0, 0, 0  # No questions asked, no correct answers, no time taken
-
-    cursor.close()
-    connection.close()
-
-    # Display the introductory message
-    screen.fill(screen_color)
-    draw_text(
-        "Let's work on Triple-Digit Subtraction!",
-        font,
-        text_color,
-        x=0,
-        y=HEIGHT * 0.4,
-        max_width=WIDTH * 0.95,
-        center=True,
-        enable_shadow=True,
-        # shadow_color=shadow_color
-    )
-
-    draw_and_wait_continue_button()
-
-    # Start the lesson timer
-    lesson_start_time = time.time()
-
-    correct_answers = 0
-    problem_count = 0
-    total_questions = 5
-    completion_times = []
-
-    clock = pygame.time.Clock()
-
-    while problem_count < total_questions:
-        num1, num2, answer = generate_math_problem(100, 999, operation="sub")
-        user_input = ""
-        first_input = True
-        question_complete = False
-
-        # Start the timer for the question
-        start_time = time.time()
-
-        while not question_complete:
-            screen.fill(screen_color)
-
-            # Draw the math problem
-            display_math_problem(num1, num2, user_input, first_input, operation="sub")
-
-            pygame.display.flip()
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if (event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER) and user_input.isdigit():
-                        end_time = time.time()
-                        time_taken = round(end_time - start_time, 1)
-                        completion_times.append(time_taken)
-
-                        if int(user_input) == answer:
-                            correct_answers += 1
-
-                            if time_taken < 3:
-                                display_result("CORRECT!", "assets/images/fast_cats", use_lightning=True)
-                            else:
-                                display_result("CORRECT!", "assets/images/cats", use_lightning=False)
-                        else:
-                            display_result(f"Sorry, the answer is {answer}")
-
-                        pygame.event.clear()
-                        problem_count += 1
-                        question_complete = True
-                    elif event.key == pygame.K_BACKSPACE:
-                        user_input = user_input[:-1]
-                    elif event.unicode.isdigit() and len(user_input) < 4:  # Limit input to four digits
-                        user_input += event.unicode
-                        first_input = False
-
-            clock.tick(60)
-
-    # End of lesson timer
-    lesson_end_time = time.time()
-
-    if completion_times:
-        average_time = round(sum(completion_times) / len(completion_times), 1)
-    else:
-        average_time = 0
-
-    try:
-        add_session_lesson(
-            session_id,
-            subtraction_lesson_id,
-            lesson_start_time,
-            lesson_end_time,
-            total_questions,
-            correct_answers
-        )
-    except Exception as e:
-        log_entry = create_log_message(f"Error recording session lesson: {e}")
-        log_message(log_entry)
-        return total_questions, correct_answers, average_time
-
-    screen.fill(screen_color)
-
-    final_message = f"Final Score: {correct_answers}/{total_questions}"
-    draw_text(final_message, font, text_color, WIDTH // 2, HEIGHT * 0.25, center=True, enable_shadow=True)
-
-    if completion_times:
-        average_time_message = f"Average Time: {average_time} seconds"
-        draw_text(average_time_message, font, text_color, WIDTH // 2, HEIGHT * 0.6, center=True, enable_shadow=True, max_width=WIDTH)
-
-    if correct_answers == total_questions:
-        draw_text("Perfect score!", font, text_color, WIDTH // 2, HEIGHT * 0.35, center=True, enable_shadow=True)
-        
-        if average_time < 3.0:
-            draw_text("MASTERY!", font, text_color, WIDTH // 2, HEIGHT * 0.80, center=True, enable_shadow=True)
-
-    draw_and_wait_continue_button()
-    
-    if correct_answers == total_questions:
-        bonus_game_selector()
-
-    return total_questions, correct_answers, average_time
-
-
-def quad_digit_subtraction(session_id):
-    """Presents a quad-digit subtraction quiz with random numbers and updates the session results."""
-    global current_student  # Access the global current student
-
-    # Retrieve the lesson_id for Quad Digit Subtraction
-    connection, cursor = get_database_cursor()
-    cursor.execute("SELECT lesson_id FROM lessons WHERE title = ?", ('Quad Digit Subtraction',))
-    result = cursor.fetchone()
-    
-    if result:
-        subtraction_lesson_id = result[0]
-    else:
-        log_entry = create_log_message("Quad Digit Subtraction lesson not found in the database.")
-        log_message(log_entry)
-        cursor.close()
-        connection.close()
-        return 0, 0, 0  # No questions asked, no correct answers, no time taken
-
-    cursor.close()
-    connection.close()
-
-    # Display the introductory message
-    screen.fill(screen_color)
-    draw_text(
-        "Let's work on Quad-Digit Subtraction!",
-        font,
-        text_color,
-        x=0,
-        y=HEIGHT * 0.4,
-        max_width=WIDTH * 0.95,
-        center=True,
-        enable_shadow=True,
-        # shadow_color=shadow_color
-    )
-
-    draw_and_wait_continue_button()
-
-    # Start the lesson timer
-    lesson_start_time = time.time()
-
-    correct_answers = 0
-    problem_count = 0
-    total_questions = 5
-    completion_times = []
-
-    clock = pygame.time.Clock()
-
-    while problem_count < total_questions:
-        num1, num2, answer = generate_math_problem(1000, 9999, operation="sub")
-        user_input = ""
-        first_input = True
-        question_complete = False
-
-        # Start the timer for the question
-        start_time = time.time()
-
-        while not question_complete:
-            screen.fill(screen_color)
-
-            # Draw the math problem
-            display_math_problem(num1, num2, user_input, first_input, operation="sub")
-
-            pygame.display.flip()
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if (event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER) and user_input.isdigit():
-                        end_time = time.time()
-                        time_taken = round(end_time - start_time, 1)
-                        completion_times.append(time_taken)
-
-                        if int(user_input) == answer:
-                            correct_answers += 1
-
-                            if time_taken < 3:
-                                display_result("CORRECT!", "assets/images/fast_cats", use_lightning=True)
-                            else:
-                                display_result("CORRECT!", "assets/images/cats", use_lightning=False)
-                        else:
-                            display_result(f"Sorry, the answer is {answer}")
-
-                        pygame.event.clear()
-                        problem_count += 1
-                        question_complete = True
-                    elif event.key == pygame.K_BACKSPACE:
-                        user_input = user_input[:-1]
-                    elif event.unicode.isdigit() and len(user_input) < 5:  # Limit input to five digits
-                        user_input += event.unicode
-                        first_input = False
-
-            clock.tick(60)
-
-    # End of lesson timer
-    lesson_end_time = time.time()
-
-    if completion_times:
-        average_time = round(sum(completion_times) / len(completion_times), 1)
-    else:
-        average_time = 0
-
-    try:
-        add_session_lesson(
-            session_id,
-            subtraction_lesson_id,
-            lesson_start_time,
-            lesson_end_time,
-            total_questions,
-            correct_answers
-        )
-    except Exception as e:
-        log_entry = create_log_message(f"Error recording session lesson: {e}")
-        log_message(log_entry)
-        return total_questions, correct_answers, average_time
-
-    screen.fill(screen_color)
-
-    final_message = f"Final Score: {correct_answers}/{total_questions}"
-    draw_text(final_message, font, text_color, WIDTH // 2, HEIGHT * 0.25, center=True, enable_shadow=True)
-
-    if completion_times:
-        average_time_message = f"Average Time: {average_time} seconds"
-        draw_text(average_time_message, font, text_color, WIDTH // 2, HEIGHT * 0.6, center=True, enable_shadow=True, max_width=WIDTH)
-
-    if correct_answers == total_questions:
-        draw_text("Perfect score!", font, text_color, WIDTH // 2, HEIGHT * 0.35, center=True, enable_shadow=True)
-        
-        if average_time < 3.0:
-            draw_text("MASTERY!", font, text_color, WIDTH // 2, HEIGHT * 0.80, center=True, enable_shadow=True)
-
-    draw_and_wait_continue_button()
-    
-    if correct_answers == total_questions:
-        bonus_game_selector()
-
-    return total_questions, correct_answers, average_time
-
-
-def subtraction_borrowing(session_id):
-    """Presents a double-digit subtraction quiz with borrowing and updates the session results."""
-    global current_student  # Access the global current student
-
-    # Retrieve the lesson_id for Subtraction with Borrowing
-    connection, cursor = get_database_cursor()
-    cursor.execute("SELECT lesson_id FROM lessons WHERE title = ?", ('Subtraction Borrowing',))
-    result = cursor.fetchone()
-    
-    if result:
-        subtraction_lesson_id = result[0]
-    else:
-        log_entry = create_log_message("Subtraction Borrowing lesson not found in the database.")
-        log_message(log_entry)
-        cursor.close()
-        connection.close()
-        return 0, 0, None  # Return default values if lesson ID not found
-
-    cursor.close()
-    connection.close()
-
-    # Check if the student got a perfect score on this lesson yesterday
-    perfect_score_yesterday = perfect_score_lesson_skip(current_student, 'Subtraction Borrowing')
-    
-    # Log the result of the perfect score check
-    today = datetime.now().date()
-    yesterday = today - timedelta(days=1)
-    log_entry = create_log_message(
-        f"Student: {current_student}, Lesson: 'Subtraction Borrowing', "
-        f"Date: {yesterday}, 100%: {'Yes' if perfect_score_yesterday else 'No'}"
-    )
-    log_message(log_entry)
-
-    # Display the introductory message
-    screen.fill(screen_color)
-    draw_text(
-        "Let's work on Subtraction Borrowing!",
-        font,
-        text_color,
-        x=0,
-        y=HEIGHT * 0.4,
-        max_width=WIDTH * 0.95,
-        center=True,
-        enable_shadow=True
-    )
-
-    # Draw the "Continue..." and, if applicable, "Skip..." buttons
-    continue_rect = draw_continue_button()
-    skip_rect = None
-    if perfect_score_yesterday:
-        skip_rect = draw_skip_button()
-    pygame.display.flip()
-
-    # Event loop to wait for the "Continue..." or "Skip..." button click
-    waiting = True
-    skip_clicked = False
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = pygame.mouse.get_pos()
-                if continue_rect.collidepoint(mouse_pos):
-                    waiting = False
-                elif skip_rect and skip_rect.collidepoint(mouse_pos):
-                    log_entry = create_log_message("skip clicked")
-                    log_message(log_entry)
-                    skip_clicked = True
-                    waiting = False
-
-    # If skip was clicked, record session with NULL values for scores and return early
-    if skip_clicked:
-        try:
-            connection, cursor = get_database_cursor()
-            
-            # Format the current time to match the desired format without microseconds
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            # Insert the session lesson with NULL values for performance metrics
-            cursor.execute('''
-                INSERT INTO session_lessons (
-                    session_id, lesson_id, start_time, end_time,
-                    total_time, questions_asked, questions_correct, avg_time_per_question, percent_correct
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                session_id, subtraction_lesson_id, current_time, current_time,
-                None, None, None, None, None  # NULL values for performance metrics
-            ))
-            
-            connection.commit()
-            log_entry = create_log_message("Session recorded as skipped with NULL values.")
-            log_message(log_entry)
-
-        except sqlite3.Error as e:
-            log_entry = create_log_message(f"Error recording skipped session: {e}")
-            log_message(log_entry)
-            connection.rollback()
-        
-        finally:
-            cursor.close()
-            connection.close()
-        
-        return 0, 0, None  # Return default values if the lesson was skipped
-
-    # Start the lesson timer
-    lesson_start_time = time.time()
-
-    correct_answers = 0
-    problem_count = 0
-    total_questions = 5
-    completion_times = []
-
-    clock = pygame.time.Clock()
-
-    while problem_count < total_questions:
-        # Generate a subtraction problem that requires borrowing
-        num1, num2, answer = generate_borrowing_problem()
-        user_input = ""
-        first_input = True
-        question_complete = False
-
-        # Start the timer for the question
-        start_time = time.time()
-
-        while not question_complete:
-            screen.fill(screen_color)
-            display_math_problem(num1, num2, user_input, first_input, operation="sub")
-            pygame.display.flip()
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if (event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER) and user_input.isdigit():
-                        end_time = time.time()
-                        time_taken = round(end_time - start_time, 1)
-                        completion_times.append(time_taken)
-
-                        if int(user_input) == answer:
-                            correct_answers += 1
-
-                            if time_taken < 3:
-                                display_result("CORRECT!", "assets/images/fast_cats", use_lightning=True)
-                            else:
-                                display_result("CORRECT!", "assets/images/cats", use_lightning=False)
-                        else:
-                            display_result(f"Sorry, the answer is {answer}")
-
-                        pygame.event.clear()
-                        problem_count += 1
-                        question_complete = True
-                    elif event.key == pygame.K_BACKSPACE:
-                        user_input = user_input[:-1]
-                    elif event.unicode.isdigit() and len(user_input) < 2:  # Limit input to two digits
-                        user_input += event.unicode
-                        first_input = False
-
-            clock.tick(60)
-
-    # End of lesson timer
-    lesson_end_time = time.time()
-
-    if completion_times:
-        average_time = round(sum(completion_times) / len(completion_times), 1)
-    else:
-        average_time = 0
-
-    try:
-        add_session_lesson(
-            session_id,
-            subtraction_lesson_id,
-            lesson_start_time,
-            lesson_end_time,
-            total_questions,
-            correct_answers
-        )
-    except Exception as e:
-        log_entry = create_log_message(f"Error recording session lesson: {e}")
-        log_message(log_entry)
-        return total_questions, correct_answers, average_time
-
-    screen.fill(screen_color)
-
-    final_message = f"Final Score: {correct_answers}/{total_questions}"
-    draw_text(final_message, font, text_color, WIDTH // 2, HEIGHT * 0.25, center=True, enable_shadow=True)
-
-    if completion_times:
-        average_time_message = f"Average Time: {average_time} seconds"
-        draw_text(average_time_message, font, text_color, WIDTH // 2, HEIGHT * 0.6, center=True, enable_shadow=True, max_width=WIDTH)
-
-    if correct_answers == total_questions:
-        draw_text("Perfect score!", font, text_color, WIDTH // 2, HEIGHT * 0.35, center=True, enable_shadow=True)
-        
-        if average_time < 3.0:
-            draw_text("MASTERY!", font, text_color, WIDTH // 2, HEIGHT * 0.80, center=True, enable_shadow=True)
-
-    draw_and_wait_continue_button()
-    
-    if correct_answers == total_questions:
-        bonus_game_selector()
-
-    return total_questions, correct_answers, average_time
-
-
-def generate_borrowing_problem():
-    """Generates a double-digit subtraction problem that requires borrowing."""
-    # Generate num1 ensuring it does not end in 9
-    num1 = random.randint(10, 99)
-    while num1 % 10 == 9:
-        num1 = random.randint(10, 99)
-
-    # Generate num2 ensuring it ends with a larger digit than num1 and is less than num1
-    num2 = random.randint(1, num1 - 1)
-    while (num2 % 10) <= (num1 % 10):
-        num2 = random.randint(1, num1 - 1)
-
-    answer = num1 - num2
-    return num1, num2, answer
-
-
-def single_digit_multiplication(session_id):
-    """Presents a single-digit multiplication quiz with random numbers and updates the session results."""
-    global current_student  # Access the global current student
-
-    log_message(create_log_message("Single digit multiplication begins."))
-    
-    # Retrieve the lesson_id for Single Digit Multiplication
-    connection, cursor = get_database_cursor()
-    cursor.execute("SELECT lesson_id FROM lessons WHERE title = ?", ('Single Digit Multiplication',))
-    result = cursor.fetchone()
-    
-    if result:
-        multiplication_lesson_id = result[0]
-    else:
-        log_entry = create_log_message("Single Digit Multiplication lesson not found in the database.")
-        log_message(log_entry)
-        cursor.close()
-        connection.close()
-        return 0, 0, None  # Return default values if lesson ID not found
-
-    cursor.close()
-    connection.close()
-
-    # Check if the student got a perfect score on this lesson yesterday
-    perfect_score_yesterday = perfect_score_lesson_skip(current_student, 'Single Digit Multiplication')
-    
-    # Log the result of the perfect score check
-    today = datetime.now().date()
-    yesterday = today - timedelta(days=1)
-    log_entry = create_log_message(
-        f"Student: {current_student}, Lesson: 'Single Digit Multiplication', "
-        f"Date: {yesterday}, 100%: {'Yes' if perfect_score_yesterday else 'No'}"
-    )
-    log_message(log_entry)
-
-    # Display the introductory message
-    screen.fill(screen_color)
-    draw_text(
-        "Let's work on Single-Digit Multiplication!",
-        font,
-        text_color,
-        x=0,
-        y=HEIGHT * 0.4,
-        max_width=WIDTH * 0.95,
-        center=True,
-        enable_shadow=True
-    )
-
-    # Draw the "Continue..." and, if applicable, "Skip..." buttons
-    continue_rect = draw_continue_button()
-    skip_rect = None
-    if perfect_score_yesterday:
-        skip_rect = draw_skip_button()
-    pygame.display.flip()
-
-    # Event loop to wait for the "Continue..." or "Skip..." button click
-    waiting = True
-    skip_clicked = False
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = pygame.mouse.get_pos()
-                if continue_rect.collidepoint(mouse_pos):
-                    waiting = False
-                elif skip_rect and skip_rect.collidepoint(mouse_pos):
-                    log_entry = create_log_message("skip clicked")
-                    log_message(log_entry)
-                    skip_clicked = True
-                    waiting = False
-
-    # If skip was clicked, record session with NULL values for scores and return early
-    if skip_clicked:
-        try:
-            connection, cursor = get_database_cursor()
-            
-            # Format the current time to match the desired format without microseconds
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            # Insert the session lesson with NULL values for performance metrics
-            cursor.execute('''
-                INSERT INTO session_lessons (
-                    session_id, lesson_id, start_time, end_time,
-                    total_time, questions_asked, questions_correct, avg_time_per_question, percent_correct
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                session_id, multiplication_lesson_id, current_time, current_time,
-                None, None, None, None, None  # NULL values for performance metrics
-            ))
-            
-            connection.commit()
-            log_entry = create_log_message("Session recorded as skipped with NULL values.")
-            log_message(log_entry)
-
-        except sqlite3.Error as e:
-            log_entry = create_log_message(f"Error recording skipped session: {e}")
-            log_message(log_entry)
-            connection.rollback()
-        
-        finally:
-            cursor.close()
-            connection.close()
-        
-        return 0, 0, None  # Return default values if the lesson was skipped
-
-    # Start the lesson timer
-    lesson_start_time = time.time()
-
-    correct_answers = 0
-    problem_count = 0
-    total_questions = 5
-    completion_times = []
-
-    clock = pygame.time.Clock()
-
-    while problem_count < total_questions:
-        num1, num2, answer = generate_math_problem(1, 9, operation="mul")
-        user_input = ""
-        first_input = True
-        question_complete = False
-
-        # Start the timer for the question
-        start_time = time.time()
-
-        while not question_complete:
-            screen.fill(screen_color)
-            display_math_problem(num1, num2, user_input, first_input, operation="mul")
-            pygame.display.flip()
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if (event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER) and user_input.isdigit():
-                        end_time = time.time()
-                        time_taken = round(end_time - start_time, 1)
-                        completion_times.append(time_taken)
-
-                        if int(user_input) == answer:
-                            correct_answers += 1
-
-                            if time_taken < 3:
-                                display_result("CORRECT!", "assets/images/fast_cats", use_lightning=True)
-                            else:
-                                display_result("CORRECT!", "assets/images/cats", use_lightning=False)
-                        else:
-                            display_result(f"Sorry, the answer is {answer}")
-
-                        pygame.event.clear()
-                        problem_count += 1
-                        question_complete = True
-                    elif event.key == pygame.K_BACKSPACE:
-                        user_input = user_input[:-1]
-                    elif event.unicode.isdigit() and len(user_input) < 2:  # Limit input to two digits
-                        user_input += event.unicode
-                        first_input = False
-
-            clock.tick(60)
-
-    # End of lesson timer
-    lesson_end_time = time.time()
-
-    if completion_times:
-        average_time = round(sum(completion_times) / len(completion_times), 1)
-    else:
-        average_time = 0
-
-    try:
-        add_session_lesson(
-            session_id,
-            multiplication_lesson_id,
-            lesson_start_time,
-            lesson_end_time,
-            total_questions,
-            correct_answers
-        )
-    except Exception as e:
-        log_entry = create_log_message(f"Error recording session lesson: {e}")
-        log_message(log_entry)
-        return total_questions, correct_answers, average_time
-
-    screen.fill(screen_color)
-
-    final_message = f"Final Score: {correct_answers}/{total_questions}"
-    draw_text(final_message, font, text_color, WIDTH // 2, HEIGHT * 0.25, center=True, enable_shadow=True)
-
-    if completion_times:
-        average_time_message = f"Average Time: {average_time} seconds"
-        draw_text(average_time_message, font, text_color, WIDTH // 2, HEIGHT * 0.6, center=True, enable_shadow=True, max_width=WIDTH)
-
-    if correct_answers == total_questions:
-        draw_text("Perfect score!", font, text_color, WIDTH // 2, HEIGHT * 0.35, center=True, enable_shadow=True)
-        
-        if average_time < 3.0:
-            draw_text("MASTERY!", font, text_color, WIDTH // 2, HEIGHT * 0.80, center=True, enable_shadow=True)
-
-    draw_and_wait_continue_button()
-    
-    if correct_answers == total_questions:
-        bonus_game_selector()
-
-    return total_questions, correct_answers, average_time
-
-
-def single_by_double_multiplication(session_id):
-    """Presents a single-by-double-digit multiplication quiz and updates the session results."""
-    global current_student  # Access the global current student
-
-    # Retrieve the lesson_id for Single by Double Digit Multiplication
-    connection, cursor = get_database_cursor()
-    cursor.execute("SELECT lesson_id FROM lessons WHERE title = ?", ('Single by Double Digit Multiplication',))
-    result = cursor.fetchone()
-    
-    if result:
-        multiplication_lesson_id = result[0]
-    else:
-        log_entry = create_log_message("Single by Double Digit Multiplication lesson not found in the database.")
-        log_message(log_entry)
-        cursor.close()
-        connection.close()
-        return 0, 0, None  # Return default values if lesson ID not found
-
-    cursor.close()
-    connection.close()
-
-    # Check if the student got a perfect score on this lesson yesterday
-    perfect_score_yesterday = perfect_score_lesson_skip(current_student, 'Single by Double Digit Multiplication')
-    
-    # Log the result of the perfect score check
-    today = datetime.now().date()
-    yesterday = today - timedelta(days=1)
-    log_entry = create_log_message(
-        f"Student: {current_student}, Lesson: 'Single by Double Digit Multiplication', "
-        f"Date: {yesterday}, 100%: {'Yes' if perfect_score_yesterday else 'No'}"
-    )
-    log_message(log_entry)
-
-    # Display the introductory message
-    screen.fill(screen_color)
-    draw_text(
-        "Let's work on Single by Double-Digit Multiplication!",
-        font,
-        text_color,
-        x=0,
-        y=HEIGHT * 0.4,
-        max_width=WIDTH * 0.95,
-        center=True,
-        enable_shadow=True
-    )
-
-    # Draw the "Continue..." and, if applicable, "Skip..." buttons
-    continue_rect = draw_continue_button()
-    skip_rect = None
-    if perfect_score_yesterday:
-        skip_rect = draw_skip_button()
-    pygame.display.flip()
-
-    # Event loop to wait for the "Continue..." or "Skip..." button click
-    waiting = True
-    skip_clicked = False
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = pygame.mouse.get_pos()
-                if continue_rect.collidepoint(mouse_pos):
-                    waiting = False
-                elif skip_rect and skip_rect.collidepoint(mouse_pos):
-                    log_entry = create_log_message("skip clicked")
-                    log_message(log_entry)
-                    skip_clicked = True
-                    waiting = False
-
-    # If skip was clicked, record session with NULL values for scores and return early
-    if skip_clicked:
-        try:
-            connection, cursor = get_database_cursor()
-            
-            # Format the current time to match the desired format without microseconds
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            # Insert the session lesson with NULL values for performance metrics
-            cursor.execute('''
-                INSERT INTO session_lessons (
-                    session_id, lesson_id, start_time, end_time,
-                    total_time, questions_asked, questions_correct, avg_time_per_question, percent_correct
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                session_id, multiplication_lesson_id, current_time, current_time,
-                None, None, None, None, None  # NULL values for performance metrics
-            ))
-            
-            connection.commit()
-            log_entry = create_log_message("Session recorded as skipped with NULL values.")
-            log_message(log_entry)
-
-        except sqlite3.Error as e:
-            log_entry = create_log_message(f"Error recording skipped session: {e}")
-            log_message(log_entry)
-            connection.rollback()
-        
-        finally:
-            cursor.close()
-            connection.close()
-        
-        return 0, 0, None  # Return default values if the lesson was skipped
-
-    # Start the lesson timer
-    lesson_start_time = time.time()
-
-    correct_answers = 0
-    problem_count = 0
-    total_questions = 5
-    completion_times = []
-
-    clock = pygame.time.Clock()
-
-    while problem_count < total_questions:
-        # Generate the multiplication problem with one number in range 10-99 and the other in range 1-9
-        num1 = random.randint(10, 99)
-        num2 = random.randint(1, 9)
-        answer = num1 * num2
-
-        user_input = ""
-        first_input = True
-        question_complete = False
-
-        # Start the timer for the question
-        start_time = time.time()
-
-        while not question_complete:
-            screen.fill(screen_color)
-            display_math_problem(num1, num2, user_input, first_input, operation="mul")
-            pygame.display.flip()
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if (event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER) and user_input.isdigit():
-                        end_time = time.time()
-                        time_taken = round(end_time - start_time, 1)
-                        completion_times.append(time_taken)
-
-                        if int(user_input) == answer:
-                            correct_answers += 1
-
-                            if time_taken < 3:
-                                display_result("CORRECT!", "assets/images/fast_cats", use_lightning=True)
-                            else:
-                                display_result("CORRECT!", "assets/images/cats", use_lightning=False)
-                        else:
-                            display_result(f"Sorry, the answer is {answer}")
-
-                        pygame.event.clear()
-                        problem_count += 1
-                        question_complete = True
-                    elif event.key == pygame.K_BACKSPACE:
-                        user_input = user_input[:-1]
-                    elif event.unicode.isdigit() and len(user_input) < 3:  # Limit input to three digits
-                        user_input += event.unicode
-                        first_input = False
-
-            clock.tick(60)
+    Methods:
+    --------
+    layout(problem):
+        Draws the static parts of a problem onto static_layer and sets input_anchors.
+    format_inputs(user_input, first_input):
+        Returns the text of each answer label.
+    draw(problem, user_input, first_input, surface=None):
+        Draws the problem with the student's answer so far.
+    """
+    def __init__(self):
+        self.layout_key = None
+        self.static_layer = None
+        self.static_position = (0, 0)
+        self.input_anchors = []
+        self.input_texts = None
+        self.input_labels = []
+
+    def layout(self, problem):
+        """Draws the static parts of a problem onto static_layer and sets input_anchors."""
+        pass
+
+    def format_inputs(self, user_input, first_input):
+        """Returns the text of each answer label, "?" until the student starts typing."""
+        return ("?" if first_input else str(user_input),)
+
+    def render_input(self, text, anchor):
+        """Render one answer label and return it with its position."""
+        x, y, attachment, shadowed = anchor
+        text_rect = pygame.Rect((0, 0), font.size(text))
+        setattr(text_rect, attachment, (x, y))
+        # Labels are opaque so each frame is plain blits; the padding holds the shadow
+        label = pygame.Surface((text_rect.width + 2, text_rect.height + 2)).convert()
+        label.fill(screen_color)
+        if shadowed:
+            label.blit(font.render(text, True, shadow_color), (2, 2))
+        label.blit(font.render(text, True, text_color), (0, 0))
+        return label, text_rect.topleft
+
+    def draw(self, problem, user_input, first_input, surface=None):
+        """
+        Draw the problem with the student's answer so far.
 
-    # End of lesson timer
-    lesson_end_time = time.time()
+        Parameters:
+            problem (tuple): The values that define the problem's static parts.
+            user_input: The student's input, as passed to format_inputs.
+            first_input (bool): Whether the student has not typed anything yet.
+            surface (pygame.Surface): The surface to draw on (defaults to the screen).
+        """
+        if surface is None:
+            surface = screen
+
+        layout_key = (problem, WIDTH, HEIGHT, font, screen_color, text_color, shadow_color)
+        if layout_key != self.layout_key:
+            # Draw over the background color so anti-aliasing matches, then crop
+            # the layer to the pixels that differ from the background
+            self.static_layer = pygame.Surface((WIDTH, HEIGHT)).convert()
+            self.static_layer.fill(screen_color)
+            self.layout(problem)
+            self.static_layer.set_colorkey(screen_color)
+            bounds = self.static_layer.get_bounding_rect()
+            self.static_layer.set_colorkey(None)
+            self.static_layer = self.static_layer.subsurface(bounds).copy()
+            self.static_position = bounds.topleft
+            self.layout_key = layout_key
+            self.input_texts = None
+
+        input_texts = self.format_inputs(user_input, first_input)
+        if input_texts != self.input_texts:
+            self.input_labels = [self.render_input(text, anchor) for text, anchor in zip(input_texts, self.input_anchors)]
+            self.input_texts = input_texts
+
+        surface.fill(screen_color)
+        surface.blit(self.static_layer, self.static_position)
+        for label, position in self.input_labels:
+            surface.blit(label, position)
+
+
+class ColumnArithmeticWidget(ProblemWidget):
+    """Whole-number column arithmetic, e.g. 27 over + 15 with the answer under a rule."""
+    min_line_width = 150  # Minimum answer line width
+
+    def layout(self, problem):
+        num1, num2, operation = problem
+        layer = self.static_layer
+
+        # Dynamically calculate positions based on screen size
+        right_x = WIDTH * 0.55  # Right edge for alignment
+        num1_y = HEIGHT * 0.4
+        num2_y = HEIGHT * 0.5
+        line_y = HEIGHT * 0.60
+        sum_y = HEIGHT * 0.65
+
+        operator_sign = {"add": "+", "sub": "-", "mul": "×"}.get(operation)
+        if operator_sign is None:
+            raise ValueError("Unsupported operation. Use 'add', 'sub', or 'mul'.")
+
+        # Both numbers are right-aligned; the operator sits left of num1's width
+        num1_width = font.size(str(num1))[0]
+        num2_width = font.size(str(num2))[0]
+        draw_text(str(num1), font, text_color, right_x - num1_width, num1_y, layer, enable_shadow=True)
+        draw_text(operator_sign, font, text_color, right_x - num1_width - WIDTH * 0.1, num2_y, layer, enable_shadow=True)
+        draw_text(str(num2), font, text_color, right_x - num2_width, num2_y, layer, enable_shadow=True)
+
+        # The answer line is at least min_line_width wide, with a drop shadow
+        max_width = max(num1_width, num2_width, font.size(str(num1 + num2))[0])
+        line_width = max(max_width * 1.5, self.min_line_width)
+        shadow_offset = 2
+        pygame.draw.line(layer, shadow_color,
+                         (right_x * 1.05 - line_width + shadow_offset, line_y + shadow_offset),
+                         (right_x * 1.05 + shadow_offset, line_y + shadow_offset), 3)
+        pygame.draw.line(layer, text_color, (right_x * 1.05 - line_width, line_y), (right_x * 1.05, line_y), 3)
+
+        self.input_anchors = [(right_x, sum_y, "topright", True)]
+
+
+class FractionSumWidget(ProblemWidget):
+    """Addition of two fractions with the same denominator, answered as 'n/d'."""
+    def layout(self, problem):
+        numerator1, numerator2, denominator, line_length_factor = problem
+        layer = self.static_layer
+
+        right_x = WIDTH * 0.55  # Right edge for alignment
+        num1_y = HEIGHT * 0.35
+        num2_y = HEIGHT * 0.5
+        line_y = HEIGHT * 0.57
+        sum_y = HEIGHT * 0.63
+
+        # Both fractions are right-aligned, with the plus sign left of the first
+        fraction1_surface = font.render(f"{numerator1}/{denominator}", True, text_color)
+        fraction2_surface = font.render(f"{numerator2}/{denominator}", True, text_color)
+        plus_surface = font.render("+", True, text_color)
+        layer.blit(fraction1_surface, fraction1_surface.get_rect(right=right_x, centery=num1_y))
+        layer.blit(plus_surface, plus_surface.get_rect(right=right_x - fraction1_surface.get_width() - WIDTH * 0.05, centery=num2_y))
+        layer.blit(fraction2_surface, fraction2_surface.get_rect(right=right_x, centery=num2_y))
+
+        answer_width = font.size(f"{numerator1 + numerator2}/{denominator}")[0]
+        line_width = max(fraction1_surface.get_width(), fraction2_surface.get_width(), answer_width) * line_length_factor
+        pygame.draw.line(layer, text_color, (right_x - line_width, line_y), (right_x, line_y), 3)
+
+        self.input_anchors = [(right_x, sum_y, "midright", False)]
+
+
+class LowestCommonDenominatorWidget(ProblemWidget):
+    """Two fractions with different denominators, answered with their LCD."""
+    def layout(self, problem):
+        numerator1, denominator1, numerator2, denominator2, line_length_factor = problem
+        layer = self.static_layer
+
+        right_x = WIDTH * 0.55  # Right edge for alignment
+        num1_y = HEIGHT * 0.35
+        num2_y = HEIGHT * 0.5
+        line_y = HEIGHT * 0.57
+        sum_y = HEIGHT * 0.63
+
+        fraction1_surface = font.render(f"{numerator1}/{denominator1}", True, text_color)
+        fraction2_surface = font.render(f"{numerator2}/{denominator2}", True, text_color)
+        plus_surface = font.render("+", True, text_color)
+        layer.blit(fraction1_surface, fraction1_surface.get_rect(right=right_x, centery=num1_y))
+        layer.blit(plus_surface, plus_surface.get_rect(right=right_x - fraction1_surface.get_width() - WIDTH * 0.05, centery=num2_y))
+        layer.blit(fraction2_surface, fraction2_surface.get_rect(right=right_x, centery=num2_y))
+
+        line_width = max(fraction1_surface.get_width(), fraction2_surface.get_width()) * line_length_factor
+        pygame.draw.line(layer, text_color, (right_x - line_width, line_y), (right_x, line_y), 3)
+
+        self.input_anchors = [(right_x, sum_y, "midright", False)]
+
+
+class EquivalentFractionWidget(ProblemWidget):
+    """Two fractions stacked in the center, with a label for each converted numerator."""
+    def layout(self, problem):
+        numerator1, denominator1, numerator2, denominator2 = problem
+
+        center_x = WIDTH // 2
+        sum_y = HEIGHT * 0.63
+        draw_text(f"{numerator1}/{denominator1}", font, text_color, center_x, HEIGHT * 0.35, self.static_layer, center=True)
+        draw_text(f"{numerator2}/{denominator2}", font, text_color, center_x, HEIGHT * 0.5, self.static_layer, center=True)
+
+        self.input_anchors = [(center_x, sum_y - 30, "midtop", False), (center_x, sum_y + 30, "midtop", False)]
+
+    def format_inputs(self, user_input, first_input):
+        user_input1, user_input2 = user_input
+        if first_input:
+            return "?", "?"
+        return str(user_input1), str(user_input2)
+
+
+# One widget per problem style, reused from question to question
+column_arithmetic_widget = ColumnArithmeticWidget()
+fraction_sum_widget = FractionSumWidget()
+lowest_common_denominator_widget = LowestCommonDenominatorWidget()
+equivalent_fraction_widget = EquivalentFractionWidget()
 
-    if completion_times:
-        average_time = round(sum(completion_times) / len(completion_times), 1)
-    else:
-        average_time = 0
 
-    try:
-        add_session_lesson(
-            session_id,
-            multiplication_lesson_id,
-            lesson_start_time,
-            lesson_end_time,
-            total_questions,
-            correct_answers
-        )
-    except Exception as e:
-        log_entry = create_log_message(f"Error recording session lesson: {e}")
-        log_message(log_entry)
-        return total_questions, correct_answers, average_time
+def display_math_problem(num1, num2, user_input, first_input, operation="add"):
+    """
+    Draw a column arithmetic problem with the student's answer so far. The caller
+    presents the frame.
 
-    screen.fill(screen_color)
+    Parameters:
+        num1 (int): The first number.
+        num2 (int): The second number.
+        user_input (str): The digits typed so far.
+        first_input (bool): Whether to show "?" because nothing has been typed yet.
+        operation (str): "add", "sub" or "mul".
+    """
+    column_arithmetic_widget.draw((num1, num2, operation), user_input, first_input)
 
-    final_message = f"Final Score: {correct_answers}/{total_questions}"
-    draw_text(final_message, font, text_color, WIDTH // 2, HEIGHT * 0.25, center=True, enable_shadow=True)
+class GeneratedProblemSource:
+    """
+    Problem source with the same interface as AdaptiveMathGenerator for lessons
+    whose problems come from a plain generator function, e.g. generate_borrowing_problem.
+    """
+    def __init__(self, generator, *args):
+        self.generator = generator
+        self.args = args
 
-    if completion_times:
-        average_time_message = f"Average Time: {average_time} seconds"
-        draw_text(average_time_message, font, text_color, WIDTH // 2, HEIGHT * 0.6, center=True, enable_shadow=True, max_width=WIDTH)
+    def next_problem(self):
+        return self.generator(*self.args)
 
-    if correct_answers == total_questions:
-        draw_text("Perfect score!", font, text_color, WIDTH // 2, HEIGHT * 0.35, center=True, enable_shadow=True)
-        
-        if average_time < 3.0:
-            draw_text("MASTERY!", font, text_color, WIDTH // 2, HEIGHT * 0.80, center=True, enable_shadow=True)
+    def record(self, *outcome):
+        pass
 
-    draw_and_wait_continue_button()
-    
-    if correct_answers == total_questions:
-        bonus_game_selector()
+    def save(self):
+        pass
 
-    return total_questions, correct_answers, average_time
 
+class IntegerProblemFormat:
+    """
+    Column arithmetic answered with a whole number and drawn by display_math_problem.
 
-def double_digit_multiplication(session_id):
-    """Presents a double-digit multiplication quiz and updates the session results."""
-    global current_student  # Access the global current student
+    Every problem format offers the same methods, so run_arithmetic_quiz can ask,
+    draw and mark any of them: problem_source, render, prompt, accept_key,
+    can_submit, check, record and correction.
 
-    # Retrieve the lesson_id for Double Digit Multiplication
-    connection, cursor = get_database_cursor()
-    cursor.execute("SELECT lesson_id FROM lessons WHERE title = ?", ('Double Digit Multiplication',))
-    result = cursor.fetchone()
-    
-    if result:
-        multiplication_lesson_id = result[0]
-    else:
-        log_entry = create_log_message("Double Digit Multiplication lesson not found in the database.")
-        log_message(log_entry)
-        cursor.close()
-        connection.close()
-        return 0, 0, 0  # No questions asked, no correct answers, no time taken
+    Attributes:
+    -----------
+    operation : str
+        "add", "sub" or "mul".
+    first_range : tuple
+        The (min, max) of the first operand.
+    second_range : tuple
+        The (min, max) of the second operand.
+    generator : callable
+        A function returning (num1, num2, answer), used instead of the adaptive
+        generator when set (optional).
+    max_input_length : int
+        The most digits the student can type, by default the digits of the largest answer.
+    """
+    def __init__(self, operation="add", first_range=(1, 9), second_range=None, generator=None, max_input_length=None):
+        self.operation = operation
+        self.first_range = first_range
+        self.second_range = second_range or first_range
+        self.generator = generator
+        if max_input_length is None:
+            if operation == "sub":
+                largest_answer = first_range[1] - self.second_range[0]
+            else:
+                largest_answer = calculate_math_answer(first_range[1], self.second_range[1], operation)
+            max_input_length = len(str(largest_answer))
+        self.max_input_length = max_input_length
+
+    def problem_source(self, session_id):
+        """Return the source the lesson's problems are drawn from."""
+        if self.generator:
+            return GeneratedProblemSource(self.generator)
+        second_range = self.second_range if self.second_range != self.first_range else None
+        return get_math_problem_source(session_id, *self.first_range, operation=self.operation, second_range=second_range)
+
+    def render(self, problem, user_input, first_input):
+        """Draw the problem with the student's answer so far."""
+        num1, num2, _ = problem
+        display_math_problem(num1, num2, user_input, first_input, self.operation)
+
+    def prompt(self, problem):
+        """Return the problem as text for the answer log."""
+        num1, num2, _ = problem
+        return format_math_prompt(num1, num2, self.operation)
+
+    def accept_key(self, user_input, character):
+        """Return the input with a typed character added, or None if it is not allowed."""
+        if character.isdigit() and len(user_input) < self.max_input_length:
+            return user_input + character
+        return None
 
-    cursor.close()
-    connection.close()
+    def can_submit(self, user_input):
+        """Return True once the input is complete enough to be marked."""
+        return user_input.isdigit()
 
-    # Display the introductory message
-    screen.fill(screen_color)
-    draw_text(
-        "Let's work on Double-Digit Multiplication!",
-        font,
-        text_color,
-        x=0,
-        y=HEIGHT * 0.4,
-        max_width=WIDTH * 0.95,
-        center=True,
-        enable_shadow=True,
-        # shadow_color=shadow_color
-    )
+    def check(self, problem, user_input):
+        """Return True if the input is the right answer. Raises ValueError if it cannot be read."""
+        return int(user_input) == problem[2]
 
-    draw_and_wait_continue_button()
+    def record(self, source, problem, correct, seconds):
+        """Tell the problem source how the student did on a problem."""
+        num1, num2, _ = problem
+        source.record(num1, num2, correct, seconds)
 
-    # Start the lesson timer
-    lesson_start_time = time.time()
+    def correction(self, problem):
+        """Return the message shown after a wrong answer."""
+        return f"Sorry, the answer is {problem[2]}"
 
-    correct_answers = 0
-    problem_count = 0
-    total_questions = 5
-    completion_times = []
 
-    clock = pygame.time.Clock()
+class FractionSumProblemFormat(IntegerProblemFormat):
+    """
+    Addition of two fractions with the same denominator, answered as 'n/d' and
+    drawn by display_fraction_problem.
+    """
+    def __init__(self, numerator_range=(1, 9), denominator=10, max_part_length=2):
+        self.numerator_range = numerator_range
+        self.denominator = denominator
+        self.max_part_length = max_part_length
+
+    def problem_source(self, session_id):
+        return GeneratedProblemSource(generate_fraction_problem, *self.numerator_range, self.denominator)
+
+    def render(self, problem, user_input, first_input):
+        numerator1, numerator2, denominator, _ = problem
+        display_fraction_problem(numerator1, numerator2, denominator, user_input, first_input)
+
+    def prompt(self, problem):
+        numerator1, numerator2, denominator, _ = problem
+        return f"{numerator1}/{denominator} + {numerator2}/{denominator}"
+
+    def accept_key(self, user_input, character):
+        if character.isdigit():
+            # Up to max_part_length digits on each side of the slash
+            if len(user_input.split("/")[-1]) < self.max_part_length:
+                return user_input + character
+        elif character == "/" and user_input and "/" not in user_input:
+            return user_input + "/"
+        return None
 
-    while problem_count < total_questions:
-        num1, num2, answer = generate_math_problem(10, 99, operation="mul")
-        user_input = ""
-        first_input = True
-        question_complete = False
+    def can_submit(self, user_input):
+        return "/" in user_input
 
-        # Start the timer for the question
-        start_time = time.time()
+    def check(self, problem, user_input):
+        _, _, denominator, answer_numerator = problem
+        numerator, answer_denominator = user_input.split("/")
+        if answer_denominator == "" or int(answer_denominator) == 0:
+            raise ValueError("Invalid denominator")
+        return fractions.Fraction(user_input) == fractions.Fraction(answer_numerator, denominator)
 
-        while not question_complete:
-            screen.fill(screen_color)
+    def record(self, source, problem, correct, seconds):
+        pass
 
-            # Draw the math problem
-            display_math_problem(num1, num2, user_input, first_input, operation="mul")
+    def correction(self, problem):
+        _, _, denominator, answer_numerator = problem
+        return f"Sorry, the answer is {answer_numerator}/{denominator}"
 
-            pygame.display.flip()
 
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if (event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER) and user_input.isdigit():
-                        end_time = time.time()
-                        time_taken = round(end_time - start_time, 1)
-                        completion_times.append(time_taken)
+class LowestCommonDenominatorProblemFormat(IntegerProblemFormat):
+    """
+    Finding the lowest common denominator of two fractions, answered with a whole
+    number and drawn by display_lcd_problem.
+    """
+    def __init__(self, numerator_range=(1, 9), denominator_range=(2, 12), max_input_length=3):
+        self.numerator_range = numerator_range
+        self.denominator_range = denominator_range
+        self.max_input_length = max_input_length
 
-                        if int(user_input) == answer:
-                            correct_answers += 1
+    def problem_source(self, session_id):
+        return GeneratedProblemSource(generate_lcd_problem, *self.numerator_range, *self.denominator_range)
 
-                            if time_taken < 3:
-                                display_result("CORRECT!", "assets/images/fast_cats", use_lightning=True)
-                            else:
-                                display_result("CORRECT!", "assets/images/cats", use_lightning=False)
-                        else:
-                            display_result(f"Sorry, the answer is {answer}")
+    def render(self, problem, user_input, first_input):
+        numerator1, denominator1, numerator2, denominator2, _ = problem
+        display_lcd_problem(numerator1, denominator1, numerator2, denominator2, user_input, first_input)
 
-                        pygame.event.clear()
-                        problem_count += 1
-                        question_complete = True
-                    elif event.key == pygame.K_BACKSPACE:
-                        user_input = user_input[:-1]
-                    elif event.unicode.isdigit() and len(user_input) < 5:  # Limit input to five digits
-                        user_input += event.unicode
-                        first_input = False
+    def prompt(self, problem):
+        numerator1, denominator1, numerator2, denominator2, _ = problem
+        return f"LCD {numerator1}/{denominator1} {numerator2}/{denominator2}"
 
-            clock.tick(60)
+    def check(self, problem, user_input):
+        return int(user_input) == problem[4]
 
-    # End of lesson timer
-    lesson_end_time = time.time()
+    def record(self, source, problem, correct, seconds):
+        pass
 
-    if completion_times:
-        average_time = round(sum(completion_times) / len(completion_times), 1)
-    else:
-        average_time = 0
+    def correction(self, problem):
+        return f"Sorry, the correct LCD is {problem[4]}"
 
-    try:
-        add_session_lesson(
-            session_id,
-            multiplication_lesson_id,
-            lesson_start_time,
-            lesson_end_time,
-            total_questions,
-            correct_answers
-        )
-    except Exception as e:
-        log_entry = create_log_message(f"Error recording session lesson: {e}")
-        log_message(log_entry)
-        return total_questions, correct_answers, average_time
 
-    screen.fill(screen_color)
+class ArithmeticQuizSpec:
+    """
+    A declarative description of an arithmetic lesson, run by run_arithmetic_quiz.
 
-    final_message = f"Final Score: {correct_answers}/{total_questions}"
-    draw_text(final_message, font, text_color, WIDTH // 2, HEIGHT * 0.25, center=True, enable_shadow=True)
+    Attributes:
+    -----------
+    lesson_title : str
+        The lesson's title in the lessons table.
+    intro_text : str
+        The message on the introduction screen.
+    problem_format : IntegerProblemFormat
+        How problems are drawn, asked, typed and marked.
+    total_questions : int
+        The number of questions in the lesson.
+    allow_skip : bool
+        Whether a "Skip..." button is offered after a perfect score yesterday.
+    fast_answer_seconds : float
+        Correct answers faster than this get the fast cats and lightning.
+    mastery_seconds : float
+        A perfect score with an average time below this shows "MASTERY!".
+    hover_particles : bool
+        Whether the intro and final screens animate particles under the mouse.
+    explanation : tuple
+        A (button text, function) pair for an explanation button on the intro (optional).
+    start_message : str
+        A message logged when the lesson starts (optional).
+    """
+    def __init__(self, lesson_title, intro_text, problem_format, total_questions=5, allow_skip=False,
+                 fast_answer_seconds=3, mastery_seconds=3.0, hover_particles=False, explanation=None,
+                 start_message=None):
+        self.lesson_title = lesson_title
+        self.intro_text = intro_text
+        self.problem_format = problem_format
+        self.total_questions = total_questions
+        self.allow_skip = allow_skip
+        self.fast_answer_seconds = fast_answer_seconds
+        self.mastery_seconds = mastery_seconds
+        self.hover_particles = hover_particles
+        self.explanation = explanation
+        self.start_message = start_message
+
+
+def record_skipped_lesson(session_id, lesson_id):
+    """
+    Record a skipped lesson in session_lessons with NULL performance metrics.
 
-    if completion_times:
-        average_time_message = f"Average Time: {average_time} seconds"
-        draw_text(average_time_message, font, text_color, WIDTH // 2, HEIGHT * 0.6, center=True, enable_shadow=True, max_width=WIDTH)
+    Parameters:
+        session_id (int): The ID of the session.
+        lesson_id (int): The ID of the skipped lesson.
+    """
+    connection, cursor = get_database_cursor()
+    try:
+        # Format the current time to match the desired format without microseconds
+        current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-    if correct_answers == total_questions:
-        draw_text("Perfect score!", font, text_color, WIDTH // 2, HEIGHT * 0.35, center=True, enable_shadow=True)
-        
-        if average_time < 3.0:
-            draw_text("MASTERY!", font, text_color, WIDTH // 2, HEIGHT * 0.80, center=True, enable_shadow=True)
+        cursor.execute('''
+            INSERT INTO session_lessons (
+                session_id, lesson_id, start_time, end_time,
+                total_time, questions_asked, questions_correct, avg_time_per_question, percent_correct
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            session_id, lesson_id, current_time, current_time,
+            None, None, None, None, None  # NULL values for performance metrics
+        ))
 
-    draw_and_wait_continue_button()
-    
-    if correct_answers == total_questions:
-        bonus_game_selector()
+        connection.commit()
+        log_message(create_log_message("Session recorded as skipped with NULL values."))
 
-    return total_questions, correct_answers, average_time
+    except sqlite3.Error as e:
+        log_message(create_log_message(f"Error recording skipped session: {e}"))
+        connection.rollback()
 
+    finally:
+        cursor.close()
+        connection.close()
 
-def generate_fraction_problem(numerator_min, numerator_max, denominator):
-    """Generates two fractions with the given denominator and returns the problem and the answer."""
-    numerator1 = random.randint(numerator_min, numerator_max)
-    numerator2 = random.randint(numerator_min, numerator_max)
-    
-    # The fractions will have the same denominator
-    answer_numerator = numerator1 + numerator2
 
-    return numerator1, numerator2, denominator, answer_numerator
+def emit_hover_particles(particles, position, count=3, lifetime=30):
+    """Add a small burst of particles at the mouse position."""
+    for _ in range(count):
+        particle = Particle(position[0], position[1], random.choice([shadow_color, text_color, screen_color]))
+        particle.lifetime = lifetime
+        angle = random.uniform(0, 2 * math.pi)
+        speed = random.uniform(1, 3)
+        particle.dx = math.cos(angle) * speed
+        particle.dy = math.sin(angle) * speed
+        particles.append(particle)
 
 
-def display_fraction_problem(numerator1, numerator2, denominator, user_input, first_input, line_length_factor=1.9):
-    screen.fill(screen_color)
-    
-    # Dynamically calculate positions based on screen size
-    right_x = WIDTH * 0.55  # Right edge for alignment
-    num1_y = HEIGHT * 0.35
-    num2_y = HEIGHT * 0.5
-    line_y = HEIGHT * 0.57
-    sum_y = HEIGHT * 0.63
+def update_hover_particles(particles):
+    """Move, draw and expire the hover particles."""
+    for particle in particles[:]:
+        particle.update()
+        particle.draw(screen)
+        if particle.is_expired():
+            particles.remove(particle)
 
-    # Draw the first fraction (right-aligned)
-    fraction1_str = f"{numerator1}/{denominator}"
-    fraction1_surface = font.render(fraction1_str, True, text_color)
-    fraction1_rect = fraction1_surface.get_rect(right=right_x, centery=num1_y)
-    screen.blit(fraction1_surface, fraction1_rect)
 
-    # Draw the plus sign (right-aligned with some offset)
-    plus_sign_x = right_x - fraction1_surface.get_width() - WIDTH * 0.05
-    plus_surface = font.render("+", True, text_color)
-    plus_rect = plus_surface.get_rect(right=plus_sign_x, centery=num2_y)
-    screen.blit(plus_surface, plus_rect)
+def show_arithmetic_quiz_intro(spec, perfect_score_yesterday):
+    """
+    Show a lesson's introduction until the student continues or skips.
 
-    # Draw the second fraction (right-aligned)
-    fraction2_str = f"{numerator2}/{denominator}"
-    fraction2_surface = font.render(fraction2_str, True, text_color)
-    fraction2_rect = fraction2_surface.get_rect(right=right_x, centery=num2_y)
-    screen.blit(fraction2_surface, fraction2_rect)
+    Parameters:
+        spec (ArithmeticQuizSpec): The lesson being introduced.
+        perfect_score_yesterday (bool): Whether to offer the "Skip..." button.
 
-    # Calculate line width with a factor
-    answer_str = f"{numerator1 + numerator2}/{denominator}"
-    line_width = max(fraction1_surface.get_width(), fraction2_surface.get_width(), font.size(answer_str)[0]) * line_length_factor
-    pygame.draw.line(screen, text_color, (right_x - line_width, line_y), (right_x, line_y), 3)
+    Returns:
+        bool: True if the student clicked "Skip...", False otherwise.
+    """
+    particles = []
+    frames_since_display = 0
 
-    # Draw the answer placeholder or the input from the user (right-aligned)
-    if first_input:
-        input_text = "?"  # Show "?" as the answer the student needs to enter
-    else:
-        input_text = user_input
+    while True:
+        screen.fill(screen_color)
 
-    input_surface = font.render(input_text, True, text_color)
-    input_rect = input_surface.get_rect(right=right_x, centery=sum_y)
-    screen.blit(input_surface, input_rect)
+        explanation_rect = None
+        if spec.explanation:
+            draw_text(spec.intro_text, font, text_color, x=0, y=HEIGHT * 0.1, max_width=WIDTH * 0.95, center=True, enable_shadow=True)
+            explanation_rect = draw_text(spec.explanation[0], font, text_color, x=0, y=HEIGHT * 0.7, center=True, enable_shadow=True, return_rect=True)
+        else:
+            draw_text(spec.intro_text, font, text_color, x=0, y=HEIGHT * 0.4, max_width=WIDTH * 0.95, center=True, enable_shadow=True)
 
-    pygame.display.flip()
+        continue_rect = draw_continue_button()
+        skip_rect = draw_skip_button() if perfect_score_yesterday else None
 
+        if spec.hover_particles and frames_since_display > 10:
+            # Highlight the hovered button and trail particles from the mouse
+            mouse_pos = pygame.mouse.get_pos()
+            if continue_rect.collidepoint(mouse_pos):
+                draw_text("Continue...", pygame.font.SysFont(current_font_name_or_path, int(get_dynamic_font_size() * 0.8)),
+                          shadow_color, x=WIDTH * 0.55, y=HEIGHT * 0.9, enable_shadow=True, shadow_color=shadow_color)
+                emit_hover_particles(particles, mouse_pos)
+            elif skip_rect and skip_rect.collidepoint(mouse_pos):
+                draw_skip_button(hovered_over=True)
+                emit_hover_particles(particles, mouse_pos)
+        update_hover_particles(particles)
 
-def display_same_denominator_explanation():
-    """
-    Display a multi-step explanation for adding fractions with the same denominator and why it's an important first step.
-    """
-    explanation_lines = [
-        "When adding fractions, they need to have the same denominator (bottom number).",
-        "Fractions like 3/4 and 5/4 can be added because they have the same denominator.",
-        "This lesson will help you practice adding fractions that already have the same denominator.",
-        "Once you've mastered this, you'll be ready for the next challenge: finding the Lowest Common Denominator.",
-        "This is an important step toward doing all fraction addition on your own!"
-    ]
-    
-    for line in explanation_lines:
-        screen.fill(screen_color)
-        draw_text(line, font, text_color, x=0, y=HEIGHT * 0.4, max_width=WIDTH * 0.95, center=True, enable_shadow=True)
         pygame.display.flip()
 
-        # Wait for a mouse click to move to the next explanation line
-        waiting = True
-        while waiting:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    waiting = False  # Move to the next line
+        # Static intros sleep until input; animated ones wake once per frame
+        for event in wait_for_input(fps=60 if spec.hover_particles else None):
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                if explanation_rect and explanation_rect.collidepoint(event.pos):
+                    spec.explanation[1]()
+                    return False
+                elif continue_rect.collidepoint(event.pos):
+                    return False
+                elif skip_rect and skip_rect.collidepoint(event.pos):
+                    log_message(create_log_message("skip clicked"))
+                    return True
 
+        frames_since_display += 1
 
-def single_denominator_addition_intro(session_id):
-    """
-    Display the initial introduction for the Single Denominator Addition quiz with
-    three clickable buttons: "What is Same Denominator?", "Continue", and "Skip" if applicable.
+
+def show_arithmetic_quiz_results(spec, correct_answers, average_time, answered):
     """
-    global current_student  # Access the global current student
+    Show the final score, average time and any perfect score or mastery message
+    until the student clicks "Continue...".
 
-    # Check if the student got a perfect score on this lesson yesterday
-    perfect_score_yesterday = perfect_score_lesson_skip(current_student, 'Single Denominator Fraction Addition')
-    
-    # Log the result of the perfect score check
-    today = datetime.now().date()
-    yesterday = today - timedelta(days=1)
-    log_entry = create_log_message(
-        f"Student: {current_student}, Lesson: 'Single Denominator Fraction Addition', "
-        f"Date: {yesterday}, 100%: {'Yes' if perfect_score_yesterday else 'No'}"
-    )
-    log_message(log_entry)
+    Parameters:
+        spec (ArithmeticQuizSpec): The finished lesson.
+        correct_answers (int): The number of correct answers.
+        average_time (float): The average time per answer in seconds.
+        answered (bool): Whether any answers were timed.
+    """
+    perfect_score = correct_answers == spec.total_questions
+    particles = []
+    frames_since_display = 0
 
-    # Display the introductory message
-    screen.fill(screen_color)
+    while True:
+        screen.fill(screen_color)
+        draw_text(f"Final Score: {correct_answers}/{spec.total_questions}", font, text_color, WIDTH // 2, HEIGHT * 0.25, center=True, enable_shadow=True)
+        if answered:
+            draw_text(f"Average Time: {average_time} seconds", font, text_color, WIDTH // 2, HEIGHT * 0.6, center=True, enable_shadow=True, max_width=WIDTH)
+        if perfect_score:
+            draw_text("Perfect score!", font, text_color, WIDTH // 2, HEIGHT * 0.35, center=True, enable_shadow=True)
+            if average_time < spec.mastery_seconds:
+                draw_text("MASTERY!", font, text_color, WIDTH // 2, HEIGHT * 0.80, center=True, enable_shadow=True)
 
-    # Draw the main instructional text
-    draw_text(
-        "Let's work on Fraction Addition with the same denominator!",
-        font,
-        text_color,
-        x=0,
-        y=HEIGHT * 0.1,
-        max_width=WIDTH * 0.95,
-        center=True,
-        enable_shadow=True
-    )
+        continue_rect = draw_continue_button()
 
-    # Draw the "What is Same Denominator?" clickable text in the center
-    explanation_button_rect = draw_text(
-        "Same Denominator?",
-        font,
-        text_color,
-        x=0,
-        y=HEIGHT * 0.7,
-        center=True,
-        enable_shadow=True,
-        return_rect=True  # Return the rect to check if it's clicked
-    )
+        if spec.hover_particles and frames_since_display > 10:
+            mouse_pos = pygame.mouse.get_pos()
+            if continue_rect.collidepoint(mouse_pos):
+                draw_text("Continue...", pygame.font.SysFont(current_font_name_or_path, int(get_dynamic_font_size() * 0.8)),
+                          shadow_color, x=WIDTH * 0.55, y=HEIGHT * 0.9, enable_shadow=True, shadow_color=shadow_color)
+                emit_hover_particles(particles, mouse_pos)
+        update_hover_particles(particles)
 
-    # Draw the "Continue" and, if applicable, "Skip" buttons using the standard functions
-    continue_rect = draw_continue_button()
-    skip_rect = None
-    if perfect_score_yesterday:
-        skip_rect = draw_skip_button()
-    pygame.display.flip()
+        pygame.display.flip()
 
-    # Event loop to wait for clicks on buttons
-    waiting = True
-    skip_clicked = False
-    while waiting:
-        for event in pygame.event.get():
+        for event in wait_for_input(fps=60 if spec.hover_particles else None):
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = pygame.mouse.get_pos()
-                if explanation_button_rect.collidepoint(mouse_pos):
-                    # Show the explanation if "Same Denominator?" is clicked
-                    display_same_denominator_explanation()
-                    waiting = False
-                elif continue_rect.collidepoint(mouse_pos):
-                    # Proceed with the lesson if "Continue" is clicked
-                    waiting = False
-                elif skip_rect and skip_rect.collidepoint(mouse_pos):
-                    # Skip the lesson if "Skip" is clicked
-                    log_entry = create_log_message("skip clicked")
-                    log_message(log_entry)
-                    skip_clicked = True
-                    waiting = False
-
-    # Handle the skip functionality
-    if skip_clicked:
-        try:
-            connection, cursor = get_database_cursor()
-            
-            # Format the current time to match the desired format without microseconds
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            # Retrieve lesson ID for recording skip with NULL metrics
-            cursor.execute("SELECT lesson_id FROM lessons WHERE title = ?", ('Single Denominator Fraction Addition',))
-            result = cursor.fetchone()
-            if result:
-                lesson_id = result[0]
-                # Insert the session lesson with NULL values for performance metrics
-                cursor.execute('''
-                    INSERT INTO session_lessons (
-                        session_id, lesson_id, start_time, end_time,
-                        total_time, questions_asked, questions_correct, avg_time_per_question, percent_correct
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    session_id, lesson_id, current_time, current_time,
-                    None, None, None, None, None  # NULL values for performance metrics
-                ))
-                
-                connection.commit()
-                log_entry = create_log_message("Session recorded as skipped with NULL values.")
-                log_message(log_entry)
+                if check_continue_click(event.pos, continue_rect):
+                    return
 
-        except sqlite3.Error as e:
-            log_entry = create_log_message(f"Error recording skipped session: {e}")
-            log_message(log_entry)
-            connection.rollback()
-        
-        finally:
-            cursor.close()
-            connection.close()
+        frames_since_display += 1
 
-        # Return control to handle the skip in session manager or calling function
-        return "skip"
 
-    # Return control to proceed with the lesson if not skipped
-    return "continue"
+def run_arithmetic_quiz(session_id, spec):
+    """
+    Run an arithmetic lesson described by a spec: the intro with its skip option,
+    the timed questions, the database records and the final score.
 
+    Parameters:
+        session_id (int): The ID of the current session.
+        spec (ArithmeticQuizSpec): The lesson to run.
 
-def single_denominator_addition(session_id):
-    """Presents an addition quiz of fractions with the same denominator and updates the session results."""
+    Returns:
+        tuple: (questions asked, correct answers, average time), with an average
+        time of None when the lesson was skipped or is missing.
+    """
     global current_student  # Access the global current student
-    
-    # Display the introduction with session_id passed as an argument
-    intro_result = single_denominator_addition_intro(session_id)
-    
-    # Handle the outcome based on intro result
-    if intro_result == "skip":
-        # If skipped, exit early with default values or any specific logic for a skipped lesson
+
+    if spec.start_message:
+        log_message(create_log_message(spec.start_message))
+
+    lesson_id = get_lesson_id_by_title(spec.lesson_title)
+    if lesson_id is None:
+        log_message(create_log_message(f"{spec.lesson_title} lesson not found in the database."))
         return 0, 0, None
 
-    # Retrieve the lesson_id for Fraction Addition
-    connection, cursor = get_database_cursor()
-    cursor.execute("SELECT lesson_id FROM lessons WHERE title = ?", ('Single Denominator Fraction Addition',))
-    result = cursor.fetchone()
-    
-    if result:
-        addition_lesson_id = result[0]
-    else:
-        log_entry = create_log_message("Single Denominator Fraction Addition lesson not found in the database.")
-        log_message(log_entry)
-        cursor.close()
-        connection.close()
-        return 0, 0, 0  # No questions asked, no correct answers, no time taken
+    perfect_score_yesterday = False
+    if spec.allow_skip:
+        # Check if the student got a perfect score on this lesson yesterday
+        perfect_score_yesterday = perfect_score_lesson_skip(current_student, spec.lesson_title)
 
-    cursor.close()
-    connection.close()
+        yesterday = datetime.now().date() - timedelta(days=1)
+        log_message(create_log_message(
+            f"Student: {current_student}, Lesson: '{spec.lesson_title}', "
+            f"Date: {yesterday}, 100%: {'Yes' if perfect_score_yesterday else 'No'}"
+        ))
+
+    if show_arithmetic_quiz_intro(spec, perfect_score_yesterday):
+        record_skipped_lesson(session_id, lesson_id)
+        return 0, 0, None
 
-    # Start by displaying the introduction and clickable LCD explanation
-    # single_denominator_addition_intro()
+    problem_format = spec.problem_format
+    problem_source = problem_format.problem_source(session_id)
 
     # Start the lesson timer
     lesson_start_time = time.time()
 
     correct_answers = 0
-    problem_count = 0
-    total_questions = 5
     completion_times = []
+    answer_log = AnswerLog()
 
-    clock = pygame.time.Clock()
-    denominator = 10  # Fixed denominator for simplicity
-
-    while problem_count < total_questions:
-        numerator1, numerator2, denominator, answer_numerator = generate_fraction_problem(1, 9, denominator)
+    for _ in range(spec.total_questions):
+        problem = problem_source.next_problem()
         user_input = ""
         first_input = True
         question_complete = False
-        invalid_input = False  # Track if the input was invalid
 
         # Start the timer for the question
         start_time = time.time()
 
         while not question_complete:
-            screen.fill(screen_color)
-
-            # If input was invalid, prompt the user again
-            if invalid_input:
-                display_result("Invalid input. Please try again.", None)
-                invalid_input = False
-
-            # Draw the math problem
-            display_fraction_problem(numerator1, numerator2, denominator, user_input, first_input)
-
+            problem_format.render(problem, user_input, first_input)
             pygame.display.flip()
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if (event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER) and "/" in user_input:
-                        end_time = time.time()
-                        time_taken = round(end_time - start_time, 1)
-                        completion_times.append(time_taken)
-
-                        try:
-                            # Split the input into numerator and denominator
-                            num, denom = user_input.split("/")
-
-                            # Check if denominator is zero or missing
-                            if denom == "" or int(denom) == 0:
-                                raise ValueError("Invalid denominator")  # Trigger invalid input handling
+                elif event.type != pygame.KEYDOWN or question_complete:
+                    continue
+
+                if event.key in (pygame.K_RETURN, pygame.K_KP_ENTER) and problem_format.can_submit(user_input):
+                    time_taken = round(time.time() - start_time, 1)
+                    try:
+                        is_correct = problem_format.check(problem, user_input)
+                    except (ValueError, ZeroDivisionError):
+                        # Unreadable answer, let the student try the same problem again
+                        display_result("Invalid input. Please try again.")
+                        pygame.event.clear()
+                        break
 
-                            # Convert the input to a Fraction and check the answer
-                            user_fraction = fractions.Fraction(user_input)
-                            if user_fraction == fractions.Fraction(answer_numerator, denominator):
-                                correct_answers += 1
-                                if time_taken < 3:
-                                    display_result("CORRECT!", "assets/images/fast_cats", use_lightning=True)
-                                else:
-                                    display_result("CORRECT!", "assets/images/cats", use_lightning=False)
-                                question_complete = True  # Move on to the next question
-                            else:
-                                # Valid input but incorrect answer
-                                display_result(f"Sorry, the answer is {answer_numerator}/{denominator}")
-                                question_complete = True  # Move on to the next question
+                    completion_times.append(time_taken)
+                    answer_log.record(problem_format.prompt(problem), user_input, is_correct, time_taken)
+                    problem_format.record(problem_source, problem, is_correct, time_taken)
 
-                        except (ValueError, ZeroDivisionError):
-                            # Invalid input, prompt the user to try again
-                            invalid_input = True  # Allow the student to try again without moving on
+                    if is_correct:
+                        correct_answers += 1
 
-                    elif event.key == pygame.K_BACKSPACE:
-                        user_input = user_input[:-1]
-                    elif event.unicode.isdigit():
-                        if "/" not in user_input:
-                            # Before the slash, allow up to two digits for the numerator
-                            if len(user_input) < 2:
-                                user_input += event.unicode
+                        if time_taken < spec.fast_answer_seconds:
+                            display_result("CORRECT!", "assets/images/fast_cats", use_lightning=True)
                         else:
-                            # After the slash, allow up to two digits for the denominator
-                            if len(user_input.split("/")[1]) < 2:
-                                user_input += event.unicode
-                    elif event.unicode == "/" and "/" not in user_input and len(user_input) > 0:
-                        # Allow the slash to be added only if it's not already present and there is something before it
-                        user_input += "/"
+                            display_result("CORRECT!", "assets/images/cats", use_lightning=False)
+                    else:
+                        display_result(problem_format.correction(problem))
 
-                    first_input = False
+                    pygame.event.clear()
+                    question_complete = True
+                elif event.key == pygame.K_BACKSPACE:
+                    user_input = user_input[:-1]
+                else:
+                    typed_input = problem_format.accept_key(user_input, event.unicode)
+                    if typed_input is not None:
+                        user_input = typed_input
+                        first_input = False
 
             clock.tick(60)
 
-        if question_complete:
-            problem_count += 1  # Only increment after the question is fully processed
-
     # End of lesson timer
     lesson_end_time = time.time()
+    problem_source.save()
 
     if completion_times:
         average_time = round(sum(completion_times) / len(completion_times), 1)
     else:
         average_time = 0
 
-    # Record the lesson performance in the database
     try:
         add_session_lesson(
             session_id,
-            addition_lesson_id,
+            lesson_id,
             lesson_start_time,
             lesson_end_time,
-            total_questions,
-            correct_answers
+            spec.total_questions,
+            correct_answers,
+            answer_log=answer_log
         )
     except Exception as e:
-        log_entry = create_log_message(f"Error recording session lesson: {e}")
-        log_message(log_entry)
-        return total_questions, correct_answers, average_time
+        log_message(create_log_message(f"Error recording session lesson: {e}"))
+        return spec.total_questions, correct_answers, average_time
 
-    # Display final score
-    screen.fill(screen_color)
-    final_message = f"Final Score: {correct_answers}/{total_questions}"
-    draw_text(final_message, font, text_color, WIDTH // 2, HEIGHT * 0.25, center=True, enable_shadow=True)
+    show_arithmetic_quiz_results(spec, correct_answers, average_time, bool(completion_times))
 
-    if completion_times:
-        average_time_message = f"Average Time: {average_time} seconds"
-        draw_text(average_time_message, font, text_color, WIDTH // 2, HEIGHT * 0.6, center=True, enable_shadow=True, max_width=WIDTH)
+    if correct_answers == spec.total_questions:
+        bonus_game_selector()
 
-    if correct_answers == total_questions:
-        draw_text("Perfect score!", font, text_color, WIDTH // 2, HEIGHT * 0.35, center=True, enable_shadow=True)
-        
-        if average_time < 3.0:
-            draw_text("MASTERY!", font, text_color, WIDTH // 2, HEIGHT * 0.80, center=True, enable_shadow=True)
+    return spec.total_questions, correct_answers, average_time
+
+
+def single_digit_addition(session_id):
+    """Presents a single-digit addition quiz with random numbers and updates the session results."""
+    return run_arithmetic_quiz(session_id, ARITHMETIC_QUIZZES["single_digit_addition"])
+
+
+def double_digit_addition(session_id):
+    """Presents a double-digit addition quiz with random numbers and updates the session results."""
+    return run_arithmetic_quiz(session_id, ARITHMETIC_QUIZZES["double_digit_addition"])
+
+
+def triple_digit_addition(session_id):
+    """Presents a triple-digit addition quiz with random numbers and updates the session results."""
+    return run_arithmetic_quiz(session_id, ARITHMETIC_QUIZZES["triple_digit_addition"])
+
+
+def quad_digit_addition(session_id):
+    """Presents a four-digit addition quiz with random numbers and updates the session results."""
+    return run_arithmetic_quiz(session_id, ARITHMETIC_QUIZZES["quad_digit_addition"])
+
+
+def single_digit_subtraction(session_id):
+    """Presents a single-digit subtraction quiz with random numbers and updates the session results."""
+    return run_arithmetic_quiz(session_id, ARITHMETIC_QUIZZES["single_digit_subtraction"])
+
+
+def double_digit_subtraction(session_id):
+    """Presents a double-digit subtraction quiz with random numbers and updates the session results."""
+    return run_arithmetic_quiz(session_id, ARITHMETIC_QUIZZES["double_digit_subtraction"])
+
+
+def triple_digit_subtraction(session_id):
+    """Presents a triple-digit subtraction quiz with random numbers and updates the session results."""
+    return run_arithmetic_quiz(session_id, ARITHMETIC_QUIZZES["triple_digit_subtraction"])
+
+
+def quad_digit_subtraction(session_id):
+    """Presents a quad-digit subtraction quiz with random numbers and updates the session results."""
+    return run_arithmetic_quiz(session_id, ARITHMETIC_QUIZZES["quad_digit_subtraction"])
+
+
+def subtraction_borrowing(session_id):
+    """Presents a double-digit subtraction quiz with borrowing and updates the session results."""
+    return run_arithmetic_quiz(session_id, ARITHMETIC_QUIZZES["subtraction_borrowing"])
+
+
+def generate_borrowing_problem():
+    """Generates a double-digit subtraction problem that requires borrowing."""
+    # Generate num1 ensuring it does not end in 9
+    num1 = random.randint(10, 99)
+    while num1 % 10 == 9:
+        num1 = random.randint(10, 99)
+
+    # Generate num2 ensuring it ends with a larger digit than num1 and is less than num1
+    num2 = random.randint(1, num1 - 1)
+    while (num2 % 10) <= (num1 % 10):
+        num2 = random.randint(1, num1 - 1)
+
+    answer = num1 - num2
+    return num1, num2, answer
+
+
+def single_digit_multiplication(session_id):
+    """Presents a single-digit multiplication quiz with random numbers and updates the session results."""
+    return run_arithmetic_quiz(session_id, ARITHMETIC_QUIZZES["single_digit_multiplication"])
+
+
+def single_by_double_multiplication(session_id):
+    """Presents a single-by-double-digit multiplication quiz and updates the session results."""
+    return run_arithmetic_quiz(session_id, ARITHMETIC_QUIZZES["single_by_double_multiplication"])
+
+
+def double_digit_multiplication(session_id):
+    """Presents a double-digit multiplication quiz and updates the session results."""
+    return run_arithmetic_quiz(session_id, ARITHMETIC_QUIZZES["double_digit_multiplication"])
+
+
+def generate_fraction_problem(numerator_min, numerator_max, denominator):
+    """Generates two fractions with the given denominator and returns the problem and the answer."""
+    numerator1 = random.randint(numerator_min, numerator_max)
+    numerator2 = random.randint(numerator_min, numerator_max)
+    
+    # The fractions will have the same denominator
+    answer_numerator = numerator1 + numerator2
+
+    return numerator1, numerator2, denominator, answer_numerator
+
+
+def display_fraction_problem(numerator1, numerator2, denominator, user_input, first_input, line_length_factor=1.9):
+    """Draw a same-denominator fraction addition with the student's answer so far. The caller presents the frame."""
+    fraction_sum_widget.draw((numerator1, numerator2, denominator, line_length_factor), user_input, first_input)
+
+
+def display_same_denominator_explanation():
+    """
+    Display a multi-step explanation for adding fractions with the same denominator and why it's an important first step.
+    """
+    explanation_lines = [
+        "When adding fractions, they need to have the same denominator (bottom number).",
+        "Fractions like 3/4 and 5/4 can be added because they have the same denominator.",
+        "This lesson will help you practice adding fractions that already have the same denominator.",
+        "Once you've mastered this, you'll be ready for the next challenge: finding the Lowest Common Denominator.",
+        "This is an important step toward doing all fraction addition on your own!"
+    ]
+    
+    for line in explanation_lines:
+        screen.fill(screen_color)
+        draw_text(line, font, text_color, x=0, y=HEIGHT * 0.4, max_width=WIDTH * 0.95, center=True, enable_shadow=True)
+        pygame.display.flip()
+
+        # Wait for a mouse click to move to the next explanation line
+        waiting = True
+        while waiting:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
+                elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                    waiting = False  # Move to the next line
 
-    draw_and_wait_continue_button()
-    
-    if correct_answers == total_questions:
-        bonus_game_selector()
 
-    return total_questions, correct_answers, average_time
+def single_denominator_addition(session_id):
+    """Presents an addition quiz of fractions with the same denominator and updates the session results."""
+    return run_arithmetic_quiz(session_id, ARITHMETIC_QUIZZES["single_denominator_addition"])
 
 
 
@@ -11576,48 +12069,10 @@ def generate_lcd_problem(numerator_min, numerator_max, denominator_min, denomina
 
 
 def display_lcd_problem(numerator1, denominator1, numerator2, denominator2, user_input, first_input, line_length_factor=1.9):
-    screen.fill(screen_color)
-
-    # Dynamically calculate positions based on screen size
-    right_x = WIDTH * 0.55  # Right edge for alignment
-    num1_y = HEIGHT * 0.35
-    num2_y = HEIGHT * 0.5
-    line_y = HEIGHT * 0.57
-    sum_y = HEIGHT * 0.63
-
-    # Draw the first fraction (right-aligned)
-    fraction1_str = f"{numerator1}/{denominator1}"
-    fraction1_surface = font.render(fraction1_str, True, text_color)
-    fraction1_rect = fraction1_surface.get_rect(right=right_x, centery=num1_y)
-    screen.blit(fraction1_surface, fraction1_rect)
-
-    # Draw the plus sign (right-aligned with some offset)
-    plus_sign_x = right_x - fraction1_surface.get_width() - WIDTH * 0.05
-    plus_surface = font.render("+", True, text_color)
-    plus_rect = plus_surface.get_rect(right=plus_sign_x, centery=num2_y)
-    screen.blit(plus_surface, plus_rect)
-
-    # Draw the second fraction (right-aligned)
-    fraction2_str = f"{numerator2}/{denominator2}"
-    fraction2_surface = font.render(fraction2_str, True, text_color)
-    fraction2_rect = fraction2_surface.get_rect(right=right_x, centery=num2_y)
-    screen.blit(fraction2_surface, fraction2_rect)
-
-    # Draw the line (this can represent the denominator line if needed)
-    line_width = max(fraction1_surface.get_width(), fraction2_surface.get_width()) * line_length_factor
-    pygame.draw.line(screen, text_color, (right_x - line_width, line_y), (right_x, line_y), 3)
-
-    # Draw the answer placeholder or the input from the student (right-aligned)
-    if first_input:
-        input_text = "?"  # Show "?" for the LCD answer the student needs to enter
-    else:
-        input_text = user_input
-
-    input_surface = font.render(input_text, True, text_color)
-    input_rect = input_surface.get_rect(right=right_x, centery=sum_y)
-    screen.blit(input_surface, input_rect)
-
-    pygame.display.flip()
+    """Draw a lowest common denominator problem with the student's answer so far. The caller presents the frame."""
+    lowest_common_denominator_widget.draw(
+        (numerator1, denominator1, numerator2, denominator2, line_length_factor), user_input, first_input
+    )
 
 
 def display_lcd_explanation():
@@ -11649,263 +12104,76 @@ def display_lcd_explanation():
                     waiting = False  # Move to the next line
 
 
-def lowest_common_denominator_quiz_intro(session_id):
-    """
-    Display the initial introduction for the Lowest Common Denominator quiz with
-    three clickable buttons: "Lowest Common Denominator?", "Continue", and "Skip" if applicable.
-    """
-    global current_student  # Access the global current student
-
-    # Check if the student got a perfect score on this lesson recently
-    perfect_score_yesterday = perfect_score_lesson_skip(current_student, 'Lowest Common Denominator')
-    
-    # Log the result of the perfect score check
-    today = datetime.now().date()
-    yesterday = today - timedelta(days=1)
-    log_entry = create_log_message(
-        f"Student: {current_student}, Lesson: 'Lowest Common Denominator', "
-        f"Date: {yesterday}, 100%: {'Yes' if perfect_score_yesterday else 'No'}"
-    )
-    log_message(log_entry)
-
-    # Display the introductory message
-    screen.fill(screen_color)
-
-    # Draw the main instructional text
-    draw_text(
-        "Let's work on finding the Lowest Common Denominator!",
-        font,
-        text_color,
-        x=0,
-        y=HEIGHT * 0.1,
-        max_width=WIDTH * 0.95,
-        center=True,
-        enable_shadow=True
-    )
-
-    lcd_button_rect = draw_text(
-        "LCD?",
-        font,
-        text_color,
-        x=0,
-        y=HEIGHT * 0.7,
-        # max_width=WIDTH * 0.95,
-        center=True,
-        enable_shadow=True,
-        return_rect=True
-    )
-
-    # Draw the "Continue" and, if applicable, "Skip" buttons
-    continue_button_rect = draw_continue_button()
-    skip_button_rect = None
-    if perfect_score_yesterday:
-        skip_button_rect = draw_skip_button()
-    pygame.display.flip()
-
-    # Event loop to wait for button clicks
-    waiting = True
-    skip_clicked = False
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = pygame.mouse.get_pos()
-                if lcd_button_rect.collidepoint(mouse_pos):
-                    # Show LCD explanation
-                    display_lcd_explanation()
-                    waiting = False
-                elif continue_button_rect.collidepoint(mouse_pos):
-                    # Move on to the next part if "Continue" is clicked
-                    waiting = False
-                elif skip_button_rect and skip_button_rect.collidepoint(mouse_pos):
-                    # Skip if "Skip" is clicked
-                    skip_clicked = True
-                    waiting = False
-
-    # Handle skip functionality
-    if skip_clicked:
-        try:
-            connection, cursor = get_database_cursor()
-
-            # Get the current time and format without microseconds
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-            # Retrieve lesson ID for recording skip
-            cursor.execute("SELECT lesson_id FROM lessons WHERE title = ?", ('Lowest Common Denominator Quiz',))
-            result = cursor.fetchone()
-            if result:
-                lesson_id = result[0]
-                # Insert session lesson with NULL values for performance metrics
-                cursor.execute('''
-                    INSERT INTO session_lessons (
-                        session_id, lesson_id, start_time, end_time,
-                        total_time, questions_asked, questions_correct, avg_time_per_question, percent_correct
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    session_id, lesson_id, current_time, current_time,
-                    None, None, None, None, None  # NULL values for performance metrics
-                ))
-
-                connection.commit()
-                log_entry = create_log_message("Session recorded as skipped with NULL values.")
-                log_message(log_entry)
-
-        except sqlite3.Error as e:
-            log_entry = create_log_message(f"Error recording skipped session: {e}")
-            log_message(log_entry)
-            connection.rollback()
-
-        finally:
-            cursor.close()
-            connection.close()
-
-        # Return "skip" to indicate the lesson was skipped
-        return "skip"
-
-    # Return "continue" to proceed with the quiz
-    return "continue"
-
-
-def lowest_common_denominator_quiz(session_id):
-    """Presents a quiz on solving for the lowest common denominator and updates the session results."""
-    global current_student  # Access the global current student
-    
-    # Display the introductory screen and get the user's choice to proceed or skip
-    intro_result = lowest_common_denominator_quiz_intro(session_id)
-
-    if intro_result == "skip":
-        # If the user chose to skip, return default values indicating no questions were asked
-        return 0, 0, None
-
-    # Retrieve the lesson_id for LCD Problems
-    connection, cursor = get_database_cursor()
-    cursor.execute("SELECT lesson_id FROM lessons WHERE title = ?", ('Lowest Common Denominator',))
-    result = cursor.fetchone()
-    
-    if result:
-        lcd_lesson_id = result[0]
-    else:
-        log_entry = create_log_message("Lowest Common Denominator lesson not found in the database.")
-        log_message(log_entry)
-        cursor.close()
-        connection.close()
-        return 0, 0, 0  # No questions asked, no correct answers, no time taken
-
-    cursor.close()
-    connection.close()
-
-    # Start by displaying the introduction and clickable LCD explanation
-    # lowest_common_denominator_quiz_intro()
-
-    # Start the lesson timer
-    lesson_start_time = time.time()
-
-    correct_answers = 0
-    problem_count = 0
-    total_questions = 5
-    completion_times = []
-
-    clock = pygame.time.Clock()
-
-    while problem_count < total_questions:
-        numerator1, denominator1, numerator2, denominator2, lcd = generate_lcd_problem(1, 9, 2, 12)
-        user_input = ""
-        first_input = True
-        question_complete = False
-
-        # Start the timer for the question
-        start_time = time.time()
-
-        while not question_complete:
-            screen.fill(screen_color)
-
-            # Draw the math problem
-            display_lcd_problem(numerator1, denominator1, numerator2, denominator2, user_input, first_input)
-
-            pygame.display.flip()
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if (event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER):
-                        end_time = time.time()
-                        time_taken = round(end_time - start_time, 1)
-                        completion_times.append(time_taken)
-
-                        try:
-                            user_answer = int(user_input)
-                            if user_answer == lcd:
-                                correct_answers += 1
-
-                                if time_taken < 3:
-                                    display_result("CORRECT!", "assets/images/fast_cats", use_lightning=True)
-                                else:
-                                    display_result("CORRECT!", "assets/images/cats", use_lightning=False)
-                            else:
-                                display_result(f"Sorry, the correct LCD is {lcd}")
-
-                        except ValueError:
-                            display_result("Invalid input, please try again")
-
-                        pygame.event.clear()
-                        problem_count += 1
-                        question_complete = True
-                    elif event.key == pygame.K_BACKSPACE:
-                        user_input = user_input[:-1]
-                    elif event.unicode.isdigit() and len(user_input) < 3:  # Limit input to three digits
-                        user_input += event.unicode
-                        first_input = False
-
-            clock.tick(60)
-
-    # End of lesson timer
-    lesson_end_time = time.time()
-
-    if completion_times:
-        average_time = round(sum(completion_times) / len(completion_times), 1)
-    else:
-        average_time = 0
-
-    # Record the lesson performance in the database
-    try:
-        add_session_lesson(
-            session_id,
-            lcd_lesson_id,
-            lesson_start_time,
-            lesson_end_time,
-            total_questions,
-            correct_answers
-        )
-    except Exception as e:
-        log_entry = create_log_message(f"Error recording session lesson: {e}")
-        log_message(log_entry)
-        return total_questions, correct_answers, average_time
-
-    # Display final score
-    screen.fill(screen_color)
-    final_message = f"Final Score: {correct_answers}/{total_questions}"
-    draw_text(final_message, font, text_color, WIDTH // 2, HEIGHT * 0.25, center=True, enable_shadow=True)
-
-    if completion_times:
-        average_time_message = f"Average Time: {average_time} seconds"
-        draw_text(average_time_message, font, text_color, WIDTH // 2, HEIGHT * 0.6, center=True, enable_shadow=True, max_width=WIDTH)
-
-    if correct_answers == total_questions:
-        draw_text("Perfect score!", font, text_color, WIDTH // 2, HEIGHT * 0.35, center=True, enable_shadow=True)
-        
-        if average_time < 3.0:
-            draw_text("MASTERY!", font, text_color, WIDTH // 2, HEIGHT * 0.80, center=True, enable_shadow=True)
+# Lessons run by run_arithmetic_quiz, keyed by the lesson function that starts them
+ARITHMETIC_QUIZZES = {
+    "single_digit_addition": ArithmeticQuizSpec(
+        "Single Digit Addition", "Let's work on Single-Digit Addition!",
+        IntegerProblemFormat("add", (1, 9)), allow_skip=True, hover_particles=True
+    ),
+    "double_digit_addition": ArithmeticQuizSpec(
+        "Double Digit Addition", "Let's work on Double-Digit Addition!",
+        IntegerProblemFormat("add", (10, 99)), allow_skip=True, hover_particles=True,
+        start_message="Double digit addition begins."
+    ),
+    "triple_digit_addition": ArithmeticQuizSpec(
+        "Triple Digit Addition", "Let's work on Triple-Digit Addition!",
+        IntegerProblemFormat("add", (100, 999))
+    ),
+    "quad_digit_addition": ArithmeticQuizSpec(
+        "Quad Digit Addition", "Let's work on Four-Digit Addition!",
+        IntegerProblemFormat("add", (1000, 9999))
+    ),
+    "single_digit_subtraction": ArithmeticQuizSpec(
+        "Single Digit Subtraction", "Let's work on Single-Digit Subtraction!",
+        IntegerProblemFormat("sub", (1, 9)), allow_skip=True
+    ),
+    "double_digit_subtraction": ArithmeticQuizSpec(
+        "Double Digit Subtraction", "Let's work on Double-Digit Subtraction!",
+        IntegerProblemFormat("sub", (10, 99)), allow_skip=True,
+        start_message="Double digit subtraction begins."
+    ),
+    "triple_digit_subtraction": ArithmeticQuizSpec(
+        "Triple Digit Subtraction", "Let's work on Triple-Digit Subtraction!",
+        IntegerProblemFormat("sub", (100, 999))
+    ),
+    "quad_digit_subtraction": ArithmeticQuizSpec(
+        "Quad Digit Subtraction", "Let's work on Quad-Digit Subtraction!",
+        IntegerProblemFormat("sub", (1000, 9999))
+    ),
+    "subtraction_borrowing": ArithmeticQuizSpec(
+        "Subtraction Borrowing", "Let's work on Subtraction Borrowing!",
+        IntegerProblemFormat("sub", (10, 99), generator=generate_borrowing_problem, max_input_length=2),
+        allow_skip=True
+    ),
+    "single_digit_multiplication": ArithmeticQuizSpec(
+        "Single Digit Multiplication", "Let's work on Single-Digit Multiplication!",
+        IntegerProblemFormat("mul", (1, 9)), allow_skip=True,
+        start_message="Single digit multiplication begins."
+    ),
+    "single_by_double_multiplication": ArithmeticQuizSpec(
+        "Single by Double Digit Multiplication", "Let's work on Single by Double-Digit Multiplication!",
+        IntegerProblemFormat("mul", (10, 99), (1, 9)), allow_skip=True
+    ),
+    "double_digit_multiplication": ArithmeticQuizSpec(
+        "Double Digit Multiplication", "Let's work on Double-Digit Multiplication!",
+        IntegerProblemFormat("mul", (10, 99))
+    ),
+    "single_denominator_addition": ArithmeticQuizSpec(
+        "Single Denominator Fraction Addition", "Let's work on Fraction Addition with the same denominator!",
+        FractionSumProblemFormat((1, 9), 10), allow_skip=True,
+        explanation=("Same Denominator?", display_same_denominator_explanation)
+    ),
+    "lowest_common_denominator_quiz": ArithmeticQuizSpec(
+        "Lowest Common Denominator", "Let's work on finding the Lowest Common Denominator!",
+        LowestCommonDenominatorProblemFormat((1, 9), (2, 12)), allow_skip=True,
+        explanation=("LCD?", display_lcd_explanation)
+    ),
+}
 
-    draw_and_wait_continue_button()
-    
-    if correct_answers == total_questions:
-        bonus_game_selector()
 
-    return total_questions, correct_answers, average_time
+def lowest_common_denominator_quiz(session_id):
+    """Presents a quiz on solving for the lowest common denominator and updates the session results."""
+    return run_arithmetic_quiz(session_id, ARITHMETIC_QUIZZES["lowest_common_denominator_quiz"])
 
 
 def generate_equivalent_fraction_problem(numerator_min, numerator_max, denominator_min, denominator_max):
@@ -11928,31 +12196,11 @@ def generate_equivalent_fraction_problem(numerator_min, numerator_max, denominat
 def display_equivalent_fraction_problem(numerator1, denominator1, numerator2, denominator2, user_input1, user_input2, first_input):
     """
     Display the fraction problem asking students to convert fractions to an equivalent form.
+    The caller presents the frame.
     """
-    screen.fill(screen_color)
-
-    # Define positions for fraction display
-    center_x = WIDTH // 2
-    num1_y = HEIGHT * 0.35
-    num2_y = HEIGHT * 0.5
-    line_y = HEIGHT * 0.57
-    sum_y = HEIGHT * 0.63
-
-    # Draw the first fraction
-    fraction1_str = f"{numerator1}/{denominator1}"
-    draw_text(fraction1_str, font, text_color, x=center_x, y=num1_y, center=True)
-
-    # Draw the second fraction
-    fraction2_str = f"{numerator2}/{denominator2}"
-    draw_text(fraction2_str, font, text_color, x=center_x, y=num2_y, center=True)
-
-    # Draw the input fields or placeholders
-    input_text1 = "?" if first_input else str(user_input1)
-    input_text2 = "?" if first_input else str(user_input2)
-    draw_text(input_text1, font, text_color, x=center_x, y=sum_y - 30, center=True)
-    draw_text(input_text2, font, text_color, x=center_x, y=sum_y + 30, center=True)
-
-    pygame.display.flip()
+    equivalent_fraction_widget.draw(
+        (numerator1, denominator1, numerator2, denominator2), (user_input1, user_input2), first_input
+    )
 
 
 def display_equivalent_fractions_explanation():
@@ -12273,6 +12521,7 @@ def equivalent_fractions_quiz(session_id):
     problem_count = 0
     total_questions = 5
     completion_times = []
+    answer_log = AnswerLog()
 
     clock = pygame.time.Clock()
 
@@ -12287,8 +12536,6 @@ def equivalent_fractions_quiz(session_id):
         start_time = time.time()
 
         while not question_complete:
-            screen.fill(screen_color)
-
             display_equivalent_fraction_problem(numerator1, denominator1, numerator2, denominator2, user_input1, user_input2, first_input)
 
             pygame.display.flip()
@@ -12307,7 +12554,12 @@ def equivalent_fractions_quiz(session_id):
                             completion_times.append(time_taken)
 
                             try:
-                                if int(user_input1) == converted_numerator1 and int(user_input2) == converted_numerator2:
+                                is_correct = int(user_input1) == converted_numerator1 and int(user_input2) == converted_numerator2
+                                answer_log.record(
+                                    f"{numerator1}/{denominator1} {numerator2}/{denominator2} = ?/{lcd} ?/{lcd}",
+                                    f"{user_input1} {user_input2}", is_correct, time_taken
+                                )
+                                if is_correct:
                                     correct_answers += 1
                                     if time_taken < 3:
                                         display_result("CORRECT!", "assets/images/fast_cats", use_lightning=True)
@@ -12345,7 +12597,8 @@ def equivalent_fractions_quiz(session_id):
             lesson_start_time,
             lesson_end_time,
             total_questions,
-            correct_answers
+            correct_answers,
+            answer_log=answer_log
         )
     except Exception as e:
         log_entry = create_log_message(f"Error recording session lesson: {e}")
@@ -12721,6 +12974,7 @@ def basic_shapes_quiz(session_id):
     problem_count = 0
     total_questions = 5
     completion_times = []
+    answer_log = AnswerLog()
 
     clock = pygame.time.Clock()
 
@@ -12786,6 +13040,7 @@ def basic_shapes_quiz(session_id):
                     if clicked_shape:
                         time_taken = round(time.time() - start_time, 1)
                         completion_times.append(time_taken)
+                        answer_log.record(correct_shape, clicked_shape, clicked_shape == correct_shape, time_taken)
 
                         if clicked_shape == correct_shape:
                             correct_answers += 1
@@ -12815,7 +13070,8 @@ def basic_shapes_quiz(session_id):
             lesson_start_time,
             lesson_end_time,
             total_questions,
-            correct_answers
+            correct_answers,
+            answer_log=answer_log
         )
     except Exception as e:
         log_entry = create_log_message(f"Error recording session lesson: {e}")
@@ -13642,7 +13898,7 @@ def introduction(font):
 
 def load_options():
     """Load and apply saved options from JSON file. """
-    global current_font_name_or_path, music_volume, current_resolution_index, current_theme
+    global current_font_name_or_path, music_volume, current_resolution_index, current_theme, japanese_font_path
     
     try:
         with open("options.json", "r") as file:
@@ -13653,6 +13909,7 @@ def load_options():
         music_volume = options.get("volume", 0.5)
         current_resolution_index = options.get("current_resolution_index", AVAILABLE_RESOLUTIONS.index((1080, 1080)))
         current_theme = options.get("current_theme", "light")  # Load the theme, default to "light" if not found
+        japanese_font_path = options.get("japanese_font")
         
     except FileNotFoundError:
         log_entry = create_log_message("Options file not found, using default settings.")
@@ -13783,6 +14040,9 @@ def student_select_menu():
     particle_lifetime = 30  # Lifetime for each particle in frames
     particles = []  # List to hold active particles
 
+    # Compose the greeting backdrop in the background while the student is picked
+    greeting_compositor.start()
+
     while True:
         draw_background(main_menu_background)
         students = get_students()  # Fetch students from the database
@@ -13936,6 +14196,9 @@ def session_manager():
         log_entry = create_log_message(f"Error: Failed to start session for {current_student}.")
         log_message(log_entry)
         return "main_menu"
+
+    # Find every lesson that can be skipped for a perfect score yesterday in one go
+    load_perfect_score_lessons(current_student)
     
     
     
@@ -14544,7 +14807,6 @@ def session_manager():
 
 
 def streak_check():
-    global angle_x, angle_y, angle_z, hue  # Declare global for cube rotation and color
     global text_color, shadow_color, screen_color, current_font_name_or_path  # Access the theme-related globals
 
     # Initialize hover particles for "Continue..." button
@@ -14564,6 +14826,9 @@ def streak_check():
         message = "Let's start a streak today! Keep it up!"
         show_cube = False
 
+    # Longer streaks earn a stack of cubes, then a dodecahedron
+    streak_mesh = create_streak_mesh(streak_days)
+
     # Check the current month
     current_month = datetime.now().month
     is_december = current_month == 12
@@ -14639,8 +14904,8 @@ def streak_check():
     # Speak the streak message out loud AFTER the screen is drawn
     speak_english(message)
 
-    # Initialize monthly particles list
-    monthly_particles = []
+    # Initialize the monthly particle field
+    monthly_particles = SeasonalParticleField(monthly_particle_class) if monthly_particle_class else None
 
     waiting = True
     while waiting:
@@ -14680,8 +14945,8 @@ def streak_check():
             button_color = text_color
 
         # Generate new monthly particles if applicable
-        if monthly_particle_class:
-            monthly_particles.append(monthly_particle_class())
+        if monthly_particles:
+            monthly_particles.spawn()
 
         # Update and draw hover particles
         for particle in hover_particles[:]:
@@ -14691,10 +14956,9 @@ def streak_check():
                 hover_particles.remove(particle)
 
         # Update and draw monthly particles
-        if monthly_particle_class:
-            for particle in monthly_particles:
-                particle.update()
-                particle.draw(screen)
+        if monthly_particles:
+            monthly_particles.update()
+            monthly_particles.draw(screen)
 
         # Draw the "Continue..." button
         draw_text(
@@ -14716,15 +14980,10 @@ def streak_check():
                 if button_rect.collidepoint(event.pos):
                     waiting = False  # Exit the loop when the button is clicked
 
-        # Draw the rotating cube if streak > 0
+        # Draw the rotating streak shape if streak > 0
         if show_cube:
             mouse_x, mouse_y = pygame.mouse.get_pos()
-            draw_wireframe_cube(screen, mouse_x, mouse_y)
-
-            # Update the cube's rotation and color
-            hue += 0.00833
-            if hue > 1.0:
-                hue -= 1.0
+            draw_wireframe_cube(screen, mouse_x, mouse_y, streak_mesh)
 
         # Refresh the display
         pygame.display.flip()
@@ -14860,21 +15119,21 @@ def lesson_selector(session_id, lesson_title):
     # Select the appropriate lesson data based on the student's current level
     lesson_data = lesson_data_sets[student_level - 1]  # Adjust for 0-indexing
 
-    # Start the lesson timer
-    lesson_start_time = time.time()
+    # Add the words from earlier levels that are due for review
+    level_words = {question['kanji'] for question in lesson_data['questions']}
+    earlier_questions = {
+        question['kanji']: question
+        for earlier_data in lesson_data_sets[:student_level - 1]
+        for question in earlier_data['questions']
+        if question['kanji'] not in level_words
+    }
+    review_words = select_review_items(session_id, lesson_title, list(earlier_questions), JAPANESE_REVIEW_QUESTIONS, due_only=True)
+    if review_words:
+        lesson_data = dict(lesson_data, questions=lesson_data['questions'] + [earlier_questions[word] for word in review_words])
 
-    # Run the quiz using japanese_quiz (pass lesson_title and lesson_data separately)
+    # Run the quiz using japanese_quiz (pass lesson_title and lesson_data separately); it records the lesson itself
     total_questions, correct_answers, avg_time = japanese_quiz(session_id, lesson_title, lesson_data)
 
-    # End the lesson timer
-    lesson_end_time = time.time()
-
-    # Fetch the lesson_id from the database for the specified lesson title
-    lesson_id = fetch_lesson_id(lesson_title)
-
-    # Add session lesson to the database, tracking progress
-    add_session_lesson(session_id, lesson_id, lesson_start_time, lesson_end_time, total_questions, correct_answers)
-
     # Handle perfect score and leveling up
     if correct_answers == total_questions and student_level < max_level + 1:
         set_student_progress(session_id, lesson_title)  # Level up on perfect score
@@ -15052,7 +15311,8 @@ def save_options():
         "font": current_font_name_or_path,
         "volume": music_volume,
         "current_resolution_index": current_resolution_index,
-        "current_theme": current_theme  # Save the currently selected theme
+        "current_theme": current_theme,  # Save the currently selected theme
+        "japanese_font": japanese_font_path
     }
 
     try:
@@ -15066,7 +15326,7 @@ def save_options():
 def credit_roll():
     # Load the cat sprite and initialize its position and direction
     try:
-        cat_image = pygame.image.load("assets/images/sprites/cat01.png").convert_alpha()
+        cat_image = load_image_asset("assets/images/sprites/cat01.png").convert_alpha()
         cat_rect = cat_image.get_rect()
         cat_rect.y = HEIGHT - cat_rect.height  # Position the cat at the bottom of the screen
         cat_speed = 4  # Set the speed of the cat
@@ -15589,6 +15849,85 @@ def psalm_23():
 ### Japanese Functions ###
 ##########################
 
+def greeting_tree_seed():
+    """Return the seed of today's greeting trees; each tree adds its index to it."""
+    return datetime.now().date().toordinal() * len(GREETING_TREES)
+
+
+class GreetingBackdropCompositor:
+    """
+    A class that composes the greeting screen's backdrop (sky, clouds and trees) on
+    a worker thread while the student is being picked, so greet_student can show
+    it at once.
+
+    The worker only uses software surfaces and hands back a raw RGB pixel buffer;
+    the main thread turns it into a display surface.
+
+    Attributes:
+    -----------
+    thread : Thread
+        The worker thread, or None when no backdrop is being composed.
+    result : tuple
+        (resolution, pixels) of the finished backdrop, or None.
+
+    Methods:
+    --------
+    start():
+        Starts composing a backdrop for the current resolution in the background.
+    take():
+        Returns the finished backdrop as a surface, waiting for the worker if needed.
+    """
+    def __init__(self):
+        self.thread = None
+        self.result = None
+
+    def start(self):
+        """Start composing a backdrop unless one is already being composed or is ready."""
+        if self.thread is not None or (self.result and self.result[0] == (WIDTH, HEIGHT)):
+            return
+        self.thread = threading.Thread(
+            target=self._compose,
+            args=((WIDTH, HEIGHT), random.randrange(CLOUD_SEED_COUNT), greeting_tree_seed()),
+            daemon=True
+        )
+        self.thread.start()
+
+    def _compose(self, resolution, cloud_seed, tree_seed):
+        """Worker thread: draw the backdrop and keep its pixels."""
+        try:
+            width, height = resolution
+            backdrop = pygame.Surface(resolution)
+            backdrop.fill(SKY_BLUE)
+            backdrop.blit(read_perlin_cloud(cloud_seed, width, height), (0, 0))
+            for index, (x_share, max_depth) in enumerate(GREETING_TREES):
+                tree = ProceduralTree(width * x_share, height, max_depth, 3, tree_seed + index)
+                tree.finish()
+                backdrop.blit(tree.surface, tree.topleft)
+            self.result = (resolution, pygame.image.tobytes(backdrop, 'RGB'))
+        except Exception as e:
+            log_message(create_log_message(f"Error composing the greeting backdrop: {e}"))
+
+    def take(self):
+        """
+        Return the composed backdrop, waiting for the worker to finish if it is still running.
+
+        Returns:
+            pygame.Surface: The backdrop, or None if none was composed for the current resolution.
+        """
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+        result, self.result = self.result, None
+        if result is None or result[0] != (WIDTH, HEIGHT):
+            return None
+        return pygame.image.frombuffer(result[1], result[0], 'RGB').convert()
+
+
+# Composes the next greeting backdrop in the background
+greeting_compositor = GreetingBackdropCompositor()
+
+
 def greet_student():
     global current_student
     global text_color, shadow_color, screen_color
@@ -15609,21 +15948,33 @@ def greet_student():
         greeting_message_eng = f"Good evening, {current_student}! Welcome to your lesson."
         greeting_message_jp = "こんばんは。"  # Good evening in Japanese
 
-    # Set a static sky blue background with Perlin clouds and static elements
-    SKY_BLUE = (135, 206, 235)
-    screen.fill(SKY_BLUE)
-    cloud_surface = generate_perlin_cloud(0)  # Static clouds
-    screen.blit(cloud_surface, (0, 0))
+    # Use the backdrop composed while the student was being picked, if it is ready
+    sky_background = greeting_compositor.take()
+    if sky_background:
+        trees = []  # Already part of the backdrop
+    else:
+        # Set a static sky blue background with Perlin clouds and static elements
+        sky_background = pygame.Surface((WIDTH, HEIGHT))
+        sky_background.fill(SKY_BLUE)
+        cloud_surface = load_perlin_cloud()  # Static clouds
+        sky_background.blit(cloud_surface, (0, 0))
+
+        # Today's trees; new ones grow in over the first frames, ones seen earlier today are cached
+        tree_seed = greeting_tree_seed()
+        trees = [
+            get_procedural_tree(WIDTH * x_share, HEIGHT, max_depth=max_depth, max_branches=3, seed=tree_seed + index)
+            for index, (x_share, max_depth) in enumerate(GREETING_TREES)
+        ]
 
-    # Draw trees and static greeting text once
-    grow_tree(screen, WIDTH * 0.25, HEIGHT, max_depth=10, max_branches=3)
-    grow_tree(screen, WIDTH * 0.75, HEIGHT, max_depth=11, max_branches=3)
+    # Draw the static greeting text once onto its own layer, in front of the trees
+    text_layer = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
     draw_text(
         greeting_message_eng, 
         font, 
         text_color,  
         x=0, 
         y=HEIGHT * 0.20, 
+        surface=text_layer,
         max_width=WIDTH * 0.95, 
         center=True,  
         enable_shadow=True,  
@@ -15637,6 +15988,7 @@ def greet_student():
         text_color, 
         x=0, 
         y=HEIGHT * 0.60,  
+        surface=text_layer,
         max_width=WIDTH * 0.95, 
         center=True,  
         enable_shadow=True,  
@@ -15652,8 +16004,17 @@ def greet_student():
     text_width, text_height = continue_font.size(continue_text)
     continue_rect = pygame.Rect(continue_x_position, continue_y_position, text_width, text_height)
 
+    def compose_static_background():
+        # Sky, trees and greeting text, redrawn only while the trees are growing
+        static_background.blit(sky_background, (0, 0))
+        for tree in trees:
+            static_background.blit(tree.surface, tree.topleft)
+        static_background.blit(text_layer, (0, 0))
+
     # Create a static background surface to avoid redrawing static elements every frame
-    static_background = screen.copy()  # Save current screen as the static background
+    static_background = pygame.Surface((WIDTH, HEIGHT))
+    compose_static_background()
+    screen.blit(static_background, (0, 0))
     pygame.display.flip()
     speak_japanese(greeting_message_jp)  # Play initial greeting
 
@@ -15665,6 +16026,12 @@ def greet_student():
     # Main event loop for dynamic elements
     waiting = True
     while waiting:
+        # Grow any new trees by a fixed share of their segments per frame
+        if not all(tree.is_complete() for tree in trees):
+            for tree in trees:
+                tree.grow(math.ceil(tree.segment_count() / TREE_GROWTH_FRAMES))
+            compose_static_background()
+
         # Blit the static background to clear the screen each frame
         screen.blit(static_background, (0, 0))
 
@@ -15977,7 +16344,7 @@ def wrap_up_session():
     # Set a static sky blue background with Perlin clouds
     SKY_BLUE = (135, 206, 235)
     screen.fill(SKY_BLUE)
-    cloud_surface = generate_perlin_cloud(0)  # Static clouds
+    cloud_surface = load_perlin_cloud()  # Static clouds
     screen.blit(cloud_surface, (0, 0))
 
     # Draw static wrap-up text
@@ -16515,8 +16882,8 @@ def skip_counting_kanji(COUNT_TO=30):
         kanji_font = pygame.font.Font(current_font_name_or_path, large_kanji_font_size)
         furigana_font = pygame.font.Font(current_font_name_or_path, furigana_font_size)
     else:
-        kanji_font = pygame.font.SysFont('msgothic', large_kanji_font_size)  # Example: MS Gothic or another font that supports Kanji
-        furigana_font = pygame.font.SysFont('msgothic', furigana_font_size)
+        kanji_font = load_japanese_font(large_kanji_font_size)
+        furigana_font = load_japanese_font(furigana_font_size)
 
     # Dictionary to map numbers (1 to 30) to their corresponding Kanji and Furigana
     kanji_numbers = {
@@ -16775,6 +17142,174 @@ def display_completion_message(lesson_type, student_level, url):
         clock.tick(60)
 
 
+### KANA GLYPH ATLAS ###
+
+class KanaGlyphAtlas:
+    """
+    A class that holds a set of kana, each pre-rendered with its drop shadow and
+    packed into one texture, so teach and quiz screens blit glyphs instead of
+    rasterizing them with FreeType.
+
+    An atlas is built once per (font, size, colors, characters), saved as a PNG with
+    a JSON index in the cache folder and loaded from there on later runs.
+
+    Attributes:
+    -----------
+    key : tuple
+        (font path, font size, text color, shadow color, shadow offset, characters).
+    texture : Surface
+        The packed glyphs with per-pixel alpha.
+    glyphs : dict
+        Maps each character to [x, y, width, height, offset x, offset y, text width,
+        text height]: its cell in the texture, where the cell sits relative to the
+        text's top-left corner, and the size the text had when rendered.
+
+    Methods:
+    --------
+    build(japanese_font):
+        Renders and packs every character with the given font.
+    load():
+        Loads the atlas from the cache folder. Returns False if it is not cached.
+    save():
+        Writes the atlas to the cache folder.
+    text_size(character):
+        Returns the (width, height) of a character's text, as font.size would.
+    draw(surface, character, position):
+        Draws a character with its shadow, its text's top-left corner at position.
+    """
+    def __init__(self, font_path, font_size, color, shadow_color, shadow_offset, characters):
+        self.key = (font_path, font_size, tuple(color), tuple(shadow_color), shadow_offset, tuple(characters))
+        self.texture = None
+        self.glyphs = {}
+
+    def cache_path(self, extension):
+        """Return the cache file path for this atlas with the given extension."""
+        digest = hashlib.sha1(repr(self.key).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(KANA_ATLAS_CACHE_DIRECTORY, f"kana_{self.key[1]}_{digest}.{extension}")
+
+    def build(self, japanese_font):
+        """
+        Render every character with its shadow, crop it to its visible pixels and
+        shelf-pack the results into the texture.
+
+        Parameters:
+            japanese_font (pygame.font.Font): A font of the atlas's size covering kana.
+        """
+        _, _, color, shadow_color, shadow_offset, characters = self.key
+        cells = {}
+        for character in dict.fromkeys(characters):
+            text_surface = japanese_font.render(character, True, color)
+            text_width, text_height = text_surface.get_size()
+            glyph = pygame.Surface((text_width + shadow_offset, text_height + shadow_offset), pygame.SRCALPHA)
+            glyph.blit(japanese_font.render(character, True, shadow_color), (shadow_offset, shadow_offset))
+            glyph.blit(text_surface, (0, 0))
+            bounds = glyph.get_bounding_rect()
+            cells[character] = (glyph.subsurface(bounds), bounds.topleft, (text_width, text_height))
+
+        atlas_width = max([KANA_ATLAS_WIDTH] + [cell.get_width() + 1 for cell, _, _ in cells.values()])
+        x = y = shelf_height = 0
+        for character, (cell, offset, text_size) in cells.items():
+            width, height = cell.get_size()
+            if x + width > atlas_width:
+                x, y = 0, y + shelf_height + 1
+                shelf_height = 0
+            self.glyphs[character] = [x, y, width, height, *offset, *text_size]
+            x += width + 1
+            shelf_height = max(shelf_height, height)
+
+        self.texture = pygame.Surface((atlas_width, max(1, y + shelf_height)), pygame.SRCALPHA)
+        for character, (cell, _, _) in cells.items():
+            self.texture.blit(cell, self.glyphs[character][:2])
+
+    def load(self):
+        """
+        Load the atlas from the cache folder.
+
+        Returns:
+            bool: True if a cached atlas was loaded, False if it has to be built.
+        """
+        image_path, index_path = self.cache_path("png"), self.cache_path("json")
+        if not (os.path.exists(image_path) and os.path.exists(index_path)):
+            return False
+        try:
+            with open(index_path, "r", encoding="utf-8") as file:
+                self.glyphs = json.load(file)["glyphs"]
+            self.texture = pygame.image.load(image_path)
+            return True
+        except (pygame.error, OSError, ValueError, KeyError) as e:
+            log_message(create_log_message(f"Error loading cached kana atlas '{image_path}': {e}"))
+            self.glyphs = {}
+            return False
+
+    def save(self):
+        """Write the atlas texture and its JSON index to the cache folder."""
+        try:
+            os.makedirs(KANA_ATLAS_CACHE_DIRECTORY, exist_ok=True)
+            pygame.image.save(self.texture, self.cache_path("png"))
+            with open(self.cache_path("json"), "w", encoding="utf-8") as file:
+                json.dump({"font": self.key[0], "size": self.key[1], "glyphs": self.glyphs}, file, ensure_ascii=False)
+        except (pygame.error, OSError) as e:
+            log_message(create_log_message(f"Error saving kana atlas to '{self.cache_path('png')}': {e}"))
+
+    def __contains__(self, character):
+        return character in self.glyphs
+
+    def text_size(self, character):
+        """Return the (width, height) of a character's text, as font.size would."""
+        return tuple(self.glyphs[character][6:8])
+
+    def draw(self, surface, character, position):
+        """
+        Draw a character with its shadow.
+
+        Parameters:
+            surface (pygame.Surface): The surface to draw on.
+            character (str): The kana to draw.
+            position (tuple): Where the top-left corner of the character's text goes.
+        """
+        x, y, width, height, offset_x, offset_y, _, _ = self.glyphs[character]
+        surface.blit(self.texture, (position[0] + offset_x, position[1] + offset_y), (x, y, width, height))
+
+
+kana_atlases = {}  # Atlases already loaded this run, keyed by KanaGlyphAtlas.key
+
+
+def get_kana_atlas(characters, font_size, color, shadow_color, shadow_offset):
+    """
+    Return the glyph atlas for a set of kana, loading it from the cache folder or
+    building and saving it the first time.
+
+    Parameters:
+        characters (list): The kana the atlas must hold.
+        font_size (int): The Japanese font size to render at.
+        color (tuple): The text color.
+        shadow_color (tuple): The drop shadow color.
+        shadow_offset (int): How far down and right the shadow is drawn, in pixels.
+
+    Returns:
+        KanaGlyphAtlas: The atlas, or None if it could not be built.
+    """
+    atlas = KanaGlyphAtlas(resolve_japanese_font_path(), font_size, color, shadow_color, shadow_offset, characters)
+    if atlas.key in kana_atlases:
+        return kana_atlases[atlas.key]
+
+    if not atlas.load():
+        try:
+            atlas.build(load_japanese_font(font_size))
+        except (pygame.error, OSError) as e:
+            log_message(create_log_message(f"Error building kana atlas: {e}"))
+            return None
+        atlas.save()
+        log_message(create_log_message(
+            f"Kana atlas built with {len(atlas.glyphs)} glyphs at size {font_size} "
+            f"({atlas.texture.get_width()}x{atlas.texture.get_height()})."
+        ))
+
+    atlas.texture = atlas.texture.convert_alpha()
+    kana_atlases[atlas.key] = atlas
+    return atlas
+
+
 def teach_characters(hiragana_subset, font):
     """Displays each Hiragana character one by one and ensures the screen redraws with each."""
     for char in hiragana_subset:
@@ -16813,8 +17348,9 @@ def run_teach(session_id, lesson_name, character_list, level_urls):
     # Get the subset of characters based on the student's level
     character_subset = get_character_subset_by_level(student_level, character_list)
 
-    # Define a larger font for the characters
-    large_japanese_font = pygame.font.Font("C:/Windows/Fonts/msgothic.ttc", 300)
+    # Characters come pre-rendered from the glyph atlas; the font is only opened without one
+    kana_atlas = get_kana_atlas(character_list, KANA_TEACH_FONT_SIZE, text_color, shadow_color, 5)
+    large_japanese_font = None if kana_atlas else load_japanese_font(KANA_TEACH_FONT_SIZE)
 
     # Display the intro message and teach the characters
     display_intro_message(lesson_name, student_level)
@@ -16831,16 +17367,21 @@ def run_teach(session_id, lesson_name, character_list, level_urls):
 
         # Clear the screen and display the current character with a shadow effect
         screen.fill(screen_color)
-        
-        # Render shadow character slightly offset
-        shadow_surface = large_japanese_font.render(char, True, shadow_color)
-        shadow_rect = shadow_surface.get_rect(center=(screen.get_width() // 2 + 5, screen.get_height() // 2 + 5))  # Offset shadow slightly
-        screen.blit(shadow_surface, shadow_rect)
-        
-        # Render main character on top of shadow
-        character_surface = large_japanese_font.render(char, True, text_color)
-        character_rect = character_surface.get_rect(center=(screen.get_width() // 2, screen.get_height() // 2))
-        screen.blit(character_surface, character_rect)
+
+        if kana_atlas:
+            character_rect = pygame.Rect((0, 0), kana_atlas.text_size(char))
+            character_rect.center = (screen.get_width() // 2, screen.get_height() // 2)
+            kana_atlas.draw(screen, char, character_rect.topleft)
+        else:
+            # Render shadow character slightly offset
+            shadow_surface = large_japanese_font.render(char, True, shadow_color)
+            shadow_rect = shadow_surface.get_rect(center=(screen.get_width() // 2 + 5, screen.get_height() // 2 + 5))  # Offset shadow slightly
+            screen.blit(shadow_surface, shadow_rect)
+
+            # Render main character on top of shadow
+            character_surface = large_japanese_font.render(char, True, text_color)
+            character_rect = character_surface.get_rect(center=(screen.get_width() // 2, screen.get_height() // 2))
+            screen.blit(character_surface, character_rect)
         
         pygame.display.flip()  # Update the display
 
@@ -16855,46 +17396,48 @@ def run_teach(session_id, lesson_name, character_list, level_urls):
     display_completion_message(lesson_name, student_level, completion_url)
 
 
+# Every hiragana taught, in lesson order
+HIRAGANA_CHARACTERS = [
+    # Basic Hiragana
+    "あ", "い", "う", "え", "お", 
+    "か", "き", "く", "け", "こ", 
+    "さ", "し", "す", "せ", "そ", 
+    "た", "ち", "つ", "て", "と", 
+    "な", "に", "ぬ", "ね", "の", 
+    "は", "ひ", "ふ", "へ", "ほ", 
+    "ま", "み", "む", "め", "も", 
+    "や", "ゆ", "よ", 
+    "ら", "り", "る", "れ", "ろ", 
+    "わ", "を", "ん",
+    
+    # Voiced Hiragana - "ga", "za", "da", "ba" columns
+    "が", "ぎ", "ぐ", "げ", "ご", 
+    "ざ", "じ", "ず", "ぜ", "ぞ", 
+    "だ", "ぢ", "づ", "で", "ど", 
+    "ば", "び", "ぶ", "べ", "ぼ",
+    
+    # "Pa" column with handakuten
+    "ぱ", "ぴ", "ぷ", "ぺ", "ぽ",
+    
+    # Contracted Sounds (ya-yōon) 
+    "きゃ", "きゅ", "きょ", 
+    "しゃ", "しゅ", "しょ", 
+    "ちゃ", "ちゅ", "ちょ", 
+    "にゃ", "にゅ", "にょ", 
+    "ひゃ", "ひゅ", "ひょ", 
+    "みゃ", "みゅ", "みょ", 
+    "りゃ", "りゅ", "りょ",
+    
+    # Voiced Contracted Sounds (ya-yōon)
+    "ぎゃ", "ぎゅ", "ぎょ", 
+    "じゃ", "じゅ", "じょ", 
+    "びゃ", "びゅ", "びょ", 
+    "ぴゃ", "ぴゅ", "ぴょ"
+]
+
+
 def hiragana_teach(session_id):
     """Displays Hiragana characters based on the student's level."""
-    hiragana_list = [
-        # Basic Hiragana
-        "あ", "い", "う", "え", "お", 
-        "か", "き", "く", "け", "こ", 
-        "さ", "し", "す", "せ", "そ", 
-        "た", "ち", "つ", "て", "と", 
-        "な", "に", "ぬ", "ね", "の", 
-        "は", "ひ", "ふ", "へ", "ほ", 
-        "ま", "み", "む", "め", "も", 
-        "や", "ゆ", "よ", 
-        "ら", "り", "る", "れ", "ろ", 
-        "わ", "を", "ん",
-        
-        # Voiced Hiragana - "ga", "za", "da", "ba" columns
-        "が", "ぎ", "ぐ", "げ", "ご", 
-        "ざ", "じ", "ず", "ぜ", "ぞ", 
-        "だ", "ぢ", "づ", "で", "ど", 
-        "ば", "び", "ぶ", "べ", "ぼ",
-        
-        # "Pa" column with handakuten
-        "ぱ", "ぴ", "ぷ", "ぺ", "ぽ",
-        
-        # Contracted Sounds (ya-yōon) 
-        "きゃ", "きゅ", "きょ", 
-        "しゃ", "しゅ", "しょ", 
-        "ちゃ", "ちゅ", "ちょ", 
-        "にゃ", "にゅ", "にょ", 
-        "ひゃ", "ひゅ", "ひょ", 
-        "みゃ", "みゅ", "みょ", 
-        "りゃ", "りゅ", "りょ",
-        
-        # Voiced Contracted Sounds (ya-yōon)
-        "ぎゃ", "ぎゅ", "ぎょ", 
-        "じゃ", "じゅ", "じょ", 
-        "びゃ", "びゅ", "びょ", 
-        "ぴゃ", "ぴゅ", "ぴょ"
-    ]
-
     # URLs for each level
     level_urls = {
         # Basic Hiragana
@@ -16934,71 +17477,78 @@ def hiragana_teach(session_id):
         26: ""   # ぴゃ (placeholder)
     }
 
-    run_teach(session_id, 'Hiragana', hiragana_list, level_urls)
+    run_teach(session_id, 'Hiragana', HIRAGANA_CHARACTERS, level_urls)
+
+
+# Every katakana taught, in lesson order
+KATAKANA_CHARACTERS = [
+    # Basic Katakana
+    "ア", "イ", "ウ", "エ", "オ", 
+    "カ", "キ", "ク", "ケ", "コ", 
+    "サ", "シ", "ス", "セ", "ソ", 
+    "タ", "チ", "ツ", "テ", "ト", 
+    "ナ", "ニ", "ヌ", "ネ", "ノ", 
+    "ハ", "ヒ", "フ", "ヘ", "ホ", 
+    "マ", "ミ", "ム", "メ", "モ", 
+    "ヤ", "ユ", "ヨ", 
+    "ラ", "リ", "ル", "レ", "ロ", 
+    "ワ", "ヲ", "ン",
+    
+    # Voiced Katakana - "ga", "za", "da", "ba" columns
+    "ガ", "ギ", "グ", "ゲ", "ゴ", 
+    "ザ", "ジ", "ズ", "ゼ", "ゾ", 
+    "ダ", "ヂ", "ヅ", "デ", "ド", 
+    "バ", "ビ", "ブ", "ベ", "ボ",
+    
+    # "Pa" column with handakuten
+    "パ", "ピ", "プ", "ペ", "ポ",
+    
+    # Contracted Sounds (ya-yōon)
+    "キャ", "キュ", "キョ", 
+    "シャ", "シュ", "ショ", 
+    "チャ", "チュ", "チョ", 
+    "ニャ", "ニュ", "ニョ", 
+    "ヒャ", "ヒュ", "ヒョ", 
+    "ミャ", "ミュ", "ミョ", 
+    "リャ", "リュ", "リョ",
+    
+    # Voiced Contracted Sounds (ya-yōon)
+    "ギャ", "ギュ", "ギョ", 
+    "ジャ", "ジュ", "ジョ", 
+    "ビャ", "ビュ", "ビョ", 
+    "ピャ", "ピュ", "ピョ"
+]
 
 
 def katakana_teach(session_id):
     """Displays Katakana characters based on the student's level."""
-    katakana_list = [
-        # Basic Katakana
-        "ア", "イ", "ウ", "エ", "オ", 
-        "カ", "キ", "ク", "ケ", "コ", 
-        "サ", "シ", "ス", "セ", "ソ", 
-        "タ", "チ", "ツ", "テ", "ト", 
-        "ナ", "ニ", "ヌ", "ネ", "ノ", 
-        "ハ", "ヒ", "フ", "ヘ", "ホ", 
-        "マ", "ミ", "ム", "メ", "モ", 
-        "ヤ", "ユ", "ヨ", 
-        "ラ", "リ", "ル", "レ", "ロ", 
-        "ワ", "ヲ", "ン",
-        
-        # Voiced Katakana - "ga", "za", "da", "ba" columns
-        "ガ", "ギ", "グ", "ゲ", "ゴ", 
-        "ザ", "ジ", "ズ", "ゼ", "ゾ", 
-        "ダ", "ヂ", "ヅ", "デ", "ド", 
-        "バ", "ビ", "ブ", "ベ", "ボ",
-        
-        # "Pa" column with handakuten
-        "パ", "ピ", "プ", "ペ", "ポ",
-        
-        # Contracted Sounds (ya-yōon)
-        "キャ", "キュ", "キョ", 
-        "シャ", "シュ", "ショ", 
-        "チャ", "チュ", "チョ", 
-        "ニャ", "ニュ", "ニョ", 
-        "ヒャ", "ヒュ", "ヒョ", 
-        "ミャ", "ミュ", "ミョ", 
-        "リャ", "リュ", "リョ",
-        
-        # Voiced Contracted Sounds (ya-yōon)
-        "ギャ", "ギュ", "ギョ", 
-        "ジャ", "ジュ", "ジョ", 
-        "ビャ", "ビュ", "ビョ", 
-        "ピャ", "ピュ", "ピョ"
-    ]
-
     level_urls = {
         # Define URLs specific to Katakana if available or use placeholders
     }
 
-    run_teach(session_id, 'Katakana', katakana_list, level_urls)
+    run_teach(session_id, 'Katakana', KATAKANA_CHARACTERS, level_urls)
 
 
 def display_kana_quiz(screen, hiragana_char, options):
     screen.fill(NAVY_BLUE)
 
-    # Draw the Hiragana on the screen using the updated draw_text function
-    draw_text(
-        hiragana_char,
-        j_font,  # Assuming you have a separate Japanese font loaded
-        WHITE,
-        x=WIDTH // 2,
-        y=HEIGHT // 3,
-        center=True,
-        enable_shadow=True,
-        # shadow_color=BLACK,
-        use_japanese_font=True
-    )
+    # Draw the kana from the glyph atlas, at the size and colors j_font would draw it
+    kana_atlas = get_kana_atlas(HIRAGANA_CHARACTERS + KATAKANA_CHARACTERS, get_font_size(), WHITE, shadow_color, 2)
+    if kana_atlas and hiragana_char in kana_atlas:
+        kana_width = kana_atlas.text_size(hiragana_char)[0]
+        kana_atlas.draw(screen, hiragana_char, ((WIDTH - kana_width) // 2, HEIGHT // 3))
+    else:
+        draw_text(
+            hiragana_char,
+            j_font,  # Assuming you have a separate Japanese font loaded
+            WHITE,
+            x=WIDTH // 2,
+            y=HEIGHT // 3,
+            center=True,
+            enable_shadow=True,
+            # shadow_color=BLACK,
+            use_japanese_font=True
+        )
 
     # Draw the multiple-choice options
     option_rects = []
@@ -17037,21 +17587,16 @@ def quiz_intro_message(session_id, lesson_title, student_level):
     draw_and_wait_continue_button()
 
 
-def quiz_loop(lesson_title, character_subset, total_questions):
-    """Handles the quiz loop, ensuring unique questions are selected from the weighted subset."""
+def quiz_loop(lesson_title, character_subset, questions):
+    """
+    Handles the quiz loop, asking the scheduled (character, romaji) questions in order
+    with wrong options drawn from the level's character subset.
+    """
     correct_answers = 0
     completion_times = []
-    asked_characters = set()  # Track characters that have already been quizzed
-
-    for problem_count in range(total_questions):
-        # Select a unique character for the question
-        character, correct_english = None, None
-        while not character or (character, correct_english) in asked_characters:
-            character, correct_english = random.choice(character_subset)
-
-        # Add the chosen character to the set of asked characters
-        asked_characters.add((character, correct_english))
+    answer_log = AnswerLog()
 
+    for character, correct_english in questions:
         # Select three unique incorrect answers
         all_romaji_options = [ch[1] for ch in character_subset if ch[1] != correct_english]
         incorrect_answers = set()
@@ -17080,6 +17625,7 @@ def quiz_loop(lesson_title, character_subset, total_questions):
                         if rect.collidepoint(mouse_pos):
                             time_taken = round(time.time() - start_time, 1)
                             completion_times.append(time_taken)
+                            answer_log.record(character, option, option == correct_english, time_taken)
                             if option == correct_english:
                                 correct_answers += 1
                                 display_result("Correct!", "assets/images/fast_cats", use_lightning=(time_taken < 3))
@@ -17088,13 +17634,15 @@ def quiz_loop(lesson_title, character_subset, total_questions):
                             question_complete = True
             pygame.time.Clock().tick(60)
     
-    return correct_answers, completion_times
+    return correct_answers, completion_times, answer_log
 
 
-def final_score_display(session_id, lesson_id, correct_answers, total_questions, completion_times, lesson_start_time, lesson_end_time, lesson_title):
+def final_score_display(session_id, lesson_id, correct_answers, total_questions, completion_times, lesson_start_time, lesson_end_time, lesson_title, answer_log=None):
     """Displays the final score and updates the student's progress."""
     average_time = round(sum(completion_times) / len(completion_times), 1) if completion_times else 0
-    add_session_lesson(session_id, lesson_id, lesson_start_time, lesson_end_time, total_questions, correct_answers)
+    add_session_lesson(session_id, lesson_id, lesson_start_time, lesson_end_time, total_questions, correct_answers,
+                       answer_log=answer_log)
+    update_review_schedule(session_id, lesson_title, answer_log)
 
     # Display final score
     screen.fill(screen_color)
@@ -17141,21 +17689,21 @@ def run_quiz(session_id, lesson_name, character_list):
     # Get the subset of characters based on level
     character_subset = get_character_subset_by_level(student_level, character_list)
 
-    # Favor the last few characters of the subset by duplicating them
-    character_subset += character_subset[-5:] * student_level  # Duplicate the last 5 characters for favoring
-
-    # Shuffle to randomize quiz questions
-    random.shuffle(character_subset)
+    # Ask the characters that are due for review first, then the newest unseen ones
+    romaji_by_character = dict(character_subset)
+    scheduled_characters = select_review_items(session_id, lesson_name, list(romaji_by_character), total_questions)
+    questions = [(character, romaji_by_character[character]) for character in scheduled_characters]
+    total_questions = len(questions)
 
     # Run the quiz loop
-    correct_answers, completion_times = quiz_loop(lesson_name, character_subset, total_questions)
+    correct_answers, completion_times, answer_log = quiz_loop(lesson_name, character_subset, questions)
 
     # Record lesson end time
     lesson_end_time = time.time()
 
     # Final score and performance display
     final_score_display(session_id, lesson_id, correct_answers, total_questions, completion_times, 
-                        lesson_start_time, lesson_end_time, lesson_title=lesson_name)
+                        lesson_start_time, lesson_end_time, lesson_title=lesson_name, answer_log=answer_log)
 
     # Return quiz results
     return total_questions, correct_answers, sum(completion_times) / len(completion_times) if completion_times else 0
@@ -17298,7 +17846,7 @@ def vocab_teach(session_id, lesson_title):
         return
 
     # Font initialization for furigana and translation
-    furigana_font = pygame.font.Font("C:/Windows/Fonts/msgothic.ttc", 75)
+    furigana_font = load_japanese_font(75)
     
     translation_font_size = 100
     if os.path.isfile(current_font_name_or_path):
@@ -17320,7 +17868,7 @@ def vocab_teach(session_id, lesson_title):
         # Adjust the kanji font size dynamically based on kanji length
         kanji_length = len(item['kanji'])
         kanji_font_size = 215 if kanji_length <= 3 else 75
-        kanji_font = pygame.font.Font("C:/Windows/Fonts/msgothic.ttc", kanji_font_size)
+        kanji_font = load_japanese_font(kanji_font_size)
 
         # Display furigana, kanji, and translation
         draw_text(item['furigana'], furigana_font, text_color, x=0, y=HEIGHT * 0.1, center=True, max_width=WIDTH,
@@ -17359,19 +17907,18 @@ def vocab_teach(session_id, lesson_title):
         try:
             # Try loading the image as a JPG first
             jpg_image_path = item['image'].replace(".png", ".jpg") if item['image'].endswith(".png") else item['image'] + ".jpg"
-            image = pygame.image.load(jpg_image_path)
+            image = load_scaled_image(jpg_image_path, (WIDTH, HEIGHT))
             image_loaded = True
         except FileNotFoundError:
             try:
                 # If JPG not found, fallback to PNG
-                image = pygame.image.load(item['image'])
+                image = load_scaled_image(item['image'], (WIDTH, HEIGHT))
                 image_loaded = True
             except FileNotFoundError:
                 log_message(f"Image not found: {jpg_image_path} or {item['image']}. Displaying text only.")
 
         if image_loaded:
-            # Resize and display the image if it was loaded successfully
-            image = pygame.transform.scale(image, (WIDTH, HEIGHT))
+            # Display the image if it was loaded successfully
             screen.blit(image, (0, 0))
             pygame.display.flip()
             speak_japanese(item['furigana'])
@@ -17436,90 +17983,15 @@ def display_result_with_image(result_text, image_file=None, use_lightning=False)
     Display the result text and an optional image from a given file.
     If an image is provided and 'use_lightning' is True, show lightning instead of particles.
     If 'use_lightning' is False, show a particle effect.
+    The animation is time-based and the player can click to skip it.
     """
-    # Clear the event queue to avoid any unwanted inputs
-    pygame.event.clear()
-
-    # Initialize particle list
-    particles = []
-
-    # Define a variable for particle delay (adjustable)
-    PARTICLE_DELAY_MS = 20  # Delay in milliseconds between each frame of particle rendering
-
-    # Attempt to load the image if provided
     bg_image = None
     if image_file:
-        try:
-            bg_image = pygame.image.load(image_file)
-            # Resize the image to the screen dimensions
-            bg_image = pygame.transform.scale(bg_image, (WIDTH, HEIGHT))
-        except FileNotFoundError:
+        bg_image = get_cached_background(image_file)
+        if bg_image is None:
             log_message(f"Image not found: {image_file}. Displaying text only.")
-            # If the image is not found, bg_image remains None
-
-    # If the image loaded successfully, blit it to the screen
-    if bg_image:
-        screen.blit(bg_image, (0, 0))
-
-        if not use_lightning:
-            # Generate particles for the effect (only if use_lightning is False)
-            for _ in range(500):  # Number of particles to generate
-                x = random.randint(0, WIDTH)
-                y = random.randint(0, HEIGHT)
-                color = random.choice([NAVY_BLUE, (255, 255, 255), ROYAL_BLUE, LIGHT_BLUE])
-                particles.append(Particle(x, y, color))
-    else:
-        # If no image file is provided or failed to load, fill the screen with the current screen color
-        screen.fill(screen_color)
-
-    # Display loop for particle effect or lightning effect
-    if use_lightning and bg_image:
-        # Show lightning effect if the fast answer condition is met
-        for _ in range(3):  # Increased number of lightning bolts for dramatic effect
-            draw_lightning(screen, (random.randint(0, WIDTH), 0), (random.randint(0, WIDTH), HEIGHT), 
-                           image_file, font, text_color, correct_message=result_text)
-            pygame.display.flip()
-            pygame.time.delay(150)  # Slight delay between lightning bolts
-    else:
-        # Show particle effect for slower answers or if no image is available
-        for _ in range(50):  # Run the particle effect for 50 frames
-            if bg_image:
-                # Transparent fill to allow particles to fade
-                screen.fill((0, 0, 0, 0))
-                screen.blit(bg_image, (0, 0))
-
-                # Update and draw each particle
-                for particle in particles[:]:
-                    particle.update()
-                    if particle.lifetime <= 0:
-                        particles.remove(particle)
-                    else:
-                        particle.draw(screen)
-
-                # Add delay to control the speed of particle rendering
-                pygame.time.delay(PARTICLE_DELAY_MS)
-            else:
-                # For incorrect answers or if no image is available, fill the screen with the current screen color
-                screen.fill(screen_color)
 
-            # Draw the result text on top of the particles or background
-            draw_text(result_text, 
-                      font, 
-                      text_color, 
-                      WIDTH // 2, 
-                      HEIGHT // 2, 
-                      center=True, 
-                      enable_shadow=True,
-                      # shadow_color=shadow_color,
-                      max_width=WIDTH)
-            pygame.display.flip()
-
-    # Final display and pause before exiting the function
-    pygame.display.flip()
-    time.sleep(1)  # Pause for 1 second
-
-    # Clear the event queue again after displaying the result
-    pygame.event.clear()
+    run_reward_animation(RewardAnimation(result_text, bg_image, use_lightning))
 
 
 def japanese_quiz(session_id, lesson_title, lesson_data):
@@ -17554,6 +18026,7 @@ def japanese_quiz(session_id, lesson_title, lesson_data):
     total_questions = len(questions)  # Set number of questions to match the data dynamically
     correct_answers = 0
     completion_times = []
+    answer_log = AnswerLog()
 
     # Quiz loop
     for problem_count in range(total_questions):
@@ -17601,26 +18074,22 @@ def japanese_quiz(session_id, lesson_title, lesson_data):
                             answer_clicked = True  # Prevent further clicks for this question
                             time_taken = round(time.time() - start_time, 1)
                             completion_times.append(time_taken)
+                            answer_log.record(question['kanji'], option, option == correct_answer, time_taken)
 
                             if option == correct_answer:
                                 correct_answers += 1
                                 
-                                # Assume JPG and fall back to PNG
+                                # Assume JPG and fall back to PNG; display_result_with_image loads the picture
                                 image_loaded = False
                                 image_file = question['image']
-                                try:
-                                    # Try loading the image as JPG
-                                    jpg_image_path = image_file.replace(".png", ".jpg") if image_file.endswith(".png") else image_file + ".jpg"
-                                    image = pygame.image.load(jpg_image_path)
+                                jpg_image_path = image_file.replace(".png", ".jpg") if image_file.endswith(".png") else image_file + ".jpg"
+                                if asset_exists(jpg_image_path):
                                     image_file = jpg_image_path  # Update to use the JPG file path
                                     image_loaded = True
-                                except FileNotFoundError:
-                                    try:
-                                        # Fallback to PNG if JPG is not found
-                                        image = pygame.image.load(image_file)
-                                        image_loaded = True
-                                    except FileNotFoundError:
-                                        log_message(f"Image not found: {jpg_image_path} or {image_file}. Displaying text only.")
+                                elif asset_exists(image_file):
+                                    image_loaded = True
+                                else:
+                                    log_message(f"Image not found: {jpg_image_path} or {image_file}. Displaying text only.")
 
                                 if image_loaded:
                                     display_result_with_image("Correct!", image_file, use_lightning=(time_taken < 3))
@@ -17642,7 +18111,9 @@ def japanese_quiz(session_id, lesson_title, lesson_data):
     lesson_end_time = time.time()
 
     # Add session lesson to the database (track progress)
-    add_session_lesson(session_id, lesson_id, lesson_start_time, lesson_end_time, total_questions, correct_answers)
+    add_session_lesson(session_id, lesson_id, lesson_start_time, lesson_end_time, total_questions, correct_answers,
+                       answer_log=answer_log)
+    update_review_schedule(session_id, lesson_title, answer_log)
 
     # Display the final score and handle perfect scores
     screen.fill(screen_color)
@@ -17736,7 +18207,11 @@ class Cat:
     Attributes:
     -----------
     image : Surface
-        The image representing the cat.
+        The image representing the cat in its current facing direction.
+    image_right : Surface
+        The cat image facing right.
+    image_left : Surface
+        The pre-flipped cat image facing left.
     rect : Rect
         The rectangle enclosing the cat for positioning and collision.
     speed : int
@@ -17759,6 +18234,8 @@ class Cat:
         The maximum rotation angle for the cat's jump.
     particles : list
         A list of particle objects emitted during jumps.
+    rotation_cache : dict
+        Rotated jump images keyed by (facing_left, jump_angle).
 
     Methods:
     --------
@@ -17770,14 +18247,17 @@ class Cat:
         Makes the cat jump and emits particles.
     update(platforms=None):
         Updates the cat's position, handles input, applies gravity, and manages jumping.
-    draw(screen):
+    draw(screen, alpha=1.0):
         Draws the cat and its particles on the provided screen.
     """
-    def __init__(self, image, x, y, speed, scale_factor):
+    def __init__(self, image, x, y, speed, scale_factor, flipped_image=None):
         """
-        Initialize the Cat object.
+        Initialize the Cat object. flipped_image is the left-facing image; it is
+        flipped from image once here if not given.
         """
-        self.image = image
+        self.image_right = image
+        self.image_left = flipped_image if flipped_image is not None else pygame.transform.flip(image, True, False)
+        self.image = self.image_right
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
@@ -17792,6 +18272,8 @@ class Cat:
         self.max_angle = 45
         self.particles = []
         self.rotated_image = self.image
+        self.rotation_cache = {}
+        self.prev_topleft = self.rect.topleft
 
     def handle_input(self):
         """Handles the player's input to move the cat."""
@@ -17799,12 +18281,12 @@ class Cat:
         if (keys[pygame.K_LEFT] or keys[pygame.K_a] or keys[pygame.K_KP4]) and self.rect.x > 0:
             self.rect.x -= self.speed
             if not self.facing_left:
-                self.image = pygame.transform.flip(self.image, True, False)
+                self.image = self.image_left
                 self.facing_left = True
         elif (keys[pygame.K_RIGHT] or keys[pygame.K_d] or keys[pygame.K_KP6]) and self.rect.x < WIDTH - self.rect.width:
             self.rect.x += self.speed
             if self.facing_left:
-                self.image = pygame.transform.flip(self.image, True, False)
+                self.image = self.image_right
                 self.facing_left = False
 
     def apply_gravity(self, platforms=None):
@@ -17839,19 +18321,20 @@ class Cat:
             self.is_jumping = True
             self.can_double_jump = True  # Allow double jump after the first jump
             for _ in range(10):
-                self.particles.append(Particle(self.rect.centerx, self.rect.bottom, (255, 255, 255)))
+                self.particles.append(particle_pool.acquire(self.rect.centerx, self.rect.bottom, (255, 255, 255)))
         elif self.can_double_jump:
             # Double jump in mid-air
             self.vertical_speed = self.jump_speed
             self.can_double_jump = False  # Disable further jumps after the double jump
             for _ in range(10):
-                self.particles.append(Particle(self.rect.centerx, self.rect.bottom, (255, 255, 255)))
+                self.particles.append(particle_pool.acquire(self.rect.centerx, self.rect.bottom, (255, 255, 255)))
 
 
     def update(self, platforms=None):
         """
         Updates the cat's position, handles input, applies gravity, and manages double jumping.
         """
+        self.prev_topleft = self.rect.topleft
         self.handle_input()
         self.apply_gravity(platforms)
 
@@ -17860,20 +18343,24 @@ class Cat:
                 self.jump_angle = max(-self.max_angle, min(self.max_angle, self.jump_angle + (-1 if self.vertical_speed < 0 else 1) * 10))
             else:
                 self.jump_angle = max(-self.max_angle, min(self.max_angle, self.jump_angle + (1 if self.vertical_speed < 0 else -1) * 10))
-            self.rotated_image = pygame.transform.rotate(self.image, self.jump_angle)
+            # Jump angles only take a handful of values, so each rotation is made once
+            rotation_key = (self.facing_left, self.jump_angle)
+            if rotation_key not in self.rotation_cache:
+                self.rotation_cache[rotation_key] = pygame.transform.rotate(self.image, self.jump_angle)
+            self.rotated_image = self.rotation_cache[rotation_key]
         else:
             self.rotated_image = self.image
 
-        for particle in self.particles[:]:
+        for particle in self.particles:
             particle.update()
-            if particle.lifetime <= 0:
-                self.particles.remove(particle)
+        particle_pool.release_where(self.particles, Particle.is_expired)
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         """
-        Draws the cat and its particles on the provided screen.
+        Draws the cat and its particles on the provided screen, alpha of the way
+        between its previous and current positions.
         """
-        screen.blit(self.rotated_image, self.rect.topleft)
+        screen.blit(self.rotated_image, interpolate_position(self.prev_topleft, self.rect.topleft, alpha))
         for particle in self.particles:
             particle.draw(screen)
 
@@ -17901,13 +18388,22 @@ class Particle:
 
     Methods:
     --------
+    reset(x, y, color):
+        Reinitializes the particle in place so it can be reused from a pool.
     update():
         Updates the particle's position and decreases its lifetime.
+    is_expired():
+        Returns True once the particle's lifetime has run out.
     draw(screen):
         Draws the particle on the given screen.
     """
+    __slots__ = ('x', 'y', 'size', 'color', 'lifetime', 'dx', 'dy')
 
     def __init__(self, x, y, color):
+        self.reset(x, y, color)
+
+    def reset(self, x, y, color):
+        """Reinitializes the particle in place so it can be reused from a pool."""
         self.x = x
         self.y = y
         self.size = random.randint(2, 8)
@@ -17922,11 +18418,19 @@ class Particle:
         self.y += self.dy
         self.lifetime -= 1
 
+    def is_expired(self):
+        """Returns True once the particle's lifetime has run out."""
+        return self.lifetime <= 0
+
     def draw(self, screen):
         """Draws the particle on the given screen."""
         pygame.draw.circle(screen, self.color, (self.x, self.y), self.size)
 
 
+# Shared pool for the particles emitted by the bonus game entities
+particle_pool = EntityPool(Particle)
+
+
 class Piranha:
     """
     A class to represent a piranha that moves horizontally across the screen.
@@ -17942,11 +18446,15 @@ class Piranha:
 
     Methods:
     --------
+    reset(image, x, y, speed):
+        Reinitializes the piranha in place so it can be reused from a pool.
     update():
         Updates the piranha's position, reversing its direction when it hits the screen edges.
-    draw(screen):
+    draw(screen, alpha=1.0):
         Draws the piranha on the given Pygame surface.
     """
+    __slots__ = ('image', 'rect', 'speed', 'prev_topleft')
+
     def __init__(self, image, x, y, speed):
         """
         Initialize the Piranha object.
@@ -17957,9 +18465,16 @@ class Piranha:
             y (int): The initial y-coordinate of the piranha.
             speed (int): The speed at which the piranha moves horizontally.
         """
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.reset(image, x, y, speed)
+
+    def reset(self, image, x, y, speed):
+        """Reinitializes the piranha in place so it can be reused from a pool."""
         self.image = image
-        self.rect = self.image.get_rect(bottomleft=(x, y))
+        self.rect.size = image.get_size()
+        self.rect.bottomleft = (x, y)
         self.speed = speed
+        self.prev_topleft = self.rect.topleft
 
     def update(self):
         """
@@ -17967,18 +18482,20 @@ class Piranha:
 
         The piranha moves horizontally and reverses direction when it hits the screen edges.
         """
+        self.prev_topleft = self.rect.topleft
         self.rect.x += self.speed
         if self.rect.left <= 0 or self.rect.right >= WIDTH:
             self.speed = -self.speed
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         """
         Draw the piranha on the screen.
 
         Parameters:
             screen (Surface): The Pygame surface to draw the piranha on.
+            alpha (float): How far (0-1) to interpolate from the previous position.
         """
-        screen.blit(self.image, self.rect.topleft)
+        screen.blit(self.image, interpolate_position(self.prev_topleft, self.rect.topleft, alpha))
    
     
 class Platform:
@@ -17994,24 +18511,35 @@ class Platform:
 
     Methods:
     --------
+    reset(image, x, y, width, height):
+        Reinitializes the platform in place so it can be reused from a pool.
     update(speed):
         Updates the platform's vertical position based on the given falling speed.
-    draw(screen):
+    draw(screen, alpha=1.0):
         Draws the platform on the given Pygame surface.
     """
+    __slots__ = ('image', 'rect', 'prev_topleft')
+
     def __init__(self, image, x, y, width, height):
         """
         Initialize the Platform object.
 
         Parameters:
-            image (Surface): The image representing the platform.
+            image (Surface): The image representing the platform. Images already at
+                (width, height), such as sprite atlas variants, are used as they are.
             x (int): The x-coordinate of the platform.
             y (int): The y-coordinate of the platform.
             width (int): The width of the platform.
             height (int): The height of the platform.
         """
-        self.image = pygame.transform.scale(image, (width, height))
-        self.rect = pygame.Rect(x, y, width, height)
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.reset(image, x, y, width, height)
+
+    def reset(self, image, x, y, width, height):
+        """Reinitializes the platform in place so it can be reused from a pool."""
+        self.image = image if image.get_size() == (width, height) else pygame.transform.scale(image, (width, height))
+        self.rect.update(x, y, width, height)
+        self.prev_topleft = self.rect.topleft
 
     def update(self, speed):
         """
@@ -18020,19 +18548,27 @@ class Platform:
         Parameters:
             speed (int): The speed at which the platform falls.
         """
+        self.prev_topleft = self.rect.topleft
         self.rect.y += speed
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         """
         Draw the platform on the screen.
 
         Parameters:
             screen (Surface): The Pygame surface to draw the platform on.
+            alpha (float): How far (0-1) to interpolate from the previous position.
         """
-        screen.blit(self.image, self.rect.topleft)
+        screen.blit(self.image, interpolate_position(self.prev_topleft, self.rect.topleft, alpha))
 
 
 class Bomb:
+    __slots__ = ('image', 'original_image', 'rect', 'speed', 'angle', 'particles', 'prev_center')
+
+    # Rotated images keyed by (image, angle), shared by every bomb. The angle steps
+    # by 15 degrees, so each image has only 24 rotations, made once each.
+    rotation_cache = {}
+
     def __init__(self, image, x, y, speed):
         """
         Initialize the Bomb object.
@@ -18043,14 +18579,23 @@ class Bomb:
             y (int): The initial y-coordinate of the bomb.
             speed (int): The speed at which the bomb falls.
         """
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.particles = []
+        self.reset(image, x, y, speed)
+
+    def reset(self, image, x, y, speed):
+        """
+        Reinitialize the bomb in place so it can be reused from a pool. Particles
+        left over from its previous fall go back to the particle pool.
+        """
         self.image = image
         self.original_image = image
-        self.rect = self.image.get_rect()
-        self.rect.x = x
-        self.rect.y = y
+        self.rect.size = image.get_size()
+        self.rect.topleft = (x, y)
         self.speed = speed
         self.angle = 0
-        self.particles = []
+        particle_pool.release_all(self.particles)
+        self.prev_center = self.rect.center
 
     def update(self):
         """
@@ -18058,26 +18603,30 @@ class Bomb:
 
         The bomb falls from the top of the screen, rotating as it descends. It also emits particles.
         """
+        self.prev_center = self.rect.center
         self.rect.y += self.speed
         self.angle = (self.angle + 15) % 360
-        self.particles = [
-            particle for particle in self.particles if particle.lifetime > 0
-        ]
+        particle_pool.release_where(self.particles, Particle.is_expired)
         for particle in self.particles:
             particle.update()
+        # Emit from the simulation step so the trail doesn't depend on the frame rate
+        if random.randint(0, 1) == 0:
+            self.particles.append(particle_pool.acquire(self.rect.centerx, self.rect.top, (255, 0, 0)))
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         """
         Draw the bomb and its particles on the screen.
 
         Parameters:
             screen (Surface): The Pygame surface to draw the bomb and particles on.
+            alpha (float): How far (0-1) to interpolate from the previous position.
         """
-        rotated_image = pygame.transform.rotate(self.original_image, self.angle)
-        new_rect = rotated_image.get_rect(center=self.rect.center)
+        rotation_key = (self.original_image, self.angle)
+        rotated_image = Bomb.rotation_cache.get(rotation_key)
+        if rotated_image is None:
+            rotated_image = Bomb.rotation_cache[rotation_key] = pygame.transform.rotate(self.original_image, self.angle)
+        new_rect = rotated_image.get_rect(center=interpolate_position(self.prev_center, self.rect.center, alpha))
         screen.blit(rotated_image, new_rect.topleft)
-        if random.randint(0, 1) == 0:
-            self.particles.append(Particle(self.rect.centerx, self.rect.top, (255, 0, 0)))
         for particle in self.particles:
             particle.draw(screen)
             
@@ -18092,11 +18641,26 @@ class Fish:
         speed (int): The vertical speed of the fish, controlling how fast it falls.
         particles (list): A list of particles for visual effects as the fish falls.
     """
+    __slots__ = ('image', 'rect', 'speed', 'particles', 'prev_topleft')
 
     def __init__(self, image, x, y, speed):
         """
         Initialize the fish object with an image, position, and speed.
 
+        Args:
+            image (pygame.Surface): The image to represent the fish.
+            x (int): The initial x-coordinate of the fish.
+            y (int): The initial y-coordinate of the fish.
+            speed (int): The speed at which the fish will fall.
+        """
+        self.rect = pygame.Rect(0, 0, 0, 0)  # Rectangle reused for the lifetime of the object.
+        self.particles = []  # Initialize an empty list for particles.
+        self.reset(image, x, y, speed)
+
+    def reset(self, image, x, y, speed):
+        """
+        Reinitialize the fish in place so it can be reused from a pool.
+
         Args:
             image (pygame.Surface): The image to represent the fish.
             x (int): The initial x-coordinate of the fish.
@@ -18104,11 +18668,11 @@ class Fish:
             speed (int): The speed at which the fish will fall.
         """
         self.image = image  # Store the image of the fish.
-        self.rect = self.image.get_rect()  # Get the rectangle of the image.
-        self.rect.x = x  # Set the initial x-coordinate.
-        self.rect.y = y  # Set the initial y-coordinate.
+        self.rect.size = image.get_size()  # Match the rectangle to the image.
+        self.rect.topleft = (x, y)  # Set the initial coordinates.
         self.speed = speed  # Set the falling speed.
-        self.particles = []  # Initialize an empty list for particles.
+        particle_pool.release_all(self.particles)  # Return leftover particles to the pool.
+        self.prev_topleft = self.rect.topleft  # Position at the previous simulation step.
 
     def update(self):
         """
@@ -18117,23 +18681,25 @@ class Fish:
         The fish falls by increasing its y-coordinate by its speed. Particles are updated and removed
         if their lifetime is over.
         """
+        self.prev_topleft = self.rect.topleft
         self.rect.y += self.speed  # Move the fish down by its speed.
-        # Remove particles whose lifetime has expired and update remaining particles.
-        self.particles = [particle for particle in self.particles if particle.lifetime > 0]
+        # Return particles whose lifetime has expired to the pool and update remaining particles.
+        particle_pool.release_where(self.particles, Particle.is_expired)
         for particle in self.particles:
             particle.update()  # Update each particle's position and state.
+        # Occasionally generate a new particle behind the fish.
+        if random.randint(0, 10) < 8:
+            self.particles.append(particle_pool.acquire(self.rect.centerx, self.rect.bottom, (50, 50, 255)))
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         """
         Draw the fish and its associated particles on the screen.
 
         Args:
             screen (pygame.Surface): The surface to draw the fish and particles on.
+            alpha (float): How far (0-1) to interpolate from the previous position.
         """
-        screen.blit(self.image, self.rect.topleft)  # Draw the fish at its current position.
-        # Occasionally generate a new particle behind the fish.
-        if random.randint(0, 10) < 8:
-            self.particles.append(Particle(self.rect.centerx, self.rect.bottom, (50, 50, 255)))
+        screen.blit(self.image, interpolate_position(self.prev_topleft, self.rect.topleft, alpha))
         # Draw all particles on the screen.
         for particle in self.particles:
             particle.draw(screen)
@@ -18182,4 +18748,7 @@ def main():
             current_state = session_manager()
 
 if __name__ == "__main__":
-    main()
+    if "--build-asset-bundle" in sys.argv[1:]:
+        build_asset_bundle()
+    else:
+        main()